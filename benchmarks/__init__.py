@@ -0,0 +1 @@
+"""Performance benchmarks for pynbntnmodem, run from the repository root."""
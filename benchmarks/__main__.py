@@ -0,0 +1,71 @@
+"""Run the benchmark suite and optionally compare against a baseline.
+
+Usage:
+    python -m benchmarks [--quick] [--only NAME ...] [--json FILE]
+                         [--compare BASELINE] [--threshold 0.1]
+
+Exits with status 1 if any result regressed beyond the threshold.
+"""
+
+import argparse
+import sys
+
+from . import (
+    bridge,
+    codec,
+    imports,
+    metrics,
+    nidd,
+    ntninit,
+    parsers,
+    planner,
+    replay,
+)
+from .common import compare, load_json, print_results, write_json
+
+BENCHMARKS = {
+    'parsers': parsers.run,
+    'nidd': nidd.run,
+    'metrics': metrics.run,
+    'replay': replay.run,
+    'planner': planner.run,
+    'codec': codec.run,
+    'bridge': bridge.run,
+    'ntninit': ntninit.run,
+    'imports': imports.run,
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true',
+                        help='fewer iterations for a smoke run')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS),
+                        help='benchmarks to run (default all)')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write results as JSON (- for stdout)')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='JSON results of a previous run to compare')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative change reported as regression')
+    args = parser.parse_args()
+    results = []
+    for name in args.only or BENCHMARKS:
+        print(f'Running {name}...', file=sys.stderr)
+        results.extend(BENCHMARKS[name](quick=args.quick))
+    if args.json:
+        write_json(results, args.json)
+    if args.json != '-':
+        print_results(results)
+    if args.compare:
+        regressions = compare(load_json(args.compare), results, args.threshold)
+        for base, result, change in regressions:
+            print(f'REGRESSION {result.key}: {base.value:,.3f} -> '
+                  f'{result.value:,.3f} {result.unit} ({change:+.1%})',
+                  file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
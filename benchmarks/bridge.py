@@ -0,0 +1,150 @@
+"""Benchmark of `UdpSocketBridge` datagram throughput and latency.
+
+The modem callbacks are in-process fakes that complete immediately, so the
+results measure the bridge itself: local socket, selector wake-up and
+forwarding.
+
+Usage:
+    python -m benchmarks.bridge [--count N] [--json FILE]
+"""
+
+import argparse
+import socket
+import statistics
+import threading
+import time
+from collections import deque
+
+from pynbntnmodem import MoMessage, MtMessage, PdnType, UdpSocketBridge
+
+from .common import Result, print_results, write_json
+
+PAYLOAD = bytes(range(100))
+
+
+class FakeSocketModem:
+    """Modem UDP socket callbacks recording uplinks and queuing downlinks."""
+    def __init__(self):
+        self.sent = 0
+        self.sent_event = threading.Event()
+        self.sent_at: list[float] = []
+        self.downlink: deque[bytes] = deque()
+
+    def open(self, **kwargs) -> bool:
+        return True
+
+    def send(self, payload: bytes) -> MoMessage:
+        self.sent_at.append(time.perf_counter())
+        self.sent += 1
+        self.sent_event.set()
+        return MoMessage(payload, PdnType.IP)
+
+    def recv(self, **kwargs):
+        if self.downlink:
+            return MtMessage(self.downlink.popleft(), PdnType.IP)
+        return None
+
+    def close(self) -> bool:
+        return True
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _bridge(fake: FakeSocketModem, port: int) -> UdpSocketBridge:
+    return UdpSocketBridge('192.0.2.1', port, fake.open, fake.send,
+                           fake.recv, fake.close, event_trigger=True)
+
+
+def bench_throughput(count: int, timeout: float = 30) -> float:
+    """Get the uplink datagrams forwarded per second."""
+    fake = FakeSocketModem()
+    port = _free_port()
+    bridge = _bridge(fake, port)
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        start = time.perf_counter()
+        for i in range(count):
+            client.sendto(PAYLOAD, ('127.0.0.1', port))
+            if i % 64 == 63:
+                time.sleep(0)   # yield to avoid overrunning the socket buffer
+        deadline = time.monotonic() + timeout
+        while fake.sent < count and time.monotonic() < deadline:
+            time.sleep(0.001)
+        elapsed = (fake.sent_at[-1] if fake.sent_at else start) - start
+    finally:
+        client.close()
+        bridge.close(timeout=5)
+    return fake.sent / elapsed if elapsed > 0 else 0
+
+
+def bench_latency(count: int) -> tuple[list[float], list[float]]:
+    """Get uplink and downlink forwarding latencies in milliseconds."""
+    fake = FakeSocketModem()
+    port = _free_port()
+    bridge = _bridge(fake, port)
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(5)
+    uplink: list[float] = []
+    downlink: list[float] = []
+    try:
+        for _ in range(count):
+            fake.sent_event.clear()
+            start = time.perf_counter()
+            client.sendto(PAYLOAD, ('127.0.0.1', port))
+            if not fake.sent_event.wait(5):
+                raise RuntimeError('Uplink not forwarded')
+            uplink.append((fake.sent_at[-1] - start) * 1000)
+            fake.downlink.append(PAYLOAD)
+            start = time.perf_counter()
+            bridge.receive_event()
+            client.recvfrom(65535)
+            downlink.append((time.perf_counter() - start) * 1000)
+    finally:
+        client.close()
+        bridge.close(timeout=5)
+    return uplink, downlink
+
+
+def _p95(samples: list[float]) -> float:
+    return statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+
+
+def run(quick: bool = False, count: int = 0) -> list[Result]:
+    """Run the bridge benchmarks.
+
+    Args:
+        quick (bool): Use fewer datagrams for a smoke run.
+        count (int): Optional datagrams per measurement.
+    """
+    count = count or (200 if quick else 2000)
+    results = [Result('bridge', 'uplink throughput',
+                      bench_throughput(count), 'datagrams/s', True)]
+    uplink, downlink = bench_latency(max(20, count // 10))
+    for name, samples in (('uplink', uplink), ('downlink', downlink)):
+        results.append(Result('bridge', f'{name} latency median',
+                              statistics.median(samples), 'ms'))
+        results.append(Result('bridge', f'{name} latency p95',
+                              _p95(samples), 'ms'))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000,
+                        help='datagrams per measurement')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write results as JSON (- for stdout)')
+    args = parser.parse_args()
+    results = run(count=args.count)
+    if args.json:
+        write_json(results, args.json)
+    else:
+        print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Benchmark of payload compression.
+
+Measures `CodecStage` encoding and decoding of a 1200-byte frame of JSON
+telemetry records with plain and dictionary-trained zlib, which is expected
+to stay well below 1 ms per frame.
+
+Usage:
+    python -m benchmarks.codec [--count N] [--json FILE]
+"""
+
+import argparse
+import json
+import random
+
+from pynbntnmodem.codec import CodecStage, ZlibCodec, train_dictionary
+
+from .common import Result, print_results, rate, write_json
+
+
+def _telemetry(i: int, rng: random.Random) -> bytes:
+    return json.dumps({
+        'deviceId': 'sensor-0042', 'seq': i, 'ts': 1700000000 + i,
+        'temperature': round(rng.uniform(-10, 40), 1),
+        'humidity': rng.randint(0, 100), 'battery': 3.6,
+    }).encode()
+
+
+def run(quick: bool = False, count: int = 0) -> list[Result]:
+    """Run the codec benchmarks.
+
+    Args:
+        quick (bool): Use fewer iterations for a smoke run.
+        count (int): Optional frames per measurement.
+    """
+    count = count or (200 if quick else 2000)
+    rng = random.Random(0)
+    zdict = train_dictionary([_telemetry(i, rng) for i in range(100)])
+    frame = b''.join(_telemetry(i, rng) for i in range(100, 108))[:1200]
+    results = []
+    for name, codec in (('zlib', ZlibCodec()),
+                        ('zlib dict', ZlibCodec(zdict=zdict))):
+        stage = CodecStage(codecs=[codec])
+        encoded = stage.encode(frame)
+        results.extend([
+            Result('codec', f'encode {name}',
+                   1e6 / rate(lambda: stage.encode(frame), count), 'us'),
+            Result('codec', f'decode {name}',
+                   1e6 / rate(lambda: stage.decode(encoded), count), 'us'),
+            Result('codec', f'ratio {name}', len(frame) / len(encoded), 'x',
+                   higher_is_better=True),
+        ])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=2000,
+                        help='frames per measurement')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write results as JSON (- for stdout)')
+    args = parser.parse_args()
+    results = run(count=args.count)
+    if args.json:
+        write_json(results, args.json)
+    else:
+        print_results(results)
+
+
+if __name__ == '__main__':
+    main()
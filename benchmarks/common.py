@@ -0,0 +1,124 @@
+"""Result records, JSON output and comparison shared by the benchmarks."""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Result:
+    """A single benchmark measurement.
+
+    Attributes:
+        benchmark (str): The benchmark module e.g. `parsers`.
+        name (str): The measurement within the benchmark e.g. `+CEREG`.
+        value (float): The measured value.
+        unit (str): The unit of `value` e.g. `lines/s` or `ms`.
+        higher_is_better (bool): True for rates, False for durations.
+    """
+    benchmark: str
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool = False
+
+    @property
+    def key(self) -> str:
+        return f'{self.benchmark}/{self.name}'
+
+
+def rate(func: Callable[[], object], count: int) -> float:
+    """Get the calls per second of a function over `count` calls."""
+    for _ in range(max(1, count // 10)):   # warm up
+        func()
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - start)
+
+
+def median_ms(func: Callable[[], object], repeat: int) -> float:
+    """Get the median wall time in milliseconds of `repeat` calls."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def environment() -> dict:
+    """Get metadata identifying the code and platform measured."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                cwd=ROOT, capture_output=True, text=True,
+                                timeout=10, check=False).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def write_json(results: Iterable[Result], path: Optional[str] = None) -> None:
+    """Write results with environment metadata to a file or stdout."""
+    data = {'environment': environment(),
+            'results': [asdict(r) for r in results]}
+    text = json.dumps(data, indent=2)
+    if path is None or path == '-':
+        print(text)
+    else:
+        Path(path).write_text(text + '\n')
+
+
+def load_json(path: str) -> list[Result]:
+    """Load results previously written by `write_json`."""
+    data = json.loads(Path(path).read_text())
+    return [Result(**r) for r in data['results']]
+
+
+def compare(baseline: Iterable[Result],
+            results: Iterable[Result],
+            threshold: float = 0.1) -> list[tuple[Result, Result, float]]:
+    """Find results that regressed against a baseline.
+
+    Args:
+        baseline (Iterable[Result]): The reference results.
+        results (Iterable[Result]): The new results.
+        threshold (float): The relative change tolerated e.g. 0.1 = 10%.
+
+    Returns:
+        A list of (baseline, result, relative change) regressions, where a
+        positive change is worse.
+    """
+    reference = {r.key: r for r in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get(result.key)
+        if base is None or base.value == 0:
+            continue
+        change = (result.value - base.value) / base.value
+        if result.higher_is_better:
+            change = -change
+        if change > threshold:
+            regressions.append((base, result, change))
+    return regressions
+
+
+def print_results(results: Iterable[Result], file=sys.stdout) -> None:
+    """Print results as an aligned table."""
+    for r in results:
+        print(f'{r.benchmark:<10}{r.name:<32}{r.value:>14,.3f} {r.unit}',
+              file=file)
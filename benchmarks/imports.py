@@ -0,0 +1,59 @@
+"""Benchmark of the `import pynbntnmodem` time in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.imports [--repeat N] [--json FILE]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from .common import ROOT, Result, print_results, write_json
+
+_SCRIPT = ('import time; start = time.perf_counter(); import pynbntnmodem; '
+           'print(time.perf_counter() - start)')
+
+
+def import_time_ms(module_script: str = _SCRIPT) -> float:
+    """Get the import time in milliseconds measured in a subprocess."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in (str(ROOT), env.get('PYTHONPATH', '')) if p)
+    out = subprocess.run([sys.executable, '-c', module_script], env=env,
+                         cwd=ROOT, capture_output=True, text=True, check=True,
+                         timeout=60).stdout
+    return float(out.strip().splitlines()[-1]) * 1000
+
+
+def run(quick: bool = False, repeat: int = 0) -> list[Result]:
+    """Run the import benchmark.
+
+    Args:
+        quick (bool): Use fewer repetitions for a smoke run.
+        repeat (int): Optional interpreter launches.
+    """
+    repeat = repeat or (3 if quick else 15)
+    samples = [import_time_ms() for _ in range(repeat)]
+    return [Result('imports', 'import pynbntnmodem median',
+                   statistics.median(samples), 'ms'),
+            Result('imports', 'import pynbntnmodem min', min(samples), 'ms')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=15,
+                        help='interpreter launches')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write results as JSON (- for stdout)')
+    args = parser.parse_args()
+    results = run(repeat=args.repeat)
+    if args.json:
+        write_json(results, args.json)
+    else:
+        print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Benchmark of the per-command metrics recording cost.
+
+Measures `MetricsRegistry` observations in isolation, the overhead added to
+each `NbntnModem.send_command` and timed API call when metrics are enabled.
+
+Usage:
+    python -m benchmarks.metrics [--count N] [--json FILE]
+"""
+
+import argparse
+
+from pynbntnmodem import MetricsRegistry, UrcType
+
+from .common import Result, print_results, rate, write_json
+
+
+def run(quick: bool = False, count: int = 0) -> list[Result]:
+    """Run the metrics benchmarks.
+
+    Args:
+        quick (bool): Use fewer iterations for a smoke run.
+        count (int): Optional observations per measurement.
+    """
+    count = count or (20000 if quick else 200000)
+    metrics = MetricsRegistry()
+    cases = {
+        'query': lambda: metrics.observe_command('AT+CEREG?', 0.12),
+        'set': lambda: metrics.observe_command('AT+CFUN=1', 1.5),
+        'urc': lambda: metrics.observe_urc('+CEREG: 5', UrcType.REGISTRATION),
+        'call': lambda: metrics.observe_call('send_message_nidd', 0.3),
+    }
+    return [Result('metrics', f'observe {name}', 1e9 / rate(func, count),
+                   'ns') for name, func in cases.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=200000,
+                        help='observations per measurement')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write results as JSON (- for stdout)')
+    args = parser.parse_args()
+    results = run(count=args.count)
+    if args.json:
+        write_json(results, args.json)
+    else:
+        print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark of the `send_message_nidd` command-building cost.
+
+An in-process modem answers every command with `OK` without serial I/O, so
+the result is the library cost of validating the payload and building the
+`AT+CSODCP` command for each payload size.
+
+Usage:
+    python -m benchmarks.nidd [--count N] [--json FILE]
+"""
+
+import argparse
+
+from pyatcommand import AtErrorCode, AtResponse
+
+from pynbntnmodem import NbntnModem
+
+from .common import Result, print_results, rate, write_json
+
+SIZES = (16, 256, 1200)
+
+
+class NullModem(NbntnModem):
+    """A modem answering every command with `OK` in-process."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.last_command = ''
+
+    def send_command(self, command: str, timeout=None, prefix='', **kwargs):
+        self._command_count += 1
+        self.last_command = command
+        return AtResponse(AtErrorCode.OK)
+
+
+def bench_size(modem: NbntnModem, size: int, count: int) -> float:
+    """Get the messages built per second for a payload size."""
+    payload = bytes(i % 256 for i in range(size))
+    send = modem.send_message_nidd
+    return rate(lambda: send(payload, rai=1), count)
+
+
+def run(quick: bool = False, count: int = 0) -> list[Result]:
+    """Run the NIDD benchmarks.
+
+    Args:
+        quick (bool): Use fewer iterations for a smoke run.
+        count (int): Optional messages per measurement.
+    """
+    count = count or (2000 if quick else 20000)
+    modem = NullModem()
+    return [Result('nidd', f'send {size} bytes', bench_size(modem, size, count),
+                   'msgs/s', True) for size in SIZES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=20000,
+                        help='messages per measurement')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write results as JSON (- for stdout)')
+    args = parser.parse_args()
+    results = run(count=args.count)
+    if args.json:
+        write_json(results, args.json)
+    else:
+        print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark of `initialize_ntn` wall time against the PTY modem emulator.
+
+Each scenario scripts emulator latency to represent a modem profile, so the
+result shows the overhead added by the library on top of the modem delays.
+
+Usage:
+    python -m benchmarks.ntninit [--repeat N] [--json FILE]
+"""
+
+import argparse
+
+from pynbntnmodem import NbntnModem
+from pynbntnmodem.emulator import ModemEmulator
+
+from .common import Result, median_ms, print_results, write_json
+
+# name: (latency per command, {command prefix: latency})
+SCENARIOS: dict[str, tuple[float, dict[str, float]]] = {
+    'no delay': (0, {}),
+    '20 ms per command': (0.02, {}),
+    'slow radio 250 ms': (0, {'AT+CFUN': 0.25}),
+}
+
+
+def bench_scenario(latency: float,
+                   command_latency: dict[str, float],
+                   repeat: int) -> tuple[float, float]:
+    """Get the median initialization time and the scripted delay in ms."""
+    with ModemEmulator(registration_delay=0.01) as emulator:
+        modem = NbntnModem(port=emulator.port, apn='benchmark')
+        modem.connect()
+        try:
+            emulator.set_latency(latency)
+            for command, seconds in command_latency.items():
+                emulator.set_latency(seconds, command)
+            emulator.commands.clear()
+            if not modem.initialize_ntn():
+                raise RuntimeError('NTN initialization failed')
+            scripted = 0.0
+            for command in emulator.commands:
+                scripted += next((s for c, s in command_latency.items()
+                                  if command.upper().startswith(c)), latency)
+            elapsed = median_ms(modem.initialize_ntn, repeat)
+        finally:
+            modem.disconnect()
+    return elapsed, scripted * 1000
+
+
+def run(quick: bool = False, repeat: int = 0) -> list[Result]:
+    """Run the initialization benchmarks.
+
+    Args:
+        quick (bool): Use fewer repetitions for a smoke run.
+        repeat (int): Optional initializations per scenario.
+    """
+    repeat = repeat or (2 if quick else 10)
+    results = []
+    for name, (latency, command_latency) in SCENARIOS.items():
+        elapsed, scripted = bench_scenario(latency, command_latency, repeat)
+        results.append(Result('ntninit', name, elapsed, 'ms'))
+        results.append(Result('ntninit', f'{name} overhead',
+                              elapsed - scripted, 'ms'))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='initializations per scenario')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write results as JSON (- for stdout)')
+    args = parser.parse_args()
+    results = run(repeat=args.repeat)
+    if args.json:
+        write_json(results, args.json)
+    else:
+        print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Micro-benchmark of the table-driven response/URC parsers.
+
+Reports parse throughput per prefix for a representative line, per `UrcType`
+for URC classification and parsing as done on receipt, and for a mixed URC
+stream as would be processed offline from recorded device logs.
+
+Usage:
+    python -m benchmarks.parsers [--count N] [--json FILE]
+"""
+
+import argparse
+
+from pynbntnmodem import NbntnModem, UrcType
+from pynbntnmodem.parsers import default_parsers
+
+from .common import Result, print_results, rate, write_json
+
+SAMPLES = {
+    '+CEREG': ('+CEREG: 5,"0001","01a2d001",9,,,"00000101","00101100"',
+               UrcType.REGISTRATION),
+    '+CESQ': ('+CESQ: 99,99,255,255,20,50', None),
+    '+CGDCONT': ('+CGDCONT: 1,"Non-IP","viasat.poc",,0,0,0,0,0,,0,,,,', None),
+    '+CGACT': ('+CGACT: 1,1', None),
+    '+CPSMS': ('+CPSMS: 1,,,"00101100","00001010"', None),
+    '+CEDRXS': ('+CEDRXS: 5,"0101"', None),
+    '+CEDRXRDP': ('+CEDRXRDP: 5,"0010","0101","0011"', None),
+    '+CRTDCP': ('+CRTDCP: 1,8,"0102030405060708"', UrcType.NIDD_MT_RCVD),
+    '+CSCON': ('+CSCON: 1', UrcType.RRC_STATE),
+}
+
+UNKNOWN_URC = '+QNTNST: 1'
+
+
+def bench_prefix(prefix: str, line: str, count: int) -> float:
+    """Get the parse rate in lines per second for a single prefix."""
+    parser = default_parsers.get(prefix)
+    assert parser is not None
+    parse = parser.parse
+    return rate(lambda: parse(line), count)
+
+
+def bench_urc_type(modem: NbntnModem, urc: str, count: int) -> float:
+    """Get the rate of URCs classified and parsed per second."""
+    get_urc_type = modem.get_urc_type
+    parse = modem.parsers.parse
+    def handle():
+        if get_urc_type(urc) != UrcType.UNKNOWN:
+            parse(urc)
+    return rate(handle, count)
+
+
+def bench_stream(count: int) -> float:
+    """Get the parse rate in lines per second for a mixed URC stream."""
+    stream = [line for line, urc_type in SAMPLES.values() if urc_type]
+    stream = (stream * (count // len(stream) + 1))[:count]
+    def parse_all():
+        for _ in default_parsers.parse_stream(stream):
+            pass
+    return rate(parse_all, 1) * count
+
+
+def run(quick: bool = False, count: int = 0) -> list[Result]:
+    """Run the parser benchmarks.
+
+    Args:
+        quick (bool): Use fewer iterations for a smoke run.
+        count (int): Optional lines parsed per measurement.
+    """
+    count = count or (10000 if quick else 100000)
+    results = []
+    for prefix, (line, _) in SAMPLES.items():
+        results.append(Result('parsers', f'prefix {prefix}',
+                              bench_prefix(prefix, line, count),
+                              'lines/s', True))
+    modem = NbntnModem()
+    urcs = {t: line for line, t in SAMPLES.values() if t is not None}
+    urcs[UrcType.UNKNOWN] = UNKNOWN_URC
+    for urc_type, urc in urcs.items():
+        results.append(Result('parsers', f'urc {urc_type.name}',
+                              bench_urc_type(modem, urc, count),
+                              'urcs/s', True))
+    results.append(Result('parsers', 'stream mixed',
+                          bench_stream(count), 'lines/s', True))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100000,
+                        help='lines parsed per measurement')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write results as JSON (- for stdout)')
+    args = parser.parse_args()
+    results = run(count=args.count)
+    if args.json:
+        write_json(results, args.json)
+    else:
+        print_results(results)
+
+
+if __name__ == '__main__':
+    main()
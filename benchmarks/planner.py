@@ -0,0 +1,59 @@
+"""Benchmark of planning PSM/eDRX timers.
+
+Measures `plan_timers` searching every encodable T3412/T3324/eDRX combination
+for typical reporting intervals and MT latency targets.
+
+Usage:
+    python -m benchmarks.planner [--count N] [--json FILE]
+"""
+
+import argparse
+import time
+
+from pynbntnmodem.psmplanner import EnergyModel, plan_timers
+
+from .common import Result, print_results, write_json
+
+TARGETS = {   # name: (max MT latency, reporting interval)
+    'hourly': (600, 3600),
+    'daily': (3600, 86400),
+    'minute': (30, 60),
+}
+
+
+def run(quick: bool = False, count: int = 0) -> list[Result]:
+    """Run the planner benchmark.
+
+    Args:
+        quick (bool): Use fewer iterations for a smoke run.
+        count (int): Optional plans per measurement.
+    """
+    count = count or (5 if quick else 50)
+    model = EnergyModel(connected_s=5, connected_mw=150)
+    results = []
+    for name, (latency, interval) in TARGETS.items():
+        plan_timers(latency, interval, model)   # warm up the timer table
+        start = time.perf_counter()
+        for _ in range(count):
+            plan_timers(latency, interval, model)
+        elapsed = time.perf_counter() - start
+        results.append(Result('planner', name, 1000 * elapsed / count, 'ms'))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=50,
+                        help='plans per measurement')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write results as JSON (- for stdout)')
+    args = parser.parse_args()
+    results = run(count=args.count)
+    if args.json:
+        write_json(results, args.json)
+    else:
+        print_results(results)
+
+
+if __name__ == '__main__':
+    main()
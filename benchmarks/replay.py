@@ -0,0 +1,82 @@
+"""Benchmark of replaying recorded AT traffic into a modem.
+
+A synthetic recording of status queries interleaved with registration and RRC
+URCs is replayed as fast as possible by a `TrafficReplayer`, so the result is
+the library cost of command dispatch, response parsing and URC handling per
+recorded query without serial I/O.
+
+Usage:
+    python -m benchmarks.replay [--count N] [--json FILE]
+"""
+
+import argparse
+import time
+
+from pyatcommand import AtErrorCode
+
+from pynbntnmodem import NbntnModem, TrafficReplayer
+from pynbntnmodem.recorder import TrafficKind, TrafficRecord
+
+from .common import Result, print_results, write_json
+
+QUERIES = (
+    ('AT+CEREG?', '+CEREG: 5,"0001","01a2d001",9'),
+    ('AT+CESQ', '+CESQ: 99,99,255,255,20,50'),
+    ('AT+CSCON?', '+CSCON: 0,1'),
+)
+URCS = ('+CEREG: 5,"0001","01a2d001",9', '+CSCON: 1', '+CSCON: 0')
+
+
+def recording(count: int) -> list[TrafficRecord]:
+    """Create a recording of `count` queries with a URC every third query."""
+    records = [TrafficRecord(TrafficKind.SESSION, time.time())]
+    for i in range(count):
+        command, info = QUERIES[i % len(QUERIES)]
+        ts = i * 0.2
+        if i % 3 == 0:
+            records.append(TrafficRecord(TrafficKind.URC, ts,
+                                         URCS[i % len(URCS)]))
+        records.append(TrafficRecord(TrafficKind.COMMAND, ts, command))
+        records.append(TrafficRecord(TrafficKind.RESPONSE, ts + 0.1, info,
+                                     AtErrorCode.OK))
+    return records
+
+
+def run(quick: bool = False, count: int = 0) -> list[Result]:
+    """Run the replay benchmark.
+
+    Args:
+        quick (bool): Use fewer iterations for a smoke run.
+        count (int): Optional queries replayed.
+    """
+    count = count or (1000 if quick else 10000)
+    records = recording(count)
+    modem = NbntnModem(cache=False)
+    TrafficReplayer(records).attach(modem)
+    getters = {'AT+CEREG?': modem.get_reginfo, 'AT+CESQ': modem.get_siginfo,
+               'AT+CSCON?': modem.get_rrc_state}
+    calls = [getters[QUERIES[i % len(QUERIES)][0]] for i in range(count)]
+    start = time.perf_counter()
+    for call in calls:
+        call()
+    elapsed = time.perf_counter() - start
+    return [Result('replay', 'status queries', count / elapsed, 'queries/s',
+                   True)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=10000,
+                        help='queries replayed')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write results as JSON (- for stdout)')
+    args = parser.parse_args()
+    results = run(count=args.count)
+    if args.json:
+        write_json(results, args.json)
+    else:
+        print_results(results)
+
+
+if __name__ == '__main__':
+    main()
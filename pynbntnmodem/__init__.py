@@ -1,69 +1,173 @@
-"""Classes and methods for interfacing to a NB-NTN modem."""
+"""Classes and methods for interfacing to a NB-NTN modem.
 
-from pyatcommand import AtClient, AtTimeout
+Public names are imported from their submodules on first access, so that
+`import pynbntnmodem` does not load the serial, asyncio, socket or git
+tooling dependencies until they are used.
+"""
 
-from .constants import (
-    NBNTN_MAX_MSG_SIZE,
-    CeregMode,
-    Chipset,
-    ChipsetManufacturer,
-    EdrxCycle,
-    EdrxPtw,
-    EmmRejectionCause,
-    GnssFixType,
-    ModuleManufacturer,
-    ModuleModel,
-    NtnOpMode,
-    PdnType,
-    RadioAccessTechnology,
-    RegistrationState,
-    RrcState,
-    SignalLevel,
-    SignalQuality,
-    TransportType,
-    UrcType,
-)
-from .loader import (
-    clone_and_load_modem_classes,
-    mutate_modem,
-)
-from .modem import (
-    NbntnModem,
-)
-from .ntninit import (
-    NtnHardwareAssert,
-    NtnInitCommand,
-    NtnInitRetry,
-    NtnInitSequence,
-    NtnInitUrc,
-)
-from .structures import (
-    EdrxConfig,
-    MoMessage,
-    MtMessage,
-    NtnLocation,
-    PdnContext,
-    PsmConfig,
-    RegInfo,
-    SigInfo,
-    SocketStatus,
-)
-from .udpsocket import UdpSocketBridge
-from .utils import get_model
+import importlib
+
+TYPE_CHECKING = False   # avoids importing typing, recognized by type checkers
+if TYPE_CHECKING:
+    from pyatcommand import AtClient, AtTimeout
+
+    from .codec import CodecStage, PayloadCodec, ZlibCodec
+    from .constants import (
+        NBNTN_MAX_MSG_SIZE,
+        CeregMode,
+        Chipset,
+        ChipsetManufacturer,
+        EdrxCycle,
+        EdrxPtw,
+        EmmRejectionCause,
+        GnssFixType,
+        ModuleManufacturer,
+        ModuleModel,
+        NtnOpMode,
+        PdnType,
+        RadioAccessTechnology,
+        RegistrationState,
+        RrcState,
+        SignalLevel,
+        SignalQuality,
+        TransportType,
+        UrcType,
+    )
+    from .aggregator import UplinkAggregator, decode_frame, encode_frame
+    from .fragmentation import Fragmenter, Reassembler
+    from .loader import clone_and_load_modem_classes, mutate_modem
+    from .metrics import MetricsRegistry
+    from .modelcache import ModelCache
+    from .modem import NbntnModem
+    from .asyncmodem import AsyncNbntnModem
+    from .ntninit import (
+        NtnDesiredState,
+        NtnHardwareAssert,
+        NtnInitCommand,
+        NtnInitReport,
+        NtnInitRetry,
+        NtnInitSequence,
+        NtnInitUrc,
+    )
+    from .pool import ModemPool, PoolUrc
+    from .psmplanner import EnergyModel, TimerPlan, plan_timers
+    from .psmtuner import PsmAutotuner
+    from .recorder import TrafficRecorder, TrafficReplayer
+    from .registry import ModemRegistry, modem_registry
+    from .repocache import RepoCache
+    from .scheduler import UplinkScheduler
+    from .signalhistory import SignalHistory
+    from .structures import (
+        EdrxConfig,
+        ModemSnapshot,
+        MoMessage,
+        MtMessage,
+        NtnLocation,
+        PdnContext,
+        PsmConfig,
+        RegInfo,
+        SigInfo,
+        SocketStatus,
+    )
+    from .statecache import CachePolicy, StateCache
+    from .udpsocket import UdpSocketBridge
+    from .urcdispatcher import UrcDispatcher, UrcSubscription, UrcWaiter
+    from .utils import get_model
+    from .wakewindow import WakeWindow, WakeWindowPredictor
+
+_SUBMODULES = {
+    'pyatcommand': ('AtClient', 'AtTimeout'),
+    '.codec': ('CodecStage', 'PayloadCodec', 'ZlibCodec'),
+    '.constants': (
+        'NBNTN_MAX_MSG_SIZE',
+        'CeregMode',
+        'Chipset',
+        'ChipsetManufacturer',
+        'EdrxCycle',
+        'EdrxPtw',
+        'EmmRejectionCause',
+        'GnssFixType',
+        'ModuleManufacturer',
+        'ModuleModel',
+        'NtnOpMode',
+        'PdnType',
+        'RadioAccessTechnology',
+        'RegistrationState',
+        'RrcState',
+        'SignalLevel',
+        'SignalQuality',
+        'TransportType',
+        'UrcType',
+    ),
+    '.aggregator': ('UplinkAggregator', 'decode_frame', 'encode_frame'),
+    '.fragmentation': ('Fragmenter', 'Reassembler'),
+    '.loader': ('clone_and_load_modem_classes', 'mutate_modem'),
+    '.metrics': ('MetricsRegistry',),
+    '.modelcache': ('ModelCache',),
+    '.modem': ('NbntnModem',),
+    '.asyncmodem': ('AsyncNbntnModem',),
+    '.ntninit': (
+        'NtnDesiredState',
+        'NtnHardwareAssert',
+        'NtnInitCommand',
+        'NtnInitReport',
+        'NtnInitRetry',
+        'NtnInitSequence',
+        'NtnInitUrc',
+    ),
+    '.pool': ('ModemPool', 'PoolUrc'),
+    '.psmplanner': ('EnergyModel', 'TimerPlan', 'plan_timers'),
+    '.psmtuner': ('PsmAutotuner',),
+    '.recorder': ('TrafficRecorder', 'TrafficReplayer'),
+    '.registry': ('ModemRegistry', 'modem_registry'),
+    '.repocache': ('RepoCache',),
+    '.scheduler': ('UplinkScheduler',),
+    '.signalhistory': ('SignalHistory',),
+    '.structures': (
+        'EdrxConfig',
+        'ModemSnapshot',
+        'MoMessage',
+        'MtMessage',
+        'NtnLocation',
+        'PdnContext',
+        'PsmConfig',
+        'RegInfo',
+        'SigInfo',
+        'SocketStatus',
+    ),
+    '.statecache': ('CachePolicy', 'StateCache'),
+    '.udpsocket': ('UdpSocketBridge',),
+    '.urcdispatcher': ('UrcDispatcher', 'UrcSubscription', 'UrcWaiter'),
+    '.utils': ('get_model',),
+    '.wakewindow': ('WakeWindow', 'WakeWindowPredictor'),
+}
+
+_LAZY = {name: module for module, names in _SUBMODULES.items()
+         for name in names}
 
 __all__ = [
     'AtClient',
     'AtTimeout',
+    'AsyncNbntnModem',
+    'CachePolicy',
     'NBNTN_MAX_MSG_SIZE',
     'CeregMode',
     'Chipset',
     'ChipsetManufacturer',
+    'CodecStage',
     'EdrxConfig',
     'EdrxCycle',
     'EdrxPtw',
     'EmmRejectionCause',
+    'EnergyModel',
+    'Fragmenter',
     'GnssFixType',
     'ModuleManufacturer',
+    'MetricsRegistry',
+    'ModelCache',
+    'ModemPool',
+    'ModemRegistry',
+    'ModemSnapshot',
     'ModuleModel',
     'MoMessage',
     'MtMessage',
@@ -71,25 +175,62 @@ __all__ = [
     'NtnLocation',
     'NtnOpMode',
     'PdnContext',
+    'PayloadCodec',
     'PdnType',
+    'PoolUrc',
+    'PsmAutotuner',
     'PsmConfig',
     'RadioAccessTechnology',
+    'Reassembler',
     'RegInfo',
     'RegistrationState',
+    'RepoCache',
     'RrcState',
     'SigInfo',
+    'SignalHistory',
     'SocketStatus',
+    'StateCache',
+    'TimerPlan',
+    'TrafficRecorder',
+    'TrafficReplayer',
     'TransportType',
     'UrcType',
     'SignalLevel',
     'SignalQuality',
     'get_model',
+    'NtnDesiredState',
     'NtnHardwareAssert',
     'NtnInitCommand',
+    'NtnInitReport',
     'NtnInitRetry',
     'NtnInitSequence',
     'NtnInitUrc',
     'clone_and_load_modem_classes',
+    'modem_registry',
     'mutate_modem',
+    'plan_timers',
     'UdpSocketBridge',
+    'UplinkAggregator',
+    'UplinkScheduler',
+    'decode_frame',
+    'encode_frame',
+    'ZlibCodec',
+    'UrcDispatcher',
+    'UrcSubscription',
+    'UrcWaiter',
+    'WakeWindow',
+    'WakeWindowPredictor',
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> 'list[str]':
+    return sorted(set(globals()) | set(__all__))
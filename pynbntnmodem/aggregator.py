@@ -0,0 +1,320 @@
+"""Coalesce small uplink records into fewer over-the-air messages.
+
+Each NIDD or UDP send is a separate over-the-air transaction with access and
+connection overhead, so many small application records are more efficiently
+sent packed into frames up to the maximum message size.
+
+A frame is a sequence of records, each preceded by its length as an unsigned
+LEB128 varint (1 byte up to 127 bytes, 2 bytes up to 16383 bytes).
+The server side uses `decode_frame` to recover the records.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from .constants import NBNTN_MAX_MSG_SIZE
+from .structures import MoMessage
+
+__all__ = ['UplinkAggregator', 'decode_frame', 'encode_frame']
+
+_log = logging.getLogger(__name__)
+
+
+def _varint(value: int) -> bytes:
+    """Encode an unsigned integer as LEB128."""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _varint_size(value: int) -> int:
+    """Get the number of bytes used to encode a varint."""
+    return max(1, (value.bit_length() + 6) // 7)
+
+
+def encode_frame(records: Iterable[bytes]) -> bytes:
+    """Pack records into a length-prefixed frame."""
+    frame = bytearray()
+    for record in records:
+        frame += _varint(len(record))
+        frame += record
+    return bytes(frame)
+
+
+def decode_frame(frame: bytes) -> list[bytes]:
+    """Unpack the records of a length-prefixed frame.
+
+    Raises:
+        `ValueError` if the frame is truncated or malformed.
+    """
+    records: list[bytes] = []
+    view = memoryview(frame)
+    offset = 0
+    end = len(frame)
+    while offset < end:
+        length = 0
+        shift = 0
+        while True:
+            if offset >= end or shift > 28:
+                raise ValueError('Malformed record length')
+            byte = view[offset]
+            offset += 1
+            length |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                break
+            shift += 7
+        if offset + length > end:
+            raise ValueError('Truncated record')
+        records.append(bytes(view[offset:offset + length]))
+        offset += length
+    return records
+
+
+@dataclass(eq=False)
+class _Frame:
+    payload: bytes
+    count: int
+    attempts: int = 0
+
+
+class UplinkAggregator:
+    """Buffers application records and sends them as packed frames.
+
+    A frame is sent when the next record would exceed `max_size`, when the
+    oldest buffered record reaches `max_age`, or on `flush()`. Frames are
+    sent in order outside the buffer lock, so records may be added during a
+    send. A frame that fails to send is kept and retried before newer frames
+    on the next flush (or after `max_age`) until `max_attempts`.
+    """
+    def __init__(self,
+                 send: Callable[[bytes], Optional[MoMessage]],
+                 max_size: int = NBNTN_MAX_MSG_SIZE,
+                 max_age: Optional[float] = None,
+                 max_attempts: int = 3):
+        """Create an aggregator.
+
+        Args:
+            send (Callable[[bytes], MoMessage|None]): The function used to
+                send a frame e.g. `modem.send_message_nidd`.
+            max_size (int): The maximum frame payload size. For UDP subtract
+                the IP/UDP header overhead.
+            max_age (float): Optional maximum seconds a record is buffered.
+            max_attempts (int): Attempts per frame before it is dropped.
+        """
+        if not callable(send):
+            raise ValueError('Invalid send callback')
+        if not isinstance(max_size, int) or max_size < 2:
+            raise ValueError('Invalid max_size')
+        if max_age is not None and (not isinstance(max_age, (int, float)) or
+                                    max_age <= 0):
+            raise ValueError('Invalid max_age')
+        if not isinstance(max_attempts, int) or max_attempts < 1:
+            raise ValueError('Invalid max_attempts')
+        self._send = send
+        self._max_size = max_size
+        self._max_age = max_age
+        self._max_attempts = max_attempts
+        self._lock = threading.RLock()
+        self._send_lock = threading.Lock()   # sends frames in order
+        self._buffer = bytearray()
+        self._count = 0
+        self._first_ts: Optional[float] = None
+        self._frames: 'deque[_Frame]' = deque()
+        self._timer: Optional[threading.Timer] = None   # buffer age
+        self._retry_timer: Optional[threading.Timer] = None
+        self._stats = {
+            'records': 0,
+            'frames': 0,
+            'bytes': 0,
+            'retries': 0,
+            'failed_frames': 0,
+            'failed_records': 0,
+        }
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def pending(self) -> int:
+        """The number of buffered records, including unsent frames."""
+        with self._lock:
+            return self._count + sum(f.count for f in self._frames)
+
+    @property
+    def size(self) -> int:
+        """The size in bytes of the buffered frame."""
+        return len(self._buffer)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the oldest buffered record was added."""
+        if self._first_ts is None:
+            return 0
+        return time.monotonic() - self._first_ts
+
+    def stats(self) -> dict[str, float]:
+        """Get counters of records and frames sent, retried or dropped.
+
+        Includes `records_per_frame` as the average packing.
+        """
+        with self._lock:
+            stats: dict[str, float] = dict(self._stats)
+        frames = stats['frames']
+        stats['records_per_frame'] = stats['records'] / frames if frames else 0
+        return stats
+
+    def add(self, record: bytes) -> list[MoMessage]:
+        """Buffer a record, sending the current frame first if full.
+
+        Args:
+            record (bytes): The application record.
+
+        Returns:
+            The `MoMessage` list of frames sent to make room or because the
+                frame is full, usually empty.
+
+        Raises:
+            `ValueError` if the record cannot fit in a frame.
+        """
+        if not isinstance(record, (bytes, bytearray)):
+            raise ValueError('Invalid record must be bytes')
+        encoded_size = _varint_size(len(record)) + len(record)
+        if encoded_size > self._max_size:
+            raise ValueError(f'Record too large ({len(record)} bytes)')
+        with self._lock:
+            queued = len(self._frames)
+            if len(self._buffer) + encoded_size > self._max_size:
+                self._seal()
+            self._buffer += _varint(len(record))
+            self._buffer += record
+            self._count += 1
+            if self._first_ts is None:
+                self._first_ts = time.monotonic()
+                self._start_timer()
+            if len(self._buffer) == self._max_size:
+                self._seal()
+            if len(self._frames) == queued:
+                return []
+        return self._send_frames()
+
+    def _schedule(self,
+                  delay: float,
+                  func: Callable[[], None]) -> threading.Timer:
+        timer = threading.Timer(max(0, delay), func)
+        timer.daemon = True
+        timer.name = 'uplink_aggregator'
+        timer.start()
+        return timer
+
+    def _start_timer(self) -> None:
+        """Start the age timer of the buffered records if configured."""
+        if (self._max_age is None or self._timer is not None or
+            self._first_ts is None):
+            return
+        self._timer = self._schedule(self._max_age - self.age, self._on_age)
+
+    def _start_retry(self) -> None:
+        """Start the timer retrying unsent frames if configured."""
+        if self._max_age is None or self._retry_timer is not None:
+            return
+        self._retry_timer = self._schedule(self._max_age, self._on_retry)
+
+    def _on_age(self):
+        with self._lock:
+            self._timer = None
+            if self._first_ts is None:
+                return
+            if self.age < self._max_age - 0.01:
+                self._start_timer()   # re-armed for the remaining age
+                return
+            _log.debug('Flushing %d records by age', self._count)
+            self._seal()
+        self._send_frames()
+
+    def _on_retry(self):
+        with self._lock:
+            self._retry_timer = None
+        self._send_frames()
+
+    def _seal(self) -> None:
+        """Move the buffered records to the queue of frames to send."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        self._frames.append(_Frame(bytes(self._buffer), self._count))
+        self._buffer.clear()
+        self._count = 0
+        self._first_ts = None
+
+    def _send_frames(self) -> list[MoMessage]:
+        """Send queued frames in order until empty or a send fails."""
+        sent: list[MoMessage] = []
+        with self._send_lock:
+            while True:
+                with self._lock:
+                    if not self._frames:
+                        break
+                    frame = self._frames[0]
+                try:
+                    message = self._send(frame.payload)
+                except Exception as exc:
+                    _log.error('Failed to send frame: %s', exc)
+                    message = None
+                with self._lock:
+                    frame.attempts += 1
+                    if message is not None:
+                        self._frames.popleft()
+                        self._stats['frames'] += 1
+                        self._stats['records'] += frame.count
+                        self._stats['bytes'] += len(frame.payload)
+                        _log.debug('Sent %d records in %d bytes',
+                                   frame.count, len(frame.payload))
+                        sent.append(message)
+                        continue
+                    if frame.attempts >= self._max_attempts:
+                        self._frames.popleft()
+                        _log.error('Dropped %d records (%d bytes) after %d'
+                                   ' attempts', frame.count,
+                                   len(frame.payload), frame.attempts)
+                        self._stats['failed_frames'] += 1
+                        self._stats['failed_records'] += frame.count
+                    else:
+                        self._stats['retries'] += 1
+                    if self._frames:
+                        self._start_retry()
+                    break
+        return sent
+
+    def flush(self) -> list[MoMessage]:
+        """Send the buffered records and any unsent frames.
+
+        Returns:
+            The `MoMessage` list of frames sent, empty if none or the send
+                failed.
+        """
+        with self._lock:
+            self._seal()
+        return self._send_frames()
+
+    def close(self) -> list[MoMessage]:
+        """Flush any buffered records and stop the timers."""
+        sent = self.flush()
+        with self._lock:
+            for timer in (self._timer, self._retry_timer):
+                if timer is not None:
+                    timer.cancel()
+            self._timer = self._retry_timer = None
+        return sent
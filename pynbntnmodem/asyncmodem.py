@@ -0,0 +1,858 @@
+"""Native asyncio facade for a NB-NTN modem.
+
+`AsyncNbntnModem` drives the serial AT interface from the event loop using
+`pyserial-asyncio`, so a single process can run many modems alongside other
+coroutines without a serial listener thread per modem.
+
+The facade wraps a `NbntnModem` (or mutated subclass) which holds
+configuration, parsers, state cache, metrics and recorder. Commands are
+exchanged on the loop and observed through the wrapped modem like its own,
+and the standard API is provided as coroutines using the modem's parsers and
+cache. Methods a subclass overrides, and other modem methods, are executed
+once in the loop's default executor by `run()`, with their commands bridged
+back to the loop. URCs are dispatched through the wrapped modem so that its
+state cache, metrics and `await_urc` waiters see them. Raw data mode
+requires a native coroutine in a subclass.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Generator, Optional
+
+import serial_asyncio
+from pyatcommand import AtErrorCode, AtResponse, AtTimeout
+from pyatcommand.common import AT_TIMEOUT, dprint
+
+from .constants import CeregMode, PdnType, RrcState, SignalQuality, UrcType
+from .modem import NbntnModem
+from .ntninit import default_init
+from .structures import (
+    EdrxConfig,
+    MoMessage,
+    MtMessage,
+    PdnContext,
+    PsmConfig,
+    RegInfo,
+    SigInfo,
+)
+from .urcdispatcher import UrcDispatcher, UrcQueue, UrcWaiter
+
+__all__ = ['AsyncNbntnModem']
+
+_log = logging.getLogger(__name__)
+
+_RESULT_PREFIXES = ('+CME ERROR:', '+CMS ERROR:')
+
+
+@dataclass
+class _PendingCommand:
+    """A command awaiting its final result code."""
+    command: str
+    prefix: str
+    future: asyncio.Future
+    lines: list[str] = field(default_factory=list)
+    start: float = field(default_factory=time.time)
+
+
+class _AtProtocol(asyncio.Protocol):
+    """Line framing of the serial byte stream for `AsyncNbntnModem`."""
+
+    def __init__(self, client: 'AsyncNbntnModem') -> None:
+        self._client = client
+        self._buf = bytearray()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._client._transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        self._buf.extend(data)
+        while True:
+            idx = self._buf.find(b'\n')
+            if idx < 0:
+                break
+            line = self._buf[:idx].decode(errors='ignore').strip()
+            del self._buf[:idx + 1]
+            if line:
+                self._client._handle_line(line)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        self._client._handle_connection_lost(exc)
+
+
+class _LoopBridge:
+    """Serves the wrapped modem's serial I/O from the event loop.
+
+    Installed as the modem's bridge while connected, so that synchronous
+    methods running in an executor thread exchange commands on the loop.
+    """
+
+    _margin: float = 5.0   # seconds allowed for commands queued ahead
+
+    def __init__(self,
+                 client: 'AsyncNbntnModem',
+                 loop: asyncio.AbstractEventLoop) -> None:
+        self._client = client
+        self._loop = loop
+
+    def send_command(self,
+                     command: str,
+                     timeout: Optional[float] = AT_TIMEOUT,
+                     prefix: str = '',
+                     **kwargs) -> AtResponse:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            raise RuntimeError('Blocking modem call from the event loop'
+                               ' - use await AsyncNbntnModem.run()')
+        limit = max(timeout or 0, self._client.modem.command_timeout)
+        future = asyncio.run_coroutine_threadsafe(
+            self._client._exchange(command, timeout, prefix, **kwargs),
+            self._loop,
+        )
+        try:
+            return future.result(limit + self._margin)
+        except FutureTimeout as exc:
+            future.cancel()
+            if self._loop.is_closed() or not self._loop.is_running():
+                raise ConnectionError('Event loop unavailable') from exc
+            raise AtTimeout(f'Event loop did not exchange {command}') from exc
+
+    def is_connected(self) -> bool:
+        return self._client.is_connected()
+
+
+class AsyncNbntnModem:
+    """Awaitable interface to a NB-NTN modem driven by the asyncio loop.
+
+    URCs are dispatched through the modem's `urc_dispatcher`, resolve any
+    futures from `expect_urc()`, and are otherwise queued for `get_urc()` or
+    `async for urc in modem`.
+    """
+
+    def __init__(self, modem: Optional[NbntnModem] = None, **kwargs) -> None:
+        """Instantiate the facade.
+
+        Args:
+            modem (NbntnModem): Optional (unconnected) modem providing
+                configuration and command logic. Created from kwargs if None.
+            **kwargs: Passed to `NbntnModem` if `modem` is not provided,
+                e.g. `port`, `baudrate`, `apn`, `pdn_type`.
+        """
+        if modem is None:
+            modem = NbntnModem(**kwargs)
+        elif not isinstance(modem, NbntnModem):
+            raise ValueError('Invalid NbntnModem')
+        self._modem = modem
+        self._port: Optional[str] = kwargs.get('port', modem.port)
+        self._baudrate: int = kwargs.get('baudrate', modem.baudrate)
+        self._transport: Optional[asyncio.BaseTransport] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._pending: Optional[_PendingCommand] = None
+        self._urc_ready: Optional[asyncio.Event] = None
+        self._expected: list[tuple[UrcWaiter, asyncio.Future]] = []
+        self._connected: bool = False
+
+    @property
+    def modem(self) -> NbntnModem:
+        """The wrapped modem providing configuration and command logic."""
+        return self._modem
+
+    @property
+    def urc_dispatcher(self) -> UrcDispatcher:
+        """The dispatcher for subscribing to URCs by type or prefix."""
+        return self._modem.urc_dispatcher
+
+    @property
+    def _urcs(self) -> UrcQueue:
+        return self._modem._unsolicited_queue
+
+    async def connect(self, **kwargs) -> None:
+        """Connect to the serial port and initialize the AT interface.
+
+        Args:
+            **port (str): The serial port name or pyserial URL.
+            **baudrate (int): The serial baud rate.
+            **echo (bool): Initialize with echo (default True).
+
+        Raises:
+            `ConnectionError` if the modem does not respond.
+        """
+        self._port = kwargs.get('port', self._port)
+        self._baudrate = kwargs.get('baudrate', self._baudrate)
+        if not self._port or not isinstance(self._port, str):
+            raise ConnectionError('Invalid or missing serial port')
+        loop = asyncio.get_running_loop()
+        self._lock = asyncio.Lock()
+        self._urc_ready = asyncio.Event()
+        try:
+            transport, _ = await serial_asyncio.create_serial_connection(
+                loop, lambda: _AtProtocol(self), self._port,
+                baudrate=self._baudrate,
+            )
+            self._transport = transport
+        except Exception as exc:
+            raise ConnectionError(f'Unable to open {self._port}') from exc
+        self._modem._bridge = _LoopBridge(self, loop)
+        try:
+            await self.send_command('AT')
+            echo = int(kwargs.get('echo', True))
+            for cmd in (f'ATE{echo}', 'ATV1'):
+                if not (await self.send_command(cmd)).ok:
+                    _log.warning('Error configuring %s', cmd)
+        except AtTimeout as exc:
+            await self.disconnect()
+            raise ConnectionError(f'No response on {self._port}') from exc
+        self._connected = True
+        _log.debug('Initialized async AT command mode on %s', self._port)
+
+    def is_connected(self) -> bool:
+        """Check if the modem is responding to AT commands."""
+        return self._connected
+
+    async def disconnect(self) -> None:
+        """Disconnect from the serial port."""
+        self._connected = False
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        self._modem._bridge = None
+        self._modem._version = ''
+        self._modem._imei = ''
+        self._modem._imsi = ''
+        self._modem.state_cache.invalidate()
+        self._modem.refresh()
+
+    def _handle_connection_lost(self, exc: Optional[Exception]) -> None:
+        if exc:
+            _log.error('Serial connection lost: %s', exc)
+        self._connected = False
+        self._transport = None
+        pending = self._pending
+        if pending and not pending.future.done():
+            pending.future.set_exception(ConnectionError('Serial connection lost'))
+
+    def _handle_line(self, line: str) -> None:
+        """Route a received line to the pending command or as a URC."""
+        pending = self._pending
+        if pending is None or pending.future.done():
+            self._handle_urc(line)
+            return
+        if not pending.lines and line == pending.command:
+            return   # echo
+        if line in ('OK', 'ERROR') or line.startswith(_RESULT_PREFIXES):
+            pending.future.set_result(line)
+            return
+        pending.lines.append(line)
+
+    def _handle_urc(self, urc: str) -> None:
+        """Dispatch a URC to subscribers, expectations or the URC queue."""
+        dispatcher = self._modem.urc_dispatcher
+        if dispatcher.dispatch(urc):
+            return
+        if self._expected:
+            urc_type = dispatcher.classify(urc)
+            for expected in self._expected:
+                waiter, future = expected
+                if future.done():
+                    continue
+                if waiter.matches(urc, urc_type):
+                    self._expected.remove(expected)
+                    future.set_result(urc)
+                    return
+        self._urcs.requeue(urc)   # already dispatched
+        if self._urc_ready is not None:
+            self._urc_ready.set()
+
+    def _build_response(self,
+                        pending: _PendingCommand,
+                        result: str) -> AtResponse:
+        """Convert the received lines to `AtResponse` like `AtClient`."""
+        parts = list(pending.lines)
+        raw = '\r\n'.join(parts + [result])
+        response = AtResponse(elapsed=time.time() - pending.start, raw=raw)
+        if result == 'OK':
+            response.result = AtErrorCode.OK
+        elif result.startswith(_RESULT_PREFIXES):
+            response.info = result.split('ERROR:', 1)[1].strip()
+            response.result = (AtErrorCode.CMS_ERROR
+                               if result.startswith('+CMS')
+                               else AtErrorCode.CME_ERROR)
+        else:
+            response.result = AtErrorCode.ERROR
+        if parts:
+            prefix = pending.prefix
+            if prefix:
+                if (not parts[0].startswith(prefix) and
+                    any(part.startswith(prefix) for part in parts)):
+                    while not parts[0].startswith(prefix):
+                        urc = parts.pop(0)
+                        _log.warning('Found pre-response URC: %s', urc)
+                        self._handle_urc(urc)
+                elif not parts[0].startswith(prefix):
+                    _log.warning('Prefix %s not found', prefix)
+                parts[0] = parts[0].replace(prefix, '', 1).strip()
+            response.info = '\n'.join(parts)
+        return response
+
+    async def send_command(self,
+                           command: str,
+                           timeout: Optional[float] = AT_TIMEOUT,
+                           prefix: str = '',
+                           **kwargs) -> AtResponse:
+        """Send an AT command and await the response.
+
+        The command is counted, measured, recorded and invalidates cached
+        state through the wrapped modem like a synchronous command.
+
+        Args:
+            command (str): The AT command to send.
+            timeout (float): The maximum time in seconds to wait for a response.
+                `None` returns immediately and any response will be orphaned.
+            prefix (str): The prefix to remove from the information response.
+
+        Raises:
+            `ValueError` if command is not a valid string or timeout is invalid.
+            `ConnectionError` if not connected.
+            `AtTimeout` if no response received within timeout.
+            `NotImplementedError` if an intermediate prompt/data mode is used.
+        """
+        if self._transport is None or self._lock is None:
+            raise ConnectionError('No serial connection')
+        modem = self._modem
+        start = modem._begin_command(command)
+        try:
+            if modem.replayer is not None:
+                res = modem.replayer.respond(modem, command, timeout)
+            else:
+                res = await self._exchange(command, timeout, prefix, **kwargs)
+        except Exception as exc:
+            modem._end_command(command, start, exc)
+            raise
+        modem._end_command(command, start, res)
+        return res
+
+    async def _exchange(self,
+                        command: str,
+                        timeout: Optional[float] = AT_TIMEOUT,
+                        prefix: str = '',
+                        **kwargs) -> AtResponse:
+        """Exchange a command and response on the serial port."""
+        if self._transport is None or self._lock is None:
+            raise ConnectionError('No serial connection')
+        if not isinstance(command, str) or not command:
+            raise ValueError('Invalid command')
+        if timeout is not None:
+            if not isinstance(timeout, (float, int)) or timeout < 0:
+                raise ValueError('Invalid command timeout')
+        if kwargs.get('mid_prompt') or kwargs.get('mid_cb'):
+            raise NotImplementedError('Data mode requires a native coroutine')
+        command_timeout = self._modem.command_timeout
+        if timeout == AT_TIMEOUT and command_timeout != AT_TIMEOUT:
+            timeout = command_timeout
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            if self._transport is None:
+                raise ConnectionError('No serial connection')
+            pending = _PendingCommand(command.strip(), prefix,
+                                      loop.create_future())
+            self._pending = pending
+            _log.debug('Sending command (timeout %s): %s',
+                       timeout, dprint(command))
+            try:
+                self._transport.write(
+                    self._modem._prepare_command(command).encode()
+                )
+                if timeout is None:
+                    _log.warning(f'{command} timeout None may orphan response')
+                    return AtResponse()
+                try:
+                    result = await asyncio.wait_for(
+                        asyncio.shield(pending.future), timeout
+                    )
+                except asyncio.TimeoutError:
+                    err_msg = f'Command timed out: {command} ({timeout} s)'
+                    _log.warning(err_msg)
+                    raise AtTimeout(err_msg)
+                response = self._build_response(pending, result)
+                _log.debug('Response to %s: %s', command, dprint(response.raw))
+                return response
+            finally:
+                self._pending = None
+
+    def expect_urc(self,
+                   urc: str = '',
+                   urc_type: Optional[UrcType] = None) -> asyncio.Future:
+        """Get a future resolved by the next matching URC.
+
+        Register before sending the command that triggers the URC.
+        The matched URC is not queued for `get_urc()`.
+
+        Args:
+            urc (str): The URC prefix to match (default any).
+            urc_type (UrcType): Optional type of URC to match.
+
+        Returns:
+            `asyncio.Future` whose result is the URC string.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._expected.append((UrcWaiter(urc_type, urc), future))
+        return future
+
+    async def await_urc(self, urc: str = '', **kwargs) -> str:
+        """Wait for an unsolicited result code or timeout.
+
+        A matching URC already queued is returned immediately.
+
+        Args:
+            urc (str): The prefix of the URC to wait for (default any).
+            **timeout (float): Maximum seconds to wait, 0 waits forever.
+            **urc_type (UrcType): Optional type of URC to wait for.
+            **future (asyncio.Future): Optional future from `expect_urc()`.
+
+        Returns:
+            The awaited URC or an empty string if it timed out.
+        """
+        timeout = float(kwargs.get('timeout', 0))
+        urc_type = kwargs.get('urc_type')
+        future: Optional[asyncio.Future] = kwargs.get('future')
+        if future is None:
+            waiter = UrcWaiter(urc_type, urc)
+            classify = self._modem.urc_dispatcher.classify
+            queued = self._urcs.take(lambda u: waiter.matches(u, classify(u)))
+            if queued is not None:
+                return queued
+            future = self.expect_urc(urc, urc_type)
+        try:
+            return await asyncio.wait_for(future, timeout or None)
+        except asyncio.TimeoutError:
+            self._expected = [e for e in self._expected if e[1] is not future]
+            _log.warning('Timed out waiting for URC (%s)', urc)
+            return ''
+
+    async def get_urc(self, timeout: Optional[float] = 0.1) -> Optional[str]:
+        """Get the next queued URC, or None if none arrives within timeout."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            if self._urc_ready is not None:
+                self._urc_ready.clear()
+            urc = self._urcs.take(lambda _: True)
+            if urc is not None:
+                return urc
+            remaining = None if deadline is None else deadline - loop.time()
+            if self._urc_ready is None or (remaining is not None and
+                                           remaining <= 0):
+                return None
+            try:
+                await asyncio.wait_for(self._urc_ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    def __aiter__(self) -> 'AsyncNbntnModem':
+        return self
+
+    async def __anext__(self) -> str:
+        """Iterate over URCs as they arrive until disconnected."""
+        while self._connected or not self._urcs.empty():
+            urc = await self.get_urc(timeout=1)
+            if urc is not None:
+                return urc
+        raise StopAsyncIteration
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a synchronous `NbntnModem` method without blocking the loop.
+
+        An escape hatch for modem methods without a coroutine here, such as
+        subclass overrides or model-specific features. `func` runs once in
+        the loop's default executor, its commands pass through the wrapped
+        modem's `send_command` and are exchanged on the serial port by the
+        event loop, and `await_urc` is woken by URCs received on the loop,
+        so delays and waits only block the executor thread.
+
+        Args:
+            func (Callable): A method of the wrapped modem, or a callable using
+                it e.g. `lambda: modem.imei`.
+
+        Returns:
+            The result of `func`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(func, *args, **kwargs)
+        )
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        """Provide other (e.g. subclass) modem methods as coroutines.
+
+        The method is executed by `run()`.
+        """
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attr = getattr(self._modem, name)
+        if not callable(attr):
+            raise AttributeError(f'{name} is not a method'
+                                 ' - use run(lambda: modem.<property>)')
+        async def _method(*args, **kwargs):
+            return await self.run(getattr(self._modem, name), *args, **kwargs)
+        _method.__name__ = name
+        return _method
+
+    def _overridden(self, name: str) -> bool:
+        """Check if the wrapped modem's class overrides a base method."""
+        return getattr(type(self._modem), name) is not getattr(NbntnModem, name)
+
+    async def _timed(self, name: str, coro: Awaitable) -> Any:
+        """Await an API call, recording it in the metrics like `timed`."""
+        metrics = self._modem.metrics
+        if not metrics.enabled:
+            return await coro
+        error = timeout = False
+        start = time.perf_counter()
+        try:
+            result = await coro
+            error = result is False
+            return result
+        except AtTimeout:
+            timeout = True
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            metrics.observe_call(name, time.perf_counter() - start,
+                                 error, timeout)
+
+    async def _query(self,
+                     command: str,
+                     prefix: str,
+                     default: Any,
+                     query: bool = False) -> Any:
+        """Send a command and parse its response with the modem's parsers."""
+        res = await self.send_command(command, prefix=f'{prefix}:')
+        if res.ok and res.info:
+            return self._modem.parsers.parse(res.info, prefix, query=query)
+        return default
+
+    async def mutate(self, **kwargs) -> NbntnModem:
+        """Mutate the wrapped modem to its model-specific subclass.
+
+        See `mutate_modem` for keyword arguments.
+        """
+        from .loader import mutate_modem
+        self._modem = await self.run(mutate_modem, self._modem, **kwargs)
+        return self._modem
+
+    async def initialize_ntn(self, **kwargs) -> bool:
+        """Execute the modem-specific initialization to communicate on NTN.
+
+        The sequence steps of the wrapped modem are awaited on the loop.
+        A subclass `initialize_ntn` override, or a `desired` state, is
+        executed by `run()`.
+
+        Args:
+            **ntn_init (NtnInitSequence|dict): The module-specific
+                initialization sequence.
+            **desired (NtnDesiredState|bool): Apply a declarative desired
+                state, see `NbntnModem.initialize_ntn`.
+        """
+        modem = self._modem
+        if kwargs.get('desired') or self._overridden('initialize_ntn'):
+            return await self.run(modem.initialize_ntn, **kwargs)
+        ntn_init = modem._ntn_init_sequence(kwargs.get('ntn_init', default_init))
+        async def initialize() -> bool:
+            modem.state_cache.on_event('initialize_ntn')
+            success = await self._drive_init(modem._ntn_init_steps(ntn_init))
+            modem.state_cache.on_event('initialize_ntn')
+            modem._ntn_initialized = success
+            return success
+        return await self._timed('initialize_ntn', initialize())
+
+    async def _drive_init(self, steps: Generator) -> Any:
+        """Execute the I/O requests of `_ntn_init_steps` on the loop."""
+        result: Any = None
+        error: Optional[Exception] = None
+        try:
+            while True:
+                if error is not None:
+                    request = steps.throw(error)
+                else:
+                    request = steps.send(result)
+                result = error = None
+                kind = request[0]
+                if kind == 'sleep':
+                    await asyncio.sleep(request[1])
+                elif kind == 'command':
+                    try:
+                        result = await self.send_command(request[1],
+                                                         timeout=request[2])
+                    except (AtTimeout, ValueError) as exc:
+                        error = exc
+                elif kind == 'expect':
+                    result = self.expect_urc(request[1])
+                elif kind == 'await':
+                    result = await self.await_urc(request[1],
+                                                  future=request[2],
+                                                  timeout=request[3] or 0)
+                elif kind == 'cancel':
+                    request[1].cancel()
+        except StopIteration as stop:
+            return stop.value
+
+    # Awaitable versions of the NbntnModem API
+
+    async def _get_identity(self, name: str, attr: str, command: str) -> str:
+        """Get an identifier queried once and kept by the wrapped modem."""
+        modem = self._modem
+        if self._overridden(name):
+            return await self.run(getattr, modem, name)
+        async def load() -> str:
+            if not getattr(modem, attr):
+                res = await self.send_command(command)
+                if res.ok and res.info:
+                    setattr(modem, attr, res.info)
+            return getattr(modem, attr)
+        return await modem.state_cache.get_async(name, load)
+
+    async def get_imei(self) -> str:
+        return await self._get_identity('imei', '_imei', 'AT+CGSN')
+
+    async def get_imsi(self) -> str:
+        return await self._get_identity('imsi', '_imsi', 'AT+CIMI')
+
+    async def get_firmware_version(self) -> str:
+        return await self._get_identity('firmware_version', '_version',
+                                        'AT+CGMR')
+
+    async def get_manufacturer(self) -> str:
+        modem = self._modem
+        if self._overridden('manufacturer'):
+            return await self.run(getattr, modem, 'manufacturer')
+        async def load() -> str:
+            if modem._manufacturer.name == 'UNKNOWN' and self.is_connected():
+                res = await self.send_command('AT+CGMI')
+                if res.ok and res.info:
+                    return res.info.split(' ')[0].upper()
+            return modem._manufacturer.name
+        return await modem.state_cache.get_async('manufacturer', load)
+
+    async def get_apn(self) -> str:
+        modem = self._modem
+        if self._overridden('apn'):
+            return await self.run(getattr, modem, 'apn')
+        async def load() -> str:
+            if not modem._apn and self.is_connected():
+                res = await self.send_command('AT+CGDCONT?',
+                                              prefix='+CGDCONT:')
+                if res.ok and res.info:
+                    contexts = res.info.split('\n')
+                    return contexts[0].split(',')[2].replace('"', '')
+            return modem._apn
+        return await modem.state_cache.get_async('apn', load)
+
+    async def get_ip_address(self) -> str:
+        modem = self._modem
+        if self._overridden('ip_address'):
+            return await self.run(getattr, modem, 'ip_address')
+        async def load() -> str:
+            res = await self.send_command('AT+CGPADDR', prefix='+CGPADDR:')
+            ip_address = modem._parse_ip_address(res.info if res.ok else '')
+            if not ip_address:
+                res = await self.send_command('AT+CGDCONT?')
+                ip_address = modem._parse_ip_address(
+                    '', res.info if res.ok else '')
+            return ip_address
+        return await modem.state_cache.get_async('ip_address', load)
+
+    async def get_reginfo(self, urc: str = '') -> RegInfo:
+        modem = self._modem
+        if self._overridden('get_reginfo'):
+            return await self.run(modem.get_reginfo, urc)
+        if urc:
+            return modem.get_reginfo(urc)   # parsed without a query
+        return await modem.state_cache.get_async(
+            'reginfo',
+            lambda: self._query('AT+CEREG?', '+CEREG', RegInfo(), query=True),
+        )
+
+    async def get_regconfig(self) -> CeregMode:
+        modem = self._modem
+        if self._overridden('get_regconfig'):
+            return await self.run(modem.get_regconfig)
+        async def load() -> CeregMode:
+            res = await self.send_command('AT+CEREG?', prefix='+CEREG:')
+            if res.ok and res.info:
+                return CeregMode(int(res.info.split(',')[0]))
+            return CeregMode.NONE
+        return await modem.state_cache.get_async('regconfig', load)
+
+    async def set_regconfig(self, config: 'CeregMode|int') -> bool:
+        modem = self._modem
+        if self._overridden('set_regconfig'):
+            return await self.run(modem.set_regconfig, config)
+        if not isinstance(config, CeregMode):
+            config = CeregMode(config)
+        async def apply() -> bool:
+            res = await self.send_command(f'AT+CEREG={config.value}')
+            modem.state_cache.on_event('set_regconfig')
+            return res.ok
+        return await self._timed('set_regconfig', apply())
+
+    async def get_rrc_state(self) -> RrcState:
+        modem = self._modem
+        if self._overridden('get_rrc_state'):
+            return await self.run(modem.get_rrc_state)
+        async def load() -> RrcState:
+            parsed = await self._query('AT+CSCON?', '+CSCON', {}, query=True)
+            return parsed.get('rrc_state', RrcState.UNKNOWN)
+        return await modem.state_cache.get_async('rrc_state', load)
+
+    async def get_siginfo(self) -> SigInfo:
+        modem = self._modem
+        if self._overridden('get_siginfo'):
+            return await self.run(modem.get_siginfo)
+        return await modem.state_cache.get_async(
+            'siginfo',
+            lambda: self._query('AT+CESQ', '+CESQ', SigInfo(255, 255, 255, 255)),
+        )
+
+    async def get_signal_quality(self,
+                                 sinr: 'int|float|None' = None,
+                                 ) -> SignalQuality:
+        if self._overridden('get_signal_quality'):
+            return await self.run(self._modem.get_signal_quality, sinr)
+        from .signalhistory import signal_quality
+        if not isinstance(sinr, (int, float)):
+            sinr = (await self.get_siginfo()).sinr
+        return signal_quality(sinr)
+
+    async def get_contexts(self) -> list[PdnContext]:
+        modem = self._modem
+        if self._overridden('get_contexts'):
+            return await self.run(modem.get_contexts)
+        async def load() -> list[PdnContext]:
+            contexts: list[PdnContext] = []
+            res = await self.send_command('AT+CGDCONT?')
+            if res.ok and res.info:
+                contexts = modem.parsers.parse_lines(res.info, '+CGDCONT')
+            res_act = await self.send_command('AT+CGACT?')
+            if res_act.ok and res_act.info:
+                for state in modem.parsers.parse_lines(res_act.info, '+CGACT'):
+                    for c in contexts:
+                        if c.id == state.id:
+                            c.active = state.active
+            return contexts
+        return await modem.state_cache.get_async('contexts', load)
+
+    async def set_context(self, apn: str, pdn_type: PdnType, **kwargs) -> bool:
+        modem = self._modem
+        if self._overridden('set_context'):
+            return await self.run(modem.set_context, apn, pdn_type, **kwargs)
+        cid = kwargs.get('cid', 1)
+        cmd = modem._context_command(apn, pdn_type, cid)
+        reconnect = kwargs.get('reconnect')
+        async def apply() -> bool:
+            if reconnect is True:
+                if not (await self.send_command('AT+CFUN=0', timeout=30)).ok:
+                    _log.error('Disable modem failed')
+            result = (await self.send_command(cmd, timeout=10)).ok
+            modem.state_cache.on_event('set_context')
+            if reconnect is True:
+                if not (await self.send_command('AT+CFUN=1', timeout=30)).ok:
+                    _log.error('Enable modem failed')
+                if result and cid == 1:
+                    modem.pdn_type = pdn_type
+            return result
+        return await self._timed('set_context', apply())
+
+    async def get_psm_config(self) -> PsmConfig:
+        modem = self._modem
+        if self._overridden('get_psm_config'):
+            return await self.run(modem.get_psm_config)
+        return await modem.state_cache.get_async(
+            'psm_config',
+            lambda: self._query('AT+CPSMS?', '+CPSMS', PsmConfig()),
+        )
+
+    async def set_psm_config(self, psm: Optional[PsmConfig] = None) -> bool:
+        modem = self._modem
+        if self._overridden('set_psm_config'):
+            return await self.run(modem.set_psm_config, psm)
+        cmd = modem._psm_command(psm)
+        async def apply() -> bool:
+            res = await self.send_command(cmd)
+            modem.state_cache.on_event('set_psm_config')
+            return res.ok
+        return await self._timed('set_psm_config', apply())
+
+    async def get_edrx_config(self) -> EdrxConfig:
+        modem = self._modem
+        if self._overridden('get_edrx_config'):
+            return await self.run(modem.get_edrx_config)
+        return await modem.state_cache.get_async(
+            'edrx_config',
+            lambda: self._query('AT+CEDRXS?', '+CEDRXS', EdrxConfig()),
+        )
+
+    async def set_edrx_config(self, edrx: Optional[EdrxConfig] = None) -> bool:
+        modem = self._modem
+        if self._overridden('set_edrx_config'):
+            return await self.run(modem.set_edrx_config, edrx)
+        cmd = modem._edrx_command(edrx)
+        async def apply() -> bool:
+            res = await self.send_command(cmd)
+            modem.state_cache.on_event('set_edrx_config')
+            return res.ok
+        return await self._timed('set_edrx_config', apply())
+
+    async def get_edrx_dynamic(self) -> EdrxConfig:
+        modem = self._modem
+        if self._overridden('get_edrx_dynamic'):
+            return await self.run(modem.get_edrx_dynamic)
+        return await modem.state_cache.get_async(
+            'edrx_dynamic',
+            lambda: self._query('AT+CEDRXRDP', '+CEDRXRDP', EdrxConfig()),
+        )
+
+    async def send_message_nidd(self,
+                                payload: bytes,
+                                **kwargs) -> Optional[MoMessage]:
+        modem = self._modem
+        if (self._overridden('send_message_nidd') or modem.fragmentation or
+                modem.codec is not None):
+            return await self.run(modem.send_message_nidd, payload, **kwargs)
+        async def send() -> Optional[MoMessage]:
+            if not (await self.send_command('AT+CSODCP?')).ok:
+                raise NotImplementedError('Requires module-specific subclass')
+            _log.debug('Sending NIDD message without confirmation')
+            res = await self.send_command(modem._nidd_command(payload,
+                                                              **kwargs))
+            if res.ok:
+                return MoMessage(payload, PdnType.NON_IP)
+            return None
+        return await self._timed('send_message_nidd', send())
+
+    async def receive_message_nidd(self,
+                                   urc: str = '',
+                                   **kwargs) -> 'MtMessage|bytes|None':
+        modem = self._modem
+        if (self._overridden('receive_message_nidd') or modem.fragmentation or
+                modem.codec is not None):
+            return await self.run(modem.receive_message_nidd, urc, **kwargs)
+        async def receive() -> 'MtMessage|bytes|None':
+            if not (await self.send_command('AT+CRTDCP?')).ok:
+                raise NotImplementedError('Requires module-specific subclass')
+            payload = None
+            if isinstance(urc, str) and urc.startswith('+CRTDCP'):
+                payload = modem.parsers.parse(urc, '+CRTDCP').payload or None
+            else:
+                _log.error('Invalid URC: %s', urc)
+            if not isinstance(payload, bytes) or kwargs.get('raw') is True:
+                return payload
+            return MtMessage(payload, transport=PdnType.NON_IP)
+        return await self._timed('receive_message_nidd', receive())
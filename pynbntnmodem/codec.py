@@ -0,0 +1,332 @@
+"""Optional payload compression for NIDD and UDP messages.
+
+A `CodecStage` prefixes each payload with a 1-byte tag identifying the
+`PayloadCodec` used, so the receiver can decode it. If a codec does not
+reduce the size, the payload is sent raw (tag 0).
+
+`ZlibCodec` uses raw deflate with an optional preset dictionary, which can be
+derived from sample traffic using `train_dictionary`. Both ends must register
+the same codecs and dictionaries under the same tags.
+
+`NbntnModem(codec=...)` applies a stage to its NIDD and UDP send/receive
+methods via the `encoded` and `decoded` decorators.
+"""
+
+import dataclasses
+import functools
+import logging
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from .structures import MoMessage, MtMessage
+
+__all__ = [
+    'CodecStage',
+    'CodecStats',
+    'PayloadCodec',
+    'RawCodec',
+    'ZlibCodec',
+    'decoded',
+    'encoded',
+    'train_dictionary',
+]
+
+_log = logging.getLogger(__name__)
+
+_active = threading.local()   # (object id, method) staged in this thread
+
+
+class PayloadCodec:
+    """Base class for a payload codec identified by a 1-byte tag."""
+    tag: int = 0
+    name: str = 'raw'
+
+    def encode(self, data: bytes) -> bytes:
+        raise NotImplementedError('Requires codec-specific subclass')
+
+    def decode(self, data: bytes) -> bytes:
+        raise NotImplementedError('Requires codec-specific subclass')
+
+
+class RawCodec(PayloadCodec):
+    """Passes data unchanged (tag 0)."""
+    def encode(self, data: bytes) -> bytes:
+        return data
+
+    def decode(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCodec(PayloadCodec):
+    """Raw deflate compression with an optional preset dictionary."""
+    name = 'zlib'
+
+    def __init__(self, tag: int = 1, level: int = 6, zdict: bytes = b''):
+        """Create the codec.
+
+        Args:
+            tag (int): The tag 1..255 identifying this codec and dictionary.
+            level (int): The compression level 1..9.
+            zdict (bytes): Optional preset dictionary of up to 32 KB.
+        """
+        if not isinstance(tag, int) or tag not in range(1, 256):
+            raise ValueError('Invalid tag must be 1..255')
+        if level not in range(1, 10):
+            raise ValueError('Invalid level must be 1..9')
+        if not isinstance(zdict, bytes) or len(zdict) > 32768:
+            raise ValueError('Invalid zdict')
+        self.tag = tag
+        self.level = level
+        self.zdict = zdict
+
+    def encode(self, data: bytes) -> bytes:
+        if self.zdict:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15,
+                                          zdict=self.zdict)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        return compressor.compress(data) + compressor.flush()
+
+    def decode(self, data: bytes) -> bytes:
+        if self.zdict:
+            decompressor = zlib.decompressobj(-15, zdict=self.zdict)
+        else:
+            decompressor = zlib.decompressobj(-15)
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+def train_dictionary(samples: Iterable[bytes],
+                     size: int = 4096,
+                     ngram: int = 8) -> bytes:
+    """Build a preset dictionary from sample payloads.
+
+    Frequent substrings are placed nearest the end of the dictionary, where
+    deflate back-references are cheapest.
+
+    Args:
+        samples (Iterable[bytes]): Representative payloads.
+        size (int): The maximum dictionary size.
+        ngram (int): The substring length counted.
+
+    Returns:
+        The dictionary bytes.
+    """
+    counts: Counter = Counter()
+    for sample in samples:
+        seen = {sample[i:i + ngram] for i in range(len(sample) - ngram + 1)}
+        counts.update(seen)   # count once per sample
+    chunks: list[bytes] = []
+    total = 0
+    for chunk, count in counts.most_common():
+        if count < 2 or total + len(chunk) > size:
+            break
+        chunks.append(chunk)
+        total += len(chunk)
+    return b''.join(reversed(chunks))
+
+
+@dataclass(frozen=True)
+class CodecStats:
+    """Statistics of an encoded or decoded message.
+
+    Attributes:
+        codec (str): The codec name used.
+        raw_size (int): The size of the uncompressed payload.
+        encoded_size (int): The size of the encoded payload including tag.
+        elapsed_us (float): Microseconds spent encoding or decoding.
+    """
+    codec: str
+    raw_size: int
+    encoded_size: int
+    elapsed_us: float
+
+    @property
+    def ratio(self) -> float:
+        """The compression ratio raw:encoded."""
+        return self.raw_size / self.encoded_size if self.encoded_size else 0
+
+
+class CodecStage:
+    """Encodes payloads with a 1-byte codec tag, before a send function."""
+    def __init__(self,
+                 send: Optional[Callable[..., Any]] = None,
+                 codecs: Optional[Iterable[PayloadCodec]] = None,
+                 default: Optional[int] = None):
+        """Create the codec stage.
+
+        Args:
+            send (Callable): Optional send function used by `send()` e.g.
+                `modem.send_message_nidd`.
+            codecs (Iterable[PayloadCodec]): Codecs to register. A `ZlibCodec`
+                is registered as tag 1 if none are specified.
+            default (int): The tag of the codec used by `encode()`, defaults to
+                the first registered.
+        """
+        if send is not None and not callable(send):
+            raise ValueError('Invalid send callback')
+        self._send = send
+        self._codecs: dict[int, PayloadCodec] = {0: RawCodec()}
+        for codec in codecs or [ZlibCodec()]:
+            self.register(codec)
+        if default is None:
+            default = next((t for t in self._codecs if t != 0), 0)
+        if default not in self._codecs:
+            raise ValueError(f'Codec {default} not registered')
+        self.default = default
+        self.last_stats: Optional[CodecStats] = None
+        self._lock = threading.Lock()
+        self._totals = {'messages': 0, 'raw_bytes': 0, 'encoded_bytes': 0,
+                        'elapsed_us': 0.0}
+
+    def register(self, codec: PayloadCodec) -> None:
+        """Register a codec by its tag."""
+        if not isinstance(codec, PayloadCodec):
+            raise ValueError('Invalid PayloadCodec')
+        if codec.tag == 0 or codec.tag not in range(1, 256):
+            raise ValueError('Invalid codec tag must be 1..255')
+        if codec.tag in self._codecs:
+            _log.warning('Replacing codec %d', codec.tag)
+        self._codecs[codec.tag] = codec
+
+    def encode(self, payload: bytes, tag: Optional[int] = None) -> bytes:
+        """Encode a payload, prefixed by the codec tag.
+
+        Args:
+            payload (bytes): The payload to encode.
+            tag (int): Optional codec tag overriding the default.
+
+        Returns:
+            The tagged payload.
+        """
+        codec = self._codecs.get(self.default if tag is None else tag)
+        if codec is None:
+            raise ValueError(f'Codec {tag} not registered')
+        start = time.perf_counter()
+        encoded = codec.encode(payload)
+        if len(encoded) >= len(payload):
+            codec = self._codecs[0]
+            encoded = payload
+        encoded = bytes([codec.tag]) + encoded
+        self._record(CodecStats(codec.name, len(payload), len(encoded),
+                                (time.perf_counter() - start) * 1e6))
+        return encoded
+
+    def decode(self, message: bytes) -> bytes:
+        """Decode a tagged payload.
+
+        Raises:
+            `ValueError` if the message is empty or the codec is unknown.
+        """
+        if not message:
+            raise ValueError('Empty message')
+        codec = self._codecs.get(message[0])
+        if codec is None:
+            raise ValueError(f'Unknown codec tag {message[0]}')
+        start = time.perf_counter()
+        try:
+            decoded = codec.decode(bytes(message[1:]))
+        except zlib.error as exc:
+            raise ValueError(f'Unable to decode: {exc}') from exc
+        stats = CodecStats(codec.name, len(decoded), len(message),
+                           (time.perf_counter() - start) * 1e6)
+        with self._lock:
+            self.last_stats = stats
+        return decoded
+
+    def send(self, payload: bytes, **kwargs) -> Any:
+        """Encode a payload and send it using the configured send function."""
+        if self._send is None:
+            raise ValueError('No send function configured')
+        return self._send(self.encode(payload), **kwargs)
+
+    def _record(self, stats: CodecStats) -> None:
+        with self._lock:
+            self.last_stats = stats
+            self._totals['messages'] += 1
+            self._totals['raw_bytes'] += stats.raw_size
+            self._totals['encoded_bytes'] += stats.encoded_size
+            self._totals['elapsed_us'] += stats.elapsed_us
+
+    def stats(self) -> dict[str, float]:
+        """Get encoding totals including the overall compression `ratio`."""
+        with self._lock:
+            totals: dict[str, float] = dict(self._totals)
+        encoded = totals['encoded_bytes']
+        totals['ratio'] = totals['raw_bytes'] / encoded if encoded else 0
+        return totals
+
+
+def _enter(obj: object, name: str) -> bool:
+    """Mark a staged method active, False if already active (nested call)."""
+    staged: set = getattr(_active, 'staged', None)
+    if staged is None:
+        staged = _active.staged = set()
+    key = (id(obj), name)
+    if key in staged:
+        return False
+    staged.add(key)
+    return True
+
+
+def _exit(obj: object, name: str) -> None:
+    _active.staged.discard((id(obj), name))
+
+
+def encoded(func: Callable) -> Callable:
+    """Decorate a modem send method to encode its payload.
+
+    The decorated object must have a `_codec` attribute, used while not None.
+    The wrapper returns the `MoMessage` with the unencoded payload.
+    `NbntnModem` subclasses overriding a decorated method are decorated
+    automatically.
+    """
+    name = func.__name__
+    @functools.wraps(func)
+    def wrapper(self, payload: bytes, **kwargs):
+        stage: Optional[CodecStage] = getattr(self, '_codec', None)
+        if stage is None or not _enter(self, name):
+            return func(self, payload, **kwargs)
+        try:
+            mo = func(self, stage.encode(payload), **kwargs)
+            if isinstance(mo, MoMessage):
+                return dataclasses.replace(mo, payload=payload)
+            return mo
+        finally:
+            _exit(self, name)
+    wrapper.__decorators__ = getattr(func, '__decorators__', ()) + (encoded,)
+    return wrapper
+
+
+def decoded(func: Callable) -> Callable:
+    """Decorate a modem receive method to decode its payload.
+
+    The decorated object must have a `_codec` attribute, used while not None.
+    The wrapper returns None if the payload cannot be decoded. `NbntnModem`
+    subclasses overriding a decorated method are decorated automatically.
+    """
+    name = func.__name__
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        stage: Optional[CodecStage] = getattr(self, '_codec', None)
+        if stage is None or not _enter(self, name):
+            return func(self, *args, **kwargs)
+        try:
+            result = func(self, *args, **kwargs)
+        finally:
+            _exit(self, name)
+        try:
+            if isinstance(result, MtMessage) and result.payload:
+                return dataclasses.replace(result,
+                                           payload=stage.decode(result.payload))
+            if isinstance(result, (bytes, bytearray)) and result:
+                return stage.decode(result)
+        except ValueError as exc:
+            _log.error('Unable to decode %s payload: %s', name, exc)
+            return None
+        return result
+    wrapper.__decorators__ = getattr(func, '__decorators__', ()) + (decoded,)
+    return wrapper
@@ -4,6 +4,7 @@ from enum import Enum, IntEnum
 
 
 NBNTN_MAX_MSG_SIZE = 1200
+UDP_MAX_PAYLOAD = NBNTN_MAX_MSG_SIZE - 20 - 8   # IPv4 + UDP headers
 
 
 class ChipsetManufacturer(IntEnum):
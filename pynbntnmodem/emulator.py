@@ -0,0 +1,557 @@
+"""A pseudo-terminal AT command emulator of a 3GPP NB-NTN modem.
+
+The emulator opens a Linux/POSIX pseudo-terminal and answers the 3GPP
+commands used by `NbntnModem`, so the full `AtClient` serial read and parse
+path can run without hardware:
+
+    with ModemEmulator() as emulator:
+        modem = NbntnModem(port=emulator.port)
+        modem.connect()
+
+Supported: `AT`, `ATZ`/`AT&F` (reset settings), `ATE`, `ATV`, `ATI`, `+CMEE`, `+CGMI`, `+CGMM`, `+CGMR`,
+`+CGSN`, `+CIMI`, `+CFUN`, `+CEREG`, `+CESQ`, `+CGDCONT`, `+CGACT`,
+`+CGPADDR`, `+CPSMS`, `+CEDRXS`, `+CEDRXRDP`, `+CSODCP`, `+CRTDCP` and
+`+CSCON`, including concatenation with `;`.
+
+Registration, RRC state and downlink data produce URCs when enabled. Latency,
+errors, timeouts (no response) and reboots can be scripted.
+
+Run `python -m pynbntnmodem.emulator` to serve a port until interrupted.
+"""
+
+import logging
+import os
+import re
+import select
+import threading
+import time
+from typing import Optional
+
+__all__ = ['ModemEmulator']
+
+_log = logging.getLogger(__name__)
+
+_PARAM_SPLIT = re.compile(r',(?=(?:[^"]*"[^"]*")*[^"]*$)')
+
+
+def _params(text: str) -> list[str]:
+    """Split command parameters on commas outside quotes, unquoted."""
+    if not text:
+        return []
+    return [p.strip().strip('"') for p in _PARAM_SPLIT.split(text)]
+
+
+class ModemEmulator:
+    """Emulates a 3GPP NB-NTN modem on a pseudo-terminal."""
+    def __init__(self, **kwargs):
+        """Create the emulator.
+
+        Args:
+            **latency (float): Seconds before each response (default 0).
+            **registration_delay (float): Seconds from radio on to registered
+                (default 0.1).
+            **rrc_inactivity (float): Seconds from last data to RRC idle
+                (default 1).
+            **imei (str): The IMEI reported.
+            **imsi (str): The IMSI reported.
+            **rsrp (int): The CESQ RSRP index 0..97 (default 50 = -90 dBm).
+            **rsrq (int): The CESQ RSRQ index 0..34 (default 20 = -9.5 dB).
+            **tac (str): The tracking area code reported.
+            **ci (str): The cell ID reported.
+        """
+        self.latency = float(kwargs.get('latency', 0))
+        self.registration_delay = float(kwargs.get('registration_delay', 0.1))
+        self.rrc_inactivity = float(kwargs.get('rrc_inactivity', 1))
+        self.manufacturer = 'pynbntnmodem'
+        self.model = 'Emulator'
+        self.revision = '1.0.0'
+        self.imei = str(kwargs.get('imei', '990000000000001'))
+        self.imsi = str(kwargs.get('imsi', '901990000000001'))
+        self.rsrp = int(kwargs.get('rsrp', 50))
+        self.rsrq = int(kwargs.get('rsrq', 20))
+        self.tac = str(kwargs.get('tac', '0001'))
+        self.ci = str(kwargs.get('ci', '01a2d001'))
+        self.commands: list[str] = []
+        self.uplinks: list[bytes] = []
+        self._command_latency: dict[str, float] = {}
+        self._scripted: list[tuple[str, Optional[str]]] = []
+        self._master: Optional[int] = None
+        self._slave: Optional[int] = None
+        self._port = ''
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._write_lock = threading.RLock()
+        self._state_lock = threading.RLock()
+        self._timers: list[threading.Timer] = []
+        self._last_data = 0.0
+        self._deferred: list[str] = []
+        self._reset()
+
+    def _reset(self):
+        """Set the default power-on state."""
+        self._reset_settings()
+        self.cfun = 1
+        self.reg_state = 2   # searching
+        self.rrc_state = 0
+        self.active: dict[int, int] = {}
+        self.psm = (0, '', '')
+        self.edrx = (0, '')
+        self.ptw = '0011'
+
+    def _reset_settings(self):
+        """Set the default configuration, as `ATZ` or `AT&F`."""
+        self.echo = True
+        self.verbose = True
+        self.cmee = 0
+        self.cereg_mode = 0
+        self.cscon_mode = 0
+        self.crtdcp_mode = 0
+        self.contexts: dict[int, tuple[str, str]] = {1: ('Non-IP', '')}
+
+    @property
+    def port(self) -> str:
+        """The pseudo-terminal device path used as serial port."""
+        return self._port
+
+    def __enter__(self) -> 'ModemEmulator':
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self) -> None:
+        """Open the pseudo-terminal and start responding."""
+        if self._running:
+            return
+        try:
+            import tty
+        except ImportError as exc:
+            raise OSError('Emulator requires a POSIX pseudo-terminal') from exc
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self._port = os.ttyname(self._slave)
+        self._running = True
+        self._thread = threading.Thread(target=self._run,
+                                        name='modem_emulator',
+                                        daemon=True)
+        self._thread.start()
+        self._schedule(self.registration_delay, self._register)
+        _log.debug('Modem emulator on %s', self._port)
+
+    def stop(self) -> None:
+        """Stop responding and close the pseudo-terminal."""
+        self._running = False
+        with self._state_lock:
+            for timer in self._timers:
+                timer.cancel()
+            self._timers.clear()
+        if self._thread is not None:
+            self._thread.join(1)
+            self._thread = None
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master = self._slave = None
+
+    # Scripting
+
+    def set_latency(self, seconds: float, command: str = '') -> None:
+        """Set the response latency globally or for a command prefix."""
+        if command:
+            self._command_latency[command.upper()] = seconds
+        else:
+            self.latency = seconds
+
+    def script_error(self, command: str, error: str = 'ERROR', count: int = 1):
+        """Respond to the next matching command(s) with an error.
+
+        Args:
+            command (str): The command prefix e.g. `AT+CESQ`.
+            error (str): `ERROR` or e.g. `+CME ERROR: 30`.
+            count (int): The number of occurrences.
+        """
+        with self._state_lock:
+            self._scripted.extend([(command.upper(), error)] * count)
+
+    def script_timeout(self, command: str, count: int = 1):
+        """Send no response to the next matching command(s)."""
+        with self._state_lock:
+            self._scripted.extend([(command.upper(), None)] * count)
+
+    def reboot(self, delay: float = 0, urc: str = 'RDY') -> None:
+        """Simulate a modem reset, losing configuration and registration."""
+        def _reboot():
+            with self._state_lock:
+                self._reset()
+            if urc:
+                self.emit_urc(urc)
+            self._schedule(self.registration_delay, self._register)
+        self._schedule(delay, _reboot)
+
+    def emit_urc(self, urc: str) -> None:
+        """Write an unsolicited result code.
+
+        URCs caused by a command are written after its response.
+        """
+        if threading.current_thread() is self._thread:
+            self._deferred.append(urc)
+        else:
+            self._write(f'\r\n{urc}\r\n')
+
+    def send_downlink(self, payload: bytes, cid: int = 1) -> None:
+        """Receive Non-IP data, reported by `+CRTDCP` if enabled."""
+        self._set_rrc(1)
+        if self.crtdcp_mode:
+            self.emit_urc(f'+CRTDCP: {cid},{len(payload)},"{payload.hex()}"')
+
+    def set_registration(self, state: int) -> None:
+        """Change the registration state, reported by `+CEREG` if enabled."""
+        with self._state_lock:
+            changed = state != self.reg_state
+            self.reg_state = state
+            if state in (1, 5):
+                self.active = {cid: 1 for cid in self.contexts}
+            else:
+                self.active = {}
+        if changed and self.cereg_mode:
+            self.emit_urc(f'+CEREG: {self._cereg_params()}')
+
+    # Internals
+
+    def _schedule(self, delay: float, func) -> None:
+        timer = threading.Timer(delay, func)
+        timer.daemon = True
+        with self._state_lock:
+            self._timers = [t for t in self._timers if t.is_alive()]
+            self._timers.append(timer)
+        timer.start()
+
+    def _register(self):
+        if self._running and self.cfun == 1:
+            self.set_registration(1)
+
+    def _set_rrc(self, state: int):
+        with self._state_lock:
+            changed = state != self.rrc_state
+            self.rrc_state = state
+        if changed and self.cscon_mode:
+            self.emit_urc(f'+CSCON: {state}')
+        if state == 1:
+            self._schedule(self.rrc_inactivity, self._rrc_timeout)
+        self._last_data = time.monotonic()
+
+    def _rrc_timeout(self):
+        if time.monotonic() - self._last_data >= self.rrc_inactivity - 0.01:
+            self._set_rrc(0)
+
+    def _write(self, text: str) -> None:
+        if self._master is None:
+            return
+        with self._write_lock:
+            try:
+                os.write(self._master, text.encode())
+            except OSError as exc:
+                _log.debug('Emulator write failed: %s', exc)
+
+    def _run(self):
+        buffer = b''
+        while self._running and self._master is not None:
+            try:
+                ready, _, _ = select.select([self._master], [], [], 0.1)
+                if not ready:
+                    continue
+                data = os.read(self._master, 1024)
+            except OSError:
+                break
+            buffer += data
+            while b'\r' in buffer:
+                line, buffer = buffer.split(b'\r', 1)
+                command = line.decode(errors='replace').strip()
+                with self._write_lock:   # timer URCs follow the deferred
+                    if command:
+                        self._handle(command)
+                    deferred, self._deferred = self._deferred, []
+                    for urc in deferred:
+                        self._write(f'\r\n{urc}\r\n')
+
+    def _handle(self, command: str) -> None:
+        self.commands.append(command)
+        echo = f'{command}\r' if self.echo else ''
+        upper = command.upper()
+        latency = self.latency
+        for prefix, seconds in self._command_latency.items():
+            if upper.startswith(prefix):
+                latency = seconds
+        if latency:
+            time.sleep(latency)
+        with self._state_lock:
+            scripted = next((s for s in self._scripted
+                             if upper.startswith(s[0])), False)
+            if scripted:
+                self._scripted.remove(scripted)   # type: ignore
+        if scripted:
+            error = scripted[1]   # type: ignore
+            if error is None:
+                self._write(echo)
+                return
+            self._write(echo + self._result(error))
+            return
+        if not upper.startswith('AT'):
+            self._write(echo + self._result('ERROR'))
+            return
+        info: list[str] = []
+        result = 'OK'
+        for part in self._split_commands(command[2:]):
+            try:
+                lines = self._execute(part)
+            except ValueError as exc:
+                result = str(exc) or 'ERROR'
+                break
+            info.extend(lines)
+        out = echo
+        for line in info:
+            out += f'\r\n{line}\r\n' if self.verbose else f'{line}\r\n'
+        self._write(out + self._result(result))
+
+    @staticmethod
+    def _split_commands(text: str) -> list[str]:
+        """Split concatenated extended commands outside quotes."""
+        parts: list[str] = []
+        current = ''
+        quoted = False
+        for char in text:
+            if char == '"':
+                quoted = not quoted
+            if char == ';' and not quoted:
+                parts.append(current)
+                current = ''
+            else:
+                current += char
+        parts.append(current)
+        return [p.strip() for p in parts if p.strip()] or ['']
+
+    def _result(self, result: str) -> str:
+        if result != 'OK' and result.startswith('+CME') and self.cmee == 0:
+            result = 'ERROR'
+        if self.verbose:
+            return f'\r\n{result}\r\n'
+        return '0\r' if result == 'OK' else '4\r'
+
+    def _error(self, cme: str = 'operation not allowed', code: int = 3):
+        if self.cmee == 2:
+            return ValueError(f'+CME ERROR: {cme}')
+        if self.cmee == 1:
+            return ValueError(f'+CME ERROR: {code}')
+        return ValueError('ERROR')
+
+    def _cereg_params(self, query: bool = False) -> str:
+        mode = self.cereg_mode
+        params = f'{self.reg_state}'
+        if mode >= 2:
+            params += f',"{self.tac}","{self.ci}",9'
+        if mode >= 4:
+            params += f',,,"{self.psm[2]}","{self.psm[1]}"'
+        return f'{mode},{params}' if query else params
+
+    def _execute(self, part: str) -> list[str]:
+        """Execute a single command without `AT` and return info lines."""
+        upper = part.upper()
+        if upper in ('&F', 'Z'):
+            with self._state_lock:
+                self._reset_settings()
+                self.active = {cid: state for cid, state in self.active.items()
+                               if cid in self.contexts}
+            return []
+        if not upper:
+            return []
+        if upper[0] in ('E', 'V') and upper[1:] in ('', '0', '1'):
+            enable = upper[1:] != '0'
+            if upper[0] == 'E':
+                self.echo = enable
+            else:
+                self.verbose = enable
+            return []
+        if upper == 'I':
+            return [f'Manufacturer: {self.manufacturer}',
+                    f'Model: {self.model}', f'Revision: {self.revision}']
+        match = re.match(r'^(\+[A-Z]+)(=\?|\?|=)?(.*)$', part, re.IGNORECASE)
+        if not match:
+            raise self._error('unknown', 100)
+        name, op, args = match.group(1).upper(), match.group(2) or '', match.group(3)
+        handler = getattr(self, f'_cmd_{name[1:].lower()}', None)
+        if handler is None:
+            raise self._error('unknown', 100)
+        if op == '=?':
+            return []
+        with self._state_lock:
+            return handler(op, _params(args))
+
+    def _cmd_cmee(self, op: str, params: list[str]) -> list[str]:
+        if op == '?':
+            return [f'+CMEE: {self.cmee}']
+        if op == '=' and params and params[0] in ('0', '1', '2'):
+            self.cmee = int(params[0])
+            return []
+        raise self._error('incorrect parameters', 50)
+
+    def _cmd_cgmi(self, op: str, params: list[str]) -> list[str]:
+        return [self.manufacturer]
+
+    def _cmd_cgmm(self, op: str, params: list[str]) -> list[str]:
+        return [self.model]
+
+    def _cmd_cgmr(self, op: str, params: list[str]) -> list[str]:
+        return [self.revision]
+
+    def _cmd_cgsn(self, op: str, params: list[str]) -> list[str]:
+        return [self.imei]
+
+    def _cmd_cimi(self, op: str, params: list[str]) -> list[str]:
+        return [self.imsi]
+
+    def _cmd_cfun(self, op: str, params: list[str]) -> list[str]:
+        if op == '?':
+            return [f'+CFUN: {self.cfun}']
+        if op == '=' and params and params[0] in ('0', '1', '4'):
+            self.cfun = int(params[0])
+            if self.cfun == 1:
+                self.set_registration(2)
+                self._schedule(self.registration_delay, self._register)
+            else:
+                self.set_registration(0)
+            return []
+        raise self._error('incorrect parameters', 50)
+
+    def _cmd_cereg(self, op: str, params: list[str]) -> list[str]:
+        if op == '?':
+            return [f'+CEREG: {self._cereg_params(query=True)}']
+        if op == '=' and params and params[0] in ('0', '1', '2', '3', '4', '5'):
+            self.cereg_mode = int(params[0])
+            return []
+        raise self._error('incorrect parameters', 50)
+
+    def _cmd_cesq(self, op: str, params: list[str]) -> list[str]:
+        if op:
+            raise self._error()
+        if self.cfun != 1:
+            return ['+CESQ: 99,99,255,255,255,255']
+        return [f'+CESQ: 99,99,255,255,{self.rsrq},{self.rsrp}']
+
+    def _cmd_cgdcont(self, op: str, params: list[str]) -> list[str]:
+        if op == '?':
+            return [f'+CGDCONT: {cid},"{pdn}","{apn}",,0,0'
+                    for cid, (pdn, apn) in sorted(self.contexts.items())]
+        if op == '=' and params and params[0].isdigit():
+            cid = int(params[0])
+            if len(params) == 1:
+                self.contexts.pop(cid, None)
+                return []
+            pdn_type = params[1] if len(params) > 1 else 'IP'
+            if pdn_type.upper() not in ('IP', 'IPV6', 'IPV4V6', 'NON-IP'):
+                raise self._error('incorrect parameters', 50)
+            if pdn_type.upper() == 'NON-IP':
+                pdn_type = 'Non-IP'
+            apn = params[2] if len(params) > 2 else ''
+            self.contexts[cid] = (pdn_type, apn)
+            return []
+        raise self._error('incorrect parameters', 50)
+
+    def _cmd_cgact(self, op: str, params: list[str]) -> list[str]:
+        if op == '?':
+            return [f'+CGACT: {cid},{self.active.get(cid, 0)}'
+                    for cid in sorted(self.contexts)]
+        if op == '=' and len(params) >= 1 and params[0] in ('0', '1'):
+            cids = [int(p) for p in params[1:] if p] or list(self.contexts)
+            for cid in cids:
+                self.active[cid] = int(params[0])
+            return []
+        raise self._error('incorrect parameters', 50)
+
+    def _cmd_cgpaddr(self, op: str, params: list[str]) -> list[str]:
+        lines = []
+        for cid, (pdn_type, _) in sorted(self.contexts.items()):
+            if self.active.get(cid) and pdn_type.upper() != 'NON-IP':
+                lines.append(f'+CGPADDR: {cid},"10.0.0.{cid + 1}"')
+            else:
+                lines.append(f'+CGPADDR: {cid}')
+        return lines
+
+    def _cmd_cpsms(self, op: str, params: list[str]) -> list[str]:
+        if op == '?':
+            mode, tau, act = self.psm
+            return [f'+CPSMS: {mode},,,"{tau}","{act}"']
+        if op == '=' and params and params[0] in ('0', '1', '2'):
+            mode = int(params[0])
+            tau = params[3] if len(params) > 3 else self.psm[1]
+            act = params[4] if len(params) > 4 else self.psm[2]
+            self.psm = (mode, tau, act) if mode == 1 else (mode, '', '')
+            return []
+        raise self._error('incorrect parameters', 50)
+
+    def _cmd_cedrxs(self, op: str, params: list[str]) -> list[str]:
+        if op == '?':
+            return [f'+CEDRXS: 5,"{self.edrx[1]}"'] if self.edrx[0] else []
+        if op == '=' and params and params[0] in ('0', '1', '2', '3'):
+            mode = int(params[0])
+            cycle = params[2] if len(params) > 2 else self.edrx[1]
+            self.edrx = (mode, cycle) if mode in (1, 2) else (0, '')
+            return []
+        raise self._error('incorrect parameters', 50)
+
+    def _cmd_cedrxrdp(self, op: str, params: list[str]) -> list[str]:
+        if not self.edrx[0]:
+            return ['+CEDRXRDP: 0']
+        cycle = self.edrx[1]
+        return [f'+CEDRXRDP: 5,"{cycle}","{cycle}","{self.ptw}"']
+
+    def _cmd_csodcp(self, op: str, params: list[str]) -> list[str]:
+        if op == '?':
+            return []
+        if op != '=' or len(params) < 3:
+            raise self._error('incorrect parameters', 50)
+        if self.reg_state not in (1, 5):
+            raise self._error('no network service', 30)
+        try:
+            payload = bytes.fromhex(params[2])
+        except ValueError as exc:
+            raise self._error('incorrect parameters', 50) from exc
+        if len(payload) != int(params[1]):
+            raise self._error('incorrect parameters', 50)
+        self.uplinks.append(payload)
+        self._set_rrc(1)
+        return []
+
+    def _cmd_crtdcp(self, op: str, params: list[str]) -> list[str]:
+        if op == '?':
+            return [f'+CRTDCP: {self.crtdcp_mode}']
+        if op == '=' and params and params[0] in ('0', '1'):
+            self.crtdcp_mode = int(params[0])
+            return []
+        raise self._error('incorrect parameters', 50)
+
+    def _cmd_cscon(self, op: str, params: list[str]) -> list[str]:
+        if op == '?':
+            return [f'+CSCON: {self.cscon_mode},{self.rrc_state}']
+        if op == '=' and params and params[0] in ('0', '1'):
+            self.cscon_mode = int(params[0])
+            return []
+        raise self._error('incorrect parameters', 50)
+
+
+def main():
+    logging.basicConfig(level=logging.DEBUG)
+    with ModemEmulator() as emulator:
+        print(f'Modem emulator on {emulator.port} (Ctrl+C to exit)')
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,363 @@
+"""Fragmentation and reassembly of payloads larger than a single message.
+
+Each message sent through a `Fragmenter` carries a small header:
+
+* 1 byte `0x00` if the payload fits in a single message.
+* 3 bytes `<msg_id>,<index>,<count>` for each fragment, where `msg_id` rolls
+  over 1..255 and `count` is at most 255.
+
+The receiving side passes every message to a `Reassembler`, which returns the
+original payload once all fragments have arrived in any order.
+
+`NbntnModem(fragmentation=True)` applies the same framing to its NIDD and UDP
+send/receive methods via the `fragmented` and `reassembled` decorators.
+"""
+
+import dataclasses
+import functools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Optional
+
+from .constants import NBNTN_MAX_MSG_SIZE
+from .structures import MoMessage, MtMessage
+
+__all__ = ['Fragmenter', 'Reassembler', 'fragment', 'fragmented',
+           'reassembled']
+
+_log = logging.getLogger(__name__)
+
+FRAGMENT_HEADER_SIZE = 3
+MAX_FRAGMENTS = 255
+_UNFRAGMENTED = 0
+
+_active = threading.local()   # (object id, method) staged in this thread
+
+
+def fragment(payload: bytes, max_size: int, msg_id: int) -> list[bytes]:
+    """Split a payload into messages with fragment headers.
+
+    Args:
+        payload (bytes): The data to send.
+        max_size (int): The maximum message size including header.
+        msg_id (int): The message identifier 1..255 used if fragmented.
+
+    Returns:
+        A list of messages, a single message if no fragmentation is needed.
+
+    Raises:
+        `ValueError` if the payload requires more than 255 fragments.
+    """
+    if len(payload) + 1 <= max_size:
+        return [bytes([_UNFRAGMENTED]) + payload]
+    if msg_id not in range(1, 256):
+        raise ValueError('Invalid msg_id must be 1..255')
+    chunk = max_size - FRAGMENT_HEADER_SIZE
+    if chunk < 1:
+        raise ValueError('Invalid max_size')
+    count = -(-len(payload) // chunk)
+    if count > MAX_FRAGMENTS:
+        raise ValueError(f'Payload too large ({len(payload)} bytes)')
+    return [bytes([msg_id, i, count]) + payload[i * chunk:(i + 1) * chunk]
+            for i in range(count)]
+
+
+class Fragmenter:
+    """Sends payloads of any size up to 255 fragments via a send function."""
+    def __init__(self,
+                 send: Callable[..., Optional[MoMessage]],
+                 max_size: int = NBNTN_MAX_MSG_SIZE):
+        """Create a fragmenter.
+
+        Args:
+            send (Callable[..., MoMessage|None]): The send function e.g.
+                `modem.send_message_nidd`.
+            max_size (int): The maximum message size. For UDP subtract the
+                IP/UDP header overhead.
+        """
+        if not callable(send):
+            raise ValueError('Invalid send callback')
+        if not isinstance(max_size, int) or max_size <= FRAGMENT_HEADER_SIZE:
+            raise ValueError('Invalid max_size')
+        self._send = send
+        self._max_size = max_size
+        self._msg_id = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_payload(self) -> int:
+        """The largest payload that can be sent."""
+        return (self._max_size - FRAGMENT_HEADER_SIZE) * MAX_FRAGMENTS
+
+    def _next_id(self) -> int:
+        self._msg_id = self._msg_id % 255 + 1
+        return self._msg_id
+
+    def send(self, payload: bytes, **kwargs) -> Optional[list[MoMessage]]:
+        """Send a payload, fragmenting if required.
+
+        Fragments are sent in order and sending stops at the first failure.
+
+        Args:
+            payload (bytes): The data to send.
+            **kwargs: Passed to the send function e.g. UDP `server`, `port`.
+
+        Returns:
+            The list of `MoMessage` sent, or None if any fragment failed.
+
+        Raises:
+            `ValueError` if the payload exceeds `max_payload`.
+        """
+        if not isinstance(payload, (bytes, bytearray)):
+            raise ValueError('Invalid payload must be bytes')
+        with self._lock:
+            msg_id = self._next_id()
+            messages = fragment(bytes(payload), self._max_size, msg_id)
+            sent: list[MoMessage] = []
+            for i, message in enumerate(messages):
+                mo = self._send(message, **kwargs)
+                if mo is None:
+                    _log.error('Failed to send fragment %d/%d of message %d',
+                               i + 1, len(messages), msg_id)
+                    return None
+                sent.append(mo)
+            if len(messages) > 1:
+                _log.debug('Sent %d bytes as %d fragments (id %d)',
+                           len(payload), len(messages), msg_id)
+            return sent
+
+
+@dataclass
+class _Partial:
+    count: int
+    fragments: dict[int, bytes] = field(default_factory=dict)
+    size: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+
+class Reassembler:
+    """Reassembles fragmented payloads in a bounded buffer.
+
+    Incomplete messages are dropped when they exceed `timeout`, or oldest
+    first when the buffer exceeds `max_messages` or `max_bytes`.
+    """
+    def __init__(self,
+                 timeout: float = 300,
+                 max_messages: int = 8,
+                 max_bytes: int = 65536):
+        """Create a reassembler.
+
+        Args:
+            timeout (float): Seconds to wait for all fragments of a message.
+            max_messages (int): The maximum incomplete messages buffered.
+            max_bytes (int): The maximum fragment bytes buffered.
+        """
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise ValueError('Invalid timeout')
+        if not isinstance(max_messages, int) or max_messages < 1:
+            raise ValueError('Invalid max_messages')
+        if not isinstance(max_bytes, int) or max_bytes < 1:
+            raise ValueError('Invalid max_bytes')
+        self._timeout = timeout
+        self._max_messages = max_messages
+        self._max_bytes = max_bytes
+        self._partials: dict[tuple[Hashable, int], _Partial] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {'completed': 0, 'expired': 0, 'evicted': 0,
+                       'duplicates': 0, 'invalid': 0}
+
+    @property
+    def pending(self) -> int:
+        """The number of incomplete messages buffered."""
+        return len(self._partials)
+
+    @property
+    def size(self) -> int:
+        """The bytes of fragments buffered."""
+        return self._size
+
+    def stats(self) -> dict[str, int]:
+        """Get counters of completed, expired, evicted and invalid messages."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _drop(self, key: tuple[Hashable, int], reason: str) -> None:
+        partial = self._partials.pop(key)
+        self._size -= partial.size
+        self._stats[reason] += 1
+        _log.warning('Dropped message %d (%d/%d fragments) %s',
+                     key[1], len(partial.fragments), partial.count, reason)
+
+    def expire(self) -> int:
+        """Drop incomplete messages that have timed out.
+
+        Returns:
+            The number of messages dropped.
+        """
+        with self._lock:
+            return self._expire()
+
+    def _expire(self) -> int:
+        now = time.monotonic()
+        expired = [k for k, p in self._partials.items()
+                   if now - p.started > self._timeout]
+        for key in expired:
+            self._drop(key, 'expired')
+        return len(expired)
+
+    def add(self, message: 'bytes|MtMessage', source: Hashable = None) -> Optional[bytes]:
+        """Add a received message.
+
+        Args:
+            message (bytes|MtMessage): The received message with header.
+            source (Hashable): Optional sender identifier e.g. IP address, so
+                that message IDs of different senders do not collide.
+
+        Returns:
+            The complete payload, or None if awaiting further fragments.
+        """
+        if isinstance(message, MtMessage):
+            message = message.payload
+        if not isinstance(message, (bytes, bytearray)) or not message:
+            raise ValueError('Invalid message')
+        if message[0] == _UNFRAGMENTED:
+            return bytes(message[1:])
+        with self._lock:
+            self._expire()
+            if len(message) < FRAGMENT_HEADER_SIZE:
+                self._stats['invalid'] += 1
+                _log.warning('Invalid fragment header')
+                return None
+            msg_id, index, count = message[0], message[1], message[2]
+            if count == 0 or index >= count:
+                self._stats['invalid'] += 1
+                _log.warning('Invalid fragment %d/%d', index, count)
+                return None
+            key = (source, msg_id)
+            partial = self._partials.get(key)
+            if partial is not None and partial.count != count:
+                self._drop(key, 'invalid')   # msg_id reused
+                partial = None
+            if partial is None:
+                partial = _Partial(count)
+                self._partials[key] = partial
+            if index in partial.fragments:
+                self._stats['duplicates'] += 1
+                return None
+            data = bytes(message[FRAGMENT_HEADER_SIZE:])
+            partial.fragments[index] = data
+            partial.size += len(data)
+            self._size += len(data)
+            if len(partial.fragments) == count:
+                del self._partials[key]
+                self._size -= partial.size
+                self._stats['completed'] += 1
+                return b''.join(partial.fragments[i] for i in range(count))
+            while (len(self._partials) > self._max_messages or
+                   self._size > self._max_bytes):
+                oldest = min(self._partials,
+                             key=lambda k: self._partials[k].started)
+                self._drop(oldest, 'evicted')
+            return None
+
+
+def _enter(obj: object, name: str) -> bool:
+    """Mark a staged method active, False if already active (nested call)."""
+    staged: set = getattr(_active, 'staged', None)
+    if staged is None:
+        staged = _active.staged = set()
+    key = (id(obj), name)
+    if key in staged:
+        return False
+    staged.add(key)
+    return True
+
+
+def _exit(obj: object, name: str) -> None:
+    _active.staged.discard((id(obj), name))
+
+
+def fragmented(max_size: int) -> Callable[[Callable], Callable]:
+    """Decorate a modem send method to fragment its payload.
+
+    The decorated object must have `_reassembler`, `_fragment_id` and
+    `_fragment_lock` attributes. Payloads are framed only while
+    `_reassembler` is set, i.e. fragmentation is enabled. `NbntnModem`
+    subclasses overriding a decorated method are decorated automatically.
+
+    Args:
+        max_size (int): The maximum message size including fragment header.
+
+    Returns:
+        The decorator, whose wrapper returns a `MoMessage` of the complete
+        payload or None if any fragment failed.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = func.__name__
+        @functools.wraps(func)
+        def wrapper(self, payload: bytes, **kwargs):
+            if (getattr(self, '_reassembler', None) is None or
+                    not _enter(self, name)):
+                return func(self, payload, **kwargs)
+            try:
+                if not isinstance(payload, (bytes, bytearray)):
+                    raise ValueError('Invalid payload must be bytes')
+                with self._fragment_lock:
+                    self._fragment_id = self._fragment_id % 255 + 1
+                    msg_id = self._fragment_id
+                messages = fragment(bytes(payload), max_size, msg_id)
+                mo = None
+                for i, message in enumerate(messages):
+                    mo = func(self, message, **kwargs)
+                    if mo is None:
+                        _log.error('Failed to send fragment %d/%d of'
+                                   ' message %d', i + 1, len(messages), msg_id)
+                        return None
+                if len(messages) > 1:
+                    _log.debug('Sent %d bytes as %d fragments (id %d)',
+                               len(payload), len(messages), msg_id)
+                if isinstance(mo, MoMessage):
+                    return dataclasses.replace(mo, payload=bytes(payload))
+                return mo
+            finally:
+                _exit(self, name)
+        wrapper.__decorators__ = (getattr(func, '__decorators__', ()) +
+                                  (decorator,))
+        return wrapper
+    return decorator
+
+
+def reassembled(func: Callable) -> Callable:
+    """Decorate a modem receive method to reassemble fragmented payloads.
+
+    The decorated object must have a `_reassembler` attribute, used while
+    not None. The wrapper returns None while awaiting further fragments,
+    else the result with the complete payload. `NbntnModem` subclasses
+    overriding a decorated method are decorated automatically.
+    """
+    name = func.__name__
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        reassembler: Optional[Reassembler] = getattr(self, '_reassembler', None)
+        if reassembler is None or not _enter(self, name):
+            return func(self, *args, **kwargs)
+        try:
+            result = func(self, *args, **kwargs)
+            if isinstance(result, MtMessage):
+                if not result.payload:
+                    return result
+                payload = reassembler.add(result.payload, result.src_ip)
+                if payload is None:
+                    return None
+                return dataclasses.replace(result, payload=payload)
+            if isinstance(result, (bytes, bytearray)) and result:
+                return reassembler.add(result)
+            return result
+        finally:
+            _exit(self, name)
+    wrapper.__decorators__ = (getattr(func, '__decorators__', ()) +
+                              (reassembled,))
+    return wrapper
@@ -7,12 +7,15 @@ import inspect
 import os
 import tempfile
 import shutil
-import subprocess
+import sys
 from typing import Type
 from pathlib import Path
 
 from . import modems
 from .modem import NbntnModem
+from .modelcache import ModelCache, ModelCacheEntry, probe_identity
+from .registry import ModemRegistry, modem_registry
+from .repocache import RepoCache, RepoSnapshot, sanitize_url
 from .constants import ModuleModel
 
 _log = logging.getLogger(__name__)
@@ -46,80 +49,210 @@ def load_module_from_path(module_path: Path):
     return module
 
 
+def _install_snapshot(snapshot: RepoSnapshot, download_path: str) -> None:
+    """Copy the modem subclass files of a cached snapshot to a folder."""
+    os.makedirs(download_path, exist_ok=True)
+    for file_path in snapshot.files():
+        if file_path.name in ['__init__.py', 'main.py']:
+            continue
+        dest_path = Path(download_path) / file_path.name
+        shutil.copy(file_path, dest_path)
+        _log.debug('Copied %s to %s', file_path.name, dest_path)
+
+
+def _load_snapshot(snapshot: RepoSnapshot) -> dict[str, Type[NbntnModem]]:
+    """Load the modem subclasses of a cached snapshot."""
+    modem_classes: dict[str, Type[NbntnModem]] = {}
+    for file_path in snapshot.files():
+        if file_path.name in ['__init__.py', 'main.py']:
+            continue
+        try:
+            submodule = load_module_from_path(file_path)
+        except Exception as e:
+            _log.exception('Failed to load module %s: %s', file_path, e)
+            continue
+        for _, cls in inspect.getmembers(submodule, inspect.isclass):
+            if (issubclass(cls, NbntnModem) and
+                cls is not NbntnModem):
+                modem_classes[cls.__name__] = cls
+                _log.debug('Loaded modem class: %s', cls.__name__)
+    return modem_classes
+
+
 def clone_and_load_modem_classes(repo_urls: list[str],
                                  branch: str = 'main',
                                  download_path: str = '',
+                                 **kwargs,
                                  ) -> dict[str, Type[NbntnModem]]:
     """Clone multiple Git repositories and load subclasses of SatelliteModem.
 
+    Repositories are resolved from the local `RepoCache` where possible, and
+    any not cached are fetched concurrently.
+
     Args:
         repo_urls (list[str]): A list of Git repository URLs.
         branch (str): The branch to clone. Defaults to 'main'.
+        download_path (str): Optional folder to copy the subclass files to.
+        **repo_cache (RepoCache|bool): The cache to use, or False to fetch
+            into a temporary folder (default `RepoCache()`).
+        **offline (bool): If True, only use cached repositories.
+        **refresh (bool): If True, fetch cached repositories again in the
+            background for next time.
 
     Returns:
          A dictionary of modem class names and their corresponding classes.
     """
     modem_classes: dict[str, Type[NbntnModem]] = {}
-    # Create a temporary directory to clone repositories
-    with tempfile.TemporaryDirectory() as temp_dir:
-        for repo_url in repo_urls:
-            repo_name = repo_url.split('/')[-1].replace('.git', '')
-            repo_path = os.path.join(temp_dir, repo_name)
-            _log.debug('Cloning git repository into %s...', repo_path)
-            result = subprocess.run(
-                ['git', 'clone', '--depth', '1', '--branch',
-                 branch, repo_url, repo_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-            if result.returncode != 0:
-                _log.error("Failed to clone repository %s: %s",
-                           repo_url, result.stderr)
+    repo_cache = kwargs.get('repo_cache', True)
+    temp_dir = None
+    if repo_cache is False:
+        temp_dir = tempfile.TemporaryDirectory()
+        repo_cache = RepoCache(temp_dir.name)
+    elif not isinstance(repo_cache, RepoCache):
+        repo_cache = RepoCache()
+    try:
+        snapshots = {url: repo_cache.resolve(url, branch) for url in repo_urls}
+        missing = [url for url, snapshot in snapshots.items() if not snapshot]
+        cached = [url for url in snapshots if url not in missing]
+        if missing and not kwargs.get('offline'):
+            snapshots.update(repo_cache.fetch_all(missing, branch))
+        if cached and kwargs.get('refresh') and not kwargs.get('offline'):
+            repo_cache.refresh(cached, branch)
+        for url, snapshot in snapshots.items():
+            if snapshot is None:
+                _log.error('Repository %s unavailable', sanitize_url(url))
                 continue
-            _log.debug("Git repository %s cloned successfully.", repo_name)
-            # Find Python files in the repository and load modem classes
-            for root, _, files in os.walk(repo_path):
-                if any(p in Path(root).parts for p in ['tests', 'examples']):
-                    continue
-                for file in files:
-                    if file in ['__init__.py', 'main.py']:
-                        continue
-                    if file.endswith('.py'):
-                        file_path = Path(root) / file
-                        try:
-                            submodule = load_module_from_path(file_path)
-                        except Exception as e:
-                            _log.exception('Failed to load module %s: %s',
-                                           file_path, e)
-                            continue
-                        for _, cls in inspect.getmembers(submodule, inspect.isclass):
-                            if (issubclass(cls, NbntnModem) and
-                                cls is not NbntnModem):
-                                modem_classes[cls.__name__] = cls
-                                _log.debug('Loaded modem class: %s', cls.__name__)
-                        # Copy to download_path if requested
-                        if download_path:
-                            os.makedirs(download_path, exist_ok=True)
-                            dest_path = Path(download_path) / file
-                            shutil.copy(file_path, dest_path)
-                            _log.debug('Copied %s to %s', file, dest_path)
+            modem_classes.update(_load_snapshot(snapshot))
+            if download_path:
+                _install_snapshot(snapshot, download_path)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
     return modem_classes
 
 
+def _resolve_model_cache(setting) -> 'ModelCache|None':
+    if setting is None or setting is True:
+        return ModelCache()
+    if setting is False:
+        return None
+    if isinstance(setting, ModelCache):
+        return setting
+    return ModelCache(setting)
+
+
+def _apply_subclass(modem: NbntnModem,
+                    candidate: Type[NbntnModem],
+                    was_connected: bool,
+                    mixin: 'Type[NbntnModem]|None' = None) -> NbntnModem:
+    """Change the class of a modem to a model-specific subclass."""
+    # Disconnect for state prior to mutation
+    if not was_connected:
+        modem.disconnect()
+    if mixin and issubclass(mixin, NbntnModem):
+        Extended = type(
+            f'Extended{candidate.__name__}',
+            (candidate, mixin),
+            {}
+        )
+        modem.__class__ = Extended
+    else:
+        modem.__class__ = candidate
+    modem._post_mutate()
+    return modem
+
+
+def _cached_subclass(entry: ModelCacheEntry) -> 'Type[NbntnModem]|None':
+    """Get the subclass recorded in a model cache entry."""
+    model = ModuleModel[entry.model]
+    target = entry.target or Path(entry.module_path)
+    try:
+        candidate = ModemRegistry._load(model, target)
+    except Exception as exc:
+        _log.warning('Unable to load cached %s: %s', target, exc)
+        return None
+    if (candidate is not None and candidate.__name__ == entry.class_name and
+        getattr(candidate, '_model', None) == model):
+        return candidate
+    return None
+
+
+def _cache_entry(port: str,
+                 imei: str,
+                 firmware: str,
+                 model: ModuleModel,
+                 candidate: Type[NbntnModem]) -> ModelCacheEntry:
+    """Build a model cache entry for a resolved subclass."""
+    target = ''
+    module_path = next((p for p, m in _module_cache.items()
+                        if getattr(m, candidate.__name__, None) is candidate),
+                       None)
+    if module_path is None:
+        module = sys.modules.get(candidate.__module__)
+        if getattr(module, '__file__', None):
+            module_path = Path(module.__file__)   # type: ignore
+            target = f'{candidate.__module__}:{candidate.__name__}'
+    return ModelCacheEntry(port, imei, firmware, model.name,
+                           str(module_path.resolve()) if module_path else '',
+                           candidate.__name__, target=target)
+
+
+def _refresh_subclass(model: ModuleModel,
+                      registry: ModemRegistry,
+                      pymodule,
+                      kwargs: dict) -> None:
+    """Refresh the repository of a model in the background.
+
+    A newer commit is copied to the modems folder for the next start.
+    """
+    modems_path = Path((pymodule or modems).__path__[0])
+    token = kwargs.get('github_token', GITHUB_TOKEN)
+    org = kwargs.get('github_org_name', GITHUB_ORG)
+    repos: list[str] = kwargs.get('github_repos', GITHUB_REPOS)
+    repo_urls = [f'https://{token}@github.com/{org}/pynbntnmodem-{repo_name}'
+                 for repo_name in repos
+                 if repo_name.replace('-', '_').endswith(model.name.lower())]
+    repo_cache = kwargs.get('repo_cache')
+    if not isinstance(repo_cache, RepoCache):
+        repo_cache = RepoCache()
+    def _on_update(url: str, snapshot: RepoSnapshot):
+        _log.info('Updating %s subclass from %s@%s', model.name,
+                  snapshot.url, snapshot.commit[:8])
+        _install_snapshot(snapshot, str(modems_path))
+        registry.refresh()
+    if repo_urls:
+        repo_cache.refresh(repo_urls, on_update=_on_update)
+
+
 def mutate_modem(modem: NbntnModem, **kwargs) -> NbntnModem:
     """Mutate and return the model-specific subclass of the satellite modem.
     
-    Attempts to find the module in `modems_path` which defaults to the `modems`
-    folder under `pynbntnmodem`.
-    If not found, will attempt to clone/download from GitHub private repository
-    if a GITHUB_TOKEN environment variable is present.
+    Resolves the subclass from the `ModemRegistry` of entry points and the
+    bundled `modems` package, importing only the matching subclass.
+    If not found, the subclass is copied from the local repository cache, or
+    cloned from the GitHub private repository if a GITHUB_TOKEN environment
+    variable is present.
+    
+    The model detected on a port is recorded in a `ModelCache` with the IMEI
+    and firmware. On subsequent calls a single identity probe validates the
+    entry and the recorded subclass is applied without detection.
     
     Args:
         modem (NbntnModem): The base/unknown modem.
-        **module (module): The module containing the subclass python files.
-            Downloaded files from GitHub will be stored here.
+        **module (module): Optional module containing the subclass python
+            files, instead of the registry. Downloaded files from GitHub will
+            be stored here.
+        **registry (ModemRegistry): Optional registry, default
+            `modem_registry`.
         **mixin (NbntnModem): Optional mixin extension subclass to apply.
+        **model_cache (ModelCache|str|bool): A cache or file path to use,
+            or False to always detect (default `ModelCache()`).
+        **repo_cache (RepoCache|bool): The cache of subclass repositories.
+            A cached subclass is used without network access, and uncached
+            ones are fetched if a GitHub token is available.
+        **refresh (bool): If True and a GitHub token is available, fetch the
+            subclass repository in the background and install any newer
+            commit for the next start.
     
     Returns:
         Subclass of NbntnModem.
@@ -130,62 +263,61 @@ def mutate_modem(modem: NbntnModem, **kwargs) -> NbntnModem:
     was_connected = modem.is_connected()
     if not was_connected:
         modem.connect()
+    mixin = kwargs.get('mixin')
+    cache = _resolve_model_cache(kwargs.pop('model_cache', None))
+    port = modem.port or ''
+    if cache is not None and port:
+        entry = cache.validate(modem, port)
+        if entry is not None:
+            candidate = _cached_subclass(entry)
+            if candidate is not None:
+                if candidate is type(modem):
+                    return modem
+                _log.debug('Using cached %s on %s', entry.model, port)
+                return _apply_subclass(modem, candidate, was_connected, mixin)
+            cache.invalidate(port)
     model = modem.get_model()
     if model == ModuleModel.UNKNOWN:
         raise ModuleNotFoundError('Unrecognized modem')
     if model == modem._model:
         return modem
-    pymodule = kwargs.pop('module', modems)
-    modems_path = Path(pymodule.__path__[0])
-    file_tag = f'{model.name.lower()}.py'
-    modem_path = next(
-        (p for p in modems_path.glob('*.py') if p.name.endswith(file_tag)),
-        None,
-    )
-    if modem_path is None:
+    pymodule = kwargs.pop('module', None)
+    registry: ModemRegistry = kwargs.get('registry') or modem_registry
+    if pymodule is not None:
+        registry = ModemRegistry(folders=[pymodule.__path__[0]],
+                                 group=None, bundled=False)
+    candidate = registry.resolve(model)
+    if candidate is None:
+        modems_path = Path((pymodule or modems).__path__[0])
+        token = kwargs.get('github_token', GITHUB_TOKEN)
+        org = kwargs.get('github_org_name', GITHUB_ORG)
+        repos: list[str] = kwargs.get('github_repos', GITHUB_REPOS)
+        repo_urls = [
+            (f'https://{token + "@" if token else ""}github.com'
+             f'/{org}/pynbntnmodem-{repo_name}')
+            for repo_name in repos
+            if repo_name.replace('-', '_').endswith(model.name.lower())
+        ]
         try:
-            token = kwargs.get('github_token', GITHUB_TOKEN)
-            if token:
-                _log.debug('Attempting to clone model subclass from GitHub...')
-                org = kwargs.get('github_org_name', GITHUB_ORG)
-                repos: list[str] = kwargs.get('github_repos', GITHUB_REPOS)
-                for repo_name in repos:
-                    if repo_name.replace('-', '_').endswith(model.name.lower()):
-                        _log.info('Copying %s from GitHub to %s',
-                                    model.name, modems_path)
-                        repo_url = (f'https://{token}@github.com'
-                                    f'/{org}/pynbntnmodem-{repo_name}')
-                        clone_and_load_modem_classes(
-                            [repo_url], download_path=str(modems_path)
-                        )
-                # refresh after download
-                modem_path = next(
-                    (p for p in modems_path.glob('*.py') if p.name.endswith(file_tag)),
-                    None,
+            if repo_urls:
+                _log.info('Copying %s subclass to %s', model.name, modems_path)
+                clone_and_load_modem_classes(
+                    repo_urls,
+                    download_path=str(modems_path),
+                    repo_cache=kwargs.get('repo_cache', True),
+                    offline=not token,
                 )
+                # refresh after download
+                registry.refresh()
+                candidate = registry.resolve(model)
         except Exception as e:
             raise ModuleNotFoundError(f'No module for {model.name}') from e
-    # Check if download still did not get the target file
-    if modem_path is None:
-        raise ModuleNotFoundError(f'No Python file found for {model.name}')
-    submodule = load_module_from_path(modem_path)
-    for _, candidate in inspect.getmembers(submodule, inspect.isclass):
-        if issubclass(candidate, NbntnModem):
-            if getattr(candidate, '_model', None) == model:
-                # Disconnect for state prior to mutation
-                if not was_connected:
-                    modem.disconnect()
-                mixin = kwargs.get('mixin')
-                if mixin and issubclass(mixin, NbntnModem):
-                    Extended = type(
-                        f'Extended{candidate.__name__}',
-                        (candidate, mixin),
-                        {}
-                    )
-                    modem.__class__ = Extended
-                else:
-                    modem.__class__ = candidate
-                modem._post_mutate()
-                return modem
-    # Fall-through
-    raise ModuleNotFoundError(f'No subclass found for {model.name}')
+    elif kwargs.get('refresh') and kwargs.get('github_token', GITHUB_TOKEN):
+        _refresh_subclass(model, registry, pymodule, kwargs)
+    if candidate is None:
+        raise ModuleNotFoundError(f'No subclass found for {model.name}')
+    if cache is not None and port:
+        imei, firmware = probe_identity(modem)
+        if imei:
+            cache.put(_cache_entry(port, imei, firmware, model, candidate))
+    return _apply_subclass(modem, candidate, was_connected, mixin)
@@ -0,0 +1,336 @@
+"""Latency and error metrics of the AT command layer.
+
+`NbntnModem` records into a `MetricsRegistry`:
+
+* Each AT command line by verb (e.g. `+CFUN`, or `+CEREG;+CESQ` for a
+  concatenated line) with count, error count, timeout count and a latency
+  histogram.
+* Each URC arrival by `UrcType`, with count and rate since the registry start.
+* Each high-level API call decorated with `timed` (e.g. `initialize_ntn`) with
+  the same counters as commands, where an exception or a `False` result is an
+  error.
+
+Recording a repeated command costs a dictionary lookup of its series and a
+bisect, well under a microsecond against the milliseconds of a serial round
+trip. Series are created under a lock but updated without one, since commands
+to a modem are serialized, so concurrent observations of one series through a
+shared registry may rarely lose an increment. Metrics are exported as a
+dictionary by `snapshot()` or in the Prometheus text exposition format by
+`to_prometheus()`.
+"""
+
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Optional
+
+from pyatcommand import AtTimeout
+
+from .constants import UrcType
+
+__all__ = ['MetricsRegistry', 'command_verb', 'timed']
+
+_log = logging.getLogger(__name__)
+
+# histogram upper bounds in seconds, covering the 15 s radio function budget
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 60,
+)
+
+_VERB_CACHE_SIZE = 256
+_verb_cache: dict[str, str] = {}
+
+
+def command_verb(command: str) -> str:
+    """Get the verb(s) of an AT command line without parameters.
+
+    For example `AT+CFUN=0` is `+CFUN`, `AT+CEREG?;+CESQ` is `+CEREG;+CESQ`
+    and `ATE0` is `E`.
+    """
+    key = command if ';' in command else command.partition('=')[0]
+    verb = _verb_cache.get(key)
+    if verb is not None:
+        return verb
+    line = key.strip()
+    if line[:2].upper() == 'AT':
+        line = line[2:]
+    verbs = []
+    for part in line.split(';'):
+        name = part.partition('=')[0].partition('?')[0].upper()
+        if name and name[0] not in '+%$#^':
+            name = name.rstrip('0123456789')
+        if name:
+            verbs.append(name)
+    verb = ';'.join(verbs) or 'AT'
+    if len(_verb_cache) < _VERB_CACHE_SIZE:
+        _verb_cache[key] = verb
+    return verb
+
+
+class _Series:
+    """Counters and latency histogram of a command or call."""
+    __slots__ = ('count', 'errors', 'timeouts', 'total', 'max', 'buckets')
+
+    def __init__(self, size: int):
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (size + 1)
+
+    def to_dict(self, bounds: tuple[float, ...]) -> dict:
+        cumulative = {}
+        running = 0
+        for bound, n in zip(bounds, self.buckets):
+            running += n
+            cumulative[_format_bound(bound)] = running
+        cumulative['+Inf'] = self.count
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'sum': self.total,
+            'max': self.max,
+            'mean': self.total / self.count if self.count else 0.0,
+            'buckets': cumulative,
+        }
+
+
+def _format_bound(bound: float) -> str:
+    return f'{bound:g}'
+
+
+def _escape(value: str) -> str:
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+class MetricsRegistry:
+    """Counters of AT commands, URCs and API calls."""
+    def __init__(self,
+                 enabled: bool = True,
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        """Create the registry.
+
+        Args:
+            enabled (bool): Record metrics, or ignore all observations.
+            buckets (tuple[float]): Ascending histogram upper bounds in
+                seconds.
+        """
+        if not buckets or list(buckets) != sorted(buckets):
+            raise ValueError('Invalid histogram buckets')
+        self.enabled = enabled
+        self._bounds = tuple(buckets)
+        self._lock = threading.Lock()
+        self._commands: dict[str, _Series] = {}
+        self._command_series: dict[str, _Series] = {}   # by line or set verb
+        self._calls: dict[str, _Series] = {}
+        self._urcs: dict[UrcType, int] = {}
+        self._active = threading.local()
+        self._start = time.monotonic()
+
+    @property
+    def buckets(self) -> tuple[float, ...]:
+        return self._bounds
+
+    def _series(self, series: dict[str, _Series], name: str) -> _Series:
+        """Get or create the series of a name."""
+        s = series.get(name)
+        if s is None:
+            with self._lock:
+                s = series.get(name)
+                if s is None:
+                    s = series[name] = _Series(len(self._bounds))
+        return s
+
+    def _observe(self,
+                 series: dict[str, _Series],
+                 name: str,
+                 seconds: float,
+                 error: bool,
+                 timeout: bool) -> None:
+        s = series.get(name) or self._series(series, name)
+        s.count += 1
+        s.total += seconds
+        if seconds > s.max:
+            s.max = seconds
+        s.buckets[bisect_left(self._bounds, seconds)] += 1
+        if timeout:
+            s.timeouts += 1
+        elif error:
+            s.errors += 1
+
+    def _command(self, command: str) -> _Series:
+        """Get the series of a command line's verb, caching it by line."""
+        key = command if ';' in command else command.partition('=')[0]
+        s = self._command_series.get(key)
+        if s is None:
+            s = self._series(self._commands, command_verb(command))
+            with self._lock:   # by verb since set parameters vary
+                if len(self._command_series) < _VERB_CACHE_SIZE:
+                    self._command_series[key] = s
+        return s
+
+    def observe_command(self,
+                        command: str,
+                        seconds: float,
+                        error: bool = False,
+                        timeout: bool = False) -> None:
+        """Record an AT command line.
+
+        Args:
+            command (str): The command line or its verb.
+            seconds (float): The time to the final result or timeout.
+            error (bool): True if the result was an error.
+            timeout (bool): True if no result was received.
+        """
+        if not self.enabled:
+            return
+        s = self._command_series.get(command) or self._command(command)
+        s.count += 1
+        s.total += seconds
+        if seconds > s.max:
+            s.max = seconds
+        s.buckets[bisect_left(self._bounds, seconds)] += 1
+        if timeout:
+            s.timeouts += 1
+        elif error:
+            s.errors += 1
+
+    def observe_call(self,
+                     name: str,
+                     seconds: float,
+                     error: bool = False,
+                     timeout: bool = False) -> None:
+        """Record a high-level API call."""
+        if self.enabled:
+            self._observe(self._calls, name, seconds, error, timeout)
+
+    def observe_urc(self, urc: str, urc_type: UrcType) -> None:
+        """Record a URC arrival, compatible with `UrcDispatcher.subscribe`."""
+        if self.enabled:
+            with self._lock:
+                self._urcs[urc_type] = self._urcs.get(urc_type, 0) + 1
+
+    def time_call(self, name: str, func: Callable, *args, **kwargs):
+        """Call a function and record its duration and outcome.
+
+        Nested calls of the same name in a thread, such as a subclass
+        override calling its base method, are recorded once.
+        """
+        active: Optional[set] = getattr(self._active, 'names', None)
+        if active is None:
+            active = self._active.names = set()
+        if not self.enabled or name in active:
+            return func(*args, **kwargs)
+        active.add(name)
+        error = timeout = False
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+            error = result is False
+            return result
+        except AtTimeout:
+            timeout = True
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            active.discard(name)
+            self._observe(self._calls, name, time.perf_counter() - start,
+                          error, timeout)
+
+    def reset(self) -> None:
+        """Clear all metrics and restart the URC rate interval."""
+        with self._lock:
+            self._commands.clear()
+            self._command_series.clear()
+            self._calls.clear()
+            self._urcs.clear()
+            self._start = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """Get the metrics as a dictionary.
+
+        Returns:
+            A dictionary with `uptime` seconds since start or reset,
+            `commands` and `calls` by name with `count`, `errors`,
+            `timeouts`, `sum`, `max`, `mean` seconds and cumulative `buckets`
+            by upper bound, and `urcs` by `UrcType` name with `count` and
+            `rate` per second.
+        """
+        with self._lock:
+            uptime = time.monotonic() - self._start
+            return {
+                'uptime': uptime,
+                'commands': {k: v.to_dict(self._bounds)
+                             for k, v in sorted(self._commands.items())},
+                'calls': {k: v.to_dict(self._bounds)
+                          for k, v in sorted(self._calls.items())},
+                'urcs': {t.name: {'count': n,
+                                  'rate': n / uptime if uptime else 0.0}
+                         for t, n in sorted(self._urcs.items(),
+                                            key=lambda i: i[0].name)},
+            }
+
+    def to_prometheus(self,
+                      namespace: str = 'pynbntnmodem',
+                      labels: Optional[dict[str, str]] = None) -> str:
+        """Get the metrics in the Prometheus text exposition format.
+
+        Args:
+            namespace (str): The metric name prefix.
+            labels (dict): Optional constant labels e.g. `{'port': port}`.
+        """
+        snapshot = self.snapshot()
+        const = ''.join(f'{k}="{_escape(str(v))}",'
+                        for k, v in (labels or {}).items())
+        lines: list[str] = []
+        for kind, label, title in (('command', 'command', 'AT command'),
+                                   ('call', 'method', 'API call')):
+            series: dict[str, dict] = snapshot[f'{kind}s']
+            name = f'{namespace}_{kind}_duration_seconds'
+            lines.append(f'# HELP {name} {title} latency.')
+            lines.append(f'# TYPE {name} histogram')
+            for key, s in series.items():
+                tag = f'{const}{label}="{_escape(key)}"'
+                for bound, n in s['buckets'].items():
+                    lines.append(f'{name}_bucket{{{tag},le="{bound}"}} {n}')
+                lines.append(f'{name}_sum{{{tag}}} {s["sum"]:.6f}')
+                lines.append(f'{name}_count{{{tag}}} {s["count"]}')
+            for counter in ('errors', 'timeouts'):
+                name = f'{namespace}_{kind}_{counter}_total'
+                lines.append(f'# HELP {name} {title} {counter}.')
+                lines.append(f'# TYPE {name} counter')
+                for key, s in series.items():
+                    tag = f'{const}{label}="{_escape(key)}"'
+                    lines.append(f'{name}{{{tag}}} {s[counter]}')
+        name = f'{namespace}_urc_total'
+        lines.append(f'# HELP {name} URCs received by type.')
+        lines.append(f'# TYPE {name} counter')
+        for key, u in snapshot['urcs'].items():
+            lines.append(f'{name}{{{const}urc_type="{key}"}} {u["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def timed(func: Callable) -> Callable:
+    """Decorate a modem method to record its calls in the modem metrics.
+
+    The decorated object must have a `_metrics` attribute of type
+    `MetricsRegistry`. `NbntnModem` subclasses overriding a decorated method
+    are decorated automatically.
+    """
+    name = func.__name__
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        metrics: Optional[MetricsRegistry] = getattr(self, '_metrics', None)
+        if metrics is None:
+            return func(self, *args, **kwargs)
+        return metrics.time_call(name, func, self, *args, **kwargs)
+    wrapper.__timed__ = True
+    wrapper.__decorators__ = getattr(func, '__decorators__', ()) + (timed,)
+    return wrapper
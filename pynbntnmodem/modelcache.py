@@ -0,0 +1,207 @@
+"""Persistent cache of the modem model detected on each serial port.
+
+`mutate_modem` records the detected `ModuleModel`, firmware and resolved
+subclass for the port and IMEI. On the next start a single identity probe
+(`AT+CGSN;+CGMR`) validates the entry, so the subclass is applied without the
+`ATI` query and module search. An entry is discarded if the IMEI or firmware
+reported differs, or the subclass file has changed.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+from pyatcommand import AtClient, AtTimeout
+
+__all__ = ['ModelCache', 'ModelCacheEntry', 'probe_identity']
+
+_log = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+
+def default_cache_dir() -> Path:
+    """Get the cache folder from environment or the user cache folder.
+
+    Uses `PYNBNTNMODEM_CACHE_DIR`, else `XDG_CACHE_HOME` or `~/.cache`.
+    """
+    folder = os.getenv('PYNBNTNMODEM_CACHE_DIR')
+    if folder:
+        return Path(folder)
+    base = os.getenv('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'pynbntnmodem'
+
+
+def default_cache_path() -> Path:
+    """Get the model cache file path within `default_cache_dir()`."""
+    return default_cache_dir() / 'models.json'
+
+
+@dataclass
+class ModelCacheEntry:
+    """A detected modem model on a serial port.
+
+    Attributes:
+        port (str): The serial port name.
+        imei (str): The IMEI reported by the modem.
+        firmware (str): The firmware revision reported, or empty if unknown.
+        model (str): The `ModuleModel` name.
+        module_path (str): The file defining the subclass.
+        class_name (str): The subclass name within the file.
+        module_mtime (int): The file modification time in nanoseconds.
+        timestamp (float): The unix time the entry was recorded.
+        target (str): The import path `module:Class` if importable by name.
+    """
+    port: str
+    imei: str
+    firmware: str
+    model: str
+    module_path: str
+    class_name: str
+    module_mtime: int = 0
+    timestamp: float = 0
+    target: str = ''
+
+    def module_changed(self) -> bool:
+        """True if the subclass file is missing or has been modified."""
+        try:
+            return os.stat(self.module_path).st_mtime_ns != self.module_mtime
+        except OSError:
+            return True
+
+
+def _identity_value(line: str, prefix: str) -> str:
+    line = line.strip()
+    if line.startswith(prefix):
+        line = line[len(prefix):].strip()
+    return line.strip('"')
+
+
+def probe_identity(modem: AtClient, timeout: float = 1) -> tuple[str, str]:
+    """Get the IMEI and firmware revision using a single command line.
+
+    Falls back to `AT+CGSN` alone if concatenation is not supported, in which
+    case the firmware is returned empty.
+
+    Returns:
+        A tuple (imei, firmware), with empty values if unavailable.
+    """
+    try:
+        res = modem.send_command('AT+CGSN;+CGMR', timeout=timeout)
+        if res.ok and res.info:
+            lines = [l for l in res.info.splitlines() if l.strip()]
+            if len(lines) == 2:
+                return (_identity_value(lines[0], '+CGSN:'),
+                        _identity_value(lines[1], '+CGMR:'))
+        res = modem.send_command('AT+CGSN', timeout=timeout)
+        if res.ok and res.info:
+            return _identity_value(res.info, '+CGSN:'), ''
+    except AtTimeout:
+        _log.warning('Identity probe timed out')
+    return '', ''
+
+
+class ModelCache:
+    """A JSON file of `ModelCacheEntry` keyed by serial port."""
+    def __init__(self, path: 'str|Path|None' = None):
+        """Create the cache.
+
+        Args:
+            path (str|Path): Optional file path, defaults to
+                `default_cache_path()`.
+        """
+        self._path = Path(path) if path else default_cache_path()
+        self._lock = threading.Lock()
+        self._entries: Optional[dict[str, ModelCacheEntry]] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _load(self) -> dict[str, ModelCacheEntry]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                data = json.loads(self._path.read_text())
+                if data.get('version') == CACHE_VERSION:
+                    for port, entry in data.get('entries', {}).items():
+                        self._entries[port] = ModelCacheEntry(**entry)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, TypeError) as exc:
+                _log.warning('Ignoring invalid model cache %s: %s',
+                             self._path, exc)
+        return self._entries
+
+    def _save(self) -> None:
+        assert self._entries is not None
+        data = {'version': CACHE_VERSION,
+                'entries': {p: asdict(e) for p, e in self._entries.items()}}
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self._path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self._path)
+        except OSError as exc:
+            _log.warning('Unable to write model cache %s: %s',
+                         self._path, exc)
+
+    def get(self, port: str) -> Optional[ModelCacheEntry]:
+        """Get the entry recorded for a port."""
+        with self._lock:
+            return self._load().get(port)
+
+    def put(self, entry: ModelCacheEntry) -> None:
+        """Record an entry, replacing any for the same port."""
+        if not entry.module_mtime:
+            try:
+                entry.module_mtime = os.stat(entry.module_path).st_mtime_ns
+            except OSError:
+                pass
+        if not entry.timestamp:
+            entry.timestamp = time.time()
+        with self._lock:
+            self._load()[entry.port] = entry
+            self._save()
+
+    def invalidate(self, port: str = '') -> None:
+        """Remove the entry for a port, or all entries."""
+        with self._lock:
+            entries = self._load()
+            if port:
+                if entries.pop(port, None) is None:
+                    return
+            else:
+                entries.clear()
+            self._save()
+
+    def validate(self,
+                 modem: AtClient,
+                 port: str) -> Optional[ModelCacheEntry]:
+        """Get the entry for a port if a probe of the modem agrees.
+
+        A stale entry is removed.
+        """
+        entry = self.get(port)
+        if entry is None:
+            return None
+        imei, firmware = probe_identity(modem)
+        reason = ''
+        if not imei or imei != entry.imei:
+            reason = f'IMEI {imei or "unavailable"}'
+        elif firmware and entry.firmware and firmware != entry.firmware:
+            reason = f'firmware {firmware}'
+        elif entry.module_changed():
+            reason = f'{entry.module_path} changed'
+        if reason:
+            _log.info('Model cache for %s invalidated by %s', port, reason)
+            self.invalidate(port)
+            return None
+        return entry
@@ -1,14 +1,17 @@
 """Abstraction of the NB-NTN modem interface."""
 
 import logging
+import threading
 import time
 from abc import ABC
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Callable, Generator, Optional
 
 from pyatcommand import AtClient, AtResponse, AtTimeout
-from pyatcommand.common import dprint
+from pyatcommand.common import AT_TIMEOUT, dprint
 
 from .constants import (
+    NBNTN_MAX_MSG_SIZE,
+    UDP_MAX_PAYLOAD,
     CeregMode,
     Chipset,
     ModuleManufacturer,
@@ -17,13 +20,18 @@ from .constants import (
     RadioAccessTechnology,
     RegistrationState,
     RrcState,
-    SignalLevel,
     SignalQuality,
     UrcType,
 )
-from .ntninit import NtnInitSequence, default_init
+from .ntninit import (
+    NtnDesiredState,
+    NtnInitReport,
+    NtnInitSequence,
+    default_init,
+)
 from .structures import (
     EdrxConfig,
+    ModemSnapshot,
     MoMessage,
     MtMessage,
     NtnLocation,
@@ -33,10 +41,27 @@ from .structures import (
     SigInfo,
     SocketStatus,
 )
+from .codec import CodecStage, decoded, encoded
+from .fragmentation import Reassembler, fragmented, reassembled
+from .metrics import MetricsRegistry, timed
+from .parsers import ParserRegistry, ResponseParser, default_parsers
+from .statecache import CachePolicy, StateCache, cached, set_command_events
+from .urcdispatcher import (
+    UrcDispatcher,
+    UrcQueue,
+    UrcSubscription,
+    UrcWaiter,
+)
 from .utils import is_valid_hostname, is_valid_ip
 
+if TYPE_CHECKING:   # imported on use to keep the modem import fast
+    from .recorder import TrafficRecorder, TrafficReplayer
+
 _log = logging.getLogger(__name__)
 
+# configuration applied by a desired-state init instead of sequence steps
+_DESIRED_COMMANDS = ('+CFUN', '+CGDCONT', '+CEREG', '+CPSMS', '+CEDRXS')
+
 
 class NbntnModem(AtClient, ABC):
     """Abstract Base Class for a NB-NTN modem."""
@@ -48,7 +73,70 @@ class NbntnModem(AtClient, ABC):
     _ignss: bool = False   # modem has internal GNSS
     _ntn_only: bool = False   # modem supports only NTN
     _rrc_ack: bool = False   # modem supports RRC send confirmation
+    _edrx_ptw: bool = False   # set_edrx_config requests the eDRX PTW
     _command_timeout: float|None = None   # module-specific heuristic
+    _batch_max: int = 8   # concatenated commands per line, 1 if unsupported
+    _batch_max_length: int = 256   # characters per concatenated command line
+    _batch_failures_max: int = 3   # failed combined lines before disabling
+    # extended commands whose information response has no prefix
+    _unprefixed_responses: tuple[str, ...] = (
+        '+CGMI', '+CGMM', '+CGMR', '+CGSN', '+CIMI',
+    )
+    # state cache freshness: ttl None is static until invalidated by events,
+    # including the verb of a set command sent by any means e.g. `+CFUN`
+    _cache_policies: dict[str, CachePolicy] = {
+        'manufacturer': CachePolicy(),
+        'model': CachePolicy(),
+        'firmware_version': CachePolicy(),
+        'imei': CachePolicy(),
+        'imsi': CachePolicy(),
+        'apn': CachePolicy(None, ('set_context', 'initialize_ntn', '+CGDCONT')),
+        'regconfig': CachePolicy(None, ('set_regconfig', 'initialize_ntn',
+                                        '+CEREG')),
+        'psm_config': CachePolicy(None, ('set_psm_config', 'initialize_ntn',
+                                         '+CPSMS')),
+        'edrx_config': CachePolicy(None, ('set_edrx_config', 'initialize_ntn',
+                                          '+CEDRXS')),
+        'contexts': CachePolicy(300, (UrcType.REGISTRATION, 'set_context',
+                                      'enable_radio', 'initialize_ntn',
+                                      '+CGDCONT', '+CGACT', '+CFUN')),
+        'ip_address': CachePolicy(300, (UrcType.REGISTRATION, 'set_context',
+                                        'enable_radio', 'initialize_ntn',
+                                        '+CGDCONT', '+CGACT', '+CFUN')),
+        'reginfo': CachePolicy(5, (UrcType.REGISTRATION, 'set_context',
+                                   'enable_radio', 'initialize_ntn',
+                                   '+CFUN', '+CEREG', '+COPS', '+CGDCONT')),
+        'edrx_dynamic': CachePolicy(300, (UrcType.REGISTRATION,
+                                          'set_edrx_config', 'enable_radio',
+                                          '+CEDRXS', '+CFUN')),
+        'rrc_state': CachePolicy(10, (UrcType.RRC_STATE, UrcType.PSM_ENTER,
+                                      UrcType.PSM_EXIT, 'enable_radio',
+                                      '+CFUN')),
+        'siginfo': CachePolicy(5, (UrcType.REGISTRATION, 'enable_radio',
+                                   '+CFUN')),
+    }
+    # snapshot attribute: (getter, 3GPP query) batched if getter not overridden
+    _snapshot_queries: dict[str, tuple[str, str]] = {
+        'reginfo': ('get_reginfo', 'AT+CEREG?'),
+        'siginfo': ('get_siginfo', 'AT+CESQ'),
+        'rrc_state': ('get_rrc_state', 'AT+CSCON?'),
+        'edrx_dynamic': ('get_edrx_dynamic', 'AT+CEDRXRDP'),
+        'psm_config': ('get_psm_config', 'AT+CPSMS?'),
+        'ip_address': ('ip_address', 'AT+CGPADDR'),
+    }
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Apply `timed` metrics and payload stages to overrides."""
+        super().__init_subclass__(**kwargs)
+        for name, attr in list(vars(cls).items()):
+            if not callable(attr) or hasattr(attr, '__decorators__'):
+                continue
+            base = getattr(super(cls, cls), name, None)
+            decorators = getattr(base, '__decorators__', ())
+            for decorator in decorators:
+                attr = decorator(attr)
+            if decorators:
+                setattr(cls, name, attr)
 
     def __init__(self, **kwargs) -> None:
         """Instantiate the class.
@@ -60,6 +148,13 @@ class NbntnModem(AtClient, ABC):
             **apn (str): The APN value to use
             **udp_server (str): Optional UDP destination server
             **udp_server_port (int): Optional UDP destination port
+            **cache (bool): Enable the state cache (default True)
+            **metrics (MetricsRegistry|bool): Registry of command, URC and
+                call metrics, or False to disable (default enabled)
+            **fragmentation (Reassembler|bool): Fragment NIDD/UDP payloads
+                and reassemble MT messages (default disabled)
+            **codec (CodecStage|bool): Encode NIDD/UDP payloads and decode MT
+                messages, before fragmentation (default disabled)
         """
         kwargs['baudrate'] = kwargs.pop('baudrate', 115200)
         super().__init__(**kwargs)
@@ -72,6 +167,33 @@ class NbntnModem(AtClient, ABC):
         self._udp_server: str = ''
         self._udp_server_port: int = 0
         self._ntn_initialized: bool = False
+        self._init_report: Optional[NtnInitReport] = None
+        self._urc_dispatcher = UrcDispatcher(
+            classifier=lambda urc: self.get_urc_type(urc)
+        )
+        self._unsolicited_queue = UrcQueue(self._urc_dispatcher)
+        self._cache = StateCache(self._cache_policies,
+                                 enabled=kwargs.get('cache', True))
+        self._urc_dispatcher.subscribe(self._cache.on_urc)
+        self._urc_dispatcher.subscribe(self._update_urc_state)
+        metrics = kwargs.get('metrics', True)
+        if not isinstance(metrics, MetricsRegistry):
+            metrics = MetricsRegistry(enabled=bool(metrics))
+        self._metrics: MetricsRegistry = metrics
+        self._urc_dispatcher.subscribe(self._metrics.observe_urc)
+        self._reassembler: Optional[Reassembler] = None
+        self._fragment_id: int = 0
+        self._fragment_lock = threading.Lock()
+        self.fragmentation = kwargs.get('fragmentation', False)
+        self._codec: Optional[CodecStage] = None
+        self.codec = kwargs.get('codec')
+        self._recorder: 'Optional[TrafficRecorder]' = None
+        self._recorder_subscription: Optional[UrcSubscription] = None
+        self._replayer: 'Optional[TrafficReplayer]' = None
+        self._bridge: Optional[Any] = None   # e.g. AsyncNbntnModem loop I/O
+        self._command_count: int = 0
+        self._batch_failures: int = 0
+        self._parsers: ParserRegistry = default_parsers.copy()
         for k, v in kwargs.items():
             if k in ['pdn_type', 'apn', 'udp_server', 'udp_server_port']:
                 setattr(self, k, v)
@@ -96,6 +218,10 @@ class NbntnModem(AtClient, ABC):
     def _post_mutate(self, **kwargs):
         """Call post-mutation to a subclass of NbntnModem."""
         self._ntn_initialized = False
+        self.__dict__.pop('_batch_max', None)
+        self._batch_failures = 0
+        for key, policy in self._cache_policies.items():
+            self._cache.set_policy(key, policy)
         
     def connect(self, **kwargs) -> None:
         return super().connect(**kwargs)
@@ -105,9 +231,180 @@ class NbntnModem(AtClient, ABC):
         for prop in reset_props:
             if hasattr(self, f'_{prop}'):
                 setattr(self, f'_{prop}', '')
+        self._cache.invalidate()
         return super().disconnect()
     
+    def send_command(self,
+                     command: str,
+                     timeout: Optional[float] = AT_TIMEOUT,
+                     prefix: str = '',
+                     **kwargs) -> AtResponse:
+        start = self._begin_command(command)
+        try:
+            res = self._transmit(command, timeout, prefix, **kwargs)
+        except Exception as exc:
+            self._end_command(command, start, exc)
+            raise
+        self._end_command(command, start, res)
+        return res
+    
+    def _begin_command(self, command: str) -> Optional[float]:
+        """Count and record a command line about to be sent.
+        
+        Returns:
+            The start time for `_end_command`, or None if commands are not
+                being observed by metrics or a recorder.
+        """
+        self._command_count += 1
+        recorder = self._recorder
+        if not self._metrics.enabled and recorder is None:
+            return None
+        if recorder is not None:
+            recorder.record_command(command)
+        return time.perf_counter()
+    
+    def _end_command(self,
+                     command: str,
+                     start: Optional[float],
+                     res: 'AtResponse|Exception') -> None:
+        """Apply the cache events of a command and record its outcome."""
+        if not isinstance(res, Exception):
+            for event in set_command_events(command):
+                self._cache.on_event(event)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        recorder = self._recorder
+        if isinstance(res, AtTimeout):
+            if recorder is not None:
+                recorder.record_response(None)
+            self._metrics.observe_command(command, elapsed, timeout=True)
+        elif isinstance(res, Exception):
+            if recorder is not None:
+                recorder.record_response(res)
+            self._metrics.observe_command(command, elapsed, error=True)
+        else:
+            if recorder is not None:
+                recorder.record_response(res)
+            self._metrics.observe_command(command, elapsed, error=not res.ok)
+    
+    def _transmit(self,
+                  command: str,
+                  timeout: Optional[float] = AT_TIMEOUT,
+                  prefix: str = '',
+                  **kwargs) -> AtResponse:
+        """Get the response from the replayer, bridge or serial port."""
+        if self._replayer is not None:
+            return self._replayer.respond(self, command, timeout)
+        if self._bridge is not None:
+            return self._bridge.send_command(command, timeout, prefix, **kwargs)
+        return super().send_command(command, timeout, prefix, **kwargs)
+    
+    def is_connected(self) -> bool:
+        if self._replayer is not None:
+            return True
+        if self._bridge is not None:
+            return self._bridge.is_connected()
+        return super().is_connected()
+    
+    @property
+    def recorder(self) -> 'Optional[TrafficRecorder]':
+        """The recorder of commands, responses and URCs, if any."""
+        return self._recorder
+    
+    @recorder.setter
+    def recorder(self, recorder: 'Optional[TrafficRecorder]'):
+        if recorder is not None:
+            from .recorder import TrafficRecorder
+            if not isinstance(recorder, TrafficRecorder):
+                raise ValueError('Invalid TrafficRecorder')
+        if self._recorder_subscription is not None:
+            self._urc_dispatcher.unsubscribe(self._recorder_subscription)
+            self._recorder_subscription = None
+        self._recorder = recorder
+        if recorder is not None:
+            self._recorder_subscription = self._urc_dispatcher.subscribe(
+                recorder.record_urc
+            )
+    
     @property
+    def replayer(self) -> 'Optional[TrafficReplayer]':
+        """The replayer answering commands instead of the serial port."""
+        return self._replayer
+    
+    @replayer.setter
+    def replayer(self, replayer: 'Optional[TrafficReplayer]'):
+        if replayer is not None:
+            from .recorder import TrafficReplayer
+            if not isinstance(replayer, TrafficReplayer):
+                raise ValueError('Invalid TrafficReplayer')
+        self._replayer = replayer
+    
+    @property
+    def fragmentation(self) -> bool:
+        """Fragment MO payloads and reassemble MT messages.
+        
+        Both ends must use the `fragmentation` header framing. May be set to a
+        `Reassembler` to configure its timeout and buffer limits.
+        """
+        return self._reassembler is not None
+    
+    @fragmentation.setter
+    def fragmentation(self, enable: 'Reassembler|bool'):
+        if isinstance(enable, Reassembler):
+            self._reassembler = enable
+        elif not isinstance(enable, bool):
+            raise ValueError('Invalid fragmentation must be bool or Reassembler')
+        elif not enable:
+            self._reassembler = None
+        elif self._reassembler is None:
+            self._reassembler = Reassembler()
+    
+    @property
+    def codec(self) -> Optional[CodecStage]:
+        """The codec stage encoding MO payloads and decoding MT messages.
+        
+        Both ends must register the same codecs. May be set True to use a
+        default `CodecStage`, or None/False to disable.
+        """
+        return self._codec
+    
+    @codec.setter
+    def codec(self, codec: 'CodecStage|bool|None'):
+        if codec is True:
+            codec = CodecStage()
+        elif codec is False:
+            codec = None
+        if codec is not None and not isinstance(codec, CodecStage):
+            raise ValueError('Invalid codec must be CodecStage or bool')
+        self._codec = codec
+    
+    @property
+    def command_count(self) -> int:
+        """The number of AT command lines sent since creation."""
+        return self._command_count
+    
+    @property
+    def metrics(self) -> MetricsRegistry:
+        """Latency and error metrics of commands, URCs and API calls."""
+        return self._metrics
+    
+    @property
+    def state_cache(self) -> StateCache:
+        """The cache of queried modem state, with hit/miss `stats()`."""
+        return self._cache
+
+    def refresh(self, *keys: str) -> None:
+        """Invalidate cached state so it is queried on next access.
+        
+        Args:
+            *keys (str): The cached attribute names e.g. `siginfo`, or all
+                if none are specified.
+        """
+        self._cache.invalidate(*keys)
+
+    @property
+    @cached('manufacturer')
     def manufacturer(self) -> str:
         if self._manufacturer.name == 'UNKNOWN' and self.is_connected():
             res = self.send_command('AT+CGMI')
@@ -116,6 +413,7 @@ class NbntnModem(AtClient, ABC):
         return self._manufacturer.name
     
     @property
+    @cached('model')
     def model(self) -> str:
         if self._model == ModuleModel.UNKNOWN and self.is_connected():
             res = self.send_command('AT+CGMM')
@@ -128,11 +426,12 @@ class NbntnModem(AtClient, ABC):
         return self._chipset.name
     
     @property
+    @cached('firmware_version')
     def firmware_version(self) -> str:
         if not self._version:
             res = self.send_command('AT+CGMR')
             if res.ok and res.info:
-                return res.info
+                self._version = res.info
         return self._version
     
     @property
@@ -154,6 +453,7 @@ class NbntnModem(AtClient, ABC):
         self._pdn_type = pdn_type
 
     @property
+    @cached('imei')
     def imei(self) -> str:
         if not self._imei:
             res = self.send_command('AT+CGSN')
@@ -162,6 +462,7 @@ class NbntnModem(AtClient, ABC):
         return self._imei
     
     @property
+    @cached('imsi')
     def imsi(self) -> str:
         if not self._imsi:
             res = self.send_command('AT+CIMI')
@@ -170,6 +471,7 @@ class NbntnModem(AtClient, ABC):
         return self._imsi
     
     @property
+    @cached('apn')
     def apn(self) -> str:
         if not self._apn and self.is_connected():
             res = self.send_command('AT+CGDCONT?', prefix='+CGDCONT:')
@@ -183,6 +485,7 @@ class NbntnModem(AtClient, ABC):
         if not isinstance(name, str):
             raise ValueError('Invalid APN')
         self._apn = name
+        self._cache.invalidate('apn')
     
     @property
     def udp_server(self) -> str:
@@ -206,28 +509,29 @@ class NbntnModem(AtClient, ABC):
         self._udp_server_port = port
     
     @property
+    @cached('ip_address')
     def ip_address(self) -> str:
-        ip_address = ''
-        res = self.send_command('AT+GCPADDR')
-        if res.ok and res.info:
-            ip_addresses = res.info.split('\n')
-            if len(ip_address) > 1:
-                _log.warning('%d IP addresses returned', len(ip_addresses))
-            ip_address = ip_addresses[0].split(',')[-1]
-            if not is_valid_ip(ip_address):
-                ip_address = ''
+        res = self.send_command('AT+CGPADDR', prefix='+CGPADDR:')
+        ip_address = self._parse_ip_address(res.info if res.ok else '')
         if not ip_address:
             res = self.send_command('AT+CGDCONT?')
-            if res.ok and res.info:
-                params = res.info.split(',')
-                for i, param in enumerate(params):
-                    param = param.replace('"', '')
-                    if not param:
-                        continue
-                    if i == 3:
-                        ip_address = param
+            ip_address = self._parse_ip_address('', res.info if res.ok else '')
         return ip_address
 
+    def _parse_ip_address(self, cgpaddr: Optional[str], cgdcont: Optional[str] = '') -> str:
+        """Get the first context IP address from `+CGPADDR` or `+CGDCONT`."""
+        if cgpaddr:
+            ip_addresses = self._parsers.parse_lines(cgpaddr, '+CGPADDR')
+            if len(ip_addresses) > 1:
+                _log.warning('%d IP addresses returned', len(ip_addresses))
+            if ip_addresses and is_valid_ip(ip_addresses[0].get('ip', '')):
+                return ip_addresses[0]['ip']
+        if cgdcont:
+            contexts = self._parsers.parse_lines(cgdcont, '+CGDCONT')
+            if contexts and contexts[0].ip:
+                return contexts[0].ip
+        return ''
+
     @property
     def ntn_initialized(self) -> bool:
         return self._ntn_initialized
@@ -270,26 +574,179 @@ class NbntnModem(AtClient, ABC):
         res: AtResponse = self.send_command(f'AT+CMEE={mode}')
         return res.ok
 
+    @staticmethod
+    def _response_prefix(command: str) -> str:
+        """Get the response prefix of an extended command e.g. `+CEREG`."""
+        name = command[2:]
+        for sep in ('=', '?'):
+            name = name.split(sep, 1)[0]
+        return name.upper()
+
+    @staticmethod
+    def _is_batchable(command: str) -> bool:
+        """Check if a command is a concatenable extended query."""
+        return (len(command) > 3 and command[:2].upper() == 'AT' and
+                command[2] in '+%#$^' and ';' not in command and
+                ('=' not in command or command.endswith('=?')))
+
+    @timed
+    def send_batch(self, commands: list[str], **kwargs) -> list[AtResponse]:
+        """Send multiple queries in as few command lines as possible.
+        
+        Extended read, test or parameterless commands are concatenated e.g.
+        `AT+CEREG?;+CESQ` and the combined response is demultiplexed by
+        prefix. Other commands, or all commands if the modem does not support
+        concatenation, are sent individually. If a combined line fails or
+        times out, its commands are retried individually, and concatenation
+        is disabled after `_batch_failures_max` consecutive combined lines
+        fail whose commands succeed individually.
+        
+        Args:
+            commands (list[str]): The AT commands to send.
+            **timeout (float): Optional timeout per command line.
+        
+        Returns:
+            A list of `AtResponse` in the order of `commands`. Information
+                responses retain their prefix.
+        
+        Raises:
+            `ValueError` if commands is not a list of strings.
+        """
+        if (not isinstance(commands, list) or
+            not all(isinstance(cmd, str) and cmd for cmd in commands)):
+            raise ValueError('Invalid command(s) must be list of strings')
+        send_kwargs = {}
+        if 'timeout' in kwargs:
+            send_kwargs['timeout'] = kwargs['timeout']
+        responses: list[Optional[AtResponse]] = [None] * len(commands)
+        batches: list[list[int]] = []
+        batch: list[int] = []
+        length = 0
+        has_unprefixed = False
+        for i, cmd in enumerate(commands):
+            if self._batch_max < 2 or not self._is_batchable(cmd):
+                continue
+            unprefixed = (self._response_prefix(cmd) in
+                          self._unprefixed_responses)
+            if batch and (len(batch) >= self._batch_max or
+                          length + len(cmd) - 1 > self._batch_max_length or
+                          unprefixed and has_unprefixed):
+                batches.append(batch)
+                batch = []
+            if not batch:
+                length = 2
+                has_unprefixed = False
+            batch.append(i)
+            length += len(cmd) - 1
+            has_unprefixed = has_unprefixed or unprefixed
+        if batch:
+            batches.append(batch)
+        for batch in batches:
+            if len(batch) < 2:
+                continue
+            batch_cmds = [commands[i] for i in batch]
+            line = 'AT' + ';'.join(cmd[2:] for cmd in batch_cmds)
+            try:
+                res = self.send_command(line, **send_kwargs)
+            except AtTimeout:
+                _log.warning('Timed out on concatenated commands: %s', line)
+                continue   # retried individually below
+            if not res.ok:
+                continue
+            self._batch_failures = 0
+            for i, info in zip(batch, self._demux_batch(batch_cmds, res.info)):
+                responses[i] = AtResponse(res.result, info, res.crc_ok,
+                                          res.elapsed)
+        fallback = [i for i in range(len(commands)) if responses[i] is None]
+        for i in fallback:
+            responses[i] = self.send_command(commands[i], **send_kwargs)
+        if (self._batch_max > 1 and
+            any(len(b) > 1 and all(i in fallback for i in b) for b in batches) and
+            all(responses[i].ok for i in fallback)):   # type: ignore
+            self._batch_failures += 1
+            if self._batch_failures >= self._batch_failures_max:
+                _log.warning('Command concatenation not supported - disabling')
+                self._batch_max = 1
+        return responses   # type: ignore
+
+    def _demux_batch(self, commands: list[str], info: Optional[str]) -> list[str]:
+        """Split a concatenated command response by prefix."""
+        prefixes = [f'{self._response_prefix(cmd)}:' for cmd in commands]
+        unprefixed = next((i for i, cmd in enumerate(commands)
+                           if self._response_prefix(cmd) in
+                           self._unprefixed_responses), None)
+        lines: list[list[str]] = [[] for _ in commands]
+        for line in (info or '').split('\n'):
+            if not line.strip():
+                continue
+            for i, prefix in enumerate(prefixes):
+                if line.startswith(prefix):
+                    lines[i].append(line)
+                    break
+            else:
+                if unprefixed is not None:
+                    lines[unprefixed].append(line)
+                else:
+                    _log.warning('Unexpected batch response: %s', dprint(line))
+                    self.inject_urc(f'\r\n{line}\r\n')
+        return ['\n'.join(l) for l in lines]
+
+    @property
+    def parsers(self) -> ParserRegistry:
+        """The response/URC parsers keyed by prefix."""
+        return self._parsers
+
+    def register_parser(self, parser: ResponseParser) -> None:
+        """Add or replace a response/URC parser e.g. for a vendor prefix."""
+        self._parsers.register(parser)
+
+    @property
+    def urc_dispatcher(self) -> UrcDispatcher:
+        """The dispatcher for subscribing to URCs by type or prefix."""
+        return self._urc_dispatcher
+
     def await_urc(self, urc: str = '', **kwargs) -> str:
         """Wait for an unsolicited result code or timeout.
         
+        Wakes as soon as a matching URC is queued. A URC already waiting in
+        the unsolicited queue is returned immediately. The matched URC is
+        consumed, other URCs remain available via `get_urc()`.
+        
         Args:
+            urc (str): The prefix of the URC to wait for (default any).
             **timeout (float): Maximum time in seconds to wait for URC.
+                 0 waits forever.
+            **urc_type (UrcType): Optional type of URC to wait for.
+            **waiter (UrcWaiter): Optional waiter registered prior to sending
+                a triggering command via `urc_dispatcher.add_waiter()`.
         
         Returns:
             The awaited URC or an empty string if it timed out.
         """
         timeout = float(kwargs.get('timeout', 0))
+        waiter: UrcWaiter = kwargs.get('waiter')
+        if not isinstance(waiter, UrcWaiter):
+            waiter = self._urc_dispatcher.add_waiter(urc,
+                                                     kwargs.get('urc_type'))
         _log.debug('Waiting for unsolicited %s (timeout: %s)', urc, timeout)
         wait_start = time.time()
-        while timeout == 0 or time.time() - wait_start < timeout:
-            candidate = self.get_urc()
-            if candidate and candidate.startswith(urc):
-                _log.debug('URC: %s received after %0.1f seconds',
-                            candidate, time.time() - wait_start)
-                return candidate
-            else:
-                time.sleep(0.25)
+        if self._replayer is not None:
+            self._replayer.feed_urcs(self)
+        queued = self._unsolicited_queue.take(
+            lambda u: waiter.matches(u, self._urc_dispatcher.classify(u))
+        )
+        if queued is not None:
+            if not self._urc_dispatcher.cancel_waiter(waiter):
+                self._unsolicited_queue.requeue(waiter.urc)
+            _log.debug('URC: %s already queued', queued)
+            return queued
+        candidate = waiter.wait(timeout or None)
+        if candidate:
+            _log.debug('URC: %s received after %0.3f seconds',
+                       candidate, time.time() - wait_start)
+            return candidate
+        if not self._urc_dispatcher.cancel_waiter(waiter):
+            return waiter.urc   # matched during cancellation
         _log.warning('Timed out waiting for URC (%s)', urc)
         return ''
     
@@ -301,6 +758,7 @@ class NbntnModem(AtClient, ABC):
         """Injects a URC string into the AtClient unsolicited queue.
         
         Used for custom events e.g. message send complete without native URC.
+        Injected URCs are dispatched to subscribers and waiters like any other.
         """
         if not urc.startswith('\r\n') or not urc.endswith('\r\n'):
             _log.warning('URC injection without header/trailer')
@@ -320,16 +778,40 @@ class NbntnModem(AtClient, ABC):
             return False
     
     # @abstractmethod
+    @timed
     def initialize_ntn(self, **kwargs) -> bool:
         """Execute the modem-specific initialization to communicate on NTN.
         
         Subclasses should call super() with ntn_init paramter.
         
+        With `desired`, the current configuration is queried and only the
+        settings that differ are sent instead of the sequence. The radio is
+        only cycled if the PDN context changes, so an already configured and
+        registered modem stays registered. Steps of `ntn_init` other than
+        GPIO, radio, registration reporting, context, PSM and eDRX commands
+        (e.g. band or vendor settings) are still sent, after the settings
+        and before the radio is enabled. See `init_report` for the steps
+        applied and skipped.
+        
         Args:
             **ntn_init (NtnInitSequence|dict): The module-specific
                 initialization sequence.
+            **desired (NtnDesiredState|bool): Apply a declarative desired
+                state, or True for the defaults using `apn` and `pdn_type`.
         """
-        ntn_init: NtnInitSequence = kwargs.get('ntn_init', default_init)
+        desired = kwargs.get('desired')
+        if desired:
+            return self._initialize_desired(desired, kwargs.get('ntn_init'))
+        ntn_init = self._ntn_init_sequence(kwargs.get('ntn_init', default_init))
+        self._cache.on_event('initialize_ntn')
+        step_success = self._drive_init(self._ntn_init_steps(ntn_init))
+        self._cache.on_event('initialize_ntn')
+        self._ntn_initialized = step_success
+        return self._ntn_initialized
+    
+    @staticmethod
+    def _ntn_init_sequence(ntn_init: 'NtnInitSequence|list') -> NtnInitSequence:
+        """Validate an initialization sequence or list of dictionaries."""
         if not isinstance(ntn_init, NtnInitSequence):
             try:
                 ntn_init = NtnInitSequence.from_list_of_dict(ntn_init)
@@ -337,19 +819,35 @@ class NbntnModem(AtClient, ABC):
                 raise ValueError('Invalid NtnInitSequence') from exc
         if len(ntn_init) == 0:
             raise ValueError('No initialization steps configured')
+        return ntn_init
+    
+    def _ntn_init_steps(self, ntn_init: NtnInitSequence) -> Generator:
+        """Run the steps of an initialization sequence as I/O requests.
+        
+        Shared by the blocking `initialize_ntn` and `AsyncNbntnModem`, which
+        execute each request and send back its result:
+        `('sleep', seconds)`, `('command', at_cmd, timeout)` returning the
+        `AtResponse`, `('expect', urc)` returning a waiter handle,
+        `('await', urc, handle, timeout)` returning the URC received and
+        `('cancel', handle)`. `AtTimeout` or `ValueError` raised by a command
+        is thrown into the generator.
+        
+        Returns:
+            True if every step succeeded.
+        """
         sequence_step = 0
         step_success = False
         for step in ntn_init:
             sequence_step += 1
             if step.delay:
-                time.sleep(step.delay)
+                yield ('sleep', step.delay)
             if step.gpio:
                 if step.cmd:
                     _log.debug('GPIO found. Skipping: %s', step.cmd)
                 if callable(step.gpio.callback):
                     _log.debug('NTN initialization triggering GPIO callback')
                     step.gpio.callback(step.gpio.duration)
-                    time.sleep(step.gpio.duration)
+                    yield ('sleep', step.gpio.duration)
                 continue
             invalid = all(x is None for x in (step.res, step.urc, step.timeout))
             if (step.cmd is None or invalid):
@@ -365,16 +863,17 @@ class NbntnModem(AtClient, ABC):
                 if not self._apn:
                     _log.warning('No APN configured - UE will not register')
                 at_cmd = at_cmd.replace('<apn>', self._apn)
+            timeout = step.timeout
+            if timeout and self._command_timeout:
+                timeout = max(timeout, self._command_timeout)
+                _log.debug('Waiting up to %0.1fs (%s)', timeout, step.why)
             step_success = False
+            waiter = None
+            if step.urc:
+                waiter = yield ('expect', step.urc.urc)
             while not step_success:
                 try:
-                    if step.timeout and self._command_timeout:
-                        if step.timeout < self._command_timeout:
-                            step.timeout = self._command_timeout
-                        _log.debug('Waiting up to %0.1fs (%s)',
-                                   step.timeout, step.why)
-                    res: AtResponse = self.send_command(at_cmd,
-                                                        timeout=step.timeout)
+                    res: AtResponse = yield ('command', at_cmd, timeout)
                     if step.res is None or res.result == step.res:
                         step_success = True
                     else:
@@ -394,30 +893,214 @@ class NbntnModem(AtClient, ABC):
                             if step.retry.delay:
                                 _log.warning('Init retry %s in %0.1f seconds',
                                              step.cmd, step.retry.delay)
-                                time.sleep(step.retry.delay)
+                                yield ('sleep', step.retry.delay)
                         attempt += 1
                     else:
                         break   # while not step_success loop
             if not step_success:
+                if waiter is not None:
+                    yield ('cancel', waiter)
                 break   # step loop
             if step.urc:
                 expected = step.urc.urc
-                urc_kwargs: dict = { 'prefixes': ['+', '%'] }
-                if step.urc.timeout:
-                    urc_kwargs['timeout'] = step.urc.timeout
-                urc = self.await_urc(expected, **urc_kwargs)
+                urc = yield ('await', expected, waiter, step.urc.timeout)
                 if urc != expected:
                     _log.error('Received %s but expected %s', urc, expected)
+                    step_success = False
                     break   # step loop
-                step_success = True
         if sequence_step != len(ntn_init):
             _log.error('NTN initialization failed at step %d (%s)',
                        sequence_step, ntn_init[sequence_step - 1].cmd)
         if step_success:
             _log.debug('NTN initialization complete')
-        self._ntn_initialized = step_success
-        return self._ntn_initialized
+        return step_success
     
+    def _drive_init(self, steps: Generator) -> Any:
+        """Execute the I/O requests of `_ntn_init_steps` by blocking calls."""
+        result: Any = None
+        error: Optional[Exception] = None
+        try:
+            while True:
+                if error is not None:
+                    request = steps.throw(error)
+                else:
+                    request = steps.send(result)
+                result = error = None
+                kind = request[0]
+                if kind == 'sleep':
+                    time.sleep(request[1])
+                elif kind == 'command':
+                    try:
+                        result = self.send_command(request[1],
+                                                   timeout=request[2])
+                    except (AtTimeout, ValueError) as exc:
+                        error = exc
+                elif kind == 'expect':
+                    result = self._urc_dispatcher.add_waiter(request[1])
+                elif kind == 'await':
+                    urc_kwargs: dict = { 'waiter': request[2] }
+                    if request[3]:
+                        urc_kwargs['timeout'] = request[3]
+                    result = self.await_urc(request[1], **urc_kwargs)
+                elif kind == 'cancel':
+                    self._urc_dispatcher.cancel_waiter(request[1])
+        except StopIteration as stop:
+            return stop.value
+    
+    @property
+    def init_report(self) -> Optional[NtnInitReport]:
+        """The steps applied and skipped by the last desired-state init."""
+        return self._init_report
+
+    def _initialize_desired(self,
+                            desired: 'NtnDesiredState|bool',
+                            ntn_init: 'NtnInitSequence|list|None' = None,
+                            ) -> bool:
+        """Apply the settings that differ from a desired state.
+        
+        Args:
+            desired (NtnDesiredState|bool): The desired state.
+            ntn_init (NtnInitSequence|list): Optional module-specific sequence
+                whose steps not covered by the desired state are applied.
+        """
+        if desired is True:
+            desired = NtnDesiredState()
+        if not isinstance(desired, NtnDesiredState):
+            raise ValueError('Invalid NtnDesiredState')
+        vendor_steps: Optional[NtnInitSequence] = None
+        if ntn_init is not None:
+            vendor_steps = NtnInitSequence(*[
+                step for step in self._ntn_init_sequence(ntn_init)
+                if not step.gpio and
+                self._response_prefix(step.cmd) not in _DESIRED_COMMANDS
+            ])
+        report = NtnInitReport()
+        self._init_report = report
+        self.refresh('regconfig', 'contexts', 'psm_config', 'edrx_config',
+                     'reginfo')
+        apn = self._apn if desired.apn is None else desired.apn
+        pdn_type = desired.pdn_type or self._pdn_type
+        config: list[tuple[str, bool, Callable[[], bool]]] = []
+        if desired.cereg_mode is not None:
+            mode = CeregMode(desired.cereg_mode)
+            config.append(('regconfig', self.get_regconfig() != mode,
+                           lambda: self.set_regconfig(mode)))
+        else:
+            mode = self.get_regconfig()
+        context_changed = False
+        if not apn:
+            _log.warning('No APN configured - context not changed')
+        else:
+            context = next((c for c in self.get_contexts()
+                            if c.id == desired.cid), None)
+            context_changed = (context is None or
+                               context.pdn_type != pdn_type or
+                               context.apn.lower() != apn.lower())
+            config.append(('context', context_changed,
+                           lambda: self.set_context(apn, pdn_type,
+                                                    cid=desired.cid)))
+        psm = desired.psm
+        if psm is not None:
+            current = self.get_psm_config()
+            if psm.mode == 1:
+                changed = current != psm
+            else:
+                changed = current.mode == 1
+            config.append(('psm', changed, lambda: self.set_psm_config(
+                psm if psm.mode == 1 else None)))
+        edrx = desired.edrx
+        if edrx is not None:
+            changed = self.get_edrx_config().cycle_bitmask != edrx.cycle_bitmask
+            config.append(('edrx', changed, lambda: self.set_edrx_config(
+                edrx if edrx.cycle_bitmask else None)))
+        registered = self.get_reginfo().state in (RegistrationState.HOME,
+                                                  RegistrationState.ROAMING)
+        res = self.send_command('AT+CFUN?', prefix='+CFUN:')
+        if res.ok and res.info:
+            radio_on = res.info.strip().split(',')[0] == '1'
+        else:
+            radio_on = registered
+        cycle = context_changed and radio_on
+        steps = [('radio off', cycle,
+                  lambda: self.enable_radio(False, timeout=15))]
+        steps.extend(config)
+        if vendor_steps is not None:
+            steps.append(('ntn_init', len(vendor_steps) > 0,
+                          lambda: self._drive_init(
+                              self._ntn_init_steps(vendor_steps))))
+        steps.append(('radio on', cycle or not radio_on,
+                      lambda: self._enable_registered(
+                          desired.registration_timeout,
+                          mode != CeregMode.NONE)))
+        for name, needed, apply in steps:
+            if not needed:
+                report.skipped.append(name)
+                continue
+            try:
+                success = apply()
+            except (AtTimeout, ValueError) as exc:
+                _log.error('Failed to apply %s: %s', name, exc)
+                success = False
+            if not success:
+                report.failed = name
+                break
+            report.applied.append(name)
+        report.radio_cycled = cycle and 'radio on' in report.applied
+        if report.failed:
+            _log.error('NTN initialization failed at %s', report.failed)
+        else:
+            _log.debug('NTN initialization applied %s skipped %s',
+                       report.applied, report.skipped)
+        self._cache.on_event('initialize_ntn')
+        self._ntn_initialized = report.success
+        return self._ntn_initialized
+
+    def _enable_registered(self,
+                           timeout: Optional[float],
+                           urc: bool = True) -> bool:
+        """Enable the radio and wait until registered.
+        
+        Args:
+            timeout (float|None): Seconds to wait for registration, or None
+                to return once the radio is enabled.
+            urc (bool): Wait for `+CEREG` URCs, polling the registration if
+                none arrive within a few seconds, else poll only.
+        """
+        waiter = None
+        if timeout and urc:
+            # discard reports from before the radio was enabled
+            while self._unsolicited_queue.take(
+                lambda u: u.startswith('+CEREG:')) is not None:
+                pass
+            waiter = self._urc_dispatcher.add_waiter('+CEREG:')
+        if not self.enable_radio(True, timeout=15):
+            if waiter is not None:
+                self._urc_dispatcher.cancel_waiter(waiter)
+            return False
+        if not timeout:
+            return True
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if urc:
+                report = self.await_urc('+CEREG:', waiter=waiter,
+                                        timeout=min(5, remaining))
+                waiter = None
+                if report:
+                    if self.get_reginfo(report).is_registered():
+                        return True
+                    continue
+            # no report (e.g. held by the listener during a command) so poll
+            self.refresh('reginfo')
+            if self.get_reginfo().is_registered():
+                return True
+            if not urc:
+                time.sleep(min(1, max(0, deadline - time.monotonic())))
+        _log.error('Not registered within %0.1f seconds', timeout)
+        return False
+
     def get_info(self, timeout: float = 3) -> str:
         """Get the detailed response of the AT information command."""
         res: AtResponse = self.send_command('ATI', timeout)
@@ -425,6 +1108,7 @@ class NbntnModem(AtClient, ABC):
             return res.info
         return ''
 
+    @timed
     def enable_radio(self, enable: bool = True, **kwargs) -> bool:
         """Enable or disable the radio.
         
@@ -436,6 +1120,7 @@ class NbntnModem(AtClient, ABC):
         """
         cmd = f'AT+CFUN={int(enable)}'
         res = self.send_command(cmd, **kwargs)
+        self._cache.on_event('enable_radio')
         return res.ok
 
     def use_ignss(self, enable: bool = True, **kwargs) -> bool:
@@ -454,6 +1139,7 @@ class NbntnModem(AtClient, ABC):
         """Set the Radio Access Technology to use."""
         raise NotImplementedError('Requires module-specific subclass')
 
+    @timed
     def get_location(self, **kwargs) -> 'NtnLocation|None':
         """Get the location currently in use by the modem."""
         raise NotImplementedError('Requires module-specific subclass')
@@ -462,6 +1148,82 @@ class NbntnModem(AtClient, ABC):
         """Set the modem location to use for registration/TAU."""
         raise NotImplementedError('Requires module-specific subclass')
     
+    def _update_urc_state(self, urc: str, urc_type: UrcType) -> None:
+        """Cache state reported by a standard URC for reuse by queries."""
+        if urc_type == UrcType.REGISTRATION and urc.startswith('+CEREG:'):
+            self._cache.put('reginfo', self._parsers.parse(urc, '+CEREG'))
+        elif urc_type == UrcType.RRC_STATE and urc.startswith('+CSCON:'):
+            rrc_state = self._parsers.parse(urc, '+CSCON').get('rrc_state')
+            if rrc_state is not None:
+                self._cache.put('rrc_state', rrc_state)
+
+    @timed
+    def get_snapshot(self, **kwargs) -> ModemSnapshot:
+        """Get a status snapshot using the fewest AT commands.
+        
+        Fresh cached values, including state reported by URCs, are reused.
+        Remaining standard queries are sent using `send_batch()` while
+        attributes whose getter is overridden by a subclass use the getter.
+        
+        Args:
+            **max_age (float): Optional maximum seconds of reused values.
+        
+        Returns:
+            `ModemSnapshot` including the number of commands and time taken.
+        """
+        max_age = kwargs.get('max_age')
+        if max_age is not None and (not isinstance(max_age, (int, float)) or
+                                    max_age < 0):
+            raise ValueError('Invalid max_age')
+        start = time.perf_counter()
+        start_count = self._command_count
+        values: dict[str, Any] = {}
+        for key in self._snapshot_queries:
+            value, age = self._cache.peek(key)
+            if value is not None and (max_age is None or age <= max_age):
+                values[key] = value
+        reused = tuple(values)
+        batch: list[str] = []
+        for key, (getter, _) in self._snapshot_queries.items():
+            if key in values:
+                continue
+            if getattr(type(self), getter) is getattr(NbntnModem, getter):
+                batch.append(key)
+            else:
+                values[key] = getattr(self, getter)
+                if callable(values[key]):
+                    values[key] = values[key]()
+        commands = [self._snapshot_queries[k][1] for k in batch]
+        if 'ip_address' in batch:
+            commands.append('AT+CGDCONT?')   # IP address fallback
+        responses = dict(zip(commands, self.send_batch(commands)))
+        for key in batch:
+            res = responses[self._snapshot_queries[key][1]]
+            info = res.info if res.ok else ''
+            if key == 'ip_address':
+                ip_res = responses['AT+CGDCONT?']
+                value = self._parse_ip_address(info, ip_res.info if ip_res.ok else '')
+            elif not info:
+                continue
+            elif key == 'reginfo':
+                value = self._parsers.parse(info, '+CEREG', query=True)
+            elif key == 'rrc_state':
+                value = self._parsers.parse(info, '+CSCON', query=True).get(
+                    'rrc_state', RrcState.UNKNOWN)
+            else:
+                prefix = self._response_prefix(self._snapshot_queries[key][1])
+                value = self._parsers.parse(info, prefix)
+            values[key] = value
+            self._cache.put(key, value)
+        return ModemSnapshot(
+            timestamp=time.time(),
+            commands=self._command_count - start_count,
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 3),
+            reused=reused,
+            **values,
+        )
+
+    @cached('reginfo')
     def get_reginfo(self, urc: str = '') -> RegInfo:
         """Get the parameters of the registration state of the modem.
         
@@ -473,40 +1235,22 @@ class NbntnModem(AtClient, ABC):
         Returns:
             RegInfo registration metadata.
         """
-        info = RegInfo()
         queried = False
         if not urc:
             queried = True
             res = self.send_command('AT+CEREG?')
             if res.ok and res.info:
                 urc = res.info
-        if urc:
-            cereg_parts = urc.replace('+CEREG:', '').strip().split(',')
-            if (queried):
-                config = CeregMode(int(cereg_parts.pop(0)))
-                _log.debug('Registration reporting mode: %s', config)
-            for i, param in enumerate(cereg_parts):
-                param = param.replace('"', '')
-                if not param:
-                    continue
-                if i == 0:
-                    info.state = RegistrationState(int(param))
-                    _log.debug('Registered: %s', info.state.name)
-                elif i == 1 and param:
-                    info.tac = param
-                elif i == 2 and param:
-                    info.ci = param
-                # 3: Access technology of registered network
-                elif i == 4 and param:
-                    info.cause_type = int(param)
-                elif i == 5 and param:
-                    info.reject_cause = int(param)
-                elif i == 6 and param:
-                    info.act_t3324_bitmask = param
-                elif i == 7 and param:
-                    info.tau_t3412_bitmask = param
+        if not urc:
+            return RegInfo()
+        info: RegInfo = self._parsers.parse(urc, '+CEREG', query=queried)
+        if queried:
+            config = urc.replace('+CEREG:', '').strip().split(',', 1)[0]
+            _log.debug('Registration reporting mode: %s', CeregMode(int(config)))
+        _log.debug('Registered: %s', info.state.name)
         return info
     
+    @cached('regconfig')
     def get_regconfig(self) -> CeregMode:
         """Get the registration URC reporting configuration."""
         res = self.send_command('AT+CEREG?', prefix='+CEREG:')
@@ -515,18 +1259,22 @@ class NbntnModem(AtClient, ABC):
             return CeregMode(int(config))
         return CeregMode.NONE
     
+    @timed
     def set_regconfig(self, config: CeregMode|int) -> bool:
         """Set the registration URC verbosity."""
         if not isinstance(config, CeregMode):
             config = CeregMode(config)
         res = self.send_command(f'AT+CEREG={config.value}')
+        self._cache.on_event('set_regconfig')
         return res.ok
     
+    @cached('rrc_state')
     def get_rrc_state(self) -> RrcState:
         """Get the perceived radio resource control connection status."""
         res = self.send_command('AT+CSCON?', prefix='+CSCON:')
         if res.ok and res.info:
-            return RrcState(int(res.info.split(',')[1]))
+            parsed = self._parsers.parse(res.info, '+CSCON', query=True)
+            return parsed.get('rrc_state', RrcState.UNKNOWN)
         return RrcState.UNKNOWN
 
     def enable_rrc_urc(self, enable: bool = True) -> bool:
@@ -535,93 +1283,36 @@ class NbntnModem(AtClient, ABC):
         return res.ok
     
     # @abstractmethod
+    @cached('siginfo')
     def get_siginfo(self) -> SigInfo:
         """Get the signal information from the modem."""
-        info = SigInfo(255, 255, 255, 255)
         res = self.send_command('AT+CESQ', prefix='+CESQ:')
         if res.ok and res.info:
-            sig_parts = res.info.split(',')
-            for i, param in enumerate(sig_parts):
-                param = param.replace('"', '')
-                if not param:
-                    continue
-                if i == 0:   # <rxlev> offset -110 dBm
-                    if param != '99':
-                        info.rssi = int(float(param) - 110)
-                if i == 1:   # <ber> RxQual values 3GPP 45.008
-                    if int(param) <= 7:
-                        rx_qual_map = {
-                            0: 0.14,
-                            1: 0.28,
-                            2: 0.57,
-                            3: 1.13,
-                            4: 2.26,
-                            5: 4.53,
-                            6: 9.05,
-                            7: 18.1,
-                        }
-                        info.ber = rx_qual_map[int(param)]
-                # 2: <rscp> offset -120 dBm 3GPP 25.133/25.123
-                # 3: <ecno> offset -24 dBm increment 0.5 3GPP 25.133
-                if i == 4:   # <rsrq> offset -19.5 dB increment 0.5 3GPP 36.133
-                    if param != '255':
-                        info.rsrq = int(float(param) * 0.5 - 19.5)
-                if i == 5:   # <rsrp> offset -140 dBm 3GPP 36.133
-                    if param != '255':
-                        info.rsrp = int(float(param) - 140)
-        return info
+            return self._parsers.parse(res.info, '+CESQ')
+        return SigInfo(255, 255, 255, 255)
     
     def get_signal_quality(self, sinr: 'int|float|None' = None) -> SignalQuality:
         """Get a qualitative indicator of 0..5 of satellite signal."""
+        from .signalhistory import signal_quality
         if not isinstance(sinr, (int, float)):
             sinr = self.get_siginfo().sinr
-        if sinr >= SignalLevel.INVALID.value:
-            return SignalQuality.WARNING
-        if sinr >= SignalLevel.BARS_5.value:
-            return SignalQuality.STRONG
-        if sinr >= SignalLevel.BARS_4.value:
-            return SignalQuality.GOOD
-        if sinr >= SignalLevel.BARS_3.value:
-            return SignalQuality.MID
-        if sinr >= SignalLevel.BARS_2.value:
-            return SignalQuality.LOW
-        if sinr >= SignalLevel.BARS_1.value:
-            return SignalQuality.WEAK
-        return SignalQuality.NONE
+        return signal_quality(sinr)
 
+    @cached('contexts')
     def get_contexts(self) -> list[PdnContext]:
         """Get the list of configured PDP contexts in the modem."""
         contexts: list[PdnContext] = []
-        res = self.send_command('AT+CGDCONT?', prefix='+CGDCONT:')
+        res, res_act = self.send_batch(['AT+CGDCONT?', 'AT+CGACT?'])
         if res.ok and res.info:
-            context_strs = res.info.split('\n')
-            for s in context_strs:
-                c = PdnContext()
-                for i, param in enumerate(s.split(',')):
-                    param = param.replace('"', '')
-                    if not param:
-                        continue
-                    if i == 0:
-                        c.id = int(param)
-                    elif i == 1:
-                        c.pdn_type = PdnType[param.upper().replace('-', '_')]
-                    elif i == 2:
-                        c.apn = param
-                    elif i == 3:
-                        c.ip = param
-                contexts.append(c)
-        res = self.send_command('AT+CGACT?', prefix='+CGACT:')
-        if res.ok and res.info:
-            context_states = res.info.split('\n')
-            for context_state in context_states:
-                cid, state = context_state.split(',')
-                cid = int(cid)
-                active = state == '1'
+            contexts = self._parsers.parse_lines(res.info, '+CGDCONT')
+        if res_act.ok and res_act.info:
+            for state in self._parsers.parse_lines(res_act.info, '+CGACT'):
                 for c in contexts:
-                    if c.id == cid:
-                        c.active = active
+                    if c.id == state.id:
+                        c.active = state.active
         return contexts
     
+    @timed
     def set_context(self, apn: str, pdn_type: PdnType, **kwargs) -> bool:
         """(Re)Define a PDN/PDP context.
         
@@ -631,19 +1322,15 @@ class NbntnModem(AtClient, ABC):
             **cid (int): The context ID.
             **reconnect (bool): Optional restart modem after change.
         """
-        if not isinstance(apn, str) or not apn:
-            raise ValueError('Missing APN value')
-        if not isinstance(pdn_type, PdnType):
-            raise ValueError('Invalid PDP type')
         cid = kwargs.get('cid', 1)
+        cmd = self._context_command(apn, pdn_type, cid)
         reconnect = kwargs.get('reconnect')
         result = False
         if reconnect is True:
             if not self.send_command('AT+CFUN=0', timeout=30).ok:
                 _log.error('Disable modem failed')
-        pdp_name = pdn_type.name.replace('_', '-')
-        cmd = f'AT+CGDCONT={cid},"{pdp_name}","{apn}"'
         result = self.send_command(cmd, timeout=10).ok
+        self._cache.on_event('set_context')
         if reconnect is True:
             if not self.send_command('AT+CFUN=1', timeout=30).ok:
                 _log.error('Enable modem failed')
@@ -651,28 +1338,29 @@ class NbntnModem(AtClient, ABC):
                 self._pdn_type = pdn_type
         return result
     
+    @staticmethod
+    def _context_command(apn: str, pdn_type: PdnType, cid: int = 1) -> str:
+        """Get the 3GPP `+CGDCONT` command defining a PDN context."""
+        if not isinstance(apn, str) or not apn:
+            raise ValueError('Missing APN value')
+        if not isinstance(pdn_type, PdnType):
+            raise ValueError('Invalid PDP type')
+        pdp_name = pdn_type.name.replace('_', '-')
+        return f'AT+CGDCONT={cid},"{pdp_name}","{apn}"'
+    
+    @cached('psm_config')
     def get_psm_config(self) -> PsmConfig:
         """Get the Power Save Mode settings.
         
         Returns the configured/requested settings, which may not be granted.
         For granted/actual, use `RegInfo.get_psm_granted()`
         """
-        config = PsmConfig()
         res = self.send_command('AT+CPSMS?', prefix='+CPSMS:')
         if res.ok and res.info:
-            psm_parts = res.info.split(',')
-            for i, param in enumerate(psm_parts):
-                param = param.replace('"', '')
-                if not param:
-                    continue
-                if i == 0:
-                    config.mode = int(param)
-                if i == 3:
-                    config.tau_t3412_bitmask = param
-                elif i == 4:
-                    config.act_t3324_bitmask = param
-        return config
+            return self._parsers.parse(res.info, '+CPSMS')
+        return PsmConfig()
     
+    @timed
     def set_psm_config(self, psm: PsmConfig|None = None) -> bool:
         """Configure requested Power Saving Mode settings.
         
@@ -682,70 +1370,70 @@ class NbntnModem(AtClient, ABC):
         Args:
             psm (PsmConfig): The requested PSM configuration.
         """
+        res = self.send_command(self._psm_command(psm))
+        self._cache.on_event('set_psm_config')
+        return res.ok
+
+    @staticmethod
+    def _psm_command(psm: Optional[PsmConfig]) -> str:
+        """Get the 3GPP `+CPSMS` command requesting PSM settings."""
         if psm and not isinstance(psm, PsmConfig):
             raise ValueError('Invalid PSM configuration')
         mode = 0 if psm is None else psm.mode
         cmd = f'AT+CPSMS={mode}'
         if mode > 0 and isinstance(psm, PsmConfig):
-            cmd += f',"{psm.tau_t3412_bitmask}","{psm.act_t3324_bitmask}"'
-        res = self.send_command(cmd)
-        return res.ok
+            cmd += f',,,"{psm.tau_t3412_bitmask}","{psm.act_t3324_bitmask}"'
+        return cmd
 
     def enable_psm_urc(self, enable: bool = True, **kwargs) -> bool:
         """Enable/disable reports of entry or exit of power save mode."""
         raise NotImplementedError('Requires module-specific subclass')
         
+    @cached('edrx_config')
     def get_edrx_config(self) -> EdrxConfig:
         """Get the Extended Discontinuous Receive (eDRX) mode settings.
         
         Returns the configured/requested values, which may not be granted.
         To determine granted/actual values use `get_edrx_dynamic()`
         """
-        config = EdrxConfig()
         res = self.send_command('AT+CEDRXS?', prefix='+CEDRXS:')
         if res.ok and res.info:
-            edrx_parts = res.info.split(',')
-            for i, param in enumerate(edrx_parts):
-                param = param.replace('"', '')
-                if not param:
-                    continue
-                if i == 1:
-                    config.cycle_bitmask = param
-                # TODO: additional?
-        return config
+            return self._parsers.parse(res.info, '+CEDRXS')
+        return EdrxConfig()
     
+    @timed
     def set_edrx_config(self, edrx: 'EdrxConfig|None' = None) -> bool:
         """Configure requested Extended Discontinuous Receive (eDRX) settings.
         
         The requested values may not be granted by the network.
+        The 3GPP command requests only the cycle, so `ptw_bitmask` is ignored
+        unless a module subclass supporting it sets `_edrx_ptw`.
         
         Args:
             edrx (EdrxConfig): The requested eDRX configuration.
         """
+        res = self.send_command(self._edrx_command(edrx))
+        self._cache.on_event('set_edrx_config')
+        return res.ok
+
+    @staticmethod
+    def _edrx_command(edrx: Optional[EdrxConfig]) -> str:
+        """Get the 3GPP `+CEDRXS` command requesting eDRX settings."""
         if edrx and not isinstance(edrx, EdrxConfig):
             raise ValueError('Invalid eDRX configuration')
         mode = 0 if edrx is None else 2
         cmd = f'AT+CEDRXS={mode}'
         if mode > 0 and isinstance(edrx, EdrxConfig):
             cmd += f',5,"{edrx.cycle_bitmask}"'
-        res = self.send_command(cmd)
-        return res.ok
+        return cmd
 
+    @cached('edrx_dynamic')
     def get_edrx_dynamic(self) -> EdrxConfig:
         """Get the eDRX parameters granted by the network."""
-        dynamic = EdrxConfig()
         res = self.send_command('AT+CEDRXRDP', prefix='+CEDRXRDP:')
         if res.ok and res.info:
-            edrx_parts = res.info.split(',')
-            for i, param in enumerate(edrx_parts):
-                param = param.replace('"', '')
-                if not param:
-                    continue
-                if i == 2:
-                    dynamic.cycle_bitmask = param
-                elif i == 3:
-                    dynamic.ptw_bitmask = param
-        return dynamic
+            return self._parsers.parse(res.info, '+CEDRXRDP')
+        return EdrxConfig()
     
     def get_sleep_mode(self) -> Any:
         """Get the modem hardware sleep settings."""
@@ -801,6 +1489,9 @@ class NbntnModem(AtClient, ABC):
         return res.ok
 
     # @abstractmethod
+    @timed
+    @encoded
+    @fragmented(NBNTN_MAX_MSG_SIZE)
     def send_message_nidd(self, payload: bytes, **kwargs) -> MoMessage|None:
         """Send a message using Non-IP Data Delivery.
         
@@ -817,11 +1508,19 @@ class NbntnModem(AtClient, ABC):
             MoMessage object with optional metadata, or None if it could not
                 be sent.
         """
-        cid = kwargs.get('cid', 1)
         res = self.send_command('AT+CSODCP?')
         if not res.ok:
             raise NotImplementedError('Requires module-specific subclass')
         _log.debug('Sending NIDD message without confirmation')
+        res = self.send_command(self._nidd_command(payload, **kwargs))
+        if res.ok:
+            return MoMessage(payload, PdnType.NON_IP)
+        return None
+    
+    @staticmethod
+    def _nidd_command(payload: bytes, **kwargs) -> str:
+        """Get the 3GPP `+CSODCP` command sending a NIDD payload."""
+        cid = kwargs.get('cid', 1)
         cmd = f'AT+CSODCP={cid},{len(payload)},"{payload.hex()}"'
         rai = kwargs.get('rai')
         data_type = kwargs.get('data_type')
@@ -831,12 +1530,12 @@ class NbntnModem(AtClient, ABC):
             if rai is None:
                 cmd += ','
             cmd += f',{data_type}'
-        res = self.send_command(cmd)
-        if res.ok:
-            return MoMessage(payload, PdnType.NON_IP)
-        return None
+        return cmd
     
     # @abstractmethod
+    @timed
+    @decoded
+    @reassembled
     def receive_message_nidd(self, urc: str = '', **kwargs) -> MtMessage|bytes|None:
         """Parses a NIDD URC string to derive the MT/downlink bytes sent.
         
@@ -853,14 +1552,7 @@ class NbntnModem(AtClient, ABC):
             raise NotImplementedError('Requires module-specific subclass')
         payload = None
         if isinstance(urc, str) and urc.startswith('+CRTDCP'):
-            urc = urc.replace('+CRTDCP:', '').strip()
-            params = urc.split(',')
-            for i, param in enumerate(params):
-                param = param.replace('"', '')
-                if not param:
-                    continue
-                if i == 2:
-                    payload = bytes.fromhex(param)
+            payload = self._parsers.parse(urc, '+CRTDCP').payload or None
         else:
             _log.error('Invalid URC: %s', urc)
         if not isinstance(payload, bytes) or kwargs.get('raw') is True:
@@ -868,6 +1560,7 @@ class NbntnModem(AtClient, ABC):
         return MtMessage(payload, transport=PdnType.NON_IP)
     
     # @abstractmethod
+    @timed
     def ping_icmp(self, **kwargs) -> int:
         """Send a ICMP ping to a target address.
         
@@ -889,6 +1582,7 @@ class NbntnModem(AtClient, ABC):
         raise NotImplementedError('Must implement in subclass')
     
     # @abstractmethod
+    @timed
     def udp_socket_open(self, **kwargs) -> bool:
         """Open a UDP socket.
         
@@ -911,6 +1605,9 @@ class NbntnModem(AtClient, ABC):
         raise NotImplementedError('Requires module-specific subclass')
     
     # @abstractmethod
+    @timed
+    @encoded
+    @fragmented(UDP_MAX_PAYLOAD)
     def send_message_udp(self, payload: bytes, **kwargs) -> MoMessage|None:
         """Send a message using UDP transport.
 
@@ -934,6 +1631,9 @@ class NbntnModem(AtClient, ABC):
         raise NotImplementedError('Requires module-specific subclass')
     
     # @abstractmethod
+    @timed
+    @decoded
+    @reassembled
     def receive_message_udp(self, urc: str = '', **kwargs) -> MtMessage|bytes|None:
         """Get MT/downlink data received over UDP.
         
@@ -949,6 +1649,7 @@ class NbntnModem(AtClient, ABC):
         """
         raise NotImplementedError('Requires module-specific subclass')
     
+    @timed
     def ntp_sync(self, server: str, **kwargs) -> bool:
         """Synchronize modem time to NTP"""
         raise NotImplementedError('Requires module-specific subclass')
@@ -996,8 +1697,8 @@ class NbntnModem(AtClient, ABC):
             if cmd in debug_commands:
                 debug_commands.remove(cmd)
         debug_commands += add_commands
-        for cmd in debug_commands:
-            res = self.send_command(cmd, timeout=15)
+        responses = self.send_batch(debug_commands, timeout=15)
+        for cmd, res in zip(debug_commands, responses):
             if res.ok:
                 _log.info('%s => %s', cmd, dprint(res.info or 'OK'))
             else:
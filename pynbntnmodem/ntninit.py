@@ -6,12 +6,15 @@ as a list of objects/dictionaries.
 """
 
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Callable, Iterable, List
 
 from pyatcommand import AtErrorCode
 from pyatcommand.common import AT_TIMEOUT, AT_URC_TIMEOUT
 
+from .constants import PdnType
+from .structures import EdrxConfig, PsmConfig
+
 
 @dataclass
 class NtnInitRetry:
@@ -208,6 +211,74 @@ class NtnInitSequence(List[NtnInitCommand]):
                 
 
 
+@dataclass
+class NtnDesiredState:
+    """Declarative configuration applied by `initialize_ntn(desired=...)`.
+    
+    Only settings that differ from the current modem configuration are sent,
+    and the radio is only cycled if the PDN context must change.
+    
+    Attributes:
+        apn (str|None): The context APN, defaults to the modem `apn`.
+        pdn_type (PdnType|None): The context PDN type, defaults to the modem
+            `pdn_type`.
+        cid (int): The context ID (default 1).
+        cereg_mode (int|None): The registration URC mode (default 5), or None
+            to leave unchanged.
+        psm (PsmConfig|None): The requested PSM settings, or None to leave
+            unchanged. Use `PsmConfig()` to disable.
+        edrx (EdrxConfig|None): The requested eDRX settings, or None to leave
+            unchanged. Use `EdrxConfig()` to disable.
+        registration_timeout (float|None): Seconds to wait for registration
+            after enabling the radio (default 120), or None to not wait.
+    """
+    apn: Optional[str] = None
+    pdn_type: Optional[PdnType] = None
+    cid: int = 1
+    cereg_mode: Optional[int] = 5
+    psm: Optional[PsmConfig] = None
+    edrx: Optional[EdrxConfig] = None
+    registration_timeout: Optional[float] = 120
+    
+    def __post_init__(self):
+        if self.apn is not None and not isinstance(self.apn, str):
+            raise ValueError('Invalid APN')
+        if self.pdn_type is not None and not isinstance(self.pdn_type, PdnType):
+            raise ValueError('Invalid PdnType')
+        if not isinstance(self.cid, int) or self.cid < 0:
+            raise ValueError('Invalid cid')
+        if self.cereg_mode is not None and self.cereg_mode not in range(0, 6):
+            raise ValueError('Invalid cereg_mode must be 0..5')
+        if self.psm is not None and not isinstance(self.psm, PsmConfig):
+            raise ValueError('Invalid PsmConfig')
+        if self.edrx is not None and not isinstance(self.edrx, EdrxConfig):
+            raise ValueError('Invalid EdrxConfig')
+        if self.registration_timeout is not None:
+            if (not isinstance(self.registration_timeout, (int, float)) or
+                self.registration_timeout <= 0):
+                raise ValueError('Invalid registration_timeout must be > 0')
+
+
+@dataclass
+class NtnInitReport:
+    """The outcome of a desired-state `initialize_ntn`.
+    
+    Attributes:
+        applied (list[str]): Steps sent because the setting differed.
+        skipped (list[str]): Steps not sent because already in effect.
+        failed (str): The step that failed, if any.
+        radio_cycled (bool): True if the radio was disabled and re-enabled.
+    """
+    applied: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    failed: str = ''
+    radio_cycled: bool = False
+    
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+
 default_init = NtnInitSequence(
     NtnInitCommand(why='disable radio during configuration',
                    cmd='AT+CFUN=0',
@@ -0,0 +1,279 @@
+"""Table-driven parsers for 3GPP AT command responses and URCs.
+
+Each `ResponseParser` declares the comma-separated parameter positions of a
+response prefix such as `+CEREG` and the structure attribute each maps to.
+The declaration is compiled once into an index table so that parsing a line is
+a single split and one pass over the mapped fields.
+
+A `ParserRegistry` keys parsers by prefix. `NbntnModem` uses a copy of
+`default_parsers` so that subclasses may `register` vendor-specific prefixes
+without affecting other modems.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from .constants import PdnType, RegistrationState, RrcState
+from .structures import (
+    EdrxConfig,
+    MtMessage,
+    PdnContext,
+    PsmConfig,
+    RegInfo,
+    SigInfo,
+)
+
+__all__ = ['ParamField', 'ParserRegistry', 'ResponseParser', 'default_parsers']
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ParamField:
+    """Maps a response parameter position to a structure attribute.
+
+    Attributes:
+        index (int): The position in the comma-separated parameters.
+        name (str): The attribute (or `dict` key) of the parsed structure.
+        convert (Callable[[str], Any]): Converts the unquoted parameter.
+        ignore (tuple[str]): Sentinel values that leave the default unchanged
+            e.g. `255` meaning unknown.
+    """
+    index: int
+    name: str
+    convert: Callable[[str], Any] = str
+    ignore: tuple[str, ...] = ()
+
+
+class ResponseParser:
+    """A precompiled parser for a single response/URC prefix.
+
+    Each line produces one structure created by `factory`. Empty parameters
+    and `ignore` values leave the structure default unchanged.
+    """
+    def __init__(self,
+                 prefix: str,
+                 factory: Callable[[], Any],
+                 fields: Iterable[ParamField],
+                 query_offset: int = 0) -> None:
+        """Create the parser.
+
+        Args:
+            prefix (str): The response prefix e.g. `+CEREG` (colon optional).
+            factory (Callable[[], Any]): Creates the default structure to
+                populate, e.g. a dataclass or `dict`.
+            fields (Iterable[ParamField]): The parameter map.
+            query_offset (int): The number of leading parameters present in a
+                query response but not the URC e.g. `<n>` of `+CEREG`.
+        """
+        if not isinstance(prefix, str) or not prefix.startswith(('+', '%', '#', '$', '^')):
+            raise ValueError('Invalid prefix')
+        if not callable(factory):
+            raise ValueError('Invalid factory')
+        self.prefix = prefix.rstrip(':')
+        self.factory = factory
+        self.fields: tuple[ParamField, ...] = tuple(sorted(fields, key=lambda f: f.index))
+        if not self.fields or any(f.index < 0 for f in self.fields):
+            raise ValueError('Invalid fields')
+        if not isinstance(query_offset, int) or query_offset < 0:
+            raise ValueError('Invalid query_offset')
+        self.query_offset = query_offset
+        self._header = f'{self.prefix}:'
+        self._table = tuple((f.index, f.name, f.convert, frozenset(f.ignore))
+                            for f in self.fields)
+        self._max_split = self.fields[-1].index + 1
+
+    def __repr__(self) -> str:
+        return f'ResponseParser({self.prefix})'
+
+    def parse(self, line: str, query: bool = False) -> Any:
+        """Parse a single response line or URC.
+
+        Args:
+            line (str): The line with or without the prefix.
+            query (bool): True if the line is a query response, to skip the
+                `query_offset` leading parameters.
+
+        Returns:
+            The populated structure.
+        """
+        target = self.factory()
+        line = line.strip()
+        if line.startswith(self._header):
+            line = line[len(self._header):]
+        offset = self.query_offset if query else 0
+        params = line.split(',', self._max_split + offset)
+        count = len(params)
+        is_dict = isinstance(target, dict)
+        for index, name, convert, ignore in self._table:
+            index += offset
+            if index >= count:
+                break
+            param = params[index].strip()
+            if param[:1] == '"':
+                param = param.strip('"')
+            if not param or param in ignore:
+                continue
+            try:
+                value = convert(param)
+            except (ValueError, KeyError, IndexError) as exc:
+                _log.warning('Unable to parse %s %s=%s: %s',
+                             self.prefix, name, param, exc)
+                continue
+            if is_dict:
+                target[name] = value
+            else:
+                setattr(target, name, value)
+        return target
+
+    def parse_lines(self, text: str, query: bool = False) -> list[Any]:
+        """Parse a multi-line response into a list of structures."""
+        return [self.parse(line, query) for line in text.split('\n')
+                if line.strip()]
+
+
+class ParserRegistry:
+    """A set of `ResponseParser` keyed by prefix."""
+    def __init__(self, parsers: Optional[Iterable[ResponseParser]] = None) -> None:
+        self._parsers: dict[str, ResponseParser] = {}
+        for parser in parsers or []:
+            self.register(parser)
+
+    def __contains__(self, prefix: str) -> bool:
+        return prefix.rstrip(':') in self._parsers
+
+    def __iter__(self) -> Iterator[ResponseParser]:
+        return iter(self._parsers.values())
+
+    def __len__(self) -> int:
+        return len(self._parsers)
+
+    @property
+    def prefixes(self) -> list[str]:
+        return list(self._parsers)
+
+    def copy(self) -> 'ParserRegistry':
+        """Get a copy that can be extended independently."""
+        return ParserRegistry(self._parsers.values())
+
+    def register(self, parser: ResponseParser) -> None:
+        """Add or replace the parser for its prefix."""
+        if not isinstance(parser, ResponseParser):
+            raise ValueError('Invalid ResponseParser')
+        self._parsers[parser.prefix] = parser
+
+    def unregister(self, prefix: str) -> bool:
+        """Remove a parser. Returns False if the prefix was not registered."""
+        return self._parsers.pop(prefix.rstrip(':'), None) is not None
+
+    def get(self, prefix: str) -> Optional[ResponseParser]:
+        """Get the parser for a prefix, or None."""
+        return self._parsers.get(prefix.rstrip(':'))
+
+    def parse(self, line: str, prefix: str = '', query: bool = False) -> Any:
+        """Parse a line using the parser for its prefix.
+
+        Args:
+            line (str): The response line or URC.
+            prefix (str): The prefix if not present in the line e.g. stripped
+                by `send_command`.
+            query (bool): True if the line is a query response.
+
+        Returns:
+            The parsed structure, or None if no parser is registered.
+        """
+        if not prefix:
+            prefix = line.strip().split(':', 1)[0]
+        parser = self.get(prefix)
+        if parser is None:
+            return None
+        return parser.parse(line, query)
+
+    def parse_lines(self, text: str, prefix: str, query: bool = False) -> list[Any]:
+        """Parse a multi-line response using the parser for `prefix`.
+
+        Raises:
+            `ValueError` if no parser is registered for the prefix.
+        """
+        parser = self.get(prefix)
+        if parser is None:
+            raise ValueError(f'No parser registered for {prefix}')
+        return parser.parse_lines(text, query)
+
+    def parse_stream(self, lines: Iterable[str]) -> Iterator[tuple[str, Any]]:
+        """Parse a stream of URCs e.g. a recorded log, skipping unknowns.
+
+        Yields:
+            Tuples of (prefix, structure).
+        """
+        parsers = self._parsers
+        for line in lines:
+            line = line.strip()
+            prefix = line.split(':', 1)[0]
+            parser = parsers.get(prefix)
+            if parser is not None:
+                yield prefix, parser.parse(line)
+
+
+_RX_QUAL = {   # <ber> RxQual values 3GPP 45.008
+    0: 0.14, 1: 0.28, 2: 0.57, 3: 1.13, 4: 2.26, 5: 4.53, 6: 9.05, 7: 18.1,
+}
+
+
+def _pdn_type(param: str) -> PdnType:
+    return PdnType[param.upper().replace('-', '_')]
+
+
+default_parsers = ParserRegistry([
+    ResponseParser('+CEREG', RegInfo, [
+        ParamField(0, 'state', lambda p: RegistrationState(int(p))),
+        ParamField(1, 'tac'),
+        ParamField(2, 'ci'),
+        # 3: Access technology of registered network
+        ParamField(4, 'cause_type', int),
+        ParamField(5, 'reject_cause', int),
+        ParamField(6, 'act_t3324_bitmask'),
+        ParamField(7, 'tau_t3412_bitmask'),
+    ], query_offset=1),
+    ResponseParser('+CESQ', lambda: SigInfo(255, 255, 255, 255), [
+        ParamField(0, 'rssi', lambda p: int(float(p) - 110), ('99',)),
+        ParamField(1, 'ber', lambda p: _RX_QUAL.get(int(p), 99.0), ('99',)),
+        # 2: <rscp> offset -120 dBm 3GPP 25.133/25.123
+        # 3: <ecno> offset -24 dBm increment 0.5 3GPP 25.133
+        ParamField(4, 'rsrq', lambda p: int(float(p) * 0.5 - 19.5), ('255',)),
+        ParamField(5, 'rsrp', lambda p: int(float(p) - 140), ('255',)),
+    ]),
+    ResponseParser('+CGDCONT', PdnContext, [
+        ParamField(0, 'id', int),
+        ParamField(1, 'pdn_type', _pdn_type),
+        ParamField(2, 'apn'),
+        ParamField(3, 'ip'),
+    ]),
+    ResponseParser('+CGPADDR', dict, [
+        ParamField(0, 'cid', int),
+        ParamField(1, 'ip'),
+    ]),
+    ResponseParser('+CGACT', PdnContext, [
+        ParamField(0, 'id', int),
+        ParamField(1, 'active', lambda p: p == '1'),
+    ]),
+    ResponseParser('+CPSMS', PsmConfig, [
+        ParamField(0, 'mode', int),
+        ParamField(3, 'tau_t3412_bitmask'),
+        ParamField(4, 'act_t3324_bitmask'),
+    ]),
+    ResponseParser('+CEDRXS', EdrxConfig, [
+        ParamField(1, 'cycle_bitmask'),
+    ]),
+    ResponseParser('+CEDRXRDP', EdrxConfig, [
+        ParamField(2, 'cycle_bitmask'),
+        ParamField(3, 'ptw_bitmask'),
+    ]),
+    ResponseParser('+CRTDCP', lambda: MtMessage(b'', PdnType.NON_IP), [
+        ParamField(2, 'payload', bytes.fromhex),
+    ]),
+    ResponseParser('+CSCON', dict, [
+        ParamField(0, 'rrc_state', lambda p: RrcState(int(p))),
+    ], query_offset=1),
+])
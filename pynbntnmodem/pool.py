@@ -0,0 +1,436 @@
+"""Drive multiple NB-NTN modems on different serial ports as a pool.
+
+Each modem has a dedicated worker thread that serializes its AT command I/O,
+so operations on different modems run in parallel. URCs from all modems are
+aggregated into a single stream tagged by port, and uplink messages are sent
+by the registered modem with the best signal and shortest queue.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from queue import Empty, Queue
+from typing import Any, Callable, Optional
+
+from .constants import TransportType, UrcType
+from .loader import mutate_modem
+from .modem import NbntnModem
+from .structures import ModemSnapshot, MoMessage
+
+__all__ = ['ModemPool', 'PoolUrc']
+
+_log = logging.getLogger(__name__)
+
+_STATUS_URCS = (UrcType.REGISTRATION, UrcType.RRC_STATE)
+
+
+@dataclass(frozen=True)
+class PoolUrc:
+    """A URC received from a pool modem.
+
+    Attributes:
+        port (str): The serial port of the modem.
+        urc (str): The URC.
+        urc_type (UrcType): The classified type.
+        timestamp (float): The unix timestamp received.
+    """
+    port: str
+    urc: str
+    urc_type: UrcType
+    timestamp: float = field(default_factory=time.time)
+
+
+class _PoolMember:
+    """A modem with its I/O worker and utilization counters."""
+    def __init__(self,
+                 port: str,
+                 modem: NbntnModem,
+                 refresh_interval: Optional[float] = None):
+        self.port = port
+        self.modem = modem
+        self.ready = False
+        self.snapshot: Optional[ModemSnapshot] = None
+        self.refresh_interval = refresh_interval
+        self.refresh_pending = False
+        self.jobs: 'Queue[Optional[tuple]]' = Queue()
+        self.busy_s = 0.0
+        self.completed = 0
+        self.errors = 0
+        self.sent = 0
+        self.sent_bytes = 0
+        self.failed = 0
+        self.closed = False
+        self._lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run,
+                                       name=f'modem_pool_{port}',
+                                       daemon=True)
+
+    def _run(self):
+        while True:
+            try:
+                job = self.jobs.get(timeout=self.refresh_interval)
+            except Empty:   # idle, keep the status used for uplink selection
+                if self.ready and not self.closed:
+                    try:
+                        self.update(max_age=0)
+                    except Exception as exc:
+                        _log.warning('Status refresh failed on %s: %s',
+                                     self.port, exc)
+                continue
+            if job is None:
+                break
+            future, func, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            start = time.perf_counter()
+            try:
+                future.set_result(func(self.modem, *args, **kwargs))
+                self.completed += 1
+            except Exception as exc:
+                self.errors += 1
+                future.set_exception(exc)
+            finally:
+                self.busy_s += time.perf_counter() - start
+
+    def update(self, **kwargs) -> ModemSnapshot:
+        """Update the status snapshot, in the worker thread.
+
+        Args:
+            **max_age (float): Maximum seconds of reused cached values.
+        """
+        self.refresh_pending = False
+        self.snapshot = self.modem.get_snapshot(**kwargs)
+        return self.snapshot
+
+    def refresh(self) -> Optional[Future]:
+        """Queue a status update unless one is already queued."""
+        if self.refresh_pending or self.closed:
+            return None
+        self.refresh_pending = True
+        return self.submit(lambda modem: self.update())
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        with self._lock:
+            if self.closed:
+                raise ConnectionError(f'Pool worker {self.port} closed')
+            if not self.thread.is_alive():
+                self.thread.start()
+            future: Future = Future()
+            self.jobs.put((future, func, args, kwargs))
+        return future
+
+    def stop(self) -> None:
+        with self._lock:
+            self.closed = True
+            if self.thread.is_alive():
+                self.jobs.put(None)
+
+
+class ModemPool:
+    """A pool of modems each served by a dedicated I/O worker thread."""
+    def __init__(self,
+                 ports: list[str],
+                 modem_factory: Optional[Callable[[str], NbntnModem]] = None,
+                 **kwargs):
+        """Create the pool.
+
+        Args:
+            ports (list[str]): The serial ports of the modems.
+            modem_factory (Callable[[str], NbntnModem]): Optional function to
+                create the modem for a port. Defaults to `NbntnModem`.
+            **queue_weight (float): Signal dB traded per queued job when
+                selecting a modem for uplink (default 5).
+            **refresh_interval (float): Seconds a worker is idle before its
+                modem status is refreshed (default 60), None to disable.
+            **consume_urcs (bool): If True, URCs are only queued by the pool
+                and not by each modem for its `get_urc()` (default False).
+            **kwargs: Other keyword arguments passed to `NbntnModem` e.g.
+                `baudrate`, `apn`, `pdn_type`.
+        """
+        if (not isinstance(ports, list) or not ports or
+            not all(isinstance(p, str) and p for p in ports) or
+            len(set(ports)) != len(ports)):
+            raise ValueError('Invalid ports must be unique list of strings')
+        if modem_factory is not None and not callable(modem_factory):
+            raise ValueError('Invalid modem_factory')
+        self._queue_weight = float(kwargs.pop('queue_weight', 5))
+        consume_urcs = kwargs.pop('consume_urcs', False)
+        if not isinstance(consume_urcs, bool):
+            raise ValueError('Invalid consume_urcs must be bool')
+        refresh_interval = kwargs.pop('refresh_interval', 60)
+        if (refresh_interval is not None and
+            (not isinstance(refresh_interval, (int, float)) or
+             refresh_interval <= 0)):
+            raise ValueError('Invalid refresh_interval')
+        if modem_factory is None:
+            modem_kwargs = dict(kwargs)
+            modem_factory = lambda port: NbntnModem(port=port, **modem_kwargs)
+        self._members: dict[str, _PoolMember] = {
+            port: _PoolMember(port, modem_factory(port), refresh_interval)
+            for port in ports
+        }
+        self._urcs: 'Queue[PoolUrc]' = Queue()
+        self._urc_callbacks: list[Callable[[PoolUrc], None]] = []
+        self._lock = threading.Lock()
+        self._started: float = time.monotonic()
+        for member in self._members.values():
+            member.modem.urc_dispatcher.subscribe(self._urc_handler(member.port),
+                                                  consume=consume_urcs)
+
+    @staticmethod
+    def discover(ports: Optional[list[str]] = None, **kwargs) -> list[str]:
+        """Find serial ports with a responsive AT modem, in parallel.
+
+        Args:
+            ports (list[str]): Candidate ports, defaults to all serial ports.
+            **kwargs: Passed to `NbntnModem.connect` e.g. `baudrate`.
+
+        Returns:
+            The list of ports that responded.
+        """
+        if ports is None:
+            from serial.tools import list_ports
+            ports = [p.device for p in list_ports.comports()]
+        kwargs.setdefault('retry_timeout', 3)
+
+        def probe(port: str) -> bool:
+            modem = NbntnModem()
+            try:
+                modem.connect(port=port, **kwargs)
+                return modem.is_connected()
+            except (ConnectionError, ValueError, OSError):
+                return False
+            finally:
+                try:
+                    modem.disconnect()
+                except Exception:
+                    pass
+
+        if not ports:
+            return []
+        with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+            found = list(executor.map(probe, ports))
+        return [port for port, ok in zip(ports, found) if ok]
+
+    @property
+    def ports(self) -> list[str]:
+        return list(self._members)
+
+    @property
+    def modems(self) -> dict[str, NbntnModem]:
+        return {port: m.modem for port, m in self._members.items()}
+
+    def _urc_handler(self, port: str) -> Callable[[str, UrcType], None]:
+        member = self._members[port]
+
+        def handler(urc: str, urc_type: UrcType):
+            if member.ready and urc_type in _STATUS_URCS:
+                member.refresh()   # reuses the state reported by the URC
+            pool_urc = PoolUrc(port, urc, urc_type)
+            self._urcs.put(pool_urc)
+            for callback in list(self._urc_callbacks):
+                try:
+                    callback(pool_urc)
+                except Exception as exc:
+                    _log.exception('URC callback error: %s', exc)
+        return handler
+
+    def start(self, **kwargs) -> dict[str, bool]:
+        """Connect, mutate and initialize all modems in parallel.
+
+        Args:
+            **connect (dict): Keyword arguments for `connect`.
+            **mutate (bool): Mutate to the model-specific subclass
+                (default True).
+            **mutate_kwargs (dict): Keyword arguments for `mutate_modem`.
+            **initialize (bool): Run `initialize_ntn` (default True).
+            **ntn_init (NtnInitSequence): Optional initialization sequence.
+
+        Returns:
+            Dictionary of port: ready. Modems that fail to start are excluded
+                from uplink selection.
+        """
+        connect_kwargs = kwargs.get('connect', {})
+        mutate = kwargs.get('mutate', True)
+        mutate_kwargs = kwargs.get('mutate_kwargs', {})
+        initialize = kwargs.get('initialize', True)
+        init_kwargs = {}
+        if 'ntn_init' in kwargs:
+            init_kwargs['ntn_init'] = kwargs['ntn_init']
+
+        def start_modem(modem: NbntnModem) -> bool:
+            if not modem.is_connected():
+                modem.connect(**connect_kwargs)
+            if mutate:
+                mutate_modem(modem, **mutate_kwargs)
+            if initialize and not modem.initialize_ntn(**init_kwargs):
+                _log.error('Failed to initialize NTN on %s', modem._port)
+                return False
+            return True
+
+        self._started = time.monotonic()
+        futures = {port: m.submit(start_modem)
+                   for port, m in self._members.items()}
+        results: dict[str, bool] = {}
+        for port, future in futures.items():
+            try:
+                results[port] = bool(future.result())
+            except Exception as exc:
+                _log.error('Failed to start modem on %s: %s', port, exc)
+                results[port] = False
+            self._members[port].ready = results[port]
+        for future in self.refresh().values():
+            future.exception()   # wait for initial status
+        return results
+
+    def submit(self, port: str, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """Run a function on a modem's worker thread.
+
+        Args:
+            port (str): The port of the modem.
+            func (Callable): Called as `func(modem, *args, **kwargs)`.
+
+        Returns:
+            A `Future` of the result.
+        """
+        member = self._members.get(port)
+        if member is None:
+            raise ValueError(f'Unknown port {port}')
+        return member.submit(func, *args, **kwargs)
+
+    def map(self, func: Callable[..., Any], *args, **kwargs) -> dict[str, Future]:
+        """Run a function on every modem in parallel."""
+        return {port: m.submit(func, *args, **kwargs)
+                for port, m in self._members.items()}
+
+    def refresh(self) -> dict[str, Future]:
+        """Update the status snapshot of every ready modem in parallel.
+
+        Snapshots are also refreshed on registration and RRC URCs and after
+        `refresh_interval` seconds idle.
+        """
+        return {port: m.submit(lambda modem, m=m: m.update())
+                for port, m in self._members.items() if m.ready}
+
+    def _score(self, member: _PoolMember) -> float:
+        """Rank a modem for uplink by signal and queue depth."""
+        level = 0.0
+        snapshot = member.snapshot
+        if snapshot is not None:
+            if snapshot.siginfo.sinr != 255:
+                level = snapshot.siginfo.sinr
+            elif snapshot.siginfo.rsrp != 255:
+                level = snapshot.siginfo.rsrp + 120   # approximate SINR scale
+        return level - self._queue_weight * member.jobs.qsize()
+
+    def select(self) -> Optional[str]:
+        """Get the port of the best modem for uplink, or None if none ready."""
+        candidates = [m for m in self._members.values() if m.ready]
+        registered = [m for m in candidates if m.snapshot is None or
+                      m.snapshot.reginfo.is_registered()]
+        candidates = registered or candidates
+        if not candidates:
+            return None
+        return max(candidates, key=self._score).port
+
+    def send(self,
+             payload: bytes,
+             transport: TransportType = TransportType.NIDD,
+             **kwargs) -> Future:
+        """Queue an uplink message on the best available modem.
+
+        Args:
+            payload (bytes): The message payload.
+            transport (TransportType): NIDD or UDP.
+            **kwargs: Passed to `send_message_nidd` or `send_message_udp`.
+
+        Returns:
+            A `Future` of the `MoMessage` or None if sending failed.
+
+        Raises:
+            `ConnectionError` if no modem is ready.
+        """
+        if not isinstance(transport, TransportType):
+            raise ValueError('Invalid transport')
+        with self._lock:
+            port = self.select()
+            if port is None:
+                raise ConnectionError('No modem available for uplink')
+            member = self._members[port]
+
+            def send_message(modem: NbntnModem) -> Optional[MoMessage]:
+                if transport == TransportType.UDP:
+                    message = modem.send_message_udp(payload, **kwargs)
+                else:
+                    message = modem.send_message_nidd(payload, **kwargs)
+                if message is None:
+                    member.failed += 1
+                else:
+                    member.sent += 1
+                    member.sent_bytes += len(payload)
+                return message
+
+            return member.submit(send_message)
+
+    def subscribe(self, callback: Callable[[PoolUrc], None]) -> None:
+        """Register a callback for URCs from all modems."""
+        if not callable(callback):
+            raise ValueError('Invalid callback')
+        self._urc_callbacks.append(callback)
+
+    def get_urc(self, timeout: Optional[float] = None) -> Optional[PoolUrc]:
+        """Get the next URC from any modem, or None if timed out."""
+        try:
+            return self._urcs.get(timeout=timeout)
+        except Empty:
+            return None
+
+    def stats(self) -> dict[str, Any]:
+        """Get pool throughput and per-modem utilization.
+
+        Returns:
+            Dictionary with `uptime`, `sent`, `sent_bytes`, `failed`,
+                `msgs_per_s`, `bytes_per_s` and `modems` keyed by port with
+                `ready`, `queued`, `completed`, `errors`, `sent`, `failed`
+                and `utilization` (fraction of uptime busy).
+        """
+        uptime = time.monotonic() - self._started
+        modems = {}
+        for port, m in self._members.items():
+            modems[port] = {
+                'ready': m.ready,
+                'queued': m.jobs.qsize(),
+                'completed': m.completed,
+                'errors': m.errors,
+                'sent': m.sent,
+                'sent_bytes': m.sent_bytes,
+                'failed': m.failed,
+                'utilization': round(m.busy_s / uptime, 4) if uptime else 0,
+            }
+        sent = sum(m['sent'] for m in modems.values())
+        sent_bytes = sum(m['sent_bytes'] for m in modems.values())
+        return {
+            'uptime': round(uptime, 3),
+            'sent': sent,
+            'sent_bytes': sent_bytes,
+            'failed': sum(m['failed'] for m in modems.values()),
+            'msgs_per_s': round(sent / uptime, 3) if uptime else 0,
+            'bytes_per_s': round(sent_bytes / uptime, 3) if uptime else 0,
+            'modems': modems,
+        }
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers after queued jobs and disconnect the modems."""
+        for member in self._members.values():
+            member.stop()
+        for member in self._members.values():
+            if member.thread.is_alive():
+                member.thread.join(timeout)
+            member.ready = False
+            try:
+                if member.modem.is_connected():
+                    member.modem.disconnect()
+            except Exception as exc:
+                _log.warning('Error disconnecting %s: %s', member.port, exc)
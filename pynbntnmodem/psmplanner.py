@@ -0,0 +1,282 @@
+"""Planning of PSM and eDRX timers against latency and energy targets.
+
+`PsmConfig.seconds_to_tau`, `seconds_to_act` and
+`EdrxConfig.seconds_to_edrx_cycle` convert one timer at a time to the nearest
+encodable value. `plan_timers` instead evaluates every encodable combination
+of T3412, T3324, eDRX cycle and Paging Time Window (plus PSM and/or eDRX
+disabled) for a reporting interval and `EnergyModel`, and returns the
+Pareto-optimal trade-offs of average power and worst-case mobile-terminated
+latency as ready-to-apply configurations.
+
+The encodable values are tabulated once. The search only considers eDRX
+cycle/PTW pairs that are not dominated in both listening duty cycle and
+paging delay, and T3412 values at most the reporting interval (all longer
+values behave the same since each uplink restarts the timer), so a plan takes
+milliseconds and can be re-run per device when policy changes.
+
+The 3GPP `+CEDRXS` command requests the eDRX cycle but not the PTW, which the
+network assigns, so by default every eDRX cycle is evaluated with a fixed
+network PTW (`ptw`, default 2.56 s). Pass `ptw=None` to also optimize the PTW
+for a module subclass able to request it.
+
+The network may grant different values than requested, so a plan should be
+re-evaluated with the granted timers from `RegInfo.get_psm_granted()` and
+`get_edrx_dynamic()`.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+from .constants import ActMultiplier, EdrxCycle, EdrxPtw, TauMultiplier
+from .structures import EdrxConfig, PsmConfig
+from .wakewindow import psm_timers
+
+__all__ = [
+    'EnergyModel',
+    'TimerPlan',
+    'encodable_timers',
+    'evaluate_timers',
+    'plan_timers',
+]
+
+_log = logging.getLogger(__name__)
+
+_TAU_UNITS = {   # seconds per unit, finest first for canonical encoding
+    TauMultiplier.S_2: 2,
+    TauMultiplier.S_30: 30,
+    TauMultiplier.M_1: 60,
+    TauMultiplier.M_10: 600,
+    TauMultiplier.H_1: 3600,
+    TauMultiplier.H_10: 36000,
+    TauMultiplier.H_320: 1152000,
+}
+DEFAULT_PTW = '0000'   # 2.56 s, applied by the network if not requested
+
+_ACT_UNITS = {
+    ActMultiplier.S_2: 2,
+    ActMultiplier.M_1: 60,
+    ActMultiplier.M_6: 360,
+}
+
+
+@dataclass(frozen=True)
+class EnergyModel:
+    """Average power drawn by the device in each state.
+
+    Attributes:
+        psm_mw (float): Power in PSM.
+        sleep_mw (float): Power sleeping between eDRX paging windows.
+        idle_mw (float): Power idle monitoring paging (DRX or eDRX PTW).
+        connected_mw (float): Power while RRC connected.
+        connected_s (float): Seconds connected per uplink or periodic TAU.
+        drx_s (float): The idle DRX paging cycle without eDRX.
+    """
+    psm_mw: float = 0.01
+    sleep_mw: float = 0.2
+    idle_mw: float = 2.0
+    connected_mw: float = 300.0
+    connected_s: float = 20.0
+    drx_s: float = 2.56
+
+
+@dataclass(frozen=True)
+class TimerPlan:
+    """A candidate PSM/eDRX configuration and its predicted performance.
+
+    Attributes:
+        psm (PsmConfig): The PSM configuration to request.
+        edrx (EdrxConfig|None): The eDRX configuration to request, or None to
+            disable eDRX.
+        power_mw (float): The predicted average power.
+        latency_s (float): The predicted worst-case MT delivery delay.
+    """
+    psm: PsmConfig = field(compare=False)
+    edrx: Optional[EdrxConfig] = field(compare=False)
+    power_mw: float
+    latency_s: float
+
+    @property
+    def tau_s(self) -> int:
+        return self.psm.tau_s if self.psm.mode else 0
+
+    @property
+    def act_s(self) -> int:
+        return self.psm.act_s if self.psm.mode else 0
+
+
+@lru_cache(maxsize=None)
+def encodable_timers() -> dict[str, tuple[tuple[float, str], ...]]:
+    """Get every distinct encodable timer value.
+
+    Returns:
+        A dictionary of `tau`, `act`, `cycle` and `ptw` tuples of
+            (seconds, bitmask) in ascending seconds.
+    """
+    def table(units: dict, first: int = 1) -> tuple[tuple[float, str], ...]:
+        values: dict[int, str] = {}
+        for unit, seconds in units.items():
+            for bct in range(first, 32):
+                values.setdefault(bct * seconds, f'{(unit << 5) | bct:08b}')
+        return tuple(sorted(values.items()))
+
+    return {
+        'tau': table(_TAU_UNITS),
+        'act': table(_ACT_UNITS, first=0),
+        'cycle': tuple((EdrxConfig.edrx_cycle_seconds(f'{c:04b}'), f'{c:04b}')
+                       for c in EdrxCycle),
+        'ptw': tuple((EdrxConfig.edrx_ptw_seconds(f'{p:04b}'), f'{p:04b}')
+                     for p in EdrxPtw),
+    }
+
+
+def _listening(model: EnergyModel, ptw_bitmask: Optional[str]) -> list[tuple]:
+    """Get non-dominated (power, paging delay, cycle, eDRX bitmasks) idle."""
+    options = [(model.idle_mw, model.drx_s, model.drx_s, None)]
+    timers = encodable_timers()
+    for cycle, cycle_bits in timers['cycle']:
+        for ptw, ptw_bits in timers['ptw']:
+            if ptw >= cycle or ptw_bitmask not in (None, ptw_bits):
+                continue
+            duty = ptw / cycle
+            power = duty * model.idle_mw + (1 - duty) * model.sleep_mw
+            options.append((power, cycle - ptw, cycle, (cycle_bits, ptw_bits)))
+    options.sort()
+    front = []
+    for option in options:
+        if not front or option[1] < front[-1][1]:
+            front.append(option)
+    return front
+
+
+def evaluate_timers(psm: Optional[PsmConfig],
+                    edrx: Optional[EdrxConfig],
+                    interval: float,
+                    model: Optional[EnergyModel] = None) -> TimerPlan:
+    """Predict the performance of a configuration e.g. granted by the network.
+
+    Uses the same model as `plan_timers`.
+
+    Args:
+        psm (PsmConfig|None): The PSM configuration.
+        edrx (EdrxConfig|None): The eDRX configuration.
+        interval (float): The seconds between uplink reports.
+        model (EnergyModel): The device power model.
+    """
+    if not isinstance(interval, (int, float)) or interval <= 0:
+        raise ValueError('Invalid interval')
+    model = model or EnergyModel()
+    power, delay = model.idle_mw, model.drx_s
+    cycle = edrx.cycle_s if edrx else 0
+    if cycle:
+        ptw = min(edrx.ptw_s, cycle)
+        duty = ptw / cycle
+        power = duty * model.idle_mw + (1 - duty) * model.sleep_mw
+        delay = cycle - ptw
+    conn = model.connected_s
+    conn_energy = conn * model.connected_mw
+    tau, act = psm_timers(psm) or (0, math.inf)
+    period = min(tau, interval) if tau else interval
+    asleep = period - conn - act
+    if asleep <= 0:   # never enters PSM
+        mean = (conn_energy + max(0, interval - conn) * power) / interval
+        return TimerPlan(psm or PsmConfig(), edrx, mean, delay)
+    wakes = math.ceil(interval / tau) if tau else 1
+    psm_energy = max(0, interval - wakes * (conn + act)) * model.psm_mw
+    mean = (wakes * (conn_energy + act * power) + psm_energy) / interval
+    latency = max(asleep, delay) if act else asleep
+    return TimerPlan(psm or PsmConfig(), edrx, mean, latency)
+
+
+def plan_timers(max_latency: float,
+                interval: float,
+                model: Optional[EnergyModel] = None,
+                **kwargs) -> list[TimerPlan]:
+    """Find the Pareto-optimal PSM/eDRX configurations.
+
+    Each uplink every `interval` seconds and each periodic TAU connects for
+    `model.connected_s`, followed by the T3324 active time listening for
+    paging then PSM. The worst-case MT latency is the longest time asleep in
+    PSM or between paging occasions.
+
+    Args:
+        max_latency (float): The maximum acceptable MT latency in seconds.
+        interval (float): The seconds between uplink reports.
+        model (EnergyModel): The device power model.
+        **psm (bool): Allow PSM (default True).
+        **edrx (bool): Allow eDRX (default True).
+        **ptw (str|None): The PTW bitmask assigned by the network to every
+            eDRX cycle (default `DEFAULT_PTW`), or None to optimize the PTW
+            if the modem can request it.
+
+    Returns:
+        `TimerPlan` list in ascending power and descending latency, empty if
+            no configuration meets `max_latency`.
+    """
+    if not isinstance(max_latency, (int, float)) or max_latency <= 0:
+        raise ValueError('Invalid max_latency')
+    if not isinstance(interval, (int, float)) or interval <= 0:
+        raise ValueError('Invalid interval')
+    if model is None:
+        model = EnergyModel()
+    elif not isinstance(model, EnergyModel):
+        raise ValueError('Invalid EnergyModel')
+    ptw = kwargs.get('ptw', DEFAULT_PTW)
+    if ptw is not None and (not isinstance(ptw, str) or
+                            not EdrxConfig.edrx_ptw_seconds(ptw)):
+        raise ValueError('Invalid ptw bitmask')
+    listening = _listening(model, ptw)
+    if kwargs.get('edrx', True) is False:
+        listening = [o for o in listening if o[3] is None]
+    conn = model.connected_s
+    conn_energy = conn * model.connected_mw
+    candidates: list[tuple[float, float, int, int, Optional[tuple]]] = []
+    for power, delay, _, edrx in listening:   # PSM disabled
+        if delay <= max_latency and interval > conn:
+            mean = (conn_energy + (interval - conn) * power) / interval
+            candidates.append((mean, delay, 0, 0, edrx))
+    if kwargs.get('psm', True) is not False:
+        timers = encodable_timers()
+        taus = [t for t in timers['tau'] if t[0] < interval]
+        longer = [t for t in timers['tau'] if t[0] >= interval]
+        if longer:
+            taus.append(longer[0])   # all longer values are equivalent
+        for tau, _ in taus:
+            period = min(tau, interval)
+            wakes = math.ceil(interval / tau)
+            for act, _ in timers['act']:
+                asleep = period - conn - act
+                if asleep <= 0:
+                    break   # never enters PSM
+                if asleep > max_latency:
+                    continue
+                psm_energy = (interval - wakes * (conn + act)) * model.psm_mw
+                if psm_energy < 0:
+                    break
+                if not act:   # no paging after the connection
+                    mean = (wakes * conn_energy + psm_energy) / interval
+                    candidates.append((mean, asleep, tau, act, None))
+                    continue
+                for power, delay, cycle, edrx in listening:
+                    if delay > max_latency or cycle > act:
+                        continue
+                    mean = (wakes * (conn_energy + act * power) +
+                            psm_energy) / interval
+                    candidates.append((mean, max(asleep, delay), tau, act, edrx))
+    candidates.sort(key=lambda c: (c[0], c[1]))
+    plans: list[TimerPlan] = []
+    bitmasks = {k: dict(v) for k, v in encodable_timers().items()
+                if k in ('tau', 'act')}
+    for mean, latency, tau, act, edrx in candidates:
+        if plans and latency >= plans[-1].latency_s:
+            continue
+        if tau:
+            psm = PsmConfig(1, bitmasks['tau'][tau], bitmasks['act'][act])
+        else:
+            psm = PsmConfig()
+        edrx_config = EdrxConfig(*edrx) if edrx else None
+        plans.append(TimerPlan(psm, edrx_config, mean, latency))
+    _log.debug('%d plans from %d candidates', len(plans), len(candidates))
+    return plans
@@ -0,0 +1,310 @@
+"""Online tuning of PSM/eDRX timers from observed traffic.
+
+Statically configured timers leave a device either awake longer than its
+traffic needs or asleep when mobile-terminated (MT) data arrives.
+`PsmAutotuner` learns the uplink cadence and the arrival times of MT messages
+relative to the preceding uplink, and chooses the lowest power `TimerPlan`
+from `plan_timers` whose MT latency at the configured quantile, replayed over
+the observed arrivals, is within the target. Without observed MT arrivals the
+worst-case latency of the plan must be within the target.
+
+A new configuration is only requested when the currently granted one misses
+the latency target, or the predicted power saving exceeds the hysteresis
+fraction, and not within the holdoff after a previous change, since each
+change may trigger a TAU or re-registration. The estimated power and latency
+trade-off is logged at each change.
+"""
+
+import logging
+import math
+import statistics
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Optional
+
+from .constants import UrcType
+from .psmplanner import (
+    DEFAULT_PTW,
+    EnergyModel,
+    TimerPlan,
+    evaluate_timers,
+    plan_timers,
+)
+from .structures import EdrxConfig, PsmConfig
+from .wakewindow import psm_timers
+
+if TYPE_CHECKING:
+    from .modem import NbntnModem
+    from .urcdispatcher import UrcSubscription
+
+__all__ = ['PsmAutotuner']
+
+_log = logging.getLogger(__name__)
+
+_MT_URCS = (UrcType.NIDD_MT_RCVD, UrcType.UDP_MT_RCVD)
+_MO_URCS = (UrcType.NIDD_MO_SENT, UrcType.UDP_MO_SENT)
+
+Granted = tuple[Optional[PsmConfig], Optional[EdrxConfig]]
+
+
+class PsmAutotuner:
+    """Requests PSM/eDRX timers matching the observed traffic."""
+    def __init__(self,
+                 max_latency: float,
+                 apply: Callable[[TimerPlan], bool],
+                 granted: Optional[Callable[[], Granted]] = None,
+                 model: Optional[EnergyModel] = None,
+                 quantile: float = 0.9,
+                 hysteresis: float = 0.2,
+                 holdoff: float = 6 * 3600,
+                 min_samples: int = 5,
+                 window: int = 50,
+                 ptw: Optional[str] = DEFAULT_PTW):
+        """Create an autotuner.
+
+        Args:
+            max_latency (float): The target MT latency in seconds.
+            apply (Callable[[TimerPlan], bool]): Function requesting the
+                plan's timers, returning True if successful.
+            granted (Callable[[], tuple]): Optional function getting the
+                network-granted (PsmConfig, EdrxConfig), otherwise the last
+                applied plan is assumed granted.
+            model (EnergyModel): The device power model.
+            quantile (float): The fraction 0..1 of observed MT arrivals that
+                must be delivered within `max_latency`.
+            hysteresis (float): The minimum fractional power saving to change
+                a configuration meeting the target.
+            holdoff (float): Minimum seconds between changes.
+            min_samples (int): Uplink intervals observed before tuning.
+            window (int): The number of recent observations used.
+            ptw (str|None): The eDRX PTW bitmask assigned by the network,
+                replaced by the granted PTW when known, or None to optimize
+                the PTW if `apply` can request it.
+        """
+        if not isinstance(max_latency, (int, float)) or max_latency <= 0:
+            raise ValueError('Invalid max_latency')
+        if not callable(apply) or (granted is not None and not callable(granted)):
+            raise ValueError('Invalid apply or granted callback')
+        if model is not None and not isinstance(model, EnergyModel):
+            raise ValueError('Invalid EnergyModel')
+        if not 0 < quantile <= 1:
+            raise ValueError('quantile must be 0..1')
+        if not isinstance(hysteresis, (int, float)) or hysteresis < 0:
+            raise ValueError('Invalid hysteresis')
+        if not isinstance(min_samples, int) or min_samples < 1:
+            raise ValueError('Invalid min_samples')
+        if not isinstance(window, int) or window < min_samples:
+            raise ValueError('Invalid window')
+        self._max_latency = max_latency
+        self._apply = apply
+        self._granted = granted
+        self._model = model or EnergyModel()
+        self._quantile = quantile
+        self._hysteresis = hysteresis
+        self._holdoff = holdoff
+        self._min_samples = min_samples
+        self._ptw = ptw
+        self._lock = threading.Lock()
+        self._gaps: 'deque[float]' = deque(maxlen=window)
+        self._mt_offsets: 'deque[float]' = deque(maxlen=window)
+        self._last_uplink: Optional[float] = None
+        self._current: Optional[TimerPlan] = None
+        self._changed_at: Optional[float] = None
+        self._changes = 0
+        self._subscription: Optional['UrcSubscription'] = None
+        self._modem: Optional['NbntnModem'] = None
+
+    @classmethod
+    def for_modem(cls,
+                  modem: 'NbntnModem',
+                  max_latency: float,
+                  **kwargs) -> 'PsmAutotuner':
+        """Create an autotuner requesting timers from a modem.
+
+        MT messages are observed from `NIDD_MT_RCVD`/`UDP_MT_RCVD` URCs and
+        uplinks from `NIDD_MO_SENT`/`UDP_MO_SENT` URCs if the modem reports
+        them, otherwise call `observe_uplink()` after each send. `tune()`
+        sends commands so must not be called from a URC callback.
+        Plans use the PTW granted by the network unless the modem subclass
+        can request the PTW.
+
+        Args:
+            modem (NbntnModem): The modem.
+            max_latency (float): The target MT latency in seconds.
+            **kwargs: Passed to the constructor.
+        """
+        def apply(plan: TimerPlan) -> bool:
+            return (modem.set_psm_config(plan.psm if plan.psm.mode else None)
+                    and modem.set_edrx_config(plan.edrx))
+
+        def granted() -> Granted:
+            return (modem.get_reginfo().get_psm_granted(),
+                    modem.get_edrx_dynamic())
+
+        if modem._edrx_ptw:
+            kwargs.setdefault('ptw', None)
+        tuner = cls(max_latency, apply, granted, **kwargs)
+        tuner._modem = modem
+        tuner._subscription = modem.urc_dispatcher.subscribe(tuner._on_urc)
+        return tuner
+
+    def detach(self) -> None:
+        """Stop observing the modem URCs."""
+        if self._modem and self._subscription:
+            self._modem.urc_dispatcher.unsubscribe(self._subscription)
+        self._modem = None
+        self._subscription = None
+
+    def _on_urc(self, urc: str, urc_type: UrcType) -> None:
+        if urc_type in _MT_URCS:
+            self.observe_mt()
+        elif urc_type in _MO_URCS:
+            self.observe_uplink()
+
+    @property
+    def interval(self) -> Optional[float]:
+        """The median seconds between uplinks, or None until learned."""
+        with self._lock:
+            if len(self._gaps) < self._min_samples:
+                return None
+            return statistics.median(self._gaps)
+
+    @property
+    def current(self) -> Optional[TimerPlan]:
+        """The last plan applied."""
+        return self._current
+
+    @property
+    def changes(self) -> int:
+        """The number of configurations applied."""
+        return self._changes
+
+    def observe_uplink(self, timestamp: Optional[float] = None) -> None:
+        """Record an uplink, default now."""
+        ts = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._last_uplink is not None and ts > self._last_uplink:
+                self._gaps.append(ts - self._last_uplink)
+            self._last_uplink = ts
+
+    def observe_mt(self, timestamp: Optional[float] = None) -> None:
+        """Record the arrival of a MT message, default now."""
+        ts = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._last_uplink is not None and ts >= self._last_uplink:
+                self._mt_offsets.append(ts - self._last_uplink)
+
+    def expected_latency(self, plan: TimerPlan) -> float:
+        """Get the MT latency quantile of a plan over the observed arrivals.
+
+        Returns:
+            Seconds, or the plan's worst-case latency without observations.
+        """
+        interval = self.interval
+        with self._lock:
+            offsets = list(self._mt_offsets)
+        if not offsets or interval is None:
+            return plan.latency_s
+        model = self._model
+        conn = model.connected_s
+        delay = model.drx_s
+        if plan.edrx and plan.edrx.cycle_s:
+            delay = plan.edrx.cycle_s - min(plan.edrx.ptw_s, plan.edrx.cycle_s)
+        tau, act = psm_timers(plan.psm) or (0, math.inf)
+        period = min(tau, interval) if tau else interval
+        latencies = []
+        for offset in offsets:
+            since_wake = offset % period
+            if since_wake < conn:
+                latencies.append(0.0)
+            elif since_wake < conn + act:
+                latencies.append(delay / 2)   # mean wait for paging
+            else:
+                latencies.append(period - since_wake)
+        latencies.sort()
+        rank = max(0, math.ceil(self._quantile * len(latencies)) - 1)
+        return latencies[rank]
+
+    def recommend(self) -> Optional[TimerPlan]:
+        """Get the lowest power plan meeting the latency target.
+
+        Returns:
+            The `TimerPlan`, or None until the uplink interval is learned or
+                if no plan meets the target.
+        """
+        interval = self.interval
+        if interval is None:
+            return None
+        plans = plan_timers(max(self._max_latency, interval), interval,
+                            self._model, ptw=self._ptw)
+        for plan in plans:   # ascending power
+            if self.expected_latency(plan) <= self._max_latency:
+                return plan
+        return None
+
+    def tune(self, now: Optional[float] = None) -> Optional[TimerPlan]:
+        """Apply the recommended plan if warranted.
+
+        Args:
+            now (float): The unix time, default now.
+
+        Returns:
+            The plan applied, or None if unchanged.
+        """
+        now = time.time() if now is None else now
+        if (self._changed_at is not None and
+            now - self._changed_at < self._holdoff):
+            return None
+        if self.interval is None:
+            return None
+        granted = self._granted() if self._granted is not None else None
+        if granted is not None and self._ptw is not None:
+            edrx = granted[1]
+            if edrx is not None and edrx.ptw_bitmask:
+                self._ptw = edrx.ptw_bitmask   # network PTW for any cycle
+        plan = self.recommend()
+        if plan is None:
+            return None
+        interval = self.interval
+        assert interval is not None
+        if granted is not None:
+            current = evaluate_timers(*granted, interval, self._model)
+        elif self._current is not None:
+            current = evaluate_timers(self._current.psm, self._current.edrx,
+                                      interval, self._model)
+        else:
+            current = None
+        if current is not None:
+            current_latency = self.expected_latency(current)
+            if (current.tau_s, current.act_s) == (plan.tau_s, plan.act_s):
+                if _edrx_cycle(current.edrx) == _edrx_cycle(plan.edrx):
+                    return None
+            saving = ((current.power_mw - plan.power_mw) / current.power_mw
+                      if current.power_mw else 0)
+            if current_latency <= self._max_latency and saving < self._hysteresis:
+                return None
+        if not self._apply(plan):
+            _log.warning('Failed to apply PSM/eDRX plan')
+            return None
+        self._current = plan
+        self._changed_at = now
+        self._changes += 1
+        psm = (f'T3412 {plan.tau_s}s T3324 {plan.act_s}s' if plan.psm.mode
+               else 'PSM off')
+        edrx = (f'{plan.edrx.cycle_s}/{plan.edrx.ptw_s}s' if plan.edrx
+                else 'off')
+        if current is None:
+            before = 'unknown'
+        else:
+            before = (f'{current.power_mw:.3f} mW'
+                      f' latency {self.expected_latency(current):.0f} s')
+        _log.info('Requested %s eDRX %s for uplink every %.0f s:'
+                  ' %s -> %.3f mW latency %.0f s (worst %.0f s)',
+                  psm, edrx, interval, before,
+                  plan.power_mw, self.expected_latency(plan), plan.latency_s)
+        return plan
+
+
+def _edrx_cycle(edrx: Optional[EdrxConfig]) -> float:
+    return edrx.cycle_s if edrx else 0
@@ -0,0 +1,376 @@
+"""Recording and replay of AT command traffic.
+
+A `TrafficRecorder` attached to a modem captures each command, response and
+URC with a monotonic timestamp into a bounded in-memory ring buffer, and
+optionally appends them to a compact binary file. A `TrafficReplayer` attached
+to a modem answers its commands from a recording and delivers the recorded URCs
+in order, at recorded speed or as fast as possible, so a field session becomes
+a deterministic test of parsers, initialization sequences and URC handling.
+
+The file is a header `NTNREC` with a version byte, followed by records of
+kind (uint8), timestamp seconds (float64), result code (int16), data length
+(uint32) and UTF-8 data, all little-endian. Each recorder start appends a
+`SESSION` record whose timestamp is the unix time, and later timestamps are
+relative to it. A truncated final record is ignored when reading.
+"""
+
+import logging
+import struct
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from enum import IntEnum
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator, Optional
+
+from pyatcommand import AtErrorCode, AtResponse, AtTimeout
+
+from .constants import UrcType
+
+if TYPE_CHECKING:
+    from .modem import NbntnModem
+
+__all__ = [
+    'ReplayMismatch',
+    'TrafficKind',
+    'TrafficRecord',
+    'TrafficRecorder',
+    'TrafficReplayer',
+    'read_records',
+    'write_records',
+]
+
+_log = logging.getLogger(__name__)
+
+MAGIC = b'NTNREC'
+VERSION = 1
+_HEADER = MAGIC + bytes([VERSION])
+_RECORD = struct.Struct('<BdhI')
+EXCEPTION_CODE = -2   # response code of a command that raised
+_REPLAYED_EXCEPTIONS: dict[str, type[Exception]] = {
+    e.__name__: e for e in (ConnectionError, NotImplementedError, OSError,
+                            RuntimeError, ValueError)
+}
+
+
+class TrafficKind(IntEnum):
+    """The kind of a recorded event."""
+    SESSION = 0
+    COMMAND = 1
+    RESPONSE = 2
+    URC = 3
+
+
+@dataclass(frozen=True)
+class TrafficRecord:
+    """A recorded command, response or URC.
+
+    Attributes:
+        kind (TrafficKind): The kind of event.
+        timestamp (float): Seconds since the session start, or the unix time
+            of a `SESSION` record.
+        data (str): The command, response information or URC.
+        code (int): The `AtErrorCode` value of a response, or
+            `EXCEPTION_CODE` if the command raised an exception described by
+            `data`.
+    """
+    kind: TrafficKind
+    timestamp: float
+    data: str = ''
+    code: int = 0
+
+    def pack(self) -> bytes:
+        """Get the binary encoding of the record."""
+        data = self.data.encode()
+        return _RECORD.pack(self.kind, self.timestamp, self.code,
+                            len(data)) + data
+
+
+def write_records(stream: BinaryIO, records: Iterable[TrafficRecord]) -> None:
+    """Write records to a binary stream, with a header if at the start."""
+    if stream.tell() == 0:
+        stream.write(_HEADER)
+    for record in records:
+        stream.write(record.pack())
+
+
+def read_records(path: 'str|Path') -> Iterator[TrafficRecord]:
+    """Read the records of a recording file.
+
+    Raises:
+        ValueError if the file is not a recording.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(_HEADER)) != _HEADER:
+            raise ValueError(f'{path} is not a traffic recording')
+        while True:
+            header = f.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                break
+            kind, timestamp, code, length = _RECORD.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                _log.warning('Ignoring truncated record in %s', path)
+                break
+            yield TrafficRecord(TrafficKind(kind), timestamp,
+                                data.decode(errors='replace'), code)
+
+
+class TrafficRecorder:
+    """Captures modem traffic to a ring buffer and optional file."""
+    def __init__(self,
+                 path: 'str|Path|None' = None,
+                 capacity: int = 4096):
+        """Create the recorder.
+
+        Args:
+            path (str|Path): Optional file to append records to.
+            capacity (int): The maximum records kept in memory.
+        """
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError('Invalid capacity')
+        self._lock = threading.Lock()
+        self._buffer: 'deque[TrafficRecord]' = deque(maxlen=capacity)
+        self._start = time.monotonic()
+        self._file: Optional[BinaryIO] = None
+        if path:
+            self._file = open(path, 'ab')
+        self._append(TrafficRecord(TrafficKind.SESSION, time.time()))
+
+    def _append(self, record: TrafficRecord) -> None:
+        with self._lock:
+            self._buffer.append(record)
+            if self._file is not None:
+                write_records(self._file, [record])
+
+    def _record(self, kind: TrafficKind, data: str, code: int = 0) -> None:
+        self._append(TrafficRecord(kind, time.monotonic() - self._start,
+                                   data, code))
+
+    def record_command(self, command: str) -> None:
+        """Record a command sent."""
+        self._record(TrafficKind.COMMAND, command)
+
+    def record_response(self,
+                        response: 'AtResponse|Exception|None') -> None:
+        """Record the response to the last command.
+
+        Args:
+            response (AtResponse|Exception|None): The response, the exception
+                raised, or None if timed out.
+        """
+        if response is None:
+            self._record(TrafficKind.RESPONSE, '', AtErrorCode.ERR_TIMEOUT)
+        elif isinstance(response, Exception):
+            self._record(TrafficKind.RESPONSE,
+                         f'{type(response).__name__}: {response}',
+                         EXCEPTION_CODE)
+        else:
+            code = response.result if response.result is not None else -1
+            self._record(TrafficKind.RESPONSE, response.info or '', code)
+
+    def record_urc(self, urc: str, urc_type: Optional[UrcType] = None) -> None:
+        """Record a URC, compatible with `UrcDispatcher.subscribe`."""
+        self._record(TrafficKind.URC, urc)
+
+    def attach(self, modem: 'NbntnModem') -> None:
+        """Start recording the traffic of a modem."""
+        modem.recorder = self
+
+    def detach(self, modem: 'NbntnModem') -> None:
+        """Stop recording the traffic of a modem."""
+        if modem.recorder is self:
+            modem.recorder = None
+
+    def records(self) -> list[TrafficRecord]:
+        """Get the records in the ring buffer, oldest first."""
+        with self._lock:
+            return list(self._buffer)
+
+    def dump(self, path: 'str|Path') -> int:
+        """Write the ring buffer to a new recording file.
+
+        Returns:
+            The number of records written.
+        """
+        records = self.records()
+        with open(path, 'wb') as f:
+            write_records(f, records)
+        return len(records)
+
+    def flush(self) -> None:
+        """Flush records appended to the file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        """Close the file, if any."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ReplayMismatch(ValueError):
+    """A command differs from the next command of the recording."""
+
+
+class TrafficReplayer:
+    """Answers modem commands from a recording."""
+    def __init__(self,
+                 records: 'Iterable[TrafficRecord]|str|Path',
+                 speed: float = 0,
+                 strict: bool = True):
+        """Create the replayer.
+
+        Args:
+            records (Iterable[TrafficRecord]|str|Path): The records or a
+                recording file.
+            speed (float): The replay speed relative to the recording e.g.
+                1 for real time, or 0 as fast as possible.
+            strict (bool): If True a command not matching the next recorded
+                command raises `ReplayMismatch`, otherwise recorded commands
+                are skipped to the next match.
+        """
+        if not isinstance(speed, (int, float)) or speed < 0:
+            raise ValueError('Invalid speed')
+        if isinstance(records, (str, Path)):
+            records = read_records(records)
+        self._records: list[TrafficRecord] = []
+        offset = last = 0.0
+        for record in records:   # sessions continue on one timeline
+            if record.kind == TrafficKind.SESSION:
+                offset = last
+                continue
+            last = record.timestamp + offset
+            if offset:
+                record = replace(record, timestamp=last)
+            self._records.append(record)
+        self._speed = speed
+        self._strict = strict
+        self._index = 0
+        self._clock: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        """The number of records not yet replayed."""
+        return len(self._records) - self._index
+
+    @property
+    def finished(self) -> bool:
+        return self._index >= len(self._records)
+
+    def attach(self, modem: 'NbntnModem') -> None:
+        """Answer the commands of a modem from the recording."""
+        modem.replayer = self
+
+    def detach(self, modem: 'NbntnModem') -> None:
+        """Restore the serial transport of a modem."""
+        if modem.replayer is self:
+            modem.replayer = None
+
+    def _wait(self, record: TrafficRecord) -> None:
+        """Sleep until the record is due at the replay speed."""
+        if not self._speed:
+            return
+        now = time.monotonic()
+        if self._clock is None:
+            self._clock = now - record.timestamp / self._speed
+        delay = self._clock + record.timestamp / self._speed - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def _deliver(self, modem: 'NbntnModem', record: TrafficRecord) -> None:
+        self._wait(record)
+        modem.inject_urc(f'\r\n{record.data}\r\n')
+
+    def feed_urcs(self, modem: 'NbntnModem', to_end: bool = False) -> int:
+        """Deliver URCs recorded before the next command, or all remaining.
+
+        Returns:
+            The number of URCs delivered.
+        """
+        count = 0
+        with self._lock:
+            while not self.finished:
+                record = self._records[self._index]
+                if record.kind != TrafficKind.URC:
+                    if not to_end:
+                        break
+                    self._index += 1
+                    continue
+                self._index += 1
+                self._deliver(modem, record)
+                count += 1
+        return count
+
+    def respond(self,
+                modem: 'NbntnModem',
+                command: str,
+                timeout: Optional[float] = None) -> AtResponse:
+        """Get the recorded response to a command.
+
+        URCs recorded before the command are delivered to the modem first.
+
+        Raises:
+            `ReplayMismatch` if strict and the command was not the next
+                recorded, or the recording has no more commands.
+            `AtTimeout` if the recorded command timed out.
+            `ConnectionError` or other exception raised by the recorded
+                command, `RuntimeError` if not a builtin.
+        """
+        self.feed_urcs(modem)
+        with self._lock:
+            while not self.finished:
+                record = self._records[self._index]
+                self._index += 1
+                if record.kind == TrafficKind.URC:
+                    self._deliver(modem, record)
+                elif record.kind == TrafficKind.COMMAND:
+                    if record.data == command:
+                        if self._speed and self._clock is None:
+                            self._clock = (time.monotonic() -
+                                           record.timestamp / self._speed)
+                        break
+                    if self._strict:
+                        raise ReplayMismatch(f'Expected {record.data}'
+                                             f' got {command}')
+            else:
+                raise ReplayMismatch(f'No recorded command {command}')
+            start = record.timestamp
+            response = None
+            while not self.finished:   # URCs received during the command
+                record = self._records[self._index]
+                if record.kind == TrafficKind.COMMAND:
+                    break
+                self._index += 1
+                if record.kind == TrafficKind.URC:
+                    self._deliver(modem, record)
+                else:
+                    response = record
+                    break
+        if response is None:
+            _log.warning('No recorded response to %s', command)
+            return AtResponse(AtErrorCode.ERR_TIMEOUT)
+        self._wait(response)
+        if response.code == AtErrorCode.ERR_TIMEOUT:
+            raise AtTimeout(f'Replayed timeout of {command}')
+        if response.code == EXCEPTION_CODE:
+            name, _, message = response.data.partition(': ')
+            exc_type = _REPLAYED_EXCEPTIONS.get(name, RuntimeError)
+            raise exc_type(message or f'Replayed {name} of {command}')
+        try:
+            result = AtErrorCode(response.code)
+        except ValueError:
+            result = None
+        return AtResponse(result, response.data or None,
+                          elapsed=response.timestamp - start)
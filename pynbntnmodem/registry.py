@@ -0,0 +1,195 @@
+"""Registry of model-specific `NbntnModem` subclasses.
+
+Maps each `ModuleModel` to the import path of its subclass, from:
+
+* Files in the bundled `modems` package (or other folders) named
+  `<anything>_<model>.py`, indexed by name without executing them.
+* Entry points in the `pynbntnmodem.modems` group of installed packages,
+  named by `ModuleModel` e.g. in a vendor package `pyproject.toml`:
+
+    [project.entry-points."pynbntnmodem.modems"]
+    TYPE1SC = "pynbntnmodem_murata_type1sc:MurataType1sc"
+
+* Explicit `register()` calls.
+
+Later sources take precedence. The index is built on first lookup and only the
+matching subclass is imported by `resolve()`.
+"""
+
+import importlib
+import inspect
+import logging
+import os
+import threading
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional, Type, Union
+
+from .constants import ModuleModel
+
+if TYPE_CHECKING:
+    from .modem import NbntnModem
+
+__all__ = ['ENTRY_POINT_GROUP', 'ModemRegistry', 'modem_registry']
+
+_log = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'pynbntnmodem.modems'
+
+Target = Union[str, Path, type]
+
+
+class ModemRegistry:
+    """Maps `ModuleModel` to a lazily imported `NbntnModem` subclass."""
+    def __init__(self,
+                 folders: Optional[Iterable['str|Path']] = None,
+                 group: Optional[str] = ENTRY_POINT_GROUP,
+                 bundled: bool = True):
+        """Create a registry.
+
+        Args:
+            folders (Iterable[str|Path]): Additional folders of subclass files.
+            group (str): The entry point group, or None to skip entry points.
+            bundled (bool): Include the bundled `pynbntnmodem.modems` package.
+        """
+        self._folders = [Path(f) for f in folders or []]
+        self._group = group
+        self._bundled = bundled
+        self._registered: dict[ModuleModel, Target] = {}
+        self._index: Optional[dict[ModuleModel, Target]] = None
+        self._resolved: dict[ModuleModel, Type['NbntnModem']] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _scan_folder(folder: Path, package: str = '') -> dict[ModuleModel, Target]:
+        """Index subclass files of a folder by name, without executing them."""
+        found: dict[ModuleModel, Target] = {}
+        try:
+            names = [e.name for e in os.scandir(folder)
+                     if e.is_file() and e.name.endswith('.py')]
+        except OSError:
+            return found
+        for model in ModuleModel:
+            if model == ModuleModel.UNKNOWN:
+                continue
+            tag = f'{model.name.lower()}.py'
+            name = next((n for n in sorted(names) if n.endswith(tag)), None)
+            if name is None:
+                continue
+            if package:
+                found[model] = f'{package}.{name[:-3]}'
+            else:
+                found[model] = folder / name
+        return found
+
+    def _build(self) -> dict[ModuleModel, Target]:
+        with self._lock:
+            if self._index is not None:
+                return self._index
+            index: dict[ModuleModel, Target] = {}
+            if self._bundled:
+                from . import modems
+                index.update(self._scan_folder(Path(modems.__path__[0]),
+                                               modems.__name__))
+            for folder in self._folders:
+                index.update(self._scan_folder(folder))
+            if self._group:
+                for ep in entry_points(group=self._group):
+                    try:
+                        index[ModuleModel[ep.name.upper()]] = ep.value
+                    except KeyError:
+                        _log.warning('Ignoring entry point %s for unknown'
+                                     ' model', ep.name)
+            index.update(self._registered)
+            self._index = index
+            _log.debug('Modem registry built with %d models', len(index))
+            return index
+
+    def refresh(self) -> None:
+        """Rebuild the index on next lookup e.g. after installing files."""
+        with self._lock:
+            self._index = None
+            self._resolved.clear()
+
+    def register(self, model: ModuleModel, target: Target) -> None:
+        """Register a subclass for a model.
+
+        Args:
+            model (ModuleModel): The model.
+            target (str|Path|type): The subclass, its import path
+                `module:Class`, a module path, or a file path.
+        """
+        if not isinstance(model, ModuleModel) or model == ModuleModel.UNKNOWN:
+            raise ValueError('Invalid ModuleModel')
+        if not isinstance(target, (str, Path, type)):
+            raise ValueError('Invalid target')
+        with self._lock:
+            self._registered[model] = target
+            if self._index is not None:
+                self._index[model] = target
+            self._resolved.pop(model, None)
+
+    def unregister(self, model: ModuleModel) -> None:
+        """Remove an explicit registration."""
+        with self._lock:
+            self._registered.pop(model, None)
+            self.refresh()
+
+    def models(self) -> list[ModuleModel]:
+        """Get the models with a registered subclass."""
+        return list(self._build())
+
+    def get(self, model: ModuleModel) -> Optional[Target]:
+        """Get the registered target for a model without importing it."""
+        return self._build().get(model)
+
+    def __contains__(self, model: ModuleModel) -> bool:
+        return model in self._build()
+
+    def resolve(self, model: ModuleModel) -> Optional[Type['NbntnModem']]:
+        """Import and get the subclass for a model.
+
+        Returns:
+            The subclass, or None if not registered or unable to load.
+        """
+        with self._lock:
+            if model in self._resolved:
+                return self._resolved[model]
+            target = self._build().get(model)
+            if target is None:
+                return None
+            try:
+                cls = self._load(model, target)
+            except Exception as exc:
+                _log.error('Unable to load %s subclass from %s: %s',
+                           model.name, target, exc)
+                return None
+            if cls is not None:
+                self._resolved[model] = cls
+            return cls
+
+    @staticmethod
+    def _load(model: ModuleModel, target: Target) -> Optional[Type['NbntnModem']]:
+        from .modem import NbntnModem
+        if isinstance(target, type):
+            return target if issubclass(target, NbntnModem) else None
+        if isinstance(target, Path):
+            from .loader import load_module_from_path
+            module = load_module_from_path(target)
+            class_name = ''
+        else:
+            module_name, _, class_name = target.partition(':')
+            module = importlib.import_module(module_name)
+        if class_name:
+            cls = getattr(module, class_name, None)
+            if inspect.isclass(cls) and issubclass(cls, NbntnModem):
+                return cls
+            return None
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if (issubclass(cls, NbntnModem) and
+                getattr(cls, '_model', None) == model):
+                return cls
+        return None
+
+
+modem_registry = ModemRegistry()
@@ -0,0 +1,348 @@
+"""Local cache of modem subclass sources fetched from Git repositories.
+
+Sources are stored per repository and commit with the SHA-256 of each file
+and a digest of the whole tree, so they can be resolved and verified offline:
+
+    <cache dir>/repos/<name>-<url hash>/
+        refs.json           latest commit fetched per branch
+        <commit>.json       manifest of file hashes and tree digest
+        <commit>/           Python sources excluding tests and examples
+
+Credentials embedded in repository URLs are never stored.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from .modelcache import default_cache_dir
+
+__all__ = ['RepoCache', 'RepoSnapshot', 'sanitize_url']
+
+_log = logging.getLogger(__name__)
+
+EXCLUDED_DIRS = ('.git', 'tests', 'examples')
+
+
+def sanitize_url(url: str) -> str:
+    """Remove any credentials from a repository URL."""
+    parts = urlsplit(url)
+    if not parts.netloc or '@' not in parts.netloc:
+        return url
+    netloc = parts.netloc.rsplit('@', 1)[1]
+    return urlunsplit((parts.scheme, netloc, parts.path, parts.query,
+                       parts.fragment))
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def tree_digest(files: dict[str, str]) -> str:
+    """Get a digest of relative file paths and their SHA-256 hashes."""
+    digest = hashlib.sha256()
+    for name in sorted(files):
+        digest.update(f'{name}\0{files[name]}\n'.encode())
+    return digest.hexdigest()
+
+
+def _write_json(path: Path, data: dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+@dataclass(frozen=True)
+class RepoSnapshot:
+    """Cached sources of a repository commit.
+
+    Attributes:
+        url (str): The repository URL without credentials.
+        branch (str): The branch fetched.
+        commit (str): The commit hash.
+        digest (str): The SHA-256 tree digest of the sources.
+        path (Path): The folder containing the sources.
+        fetched (float): The unix time fetched.
+    """
+    url: str
+    branch: str
+    commit: str
+    digest: str
+    path: Path
+    fetched: float
+
+    def files(self) -> list[Path]:
+        """Get the Python source files of the snapshot."""
+        return sorted(self.path.rglob('*.py'))
+
+
+class RepoCache:
+    """Fetches and caches subclass repositories for offline use."""
+    def __init__(self,
+                 root: 'str|Path|None' = None,
+                 timeout: float = 120,
+                 max_workers: int = 4):
+        """Create the cache.
+
+        Args:
+            root (str|Path): Optional folder, defaults to `repos` within
+                `default_cache_dir()`.
+            timeout (float): Maximum seconds for each git operation.
+            max_workers (int): Maximum concurrent fetches.
+        """
+        self._root = Path(root) if root else default_cache_dir() / 'repos'
+        self._timeout = timeout
+        self._max_workers = max(1, max_workers)
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _repo_dir(self, url: str) -> Path:
+        clean = sanitize_url(url)
+        name = clean.rstrip('/').split('/')[-1]
+        if name.endswith('.git'):
+            name = name[:-4]
+        key = hashlib.sha256(clean.encode()).hexdigest()[:12]
+        return self._root / f'{name}-{key}'
+
+    def _lock(self, url: str) -> threading.Lock:
+        key = sanitize_url(url)
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _read_json(self, path: Path) -> dict:
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as exc:
+            _log.warning('Ignoring invalid %s: %s', path, exc)
+            return {}
+
+    def _snapshot(self, url: str, branch: str, commit: str) -> Optional[RepoSnapshot]:
+        repo_dir = self._repo_dir(url)
+        manifest = self._read_json(repo_dir / f'{commit}.json')
+        if not manifest:
+            return None
+        return RepoSnapshot(sanitize_url(url), branch, commit,
+                            manifest.get('digest', ''), repo_dir / commit,
+                            manifest.get('fetched', 0))
+
+    def verify(self, snapshot: RepoSnapshot) -> bool:
+        """Check the snapshot files match the hashes recorded when fetched."""
+        manifest = self._read_json(snapshot.path.parent /
+                                   f'{snapshot.commit}.json')
+        files: dict[str, str] = manifest.get('files', {})
+        if not files or tree_digest(files) != snapshot.digest:
+            return False
+        try:
+            actual = {str(p.relative_to(snapshot.path)): _file_hash(p)
+                      for p in snapshot.files()}
+        except OSError:
+            return False
+        return actual == files
+
+    def resolve(self,
+                url: str,
+                branch: str = 'main',
+                verify: bool = True) -> Optional[RepoSnapshot]:
+        """Get the latest cached snapshot of a branch without network access.
+
+        Returns:
+            The snapshot, or None if not cached or failing verification.
+        """
+        refs = self._read_json(self._repo_dir(url) / 'refs.json')
+        commit = refs.get(branch)
+        if not commit:
+            return None
+        snapshot = self._snapshot(url, branch, commit)
+        if snapshot is None:
+            return None
+        if verify and not self.verify(snapshot):
+            _log.warning('Cached %s@%s failed verification',
+                         snapshot.url, commit[:8])
+            return None
+        return snapshot
+
+    def _git(self, *args: str) -> subprocess.CompletedProcess:
+        env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+        return subprocess.run(['git', *args], stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, text=True, env=env,
+                              timeout=self._timeout, check=False)
+
+    def _remote_commit(self, url: str, branch: str) -> str:
+        """Get the latest commit of a remote branch, or '' if unavailable."""
+        try:
+            result = self._git('ls-remote', url, f'refs/heads/{branch}')
+        except (OSError, subprocess.TimeoutExpired):
+            return ''
+        if result.returncode != 0:
+            return ''
+        return result.stdout.split('\t', 1)[0].strip()
+
+    def fetch(self, url: str, branch: str = 'main') -> Optional[RepoSnapshot]:
+        """Fetch the latest commit of a branch into the cache.
+
+        The remote branch is checked with `git ls-remote` first, and only
+        cloned if its commit differs from the verified cached snapshot.
+
+        Returns:
+            The snapshot, or None if the fetch failed.
+        """
+        clean = sanitize_url(url)
+        repo_dir = self._repo_dir(url)
+        with self._lock(url):
+            remote = self._remote_commit(url, branch)
+            refs = self._read_json(repo_dir / 'refs.json')
+            if remote and refs.get(branch) == remote:
+                snapshot = self._snapshot(url, branch, remote)
+                if snapshot is not None and self.verify(snapshot):
+                    _log.debug('Cached %s@%s is up to date', clean, remote[:8])
+                    return snapshot
+            repo_dir.mkdir(parents=True, exist_ok=True)
+            with tempfile.TemporaryDirectory(dir=repo_dir) as staging:
+                source = Path(staging) / 'source'
+                try:
+                    result = self._git('clone', '--depth', '1', '--branch',
+                                       branch, url, str(source))
+                except (OSError, subprocess.TimeoutExpired) as exc:
+                    _log.error('Failed to clone %s: %s', clean, exc)
+                    return None
+                if result.returncode != 0:
+                    _log.error('Failed to clone %s: %s', clean,
+                               result.stderr.replace(url, clean).strip())
+                    return None
+                commit = self._git('-C', str(source), 'rev-parse',
+                                   'HEAD').stdout.strip()
+                if not commit:
+                    _log.error('Unable to determine commit of %s', clean)
+                    return None
+                snapshot = self._snapshot(url, branch, commit)
+                if snapshot is None or not self.verify(snapshot):
+                    snapshot = self._store(url, branch, commit, source,
+                                           Path(staging))
+            refs = self._read_json(repo_dir / 'refs.json')
+            refs[branch] = commit
+            _write_json(repo_dir / 'refs.json', refs)
+        _log.debug('Cached %s@%s', clean, commit[:8])
+        return snapshot
+
+    def _store(self,
+               url: str,
+               branch: str,
+               commit: str,
+               source: Path,
+               staging: Path) -> RepoSnapshot:
+        """Copy the sources of a clone into the cache."""
+        repo_dir = self._repo_dir(url)
+        target = staging / commit
+        files: dict[str, str] = {}
+        for path in sorted(source.rglob('*.py')):
+            relative = path.relative_to(source)
+            if any(part in EXCLUDED_DIRS for part in relative.parts[:-1]):
+                continue
+            dest = target / relative
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, dest)
+            files[str(relative)] = _file_hash(dest)
+        target.mkdir(exist_ok=True)
+        final = repo_dir / commit
+        if final.exists():
+            shutil.rmtree(final)   # failed verification
+        os.replace(target, final)
+        fetched = time.time()
+        digest = tree_digest(files)
+        _write_json(repo_dir / f'{commit}.json', {
+            'url': sanitize_url(url),
+            'branch': branch,
+            'commit': commit,
+            'digest': digest,
+            'files': files,
+            'fetched': fetched,
+        })
+        return RepoSnapshot(sanitize_url(url), branch, commit, digest, final,
+                            fetched)
+
+    def fetch_all(self,
+                  urls: Iterable[str],
+                  branch: str = 'main') -> dict[str, Optional[RepoSnapshot]]:
+        """Fetch several repositories concurrently.
+
+        Returns:
+            A dictionary of snapshot or None per URL requested.
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        workers = min(self._max_workers, len(urls))
+        with ThreadPoolExecutor(workers, 'repo_fetch') as executor:
+            results = executor.map(lambda u: self.fetch(u, branch), urls)
+            return dict(zip(urls, results))
+
+    def refresh(self,
+                urls: Iterable[str],
+                branch: str = 'main',
+                on_update: Optional[Callable[[str, RepoSnapshot], None]] = None,
+                ) -> threading.Thread:
+        """Fetch repositories in a background thread.
+
+        Args:
+            urls (Iterable[str]): The repository URLs.
+            branch (str): The branch to fetch.
+            on_update (Callable[[str, RepoSnapshot], None]): Optional callback
+                with the URL and snapshot when a different commit is fetched.
+
+        Returns:
+            The started daemon thread.
+        """
+        urls = list(urls)
+        previous = {u: self.resolve(u, branch, verify=False) for u in urls}
+        def _refresh():
+            for url, snapshot in self.fetch_all(urls, branch).items():
+                before = previous.get(url)
+                if (snapshot is not None and callable(on_update) and
+                    (before is None or before.commit != snapshot.commit)):
+                    try:
+                        on_update(url, snapshot)
+                    except Exception as exc:
+                        _log.error('Refresh callback failed: %s', exc)
+        thread = threading.Thread(target=_refresh, name='repo_refresh',
+                                  daemon=True)
+        thread.start()
+        return thread
+
+    def prune(self, url: str, keep: int = 2) -> int:
+        """Remove all but the most recently fetched commits of a repository.
+
+        Returns:
+            The number of commits removed.
+        """
+        repo_dir = self._repo_dir(url)
+        with self._lock(url):
+            refs = set(self._read_json(repo_dir / 'refs.json').values())
+            manifests = sorted(repo_dir.glob('*.json'),
+                               key=lambda p: p.stat().st_mtime, reverse=True)
+            manifests = [m for m in manifests if m.name != 'refs.json']
+            removed = 0
+            for manifest in manifests[keep:]:
+                if manifest.stem in refs:
+                    continue
+                shutil.rmtree(repo_dir / manifest.stem, ignore_errors=True)
+                manifest.unlink(missing_ok=True)
+                removed += 1
+            return removed
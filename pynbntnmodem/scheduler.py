@@ -0,0 +1,348 @@
+"""Signal-aware scheduling of uplink messages.
+
+Sending on a poor link often fails or needs retries, costing airtime and
+energy. `UplinkScheduler` holds messages submitted with a deadline and releases
+them, earliest deadline first, when the modem is registered and the
+`SignalQuality` reaches a threshold, or when a deadline forces the send
+regardless of the link.
+
+The link is checked on submission, every `poll_interval` while messages are
+pending, at each deadline and when `wake()` is called, e.g. on a registration
+URC. A failed send is retried no sooner than `poll_interval` later, at up to
+`max_attempts`. `stats()` compares the first-try success rate achieved with the rate
+expected from a per-quality success model, both at the time of sending and at
+the time of submission (i.e. had each message been sent immediately).
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Optional
+
+from .constants import SignalQuality, TransportType, UrcType
+from .structures import MoMessage
+
+if TYPE_CHECKING:
+    from .modem import NbntnModem
+
+__all__ = ['UplinkScheduler']
+
+_log = logging.getLogger(__name__)
+
+# prior probability of first-try success by quality, calibrate by `stats()`
+DEFAULT_SUCCESS_MODEL: dict[SignalQuality, float] = {
+    SignalQuality.NONE: 0.1,
+    SignalQuality.WEAK: 0.4,
+    SignalQuality.LOW: 0.65,
+    SignalQuality.MID: 0.85,
+    SignalQuality.GOOD: 0.93,
+    SignalQuality.STRONG: 0.97,
+    SignalQuality.WARNING: 0.5,
+}
+
+Link = tuple[SignalQuality, bool]
+
+
+@dataclass(eq=False)
+class _Pending:
+    payload: bytes
+    deadline: float
+    kwargs: dict
+    future: Future
+    submitted: float = field(default_factory=time.monotonic)
+    submit_quality: Optional[SignalQuality] = None
+    attempts: int = 0
+    retry_at: float = 0
+
+
+class UplinkScheduler:
+    """Releases uplink messages on a good link or at their deadline."""
+    def __init__(self,
+                 send: Callable[..., Optional[MoMessage]],
+                 link: Callable[[], Link],
+                 threshold: SignalQuality = SignalQuality.MID,
+                 poll_interval: float = 15,
+                 max_attempts: int = 3,
+                 success_model: Optional[dict[SignalQuality, float]] = None):
+        """Create a scheduler.
+
+        Args:
+            send (Callable[..., MoMessage|None]): The function used to send a
+                payload e.g. `modem.send_message_nidd`.
+            link (Callable[[], tuple[SignalQuality, bool]]): Function getting
+                the current signal quality and whether registered.
+            threshold (SignalQuality): The minimum quality to release messages
+                before their deadline.
+            poll_interval (float): Seconds between link checks while pending.
+            max_attempts (int): Attempts per message before it is dropped.
+            success_model (dict): Optional expected first-try success
+                probability by `SignalQuality`.
+        """
+        if not callable(send) or not callable(link):
+            raise ValueError('Invalid send or link callback')
+        if (not isinstance(threshold, SignalQuality) or
+            threshold == SignalQuality.WARNING):
+            raise ValueError('Invalid threshold')
+        if not isinstance(poll_interval, (int, float)) or poll_interval <= 0:
+            raise ValueError('Invalid poll_interval')
+        if not isinstance(max_attempts, int) or max_attempts < 1:
+            raise ValueError('Invalid max_attempts')
+        self._send = send
+        self._link = link
+        self._threshold = threshold
+        self._poll_interval = poll_interval
+        self._max_attempts = max_attempts
+        self._model = dict(DEFAULT_SUCCESS_MODEL)
+        self._model.update(success_model or {})
+        self._cond = threading.Condition()
+        self._pending: list[_Pending] = []
+        self._woken = False
+        self._flush = False
+        self._running = True
+        self._stats = {
+            'submitted': 0,
+            'sent': 0,
+            'forced': 0,
+            'dropped': 0,
+            'first_attempts': 0,
+            'first_successes': 0,
+            'expected': 0.0,
+            'immediate': 0.0,
+            'delay': 0.0,
+        }
+        self._by_quality = {q: [0, 0] for q in SignalQuality}
+        self._on_close: list[Callable[[], None]] = []
+        self._thread = threading.Thread(target=self._run,
+                                        name='uplink_scheduler', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def for_modem(cls,
+                  modem: 'NbntnModem',
+                  transport: TransportType = TransportType.NIDD,
+                  **kwargs) -> 'UplinkScheduler':
+        """Create a scheduler sending via a modem.
+
+        The link is the modem's (cached) registration and signal quality,
+        re-checked on each registration URC. A modem not reporting SINR has
+        quality `WARNING`, so messages are only released at their deadline.
+
+        Args:
+            modem (NbntnModem): The modem.
+            transport (TransportType): NIDD or UDP.
+            **kwargs: Passed to the constructor.
+        """
+        if transport == TransportType.UDP:
+            send = modem.send_message_udp
+        else:
+            send = modem.send_message_nidd
+
+        def link() -> Link:
+            registered = modem.get_reginfo().is_registered()
+            return modem.get_signal_quality(), registered
+
+        scheduler = cls(send, link, **kwargs)
+        subscription = modem.urc_dispatcher.subscribe(
+            lambda urc, urc_type: scheduler.wake(),
+            urc_type=UrcType.REGISTRATION,
+        )
+        scheduler._on_close.append(
+            lambda: modem.urc_dispatcher.unsubscribe(subscription)
+        )
+        return scheduler
+
+    @property
+    def threshold(self) -> SignalQuality:
+        return self._threshold
+
+    @threshold.setter
+    def threshold(self, quality: SignalQuality):
+        if (not isinstance(quality, SignalQuality) or
+            quality == SignalQuality.WARNING):
+            raise ValueError('Invalid threshold')
+        self._threshold = quality
+        self.wake()
+
+    @property
+    def pending(self) -> int:
+        """The number of messages waiting to be sent."""
+        with self._cond:
+            return len(self._pending)
+
+    def submit(self, payload: bytes, deadline: float = 300, **kwargs) -> Future:
+        """Queue a message to send by a deadline.
+
+        Args:
+            payload (bytes): The message payload.
+            deadline (float): Maximum seconds to wait for a good link.
+            **kwargs: Passed to the send function e.g. `rai`.
+
+        Returns:
+            A `Future` of the `MoMessage`, or None if dropped after
+                `max_attempts` failures.
+        """
+        if not isinstance(payload, (bytes, bytearray)):
+            raise ValueError('Invalid payload must be bytes')
+        if not isinstance(deadline, (int, float)) or deadline < 0:
+            raise ValueError('Invalid deadline')
+        future: Future = Future()
+        with self._cond:
+            if not self._running:
+                raise ConnectionError('Scheduler closed')
+            self._pending.append(_Pending(bytes(payload),
+                                          time.monotonic() + deadline,
+                                          kwargs, future))
+            self._stats['submitted'] += 1
+            self._woken = True
+            self._cond.notify()
+        return future
+
+    def wake(self) -> None:
+        """Check the link now, e.g. on a registration change."""
+        with self._cond:
+            self._woken = True
+            self._cond.notify()
+
+    def flush(self) -> None:
+        """Release all pending messages now regardless of the link."""
+        with self._cond:
+            self._flush = True
+            self._woken = True
+            self._cond.notify()
+
+    def close(self, flush: bool = False, timeout: Optional[float] = None) -> None:
+        """Stop the scheduler.
+
+        Args:
+            flush (bool): Send pending messages first, otherwise they are
+                cancelled.
+            timeout (float): Maximum seconds to wait for the flush.
+        """
+        if flush:
+            self.flush()
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join(timeout)
+        with self._cond:
+            for pending in self._pending:
+                pending.future.cancel()
+            self._pending.clear()
+        for callback in self._on_close:
+            callback()
+        self._on_close.clear()
+
+    def _check_link(self) -> Link:
+        try:
+            quality, registered = self._link()
+            return SignalQuality(quality), bool(registered)
+        except Exception as exc:
+            _log.warning('Link check failed: %s', exc)
+            return SignalQuality.WARNING, False
+
+    def _wait(self) -> None:
+        """Wait for a submission, wake, poll interval or deadline."""
+        with self._cond:
+            if self._woken or not self._running:
+                return
+            timeout = None
+            if self._pending:
+                earliest = min(p.deadline for p in self._pending)
+                timeout = min(self._poll_interval,
+                              max(0.0, earliest - time.monotonic()))
+            self._cond.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            self._wait()
+            with self._cond:
+                if not self._running and not self._flush:
+                    return
+                self._woken = False
+                flush = self._flush
+                self._flush = False
+                if not self._pending:
+                    continue
+            quality, registered = self._check_link()
+            good = (registered and quality != SignalQuality.WARNING and
+                    quality >= self._threshold)
+            now = time.monotonic()
+            with self._cond:
+                for pending in self._pending:
+                    if pending.submit_quality is None:
+                        pending.submit_quality = quality
+                queue = sorted(self._pending, key=lambda p: p.deadline)
+            if not flush:
+                queue = [p for p in queue if p.retry_at <= now and
+                         (good or p.deadline <= now)]
+            for pending in queue:
+                if not self._attempt(pending, quality, good or flush) and good:
+                    self.wake()   # re-check the link before continuing
+                    break
+
+    def _attempt(self, pending: _Pending, quality: SignalQuality, good: bool) -> bool:
+        """Send a message, returning True if successful."""
+        first = pending.attempts == 0
+        pending.attempts += 1
+        try:
+            message = self._send(pending.payload, **pending.kwargs)
+        except Exception as exc:
+            _log.error('Failed to send scheduled uplink: %s', exc)
+            message = None
+        success = message is not None
+        with self._cond:
+            stats = self._stats
+            if first:
+                stats['first_attempts'] += 1
+                stats['first_successes'] += int(success)
+                stats['expected'] += self._model.get(quality, 0)
+                stats['immediate'] += self._model.get(
+                    pending.submit_quality or quality, 0)
+                self._by_quality[quality][0] += 1
+                self._by_quality[quality][1] += int(success)
+                if not good:
+                    stats['forced'] += 1
+            if success:
+                stats['sent'] += 1
+                stats['delay'] += time.monotonic() - pending.submitted
+            elif pending.attempts >= self._max_attempts:
+                stats['dropped'] += 1
+                _log.error('Dropped uplink after %d attempts', pending.attempts)
+            else:   # retry on a good link or at the deadline, backing off
+                pending.retry_at = time.monotonic() + self._poll_interval
+                pending.deadline = max(pending.deadline, pending.retry_at)
+            if success or pending.attempts >= self._max_attempts:
+                self._pending.remove(pending)
+                pending.future.set_result(message)
+        return success
+
+    def stats(self) -> dict:
+        """Get counters and first-try success rates.
+
+        Returns:
+            A dictionary with counts of `submitted`, `sent`, `forced` (sent at
+            deadline on a poor link) and `dropped` messages, `mean_delay`
+            seconds to a successful send, and first-try success rates
+            `actual_success_rate`, `expected_success_rate` from the model at
+            the quality when sent, and `immediate_success_rate` from the model
+            at the quality when submitted, with `by_quality` attempts and
+            successes to calibrate the model.
+        """
+        with self._cond:
+            stats = dict(self._stats)
+            by_quality = {q.name: {'attempts': a, 'successes': s}
+                          for q, (a, s) in self._by_quality.items() if a}
+        attempts = stats.pop('first_attempts')
+        successes = stats.pop('first_successes')
+        expected = stats.pop('expected')
+        immediate = stats.pop('immediate')
+        delay = stats.pop('delay')
+        stats['mean_delay'] = delay / stats['sent'] if stats['sent'] else 0.0
+        stats['actual_success_rate'] = successes / attempts if attempts else 0.0
+        stats['expected_success_rate'] = expected / attempts if attempts else 0.0
+        stats['immediate_success_rate'] = (immediate / attempts
+                                           if attempts else 0.0)
+        stats['by_quality'] = by_quality
+        return stats
@@ -0,0 +1,262 @@
+"""Fixed-memory time series of signal information.
+
+`SignalHistory` keeps periodic `SigInfo` samples in a ring buffer of typed
+arrays rather than a list of objects: a 4-byte unix time, 2-byte RSRP and
+RSSI, RSRQ and SINR in tenths of a dB, and BER in hundredths of a percent, so
+14 bytes per sample regardless of history length (about 5 KB for 6 hours at
+one sample a minute).
+
+Statistics are computed over array slices with C-implemented builtins
+(`sum`, `sorted`, `bisect`, `itertools.accumulate`) and exclude samples with
+the invalid value of a field, e.g. SINR 255.
+"""
+
+import logging
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, compress, repeat
+from typing import Iterable, Optional
+
+from .constants import SignalLevel, SignalQuality
+from .structures import SigInfo
+
+__all__ = ['SignalHistory', 'signal_quality']
+
+_log = logging.getLogger(__name__)
+
+FIELDS = ('rsrp', 'rsrq', 'sinr', 'rssi', 'ber')
+_TYPECODES = {'rsrp': 'h', 'rsrq': 'h', 'sinr': 'h', 'rssi': 'h', 'ber': 'H'}
+_INVALID = {'rsrp': 255, 'rsrq': 2550, 'sinr': 2550, 'rssi': 99, 'ber': 9900}
+_SCALE = {'rsrq': 10, 'sinr': 10, 'ber': 100}   # stored as integer fractions
+
+# SINR lower bounds of SignalQuality WEAK..STRONG then WARNING if invalid
+_QUALITY_BOUNDS = (
+    SignalLevel.BARS_1.value,
+    SignalLevel.BARS_2.value,
+    SignalLevel.BARS_3.value,
+    SignalLevel.BARS_4.value,
+    SignalLevel.BARS_5.value,
+    SignalLevel.INVALID.value,
+)
+
+
+def signal_quality(sinr: 'int|float') -> SignalQuality:
+    """Get the qualitative `SignalQuality` of a SINR value."""
+    return SignalQuality(bisect_right(_QUALITY_BOUNDS, sinr))
+
+
+class SignalHistory:
+    """A ring buffer of `SigInfo` samples with vectorized statistics."""
+    def __init__(self, capacity: int = 360):
+        """Create the history.
+
+        Args:
+            capacity (int): The maximum samples kept, oldest are overwritten.
+        """
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError('Invalid capacity')
+        self._capacity = capacity
+        self._times = array('I', bytes(4 * capacity))
+        self._fields = {f: array(_TYPECODES[f], [_INVALID[f]]) * capacity
+                        for f in FIELDS}
+        self._head = 0   # next write index
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def nbytes(self) -> int:
+        """The memory used by the sample arrays in bytes."""
+        return (self._times.itemsize * self._capacity +
+                sum(a.itemsize * self._capacity for a in self._fields.values()))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        """Remove all samples."""
+        self._head = 0
+        self._size = 0
+
+    def append(self, siginfo: SigInfo, timestamp: Optional[float] = None) -> None:
+        """Add a sample, in time order.
+
+        Args:
+            siginfo (SigInfo): The signal information.
+            timestamp (float): The unix time of the sample, default now.
+        """
+        if not isinstance(siginfo, SigInfo):
+            raise ValueError('Invalid SigInfo')
+        i = self._head
+        self._times[i] = int(time.time() if timestamp is None else timestamp)
+        for f in FIELDS:
+            value = getattr(siginfo, f)
+            try:   # e.g. SINR 3.5 is stored as 35
+                self._fields[f][i] = int(round(value * _SCALE.get(f, 1)))
+            except (OverflowError, TypeError, ValueError):
+                self._fields[f][i] = _INVALID[f]
+        self._head = (i + 1) % self._capacity
+        if self._size < self._capacity:
+            self._size += 1
+
+    def extend(self, samples: Iterable[tuple[float, SigInfo]]) -> None:
+        """Add (timestamp, SigInfo) samples."""
+        for timestamp, siginfo in samples:
+            self.append(siginfo, timestamp)
+
+    def _ordered(self, arr: array) -> array:
+        """Get the samples of an array oldest first."""
+        if self._size < self._capacity:
+            return arr[:self._size]
+        return arr[self._head:] + arr[:self._head]
+
+    def _start(self, times: array, window: float, now: Optional[float]) -> int:
+        if not window:
+            return 0
+        if now is None:
+            now = times[-1] if times else time.time()
+        return bisect_left(times, now - window)
+
+    def timestamps(self, window: float = 0, now: Optional[float] = None) -> array:
+        """Get the sample unix times oldest first.
+
+        Args:
+            window (float): Seconds before `now` to include, or 0 for all.
+            now (float): The window end, default the latest sample.
+        """
+        times = self._ordered(self._times)
+        return times[self._start(times, window, now):]
+
+    def values(self,
+               field: str,
+               window: float = 0,
+               now: Optional[float] = None,
+               valid: bool = True) -> 'array|list[float]':
+        """Get the values of a field oldest first.
+
+        Args:
+            field (str): One of `rsrp`, `rsrq`, `sinr`, `rssi` or `ber`.
+            window (float): Seconds before `now` to include, or 0 for all.
+            now (float): The window end, default the latest sample.
+            valid (bool): Exclude samples with the invalid value.
+
+        Returns:
+            An array of integer values, or a list of floats for `rsrq`,
+            `sinr` and `ber`.
+        """
+        if field not in self._fields:
+            raise ValueError(f'Invalid field {field}')
+        times = self._ordered(self._times)
+        values = self._ordered(self._fields[field])
+        values = values[self._start(times, window, now):]
+        if valid:
+            invalid = _INVALID[field]
+            values = array(values.typecode,
+                           compress(values, map(invalid.__ne__, values)))
+        if field in _SCALE:
+            scale = _SCALE[field]
+            return [v / scale for v in values]
+        return values
+
+    def mean(self, field: str, window: float = 0, **kwargs) -> Optional[float]:
+        """Get the mean of valid values, or None if there are none."""
+        values = self.values(field, window, kwargs.get('now'))
+        return sum(values) / len(values) if values else None
+
+    def rolling_mean(self, field: str, size: int) -> list[float]:
+        """Get the mean of each `size` consecutive valid values.
+
+        Returns:
+            A list of `len(values) - size + 1` means, oldest first.
+        """
+        if not isinstance(size, int) or size < 1:
+            raise ValueError('Invalid size')
+        values = self.values(field)
+        if len(values) < size:
+            return []
+        totals = list(accumulate(values, initial=0))
+        return [(b - a) / size for a, b in zip(totals, totals[size:])]
+
+    def percentile(self,
+                   field: str,
+                   q: float,
+                   window: float = 0,
+                   **kwargs) -> Optional[float]:
+        """Get a percentile of valid values with linear interpolation.
+
+        Args:
+            field (str): The field name.
+            q (float): The percentile 0..100.
+            window (float): Seconds before the latest sample, or 0 for all.
+
+        Returns:
+            The percentile, or None if there are no valid values.
+        """
+        if not 0 <= q <= 100:
+            raise ValueError('Percentile must be 0..100')
+        values = sorted(self.values(field, window, kwargs.get('now')))
+        if not values:
+            return None
+        rank = (len(values) - 1) * q / 100
+        low = int(rank)
+        high = min(low + 1, len(values) - 1)
+        return values[low] + (values[high] - values[low]) * (rank - low)
+
+    def ewma(self, field: str, alpha: float = 0.1) -> Optional[float]:
+        """Get the exponentially weighted moving average of valid values.
+
+        Args:
+            field (str): The field name.
+            alpha (float): The smoothing factor 0..1 of the newest value.
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError('alpha must be 0..1')
+        values = self.values(field)
+        if not values:
+            return None
+        decay = 1 - alpha
+        for average in accumulate(values, lambda a, v: decay * a + alpha * v):
+            pass
+        return average
+
+    def quality(self, window: float = 0, **kwargs) -> list[SignalQuality]:
+        """Classify every sample by SINR as `NbntnModem.get_signal_quality`.
+
+        Samples without a valid SINR are `WARNING`.
+        """
+        sinr = self.values('sinr', window, kwargs.get('now'), valid=False)
+        return list(map(SignalQuality,
+                        map(bisect_right, repeat(_QUALITY_BOUNDS), sinr)))
+
+    def quality_counts(self, window: float = 0, **kwargs) -> dict[SignalQuality, int]:
+        """Get the number of samples per `SignalQuality`."""
+        counts = dict.fromkeys(SignalQuality, 0)
+        for quality in self.quality(window, **kwargs):
+            counts[quality] += 1
+        return counts
+
+    def latest(self) -> Optional[SigInfo]:
+        """Get the most recent sample."""
+        if not self._size:
+            return None
+        i = (self._head - 1) % self._capacity
+        kwargs = {f: self._fields[f][i] for f in FIELDS}
+        for f, scale in _SCALE.items():
+            kwargs[f] /= scale
+        return SigInfo(**kwargs)
+
+    def export(self, window: float = 0, **kwargs) -> dict[str, list]:
+        """Get all samples as lists by field, including invalid values.
+
+        Returns:
+            A dictionary of `timestamp` and each field, oldest first.
+        """
+        now = kwargs.get('now')
+        data = {'timestamp': self.timestamps(window, now).tolist()}
+        for f in FIELDS:
+            values = self.values(f, window, now, valid=False)
+            data[f] = values if isinstance(values, list) else values.tolist()
+        return data
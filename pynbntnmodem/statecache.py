@@ -0,0 +1,240 @@
+"""Cache of modem state to avoid repeated AT queries.
+
+Each cached attribute has a `CachePolicy` defining how long a value remains
+fresh (static or time-to-live) and which events invalidate it. Events are
+either a `UrcType` received by the modem, or the name of an operation such as
+`set_context` or `reboot`.
+"""
+
+import copy
+import functools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, Optional, Union
+
+from .constants import UrcType
+
+__all__ = ['CachePolicy', 'StateCache', 'cached', 'set_command_events']
+
+_log = logging.getLogger(__name__)
+
+CacheEvent = Union[UrcType, str]
+
+REBOOT = 'reboot'   # invalidates all entries including static
+_RESETS = ('Z', '&F')
+
+
+def set_command_events(command: str) -> list[CacheEvent]:
+    """Get the cache events of the set (non-query) commands in a line.
+
+    The event of a set command is its verb, for example `AT+CFUN=1;+CEREG?`
+    is `['+CFUN']`, while `ATZ` or `AT&F` is a reboot.
+    """
+    upper = command.upper()
+    if '=' not in upper and 'Z' not in upper and '&F' not in upper:
+        return []
+    line = command.strip()
+    if line[:2].upper() == 'AT':
+        line = line[2:]
+    events: list[CacheEvent] = []
+    for part in line.split(';'):
+        name, sep, params = part.partition('=')
+        name = name.strip().upper()
+        if name.rstrip('0') in _RESETS:
+            events.append(REBOOT)
+        elif sep and not params.startswith('?') and name:
+            events.append(name)
+    return events
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Freshness policy for a cached attribute.
+
+    Attributes:
+        ttl (float|None): Seconds a value remains fresh, `None` for static.
+        events (tuple): Events (`UrcType` or operation name) that invalidate
+            the value.
+    """
+    ttl: Optional[float] = None
+    events: tuple[CacheEvent, ...] = ()
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    timestamp: float = field(default_factory=time.monotonic)
+
+
+class StateCache:
+    """A thread-safe cache of modem attributes with per-key policies."""
+
+    def __init__(self,
+                 policies: Optional[dict[str, CachePolicy]] = None,
+                 enabled: bool = True) -> None:
+        """Create the cache.
+
+        Args:
+            policies (dict[str, CachePolicy]): Policy per attribute name.
+                Attributes without a policy are not cached.
+            enabled (bool): If False, every `get` calls its loader.
+        """
+        self._policies: dict[str, CachePolicy] = dict(policies or {})
+        self._entries: dict[str, _CacheEntry] = {}
+        self._hits: dict[str, int] = {}
+        self._misses: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.enabled = enabled
+
+    @property
+    def policies(self) -> dict[str, CachePolicy]:
+        return dict(self._policies)
+
+    def set_policy(self, key: str, policy: Optional[CachePolicy]) -> None:
+        """Add, replace or remove (`None`) the policy for an attribute."""
+        with self._lock:
+            if policy is None:
+                self._policies.pop(key, None)
+            elif not isinstance(policy, CachePolicy):
+                raise ValueError('Invalid CachePolicy')
+            else:
+                self._policies[key] = policy
+            self._entries.pop(key, None)
+
+    def _is_fresh(self, key: str, entry: _CacheEntry) -> bool:
+        policy = self._policies.get(key)
+        if policy is None:
+            return False
+        if policy.ttl is None:
+            return True
+        return time.monotonic() - entry.timestamp < policy.ttl
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Get a fresh cached value, or load and cache it.
+
+        Empty or `None` values returned by the loader are not cached.
+
+        Args:
+            key (str): The attribute name.
+            loader (Callable): Queries the modem for the current value.
+        """
+        hit, value = self._lookup(key)
+        if hit:
+            return value
+        return self._store(key, loader())
+
+    async def get_async(self,
+                        key: str,
+                        loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Get a fresh cached value, or await the loader and cache it.
+
+        Args:
+            key (str): The attribute name.
+            loader (Callable): Coroutine function querying the modem.
+        """
+        hit, value = self._lookup(key)
+        if hit:
+            return value
+        return self._store(key, await loader())
+
+    def _lookup(self, key: str) -> tuple[bool, Any]:
+        if self.enabled and key in self._policies:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and self._is_fresh(key, entry):
+                    self._hits[key] = self._hits.get(key, 0) + 1
+                    return True, copy.deepcopy(entry.value)
+        return False, None
+
+    def _store(self, key: str, value: Any) -> Any:
+        if self.enabled and key in self._policies:
+            with self._lock:
+                self._misses[key] = self._misses.get(key, 0) + 1
+                if value is not None and value != '':
+                    self._entries[key] = _CacheEntry(copy.deepcopy(value))
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a value obtained elsewhere e.g. parsed from a URC."""
+        if key in self._policies and value is not None:
+            with self._lock:
+                self._entries[key] = _CacheEntry(copy.deepcopy(value))
+
+    def peek(self, key: str) -> tuple[Any, Optional[float]]:
+        """Get a fresh cached value and its age without loading.
+
+        Returns:
+            Tuple of (value, age seconds) or (None, None) if not fresh.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._is_fresh(key, entry):
+                return None, None
+            return (copy.deepcopy(entry.value),
+                    time.monotonic() - entry.timestamp)
+
+    def invalidate(self, *keys: str) -> None:
+        """Invalidate the specified attributes, or all if none specified."""
+        with self._lock:
+            if not keys:
+                self._entries.clear()
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def on_event(self, event: CacheEvent) -> None:
+        """Invalidate attributes affected by an event."""
+        if event == REBOOT:
+            self.invalidate()
+            return
+        with self._lock:
+            stale = [k for k, p in self._policies.items() if event in p.events]
+            for key in stale:
+                self._entries.pop(key, None)
+        if stale:
+            _log.debug('Invalidated %s on %s', stale,
+                       event.name if isinstance(event, UrcType) else event)
+
+    def on_urc(self, urc: str, urc_type: UrcType) -> None:
+        """URC dispatcher callback invalidating attributes by `UrcType`."""
+        if urc_type == UrcType.MODEM_REBOOT:
+            self.on_event(REBOOT)
+        elif urc_type != UrcType.UNKNOWN:
+            self.on_event(urc_type)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Get hit/miss counters per attribute and in total."""
+        with self._lock:
+            keys: Iterable[str] = set(self._hits) | set(self._misses)
+            stats = {k: {'hits': self._hits.get(k, 0),
+                         'misses': self._misses.get(k, 0)}
+                     for k in sorted(keys)}
+        stats['total'] = {
+            'hits': sum(s['hits'] for s in stats.values()),
+            'misses': sum(s['misses'] for s in stats.values()),
+        }
+        return stats
+
+    def reset_stats(self) -> None:
+        """Reset the hit/miss counters."""
+        with self._lock:
+            self._hits.clear()
+            self._misses.clear()
+
+
+def cached(key: str) -> Callable:
+    """Decorate a modem query method or property getter to use its cache.
+
+    Only calls without arguments are cached. The decorated object must have
+    a `_cache` attribute of type `StateCache`.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache: Optional[StateCache] = getattr(self, '_cache', None)
+            if args or kwargs or cache is None:
+                return func(self, *args, **kwargs)
+            return cache.get(key, lambda: func(self))
+        return wrapper
+    return decorator
@@ -7,10 +7,12 @@ from .pdpcontext import PdnContext
 from .psmconfig import PsmConfig
 from .reginfo import RegInfo
 from .siginfo import SigInfo
+from .snapshot import ModemSnapshot
 from .socketstatus import SocketStatus
 
 __all__ = [
     'EdrxConfig',
+    'ModemSnapshot',
     'NtnLocation',
     'MoMessage',
     'MtMessage',
@@ -0,0 +1,47 @@
+"""Data class helper for a point-in-time modem status snapshot.
+
+A snapshot gathers the status attributes typically sampled by a health or
+telemetry loop, together with the cost of collecting them.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+from pynbntnmodem.constants import RrcState
+from .edrxconfig import EdrxConfig
+from .psmconfig import PsmConfig
+from .reginfo import RegInfo
+from .siginfo import SigInfo
+
+
+@dataclass(frozen=True)
+class ModemSnapshot:
+    """An immutable record of modem status.
+    
+    Attributes:
+        timestamp (float): The unix timestamp of capture.
+        reginfo (RegInfo): The registration information.
+        siginfo (SigInfo): The signal information.
+        rrc_state (RrcState): The RRC connection state.
+        edrx_dynamic (EdrxConfig): The network-granted eDRX parameters.
+        psm_config (PsmConfig): The requested PSM configuration.
+        ip_address (str): The IP address assigned by the network, if any.
+        commands (int): The number of AT command lines sent.
+        elapsed_ms (float): The milliseconds taken to capture.
+        reused (tuple[str]): Attributes taken from fresh cached/URC state.
+    """
+    timestamp: float = field(default_factory=time.time)
+    reginfo: RegInfo = field(default_factory=RegInfo)
+    siginfo: SigInfo = field(default_factory=SigInfo)
+    rrc_state: RrcState = RrcState.UNKNOWN
+    edrx_dynamic: EdrxConfig = field(default_factory=EdrxConfig)
+    psm_config: PsmConfig = field(default_factory=PsmConfig)
+    ip_address: str = ''
+    commands: int = 0
+    elapsed_ms: float = 0
+    reused: tuple[str, ...] = ()
+    
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was captured."""
+        return time.time() - self.timestamp
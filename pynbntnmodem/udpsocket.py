@@ -4,12 +4,13 @@
 
 import atexit
 import logging
+import selectors
 import socket
 import threading
-import time
-from typing import Callable
+from typing import Callable, Optional
 
-from .constants import NBNTN_MAX_MSG_SIZE
+from .constants import NBNTN_MAX_MSG_SIZE, UDP_MAX_PAYLOAD
+from .fragmentation import Fragmenter, Reassembler
 from .structures import MoMessage, MtMessage
 
 __all__ = ['UdpSocketBridge']
@@ -19,8 +20,10 @@ _log = logging.getLogger(__name__)
 
 class UdpSocketBridge:
     """Provides a raw socket-like interface on the local host.
-    
+
     Acts as bridge between a raw socket and the modem's AT commands.
+    The bridge thread blocks on a selector and wakes immediately on local
+    datagrams, `receive_event()` or `close()`.
     """
     def __init__(self,
                  server: str,
@@ -29,9 +32,12 @@ class UdpSocketBridge:
                  send: Callable[[bytes], MoMessage|None],
                  recv: Callable[..., bytes|MtMessage|None],
                  close: Callable[[], bool],
-                 event_trigger: bool = False):
+                 event_trigger: bool = False,
+                 poll_interval: float = 1,
+                 max_poll_interval: Optional[float] = None,
+                 fragmentation: bool = False):
         """Create a raw socket.
-        
+
         Args:
             server (str): The IP address or server name to connect to.
             port (int): The UDP port to use.
@@ -43,6 +49,17 @@ class UdpSocketBridge:
                 to receive UDP data from the modem socket.
             close (Callable[[], bool]): The callback function to close
                 the modem socket.
+            event_trigger (bool): If True, downlink is only read after
+                `receive_event()`, otherwise the modem is polled.
+            poll_interval (float): The seconds between downlink polls if not
+                `event_trigger`.
+            max_poll_interval (float|None): Optional maximum seconds between
+                polls, doubling the interval from `poll_interval` while no
+                data is received. Default None polls every `poll_interval`.
+            fragmentation (bool): If True, datagrams are sent with a
+                fragment header allowing payloads above `UDP_MAX_PAYLOAD`,
+                and received datagrams are reassembled. Requires the same
+                framing at the server.
         """
         if not isinstance(server, str) or not server:
             raise ValueError('Invalid server')
@@ -50,58 +67,186 @@ class UdpSocketBridge:
         if not isinstance(port, int) or port not in range(0, 65536):
             raise ValueError('Invalid port')
         self._port = port
+        if max_poll_interval is None:
+            max_poll_interval = poll_interval
+        if (not isinstance(poll_interval, (int, float)) or poll_interval <= 0 or
+            not isinstance(max_poll_interval, (int, float)) or
+            max_poll_interval < poll_interval):
+            raise ValueError('Invalid poll interval(s)')
+        self._poll_interval = float(poll_interval)
+        self._max_poll_interval = float(max_poll_interval)
         self._cb_open = open
         self._cb_send = send
         self._cb_recv = recv
         self._cb_close = close
-        self._on_exit = atexit.register(self.close)
+        self._event_trigger = event_trigger
+        self._fragmenter: Optional[Fragmenter] = None
+        self._reassembler: Optional[Reassembler] = None
+        if fragmentation:
+            self._fragmenter = Fragmenter(self._cb_send, UDP_MAX_PAYLOAD)
+            self._reassembler = Reassembler()
+        self._recv_event = threading.Event()
+        self._peer: Optional[tuple[str, int]] = None
+        self._closed = threading.Event()
         self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self._sock.bind(('127.0.0.1', self._port))
         self._sock.setblocking(False)
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._sock, selectors.EVENT_READ)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
         self._running: bool = True
+        atexit.register(self.close)
         self._thread = threading.Thread(target=self._run,
                                         name='udp_socket_bridge',
                                         daemon=True)
         self._thread.start()
-        self._event_trigger = event_trigger
-        self._recv_event = threading.Event()
-        self._recv_event.clear()
-    
+
+    def _wake(self):
+        """Wake the bridge thread from the selector."""
+        try:
+            self._wake_w.send(b'\x00')
+        except (BlockingIOError, OSError):
+            pass   # already pending or closed
+
     def _run(self):
-        opened = self._cb_open(server=self._server, port=self._port)
-        if not opened:
-            raise IOError(f'Failed to open UDP socket {self._server}:{self._port}')
-        _log.debug('UDP socket bridge running on port %d', self._port)
+        try:
+            opened = self._cb_open(server=self._server, port=self._port)
+            if not opened:
+                _log.error('Failed to open UDP socket %s:%d',
+                           self._server, self._port)
+                return
+            _log.debug('UDP socket bridge running on port %d', self._port)
+            poll_interval = self._poll_interval
+            while self._running:
+                timeout = None if self._event_trigger else poll_interval
+                events = self._selector.select(timeout)
+                if not self._running:
+                    break
+                sent = 0
+                poll_downlink = not events and not self._event_trigger
+                for key, _ in events:
+                    if key.fileobj is self._wake_r:
+                        try:
+                            while self._wake_r.recv(64):
+                                pass
+                        except (BlockingIOError, OSError):
+                            pass
+                    elif key.fileobj is self._sock:
+                        sent += self._forward_uplink()
+                if self._recv_event.is_set():
+                    self._recv_event.clear()
+                    poll_downlink = True
+                elif sent and not self._event_trigger:
+                    poll_downlink = True   # response likely follows uplink
+                if poll_downlink:
+                    if self._forward_downlink() > 0:
+                        poll_interval = self._poll_interval
+                    elif not self._event_trigger:
+                        poll_interval = min(poll_interval * 2,
+                                            self._max_poll_interval)
+        except Exception as exc:
+            _log.exception('UDP socket bridge error: %s', exc)
+        finally:
+            self._shutdown()
+
+    def _forward_uplink(self) -> int:
+        """Forward all pending local datagrams over the air.
+
+        Returns:
+            The number of datagrams sent.
+        """
+        sent = 0
         while self._running:
-            # check for incoming data
-            if not self._event_trigger or self._recv_event.is_set():
-                self._recv_event.clear()
-                downlink = self._cb_recv(size=NBNTN_MAX_MSG_SIZE, raw=True)
-                if isinstance(downlink, bytes) and len(downlink) > 0:
-                    rcvd = self._sock.sendto(downlink, ('127.0.0.1', self._port))
-                    _log.debug('Received %d bytes OTA', rcvd)
-            # forward local data
             try:
-                send_data, _ = self._sock.recvfrom(1024)
-                if isinstance(send_data, bytes) and len(send_data) > 0:
-                    if len(send_data) <= (NBNTN_MAX_MSG_SIZE - 20 - 8):
-                        uplink = self._cb_send(send_data)
-                        if isinstance(uplink, MoMessage):
-                            _log.debug('Sent %d bytes OTA', uplink.size)
-                    else:
-                        _log.warning('Data too large to send')
+                send_data, addr = self._sock.recvfrom(65535)
             except (socket.timeout, BlockingIOError):
-                pass
-            time.sleep(1)   # avoid excessive processing
-    
+                break
+            except OSError as exc:
+                _log.warning('Local socket error: %s', exc)
+                break
+            self._peer = addr
+            if not send_data:
+                continue
+            if self._fragmenter is not None:
+                try:
+                    fragments = self._fragmenter.send(send_data)
+                except ValueError as exc:
+                    _log.warning('Unable to send: %s', exc)
+                    continue
+                if fragments:
+                    _log.debug('Sent %d bytes OTA', sum(f.size for f in fragments))
+                    sent += 1
+                continue
+            if len(send_data) > UDP_MAX_PAYLOAD:
+                _log.warning('Data too large to send (%d bytes)', len(send_data))
+                continue
+            uplink = self._cb_send(send_data)
+            if isinstance(uplink, MoMessage):
+                _log.debug('Sent %d bytes OTA', uplink.size)
+                sent += 1
+        return sent
+
+    def _forward_downlink(self) -> int:
+        """Forward all pending over the air datagrams to the local peer.
+
+        Returns:
+            The number of datagrams received.
+        """
+        received = 0
+        while self._running:
+            downlink = self._cb_recv(size=NBNTN_MAX_MSG_SIZE, raw=True)
+            if isinstance(downlink, MtMessage):
+                downlink = downlink.payload
+            if not isinstance(downlink, bytes) or len(downlink) == 0:
+                break
+            received += 1
+            _log.debug('Received %d bytes OTA', len(downlink))
+            if self._reassembler is not None:
+                try:
+                    downlink = self._reassembler.add(downlink)
+                except ValueError as exc:
+                    _log.warning('Invalid downlink: %s', exc)
+                    continue
+                if downlink is None:
+                    continue   # awaiting further fragments
+            if self._peer is None:
+                _log.warning('No local peer - dropping %d bytes', len(downlink))
+                continue
+            self._sock.sendto(downlink, self._peer)
+        return received
+
+    def _shutdown(self):
+        """Close the modem socket and release local resources."""
+        try:
+            if not self._cb_close():
+                _log.error('Failed to close UDP socket')
+        except Exception as exc:
+            _log.error('Failed to close UDP socket: %s', exc)
+        self._selector.close()
+        for sock in (self._sock, self._wake_r, self._wake_w):
+            sock.close()
+        self._closed.set()
+
     def receive_event(self):
         """Trigger a received data event."""
         self._recv_event.set()
-    
-    def close(self):
-        """Terminate the socket bridge."""
-        self._running = False
-        closed = self._cb_close()
-        if not closed:
-            _log.error('Failed to close UDP socket')
-        self._thread.join()
+        self._wake()
+
+    def close(self, timeout: Optional[float] = None):
+        """Terminate the socket bridge.
+
+        Waits for any in-progress send/receive to complete before the modem
+        socket is closed by the bridge thread.
+
+        Args:
+            timeout (float): Optional maximum seconds to wait.
+        """
+        atexit.unregister(self.close)
+        if self._running:
+            self._running = False
+            self._wake()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout)
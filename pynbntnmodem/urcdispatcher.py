@@ -0,0 +1,281 @@
+"""Event-driven dispatch of Unsolicited Result Codes.
+
+The dispatcher sits on the `AtClient` unsolicited queue so that every URC
+received by the serial listener, pre-response URC or injected URC is offered
+to subscribers as soon as it is queued, rather than being discovered by
+polling `get_urc()`.
+
+Subscribers may filter by `UrcType` and/or string prefix and receive URCs via
+a callback, a dedicated queue, or a one-shot waiter that wakes immediately on
+the first match.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from queue import Queue
+from typing import Callable, Optional
+
+from .constants import UrcType
+
+__all__ = ['UrcDispatcher', 'UrcQueue', 'UrcSubscription', 'UrcWaiter']
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class UrcSubscription:
+    """A persistent subscription to matching URCs.
+
+    Attributes:
+        urc_type (UrcType|None): Optional type filter.
+        prefix (str): Optional prefix filter e.g. `+CEREG:`.
+        callback (Callable[[str, UrcType], None]|None): Optional function
+            called in the dispatching thread with the URC and its type.
+        queue (Queue|None): Optional per-subscriber queue of matching URCs.
+        consume (bool): If True the URC is not passed on to `get_urc()`.
+    """
+    urc_type: Optional[UrcType] = None
+    prefix: str = ''
+    callback: Optional[Callable[[str, UrcType], None]] = None
+    queue: Optional['Queue[str]'] = None
+    consume: bool = False
+
+    def matches(self, urc: str, urc_type: UrcType) -> bool:
+        """Check if the URC matches the subscription filters."""
+        if self.urc_type is not None and urc_type != self.urc_type:
+            return False
+        return urc.startswith(self.prefix)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Get the next URC from the subscriber queue, or None if timed out."""
+        if self.queue is None:
+            raise ValueError('Subscription has no queue')
+        try:
+            return self.queue.get(timeout=timeout)
+        except Exception:
+            return None
+
+
+@dataclass(eq=False)
+class UrcWaiter:
+    """A one-shot waiter for the first matching URC.
+
+    A matched URC is consumed by the waiter and not passed to `get_urc()`.
+
+    Attributes:
+        urc_type (UrcType|None): Optional type filter.
+        prefix (str): Optional prefix filter.
+        urc (str): The matched URC, empty until matched.
+    """
+    urc_type: Optional[UrcType] = None
+    prefix: str = ''
+    urc: str = ''
+    _event: threading.Event = field(default_factory=threading.Event, repr=False)
+    _cancelled: bool = field(default=False, repr=False)
+
+    def matches(self, urc: str, urc_type: UrcType) -> bool:
+        """Check if the URC matches the waiter filters."""
+        if self.urc_type is not None and urc_type != self.urc_type:
+            return False
+        return urc.startswith(self.prefix)
+
+    def is_set(self) -> bool:
+        """Check if the waiter has been matched."""
+        return self._event.is_set()
+
+    def set(self, urc: str) -> None:
+        """Complete the waiter with the matched URC."""
+        self.urc = urc
+        self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        """Block until matched or timeout.
+
+        Args:
+            timeout (float|None): Maximum seconds to wait, `None` for forever.
+
+        Returns:
+            The matched URC or an empty string if it timed out.
+        """
+        self._event.wait(timeout)
+        return self.urc
+
+
+class UrcDispatcher:
+    """Dispatches URCs to subscribers and waiters as they arrive."""
+
+    def __init__(self,
+                 classifier: Optional[Callable[[str], UrcType]] = None,
+                 ) -> None:
+        """Create a dispatcher.
+
+        Args:
+            classifier (Callable[[str], UrcType]): Optional function used to
+                determine the `UrcType` of each URC, typically
+                `NbntnModem.get_urc_type`.
+        """
+        self._classifier = classifier
+        self._lock = threading.Lock()
+        self._subscriptions: list[UrcSubscription] = []
+        self._waiters: list[UrcWaiter] = []
+
+    def classify(self, urc: str) -> UrcType:
+        """Get the `UrcType` of a URC using the configured classifier."""
+        if not callable(self._classifier):
+            return UrcType.UNKNOWN
+        try:
+            return self._classifier(urc)
+        except Exception as exc:
+            _log.debug('Unable to classify URC %s: %s', urc, exc)
+            return UrcType.UNKNOWN
+
+    def subscribe(self,
+                  callback: Optional[Callable[[str, UrcType], None]] = None,
+                  urc_type: Optional[UrcType] = None,
+                  prefix: str = '',
+                  **kwargs) -> UrcSubscription:
+        """Subscribe to URCs matching a type and/or prefix.
+
+        Args:
+            callback (Callable[[str, UrcType], None]): Optional function called
+                with each matching URC and its type.
+            urc_type (UrcType): Optional type filter.
+            prefix (str): Optional prefix filter.
+            **queue (bool|Queue): If True creates a subscriber queue, or uses
+                the `Queue` provided.
+            **consume (bool): If True, matching URCs are not passed on to
+                `get_urc()`.
+
+        Returns:
+            The `UrcSubscription` used to `unsubscribe` or `get` queued URCs.
+        """
+        if callback is not None and not callable(callback):
+            raise ValueError('Invalid callback')
+        if urc_type is not None and not isinstance(urc_type, UrcType):
+            raise ValueError('Invalid UrcType')
+        if not isinstance(prefix, str):
+            raise ValueError('Invalid prefix')
+        queue = kwargs.get('queue')
+        if queue is True:
+            queue = Queue()
+        elif queue is not None and not isinstance(queue, Queue):
+            raise ValueError('Invalid subscriber queue')
+        if callback is None and queue is None:
+            raise ValueError('Subscription requires a callback and/or queue')
+        subscription = UrcSubscription(urc_type, prefix, callback, queue,
+                                       bool(kwargs.get('consume', False)))
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: UrcSubscription) -> bool:
+        """Remove a subscription. Returns False if it was not subscribed."""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+                return True
+        return False
+
+    def add_waiter(self,
+                   prefix: str = '',
+                   urc_type: Optional[UrcType] = None) -> UrcWaiter:
+        """Register a one-shot waiter for the next matching URC.
+
+        Registering before sending the command that triggers a URC avoids
+        missing a fast response.
+        """
+        if not isinstance(prefix, str):
+            raise ValueError('Invalid prefix')
+        if urc_type is not None and not isinstance(urc_type, UrcType):
+            raise ValueError('Invalid UrcType')
+        waiter = UrcWaiter(urc_type, prefix)
+        with self._lock:
+            self._waiters.append(waiter)
+        return waiter
+
+    def cancel_waiter(self, waiter: UrcWaiter) -> bool:
+        """Cancel a waiter. Returns False if it was already matched."""
+        with self._lock:
+            waiter._cancelled = True
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            return not waiter.is_set()
+
+    def dispatch(self, urc: str) -> bool:
+        """Offer a URC to waiters and subscribers.
+
+        Callbacks run in the calling thread (typically the serial listener)
+        so they should return quickly.
+
+        Args:
+            urc (str): The URC, with or without header/trailer.
+
+        Returns:
+            True if the URC was consumed and should not be queued.
+        """
+        stripped = urc.strip()
+        if not stripped:
+            return False
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            waiters = list(self._waiters)
+        if not subscriptions and not waiters:
+            return False
+        urc_type = self.classify(stripped)
+        consumed = False
+        for subscription in subscriptions:
+            if not subscription.matches(stripped, urc_type):
+                continue
+            if subscription.queue is not None:
+                subscription.queue.put(stripped)
+            if subscription.callback is not None:
+                try:
+                    subscription.callback(stripped, urc_type)
+                except Exception as exc:
+                    _log.exception('URC callback error: %s', exc)
+            consumed = consumed or subscription.consume
+        for waiter in waiters:
+            if not waiter.matches(stripped, urc_type):
+                continue
+            with self._lock:
+                if waiter._cancelled or waiter not in self._waiters:
+                    continue
+                self._waiters.remove(waiter)
+                waiter.set(stripped)
+            return True   # one-shot waiter consumes the URC
+        return consumed
+
+
+class UrcQueue(Queue):
+    """An unsolicited queue that dispatches each URC as it is put."""
+
+    def __init__(self, dispatcher: UrcDispatcher, maxsize: int = 0) -> None:
+        super().__init__(maxsize)
+        self.dispatcher = dispatcher
+
+    def put(self, item, block=True, timeout=None):
+        if isinstance(item, str) and self.dispatcher.dispatch(item):
+            return
+        super().put(item, block, timeout)
+
+    def requeue(self, item: str) -> None:
+        """Put an item back in the queue without dispatching it again."""
+        super().put(item)
+
+    def take(self, matches: Callable[[str], bool]) -> Optional[str]:
+        """Remove and return the first queued URC that matches, if any.
+
+        Args:
+            matches (Callable[[str], bool]): Test applied to each stripped URC.
+
+        Returns:
+            The stripped URC or None if no queued URC matches.
+        """
+        with self.not_empty:
+            for item in list(self.queue):
+                if isinstance(item, str) and matches(item.strip()):
+                    self.queue.remove(item)
+                    self.not_full.notify()
+                    return item.strip()
+        return None
@@ -0,0 +1,358 @@
+"""Prediction of when a PSM/eDRX device is reachable.
+
+With Power Saving Mode the network-granted timers T3412 (periodic TAU) and
+T3324 (active time) both start when the RRC connection is released. The device
+listens for paging until T3324 expires, then sleeps until T3412 expires and it
+wakes to update its tracking area. With eDRX the device only listens during a
+Paging Time Window (PTW) once per eDRX cycle while idle.
+
+`WakeWindowPredictor` combines the granted `PsmConfig` and `EdrxConfig` with
+the timestamps of RRC connect/release and PSM enter/exit events to predict the
+`WakeWindow` periods when the radio is awake. A server may use it to time
+mobile-terminated deliveries, and a device to send uplinks while the radio is
+already awake rather than waking it.
+
+The prediction is approximate: the duration of a connection is learned from
+observed RRC transitions, and eDRX paging windows are assumed to start at the
+beginning of each cycle from release since the hyperframe alignment is not
+reported by the modem.
+"""
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from .constants import ActMultiplier, RrcState, UrcType
+from .structures import EdrxConfig, PsmConfig
+
+if TYPE_CHECKING:
+    from .modem import NbntnModem
+    from .urcdispatcher import UrcSubscription
+
+__all__ = ['WakeWindow', 'WakeWindowPredictor', 'WindowKind', 'psm_timers']
+
+_log = logging.getLogger(__name__)
+
+_MAX_WINDOWS = 10000   # bound on windows iterated per prediction
+
+
+class WindowKind(IntEnum):
+    """The reason the radio is awake during a window."""
+    CONNECTED = 0   # RRC connected e.g. data transfer or periodic TAU
+    IDLE = 1   # idle monitoring paging every DRX cycle
+    PAGING = 2   # eDRX paging time window
+
+
+@dataclass(frozen=True)
+class WakeWindow:
+    """A period when the device is reachable.
+
+    Attributes:
+        start (float): The unix time the window opens.
+        end (float): The unix time the window closes, `math.inf` if the device
+            does not sleep.
+        kind (WindowKind): The reason the radio is awake.
+    """
+    start: float
+    end: float
+    kind: WindowKind
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def contains(self, timestamp: float) -> bool:
+        """Check if a unix time is within the window."""
+        return self.start <= timestamp < self.end
+
+
+def psm_timers(psm: Optional[PsmConfig]) -> Optional[tuple[int, int]]:
+    """Get the (T3412, T3324) seconds of a PSM configuration.
+
+    A T3412 of 0 means the device does not wake for periodic TAU.
+
+    Returns:
+        The timers, or None if PSM is not in use.
+    """
+    if not psm or not psm.mode or not psm.act_t3324_bitmask:
+        return None
+    if int(psm.act_t3324_bitmask, 2) >> 5 == ActMultiplier.DEACTIVATED:
+        return None
+    return psm.tau_s, psm.act_s
+
+
+class WakeWindowPredictor:
+    """Predicts reachable windows from PSM/eDRX timers and RRC events."""
+    def __init__(self,
+                 psm: Optional[PsmConfig] = None,
+                 edrx: Optional[EdrxConfig] = None,
+                 connected_s: float = 20,
+                 alpha: float = 0.3):
+        """Create a predictor.
+
+        Args:
+            psm (PsmConfig): The network-granted PSM configuration.
+            edrx (EdrxConfig): The network-granted eDRX configuration.
+            connected_s (float): The initial estimate of seconds an RRC
+                connection lasts, refined by observed transitions.
+            alpha (float): The weight 0..1 of each observed connection
+                duration in the estimate.
+        """
+        if not isinstance(connected_s, (int, float)) or connected_s < 0:
+            raise ValueError('Invalid connected_s')
+        if not 0 < alpha <= 1:
+            raise ValueError('alpha must be 0..1')
+        self._lock = threading.Lock()
+        self._psm: Optional[tuple[int, int]] = None
+        self._edrx: Optional[tuple[float, float]] = None
+        self._edrx_config: Optional[EdrxConfig] = None
+        self.set_config(psm, edrx)
+        self._connected_s = float(connected_s)
+        self._alpha = alpha
+        self._rrc = RrcState.UNKNOWN
+        self._connected_at: Optional[float] = None
+        self._idle_at: Optional[float] = None
+        self._psm_at: Optional[float] = None
+        self._subscription: Optional['UrcSubscription'] = None
+        self._modem: Optional['NbntnModem'] = None
+
+    @classmethod
+    def for_modem(cls, modem: 'NbntnModem', **kwargs) -> 'WakeWindowPredictor':
+        """Create a predictor tracking a modem.
+
+        The granted timers and RRC state are queried, then updated from
+        `+CSCON`, `+CEREG` and PSM URCs, so RRC (and `+CEREG` mode 4 or 5 for
+        granted PSM timers) URC reporting should be enabled. Until the first
+        release is observed an idle modem is assumed released when created.
+
+        Args:
+            modem (NbntnModem): The modem.
+            **kwargs: Passed to the constructor.
+        """
+        predictor = cls(modem.get_reginfo().get_psm_granted(),
+                        modem.get_edrx_dynamic(), **kwargs)
+        if modem.get_rrc_state() == RrcState.CONNECTED:
+            predictor.connected()
+        else:
+            predictor.idle()
+        predictor._modem = modem
+        predictor._subscription = modem.urc_dispatcher.subscribe(
+            predictor._on_urc
+        )
+        return predictor
+
+    def detach(self) -> None:
+        """Stop tracking the modem URCs."""
+        if self._modem and self._subscription:
+            self._modem.urc_dispatcher.unsubscribe(self._subscription)
+        self._modem = None
+        self._subscription = None
+
+    def _on_urc(self, urc: str, urc_type: UrcType) -> None:
+        assert self._modem is not None
+        try:
+            if urc_type == UrcType.RRC_STATE and urc.startswith('+CSCON:'):
+                state = self._modem.parsers.parse(urc, '+CSCON').get('rrc_state')
+                if state == RrcState.CONNECTED:
+                    self.connected()
+                elif state == RrcState.IDLE:
+                    self.idle()
+            elif urc_type == UrcType.REGISTRATION and urc.startswith('+CEREG:'):
+                psm = self._modem.parsers.parse(urc, '+CEREG').get_psm_granted()
+                if psm.act_t3324_bitmask:
+                    self.set_config(psm, self.edrx)
+            elif urc_type == UrcType.PSM_ENTER:
+                self.psm_entered()
+            elif urc_type == UrcType.PSM_EXIT:
+                self.psm_exited()
+        except Exception as exc:
+            _log.warning('Unable to track URC %s: %s', urc, exc)
+
+    @property
+    def psm(self) -> Optional[tuple[int, int]]:
+        """The (T3412, T3324) seconds in use, or None without PSM."""
+        return self._psm
+
+    @property
+    def edrx(self) -> Optional[EdrxConfig]:
+        """The eDRX configuration in use, or None without eDRX."""
+        return self._edrx_config
+
+    @property
+    def connected_s(self) -> float:
+        """The estimated seconds an RRC connection lasts."""
+        return self._connected_s
+
+    def set_config(self,
+                   psm: Optional[PsmConfig] = None,
+                   edrx: Optional[EdrxConfig] = None) -> None:
+        """Update the network-granted timers."""
+        if psm is not None and not isinstance(psm, PsmConfig):
+            raise ValueError('Invalid PsmConfig')
+        if edrx is not None and not isinstance(edrx, EdrxConfig):
+            raise ValueError('Invalid EdrxConfig')
+        timers = psm_timers(psm)
+        cycle = edrx.cycle_s if edrx else 0
+        with self._lock:
+            self._psm = timers
+            self._edrx_config = edrx if cycle else None
+            self._edrx = (cycle, min(edrx.ptw_s, cycle)) if edrx and cycle else None
+        _log.debug('PSM timers %s eDRX %s', timers, self._edrx)
+
+    def connected(self, timestamp: Optional[float] = None) -> None:
+        """Record the RRC connection of the device, default now."""
+        ts = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._rrc != RrcState.CONNECTED:
+                self._rrc = RrcState.CONNECTED
+                self._connected_at = ts
+            self._psm_at = None
+
+    def idle(self, timestamp: Optional[float] = None) -> None:
+        """Record the RRC release of the device, default now."""
+        ts = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._rrc == RrcState.CONNECTED and self._connected_at is not None:
+                duration = max(0.0, ts - self._connected_at)
+                self._connected_s += self._alpha * (duration - self._connected_s)
+            self._rrc = RrcState.IDLE
+            self._idle_at = ts
+            self._psm_at = None
+
+    def psm_entered(self, timestamp: Optional[float] = None) -> None:
+        """Record the device entering PSM, default now."""
+        ts = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self._rrc = RrcState.IDLE
+            self._psm_at = ts
+
+    def psm_exited(self, timestamp: Optional[float] = None) -> None:
+        """Record the device leaving PSM to connect, default now."""
+        with self._lock:
+            self._psm_at = None
+        self.connected(timestamp)
+
+    def _timeline(self, now: float) -> Iterator[WakeWindow]:
+        """Generate the predicted windows in order from the current state."""
+        with self._lock:
+            psm, edrx, est = self._psm, self._edrx, self._connected_s
+            rrc, psm_at = self._rrc, self._psm_at
+            connected_at, idle_at = self._connected_at, self._idle_at
+        tau, act = psm or (0, math.inf)
+        if rrc == RrcState.UNKNOWN:
+            if psm or edrx:
+                return   # unknown phase
+            idle_at = now
+        elif rrc == RrcState.CONNECTED:
+            assert connected_at is not None
+            end = max(connected_at + est, now)
+            yield WakeWindow(connected_at, end, WindowKind.CONNECTED)
+            idle_at = end
+        elif psm_at is not None:
+            if not psm or not tau:
+                return   # asleep until an uplink
+            if idle_at is not None and idle_at <= psm_at < idle_at + tau:
+                tau_at = idle_at + tau
+            else:
+                tau_at = psm_at + max(0, tau - act)
+            yield WakeWindow(tau_at, tau_at + est, WindowKind.CONNECTED)
+            idle_at = tau_at + est
+        assert idle_at is not None
+        while True:
+            if psm and tau:
+                period = tau + est
+                if idle_at + period <= now:
+                    idle_at += (now - idle_at) // period * period
+            active_end = idle_at + min(act, tau) if psm and tau else idle_at + act
+            if edrx:
+                cycle, ptw = edrx
+                start = idle_at
+                if now > start:
+                    start += (now - start) // cycle * cycle
+                while start < active_end:
+                    yield WakeWindow(start, min(start + ptw, active_end),
+                                     WindowKind.PAGING)
+                    start += cycle
+            elif active_end > idle_at:
+                yield WakeWindow(idle_at, active_end, WindowKind.IDLE)
+            if not psm or not tau:
+                return
+            tau_at = idle_at + tau
+            yield WakeWindow(tau_at, tau_at + est, WindowKind.CONNECTED)
+            idle_at = tau_at + est
+
+    def windows(self,
+                horizon: float = 3600,
+                now: Optional[float] = None) -> list[WakeWindow]:
+        """Get the predicted windows overlapping a period.
+
+        Args:
+            horizon (float): Seconds after `now` to predict.
+            now (float): The unix time to predict from, default now.
+
+        Returns:
+            A list of `WakeWindow` in time order.
+        """
+        if not isinstance(horizon, (int, float)) or horizon < 0:
+            raise ValueError('Invalid horizon')
+        now = time.time() if now is None else now
+        windows = []
+        for window in self._timeline(now):
+            if window.start >= now + horizon or len(windows) >= _MAX_WINDOWS:
+                break
+            if window.end > now:
+                windows.append(window)
+        return windows
+
+    def next_reachable_window(self,
+                              now: Optional[float] = None,
+                              min_duration: float = 0) -> Optional[WakeWindow]:
+        """Get the current or next period when the device is reachable.
+
+        Contiguous windows e.g. a connection followed by the active time are
+        merged, with the kind of the first.
+
+        Args:
+            now (float): The unix time to predict from, default now.
+            min_duration (float): The minimum seconds remaining in the window
+                e.g. to complete a delivery.
+
+        Returns:
+            The `WakeWindow` starting no earlier than `now`, or None if the
+                device will not be reachable without an uplink or its phase
+                is unknown.
+        """
+        now = time.time() if now is None else now
+        merged: Optional[WakeWindow] = None
+        for i, window in enumerate(self._timeline(now)):
+            if i >= _MAX_WINDOWS:
+                break
+            if window.end <= now:
+                continue
+            if merged and window.start <= merged.end:
+                merged = WakeWindow(merged.start, max(merged.end, window.end),
+                                    merged.kind)
+                continue
+            if merged and merged.end - merged.start >= min_duration:
+                return merged
+            merged = WakeWindow(max(window.start, now), window.end, window.kind)
+        if merged and merged.end - merged.start >= min_duration:
+            return merged
+        return None
+
+    def time_until_sleep(self, now: Optional[float] = None) -> float:
+        """Get the seconds until the radio stops listening.
+
+        Returns:
+            Seconds until the end of the current window, 0 if the device is
+                not reachable now, or `math.inf` if it does not sleep.
+        """
+        now = time.time() if now is None else now
+        window = self.next_reachable_window(now)
+        if window is None or window.start > now:
+            return 0.0
+        return window.end - now
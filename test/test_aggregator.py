@@ -0,0 +1,111 @@
+import time
+
+import pytest
+
+from pynbntnmodem import (
+    MoMessage,
+    PdnType,
+    UplinkAggregator,
+    decode_frame,
+    encode_frame,
+)
+
+
+def make_sender(sent: list, ok: bool = True):
+    def send(payload: bytes):
+        sent.append(payload)
+        return MoMessage(payload, PdnType.NON_IP) if ok else None
+    return send
+
+
+def test_frame_codec():
+    records = [b'', b'a', bytes(127), bytes(128), bytes(300)]
+    frame = encode_frame(records)
+    assert len(frame) == sum(len(r) for r in records) + 1 + 1 + 1 + 2 + 2
+    assert decode_frame(frame) == records
+    with pytest.raises(ValueError):
+        decode_frame(frame[:-1])
+    with pytest.raises(ValueError):
+        decode_frame(b'\x80')
+
+
+def test_flush_by_size():
+    sent: list = []
+    aggregator = UplinkAggregator(make_sender(sent), max_size=100)
+    record = bytes(range(19))   # 20 bytes framed
+    for _ in range(4):
+        assert aggregator.add(record) == []
+    assert len(aggregator.add(record)) == 1   # exactly full
+    assert len(sent) == 1 and aggregator.pending == 0
+    aggregator.add(record)
+    assert len(aggregator.add(bytes(90))) == 1   # does not fit
+    assert decode_frame(sent[1]) == [record]
+    assert len(aggregator.close()) == 1
+    assert decode_frame(sent[2]) == [bytes(90)]
+    aggregator.add(bytes(50))
+    messages = aggregator.add(bytes(99))   # makes room then exactly full
+    assert [m.payload for m in messages] == sent[3:] and len(sent) == 5
+    with pytest.raises(ValueError):
+        aggregator.add(bytes(100))
+    stats = aggregator.stats()
+    assert stats['records'] == 9 and stats['frames'] == 5
+
+
+def test_flush_by_age():
+    sent: list = []
+    aggregator = UplinkAggregator(make_sender(sent, ok=False), max_age=0.1,
+                                  max_attempts=1)
+    aggregator.add(b'reading1')
+    aggregator.add(b'reading2')
+    assert aggregator.age < 0.1
+    time.sleep(0.3)
+    assert len(sent) == 1 and decode_frame(sent[0]) == [b'reading1', b'reading2']
+    assert aggregator.stats()['failed_records'] == 2
+    assert aggregator.flush() == []
+
+
+def test_failed_frame_retried():
+    sent: list = []
+    ok = [False]
+
+    def send(payload: bytes):
+        sent.append(payload)
+        return MoMessage(payload, PdnType.NON_IP) if ok[0] else None
+
+    aggregator = UplinkAggregator(send, max_size=10, max_attempts=2)
+    aggregator.add(bytes(5))
+    assert aggregator.add(bytes(5)) == []   # first frame failed and kept
+    assert aggregator.pending == 2 and len(sent) == 1
+    aggregator.add(bytes(1))   # no new frame so no retry
+    assert len(sent) == 1
+    ok[0] = True
+    messages = aggregator.flush()
+    assert [m.payload for m in messages] == [bytes([5]) + bytes(5),
+                                             encode_frame([bytes(5), bytes(1)])]
+    assert aggregator.pending == 0
+    stats = aggregator.stats()
+    assert stats['retries'] == 1 and stats['failed_frames'] == 0
+    ok[0] = False
+    aggregator.add(bytes(3))
+    assert aggregator.flush() == [] and aggregator.flush() == []
+    assert aggregator.pending == 0 and aggregator.stats()['failed_records'] == 1
+
+
+def test_age_while_retry_pending():
+    sent: list = []
+    ok = [False]
+
+    def send(payload: bytes):
+        sent.append(payload)
+        return MoMessage(payload, PdnType.NON_IP) if ok[0] else None
+
+    aggregator = UplinkAggregator(send, max_age=0.3)
+    aggregator.add(b'first')
+    time.sleep(0.4)   # sent by age and failed, retry pending
+    assert len(sent) == 1 and aggregator.pending == 1
+    ok[0] = True
+    aggregator.add(b'second')
+    time.sleep(0.8)
+    assert aggregator.pending == 0
+    assert [decode_frame(f) for f in sent[1:]] == [[b'first'], [b'second']]
+    aggregator.close()
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+from typing import Optional
+
+import pytest
+
+from pynbntnmodem import (
+    AsyncNbntnModem,
+    NbntnModem,
+    PdnContext,
+    PdnType,
+    RegInfo,
+    RrcState,
+    UrcType,
+)
+from pynbntnmodem.asyncmodem import _LoopBridge
+from pynbntnmodem.ntninit import NtnInitCommand, NtnInitSequence, default_init
+
+logger = logging.getLogger()
+
+
+async def fake_modem(responses: dict[str, str],
+                     urcs: Optional[dict[str, tuple[str, float]]] = None):
+    """Start a TCP server echoing commands with canned V1 responses."""
+    urcs = urcs or {}
+
+    async def handle(reader: asyncio.StreamReader,
+                     writer: asyncio.StreamWriter):
+        while True:
+            data = await reader.readuntil(b'\r')
+            cmd = data.decode().strip()
+            info = responses.get(cmd, '')
+            out = data
+            if cmd in responses or cmd in ('AT', 'ATE1', 'ATV1'):
+                if info:
+                    out += f'\r\n{info}\r\n'.encode()
+                out += b'\r\nOK\r\n'
+            else:
+                out += b'\r\nERROR\r\n'
+            writer.write(out)
+            await writer.drain()
+            if cmd in urcs:
+                urc, delay = urcs[cmd]
+                await asyncio.sleep(delay)
+                writer.write(f'\r\n{urc}\r\n'.encode())
+                await writer.drain()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f'socket://127.0.0.1:{port}'
+
+
+def test_async_api():
+    async def main():
+        server, url = await fake_modem({
+            'AT+CEREG?': '+CEREG: 5,1,"0001","01a2d001",9',
+            'AT+CGDCONT?': '+CGDCONT: 1,"Non-IP","viasat.poc",,0,0',
+            'AT+CGACT?': '+CGACT: 1,1',
+            'AT+CGSN': '123456789012345',
+            'AT+CSCON?': '+CSCON: 0,1',
+            **{i.cmd.replace('<pdn_type>', 'NON-IP').replace('<apn>', 'viasat.poc'): ''
+               for i in default_init},
+        })
+        modem = AsyncNbntnModem(apn='viasat.poc')
+        await modem.connect(port=url)
+        reginfo, imei = await asyncio.gather(modem.get_reginfo(),
+                                             modem.get_imei())
+        assert isinstance(reginfo, RegInfo) and reginfo.is_registered()
+        assert imei == '123456789012345'
+        contexts = await modem.get_contexts()
+        assert len(contexts) == 1 and isinstance(contexts[0], PdnContext)
+        assert contexts[0].pdn_type == PdnType.NON_IP and contexts[0].active
+        assert not (await modem.send_command('AT+XYZ')).ok
+        assert await modem.get_rrc_state() == RrcState.CONNECTED   # generic
+        assert await modem.initialize_ntn()
+        await modem.disconnect()
+        server.close()
+    asyncio.run(main())
+
+
+def test_async_urcs():
+    async def main():
+        server, url = await fake_modem(
+            responses={'AT+CFUN=1': '', 'AT+CSCON=1': ''},
+            urcs={'AT+CFUN=1': ('+CEREG: 1', 0.1),
+                  'AT+CSCON=1': ('+CSCON: 1', 0.05)},
+        )
+        modem = AsyncNbntnModem()
+        await modem.connect(port=url)
+        future = modem.expect_urc(urc_type=UrcType.REGISTRATION)
+        assert (await modem.send_command('AT+CFUN=1')).ok
+        assert await asyncio.wait_for(future, 1) == '+CEREG: 1'
+        assert (await modem.send_command('AT+CSCON=1')).ok
+        async for urc in modem:
+            assert urc == '+CSCON: 1'
+            break
+        await modem.disconnect()
+        server.close()
+    asyncio.run(main())
+
+
+def test_async_run_sync_method():
+    async def main():
+        server, url = await fake_modem(
+            responses={'AT+CSCON=1': ''},
+            urcs={'AT+CSCON=1': ('+CSCON: 1', 0.05)},
+        )
+        modem = AsyncNbntnModem()
+        await modem.connect(port=url)
+        sent = []
+
+        def connect_rrc() -> str:
+            sent.append(modem.modem.send_command('AT+CSCON=1').ok)
+            return modem.modem.await_urc('+CSCON:', timeout=1)
+
+        count = modem.modem.command_count
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        assert await modem.run(connect_rrc) == '+CSCON: 1'
+        task.cancel()
+        assert sent == [True] and ticks > 0   # run once, loop not blocked
+        assert modem.modem.command_count == count + 1
+        assert modem.modem.metrics.snapshot()['commands']['+CSCON']['count'] == 1
+        await modem.disconnect()
+        server.close()
+    asyncio.run(main())
+
+
+def test_async_native_api():
+    async def main():
+        server, url = await fake_modem({
+            'AT+CEREG?': '+CEREG: 5,1,"0001","01a2d001",9',
+            'AT+CEREG=5': '',
+            'AT+CESQ': '+CESQ: 99,99,255,255,18,55',
+            **{i.cmd.replace('<pdn_type>', 'NON-IP').replace('<apn>', 'viasat.poc'): ''
+               for i in default_init},
+        })
+        modem = AsyncNbntnModem(apn='viasat.poc')
+        await modem.connect(port=url)
+
+        async def no_executor(*args, **kwargs):
+            raise AssertionError('Executor used by native coroutine')
+
+        modem.run = no_executor
+        count = modem.modem.command_count
+        assert (await modem.get_reginfo()).is_registered()
+        assert (await modem.get_reginfo()).is_registered()   # cached
+        assert modem.modem.command_count == count + 1
+        assert await modem.set_regconfig(5)
+        assert modem.modem.state_cache.peek('reginfo') == (None, None)
+        assert (await modem.get_siginfo()).rsrp == -85
+        assert await modem.initialize_ntn()
+        snapshot = modem.modem.metrics.snapshot()
+        assert snapshot['commands']['+CESQ']['count'] == 1
+        assert snapshot['calls']['initialize_ntn']['count'] == 1
+        await modem.disconnect()
+        server.close()
+    asyncio.run(main())
+
+
+def test_async_subclass_override():
+    class Custom(NbntnModem):
+        def initialize_ntn(self, **kwargs) -> bool:
+            ntn_init = NtnInitSequence(NtnInitCommand('custom', 'AT+CUSTOM'))
+            return super().initialize_ntn(ntn_init=ntn_init, **kwargs)
+
+    async def main():
+        server, url = await fake_modem({'AT+CUSTOM': ''})
+        modem = AsyncNbntnModem(Custom())
+        await modem.connect(port=url)
+        assert await modem.initialize_ntn()
+        assert modem.modem.ntn_initialized
+        assert modem.modem.metrics.snapshot()['commands']['+CUSTOM']['count'] == 1
+        await modem.disconnect()
+        server.close()
+    asyncio.run(main())
+
+
+def test_loop_bridge_unavailable():
+    loop = asyncio.new_event_loop()
+    bridge = _LoopBridge(AsyncNbntnModem(), loop)
+    bridge._margin = 0.1
+    try:
+        with pytest.raises(ConnectionError):
+            bridge.send_command('AT', timeout=0.1)
+    finally:
+        loop.run_until_complete(asyncio.sleep(0.01))   # process cancellation
+        loop.close()
@@ -0,0 +1,21 @@
+from benchmarks.common import Result, compare
+from benchmarks.parsers import run
+
+
+def test_compare():
+    baseline = [Result('parsers', 'stream', 1000, 'lines/s', True),
+                Result('ntninit', 'no delay', 100, 'ms')]
+    results = [Result('parsers', 'stream', 850, 'lines/s', True),
+               Result('ntninit', 'no delay', 105, 'ms'),
+               Result('imports', 'new', 1, 'ms')]
+    regressions = compare(baseline, results, threshold=0.1)
+    assert [r.key for _, r, _ in regressions] == ['parsers/stream']
+    assert abs(regressions[0][2] - 0.15) < 1e-9
+    assert not compare(baseline, results, threshold=0.2)
+
+
+def test_parsers_benchmark():
+    results = run(count=100)
+    names = {r.name for r in results}
+    assert 'urc REGISTRATION' in names and 'urc UNKNOWN' in names
+    assert all(r.value > 0 and r.higher_is_better for r in results)
@@ -0,0 +1,101 @@
+import json
+import random
+import time
+
+import pytest
+
+from pynbntnmodem import MoMessage, PdnType
+from pynbntnmodem.codec import (
+    CodecStage,
+    PayloadCodec,
+    ZlibCodec,
+    train_dictionary,
+)
+
+
+def telemetry(i: int) -> bytes:
+    return json.dumps({
+        'deviceId': 'sensor-0042', 'seq': i, 'ts': 1700000000 + i,
+        'temperature': round(random.uniform(-10, 40), 1),
+        'humidity': random.randint(0, 100), 'battery': 3.6,
+    }).encode()
+
+
+def test_zlib_dictionary():
+    samples = [telemetry(i) for i in range(200)]
+    zdict = train_dictionary(samples, size=1024)
+    assert 0 < len(zdict) <= 1024
+    plain = CodecStage(codecs=[ZlibCodec(tag=1)])
+    trained = CodecStage(codecs=[ZlibCodec(tag=2, zdict=zdict)])
+    payload = telemetry(1000)
+    encoded = trained.encode(payload)
+    assert encoded[0] == 2
+    assert len(encoded) < len(plain.encode(payload)) < len(payload)
+    assert trained.decode(encoded) == payload
+    assert trained.last_stats.ratio > 1
+    with pytest.raises(ValueError):
+        plain.decode(encoded)   # tag 2 not registered
+
+
+def test_codec_stage():
+    sent: list[bytes] = []
+    stage = CodecStage(lambda b: sent.append(b) or MoMessage(b, PdnType.NON_IP))
+    assert stage.send(b'\x01') is not None
+    assert sent[0] == b'\x00\x01'   # incompressible sent raw
+    assert stage.decode(sent[0]) == b'\x01'
+
+    class XorCodec(PayloadCodec):
+        tag = 200
+        name = 'xor'
+        def encode(self, data: bytes) -> bytes:
+            return bytes(b ^ 0x55 for b in data[:len(data) // 2])
+        def decode(self, data: bytes) -> bytes:
+            return bytes(b ^ 0x55 for b in data) * 2
+
+    stage.register(XorCodec())
+    assert stage.decode(stage.encode(b'abab', tag=200)) == b'abab'
+    totals = stage.stats()
+    assert totals['messages'] == 2 and totals['ratio'] > 0
+
+
+def test_encode_frame():
+    stage = CodecStage(codecs=[ZlibCodec(zdict=train_dictionary(
+        [telemetry(i) for i in range(100)]))])
+    frame = b''.join(telemetry(i) for i in range(8))[:1200]
+    encoded = stage.encode(frame)
+    assert len(encoded) < len(frame)   # see benchmarks.codec for timing
+    assert stage.decode(encoded) == frame
+
+
+def test_modem_codec():
+    from pynbntnmodem import NbntnModem
+    from pynbntnmodem.emulator import ModemEmulator
+    from pynbntnmodem.fragmentation import Reassembler, fragment
+
+    stage = CodecStage()
+    with ModemEmulator(registration_delay=0.05) as emulator:
+        modem = NbntnModem(port=emulator.port, codec=stage,
+                           fragmentation=True)
+        modem.connect()
+        try:
+            time.sleep(0.1)
+            payload = b'{"temperature": 21.5, "humidity": 40}' * 100
+            mo = modem.send_message_nidd(payload)
+            assert mo is not None and mo.payload == payload
+            assert len(emulator.uplinks) == 1   # compressed before fragmenting
+            assert stage.last_stats.ratio > 10
+            message = Reassembler().add(emulator.uplinks[0])
+            assert CodecStage().decode(message) == payload
+            assert modem.enable_nidd_urc()
+            data = random.randbytes(2048)   # incompressible so sent raw
+            encoded = stage.encode(data)
+            received = []
+            for message in fragment(encoded, 1200, 3):
+                emulator.send_downlink(message)
+                urc = modem.await_urc('+CRTDCP', timeout=2)
+                received.append(modem.receive_message_nidd(urc, raw=True))
+            assert received == [None, data]
+            modem.codec = False
+            assert modem.codec is None
+        finally:
+            modem.disconnect()
@@ -0,0 +1,181 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from pynbntnmodem import (
+    AtTimeout,
+    CeregMode,
+    EdrxConfig,
+    ModelCache,
+    NbntnModem,
+    NtnDesiredState,
+    NtnInitCommand,
+    NtnInitSequence,
+    PsmConfig,
+    RegistrationState,
+    mutate_modem,
+)
+from pynbntnmodem.emulator import ModemEmulator
+from pynbntnmodem.ntninit import default_init
+
+
+@pytest.fixture
+def emulated():
+    with ModemEmulator(registration_delay=0.05, rrc_inactivity=0.2) as emulator:
+        modem = NbntnModem(port=emulator.port)
+        modem.connect()
+        yield emulator, modem
+        modem.disconnect()
+
+
+def test_emulator_queries(emulated):
+    emulator, modem = emulated
+    assert modem.is_connected()
+    assert modem.imei == emulator.imei
+    time.sleep(0.1)
+    assert modem.get_reginfo().state == RegistrationState.HOME
+    assert modem.get_siginfo().rsrp == -90
+    assert modem.set_context('test.apn', modem.pdn_type)
+    contexts = modem.get_contexts()
+    assert contexts[0].apn == 'test.apn' and contexts[0].active
+    res = modem.send_batch(['AT+CEREG?', 'AT+CESQ', 'AT+CGSN'])
+    assert all(r.ok for r in res)
+    assert 'AT+CEREG?;+CESQ;+CGSN' in emulator.commands
+
+
+def test_emulator_nidd(emulated):
+    emulator, modem = emulated
+    time.sleep(0.1)
+    assert modem.enable_rrc_urc()
+    assert modem.send_message_nidd(b'hello') is not None
+    assert emulator.uplinks == [b'hello']
+    assert modem.await_urc('+CSCON', timeout=2) == '+CSCON: 1'
+    assert modem.await_urc('+CSCON', timeout=2) == '+CSCON: 0'
+    assert modem.enable_nidd_urc()
+    emulator.send_downlink(b'\x01\x02')
+    urc = modem.await_urc('+CRTDCP', timeout=2)
+    assert modem.receive_message_nidd(urc, raw=True) == b'\x01\x02'
+
+
+def test_emulator_reset_settings(emulated):
+    emulator, modem = emulated
+    time.sleep(0.1)
+    for command in ('AT+CMEE=2', 'AT+CEREG=5', 'AT+CSCON=1',
+                    'AT+CGDCONT=2,"IP","other.apn"'):
+        assert modem.send_command(command).ok
+    assert emulator.cereg_mode == 5 and 2 in emulator.contexts
+    assert modem.send_command('ATZ').ok
+    assert (emulator.cmee, emulator.cereg_mode, emulator.cscon_mode) == (0, 0, 0)
+    assert emulator.contexts == {1: ('Non-IP', '')}
+    assert emulator.reg_state == 1   # registration is kept
+    assert modem.send_command('AT+CEREG=2;&F').ok
+    assert emulator.cereg_mode == 0
+
+
+def test_cache_invalidated_by_set_command(emulated):
+    emulator, modem = emulated
+    time.sleep(0.1)
+    assert modem.get_regconfig() == CeregMode.NONE
+    assert modem.get_reginfo().state == RegistrationState.HOME
+    assert modem.send_command('AT+CEREG=2').ok
+    assert modem.get_regconfig() == CeregMode(2)
+    assert modem.send_command('AT+CFUN=0').ok
+    assert modem.get_reginfo().state == RegistrationState.NONE
+
+
+def test_emulator_scripting(emulated):
+    emulator, modem = emulated
+    emulator.script_error('AT+CESQ')
+    assert not modem.send_command('AT+CESQ').ok
+    assert modem.send_command('AT+CESQ').ok
+    emulator.script_timeout('AT+CGSN')
+    with pytest.raises(AtTimeout):
+        modem.send_command('AT+CGSN', timeout=0.5)
+    emulator.set_latency(0.3, 'AT+CIMI')
+    start = time.monotonic()
+    assert modem.send_command('AT+CIMI').ok
+    assert time.monotonic() - start >= 0.3
+    assert modem.set_regconfig(2)
+    emulator.reboot()
+    assert modem.await_urc('RDY', timeout=2) == 'RDY'
+    assert modem.get_regconfig() == 0
+
+
+def test_initialize_desired_state(emulated):
+    emulator, modem = emulated
+    modem.apn = 'test.apn'
+    desired = NtnDesiredState(psm=PsmConfig(1, '00101100', '00001010'))
+    assert modem.initialize_ntn(desired=desired)
+    report = modem.init_report
+    assert report.radio_cycled and not report.skipped
+    assert 'AT+CFUN=0' in emulator.commands
+    assert modem.get_reginfo().is_registered()   # awaited before success
+    emulator.commands.clear()
+    assert modem.initialize_ntn(desired=desired)
+    report = modem.init_report
+    assert not report.applied and not report.radio_cycled
+    assert report.skipped == ['radio off', 'regconfig', 'context', 'psm',
+                              'radio on']
+    assert not any(c.startswith('AT+CFUN=') for c in emulator.commands)
+    desired.edrx = EdrxConfig('0101')
+    assert modem.initialize_ntn(desired=desired)
+    assert modem.init_report.applied == ['edrx']
+    assert emulator.reg_state == 1
+
+
+def test_initialize_desired_with_sequence(emulated):
+    emulator, modem = emulated
+    modem.apn = 'test.apn'
+    ntn_init = NtnInitSequence(*default_init,
+                               NtnInitCommand('enable RRC URC', 'AT+CSCON=1'))
+    assert modem.initialize_ntn(desired=True, ntn_init=ntn_init)
+    assert modem.init_report.applied[-2:] == ['ntn_init', 'radio on']
+    assert 'AT+CSCON=1' in emulator.commands
+    assert emulator.commands.count('AT+CFUN=0') == 1
+    assert not any('<apn>' in c for c in emulator.commands)
+    emulator.registration_delay = 2
+    modem.apn = 'other.apn'
+    desired = NtnDesiredState(registration_timeout=0.3)
+    assert not modem.initialize_ntn(desired=desired)
+    assert modem.init_report.failed == 'radio on'
+
+
+MODEL_SUBCLASS = '''
+from pynbntnmodem import ModuleModel, NbntnModem
+
+
+class MurataType1sc(NbntnModem):
+    _model = ModuleModel.TYPE1SC
+'''
+
+
+def test_model_cache(tmp_path):
+    folder = tmp_path / 'modems'
+    folder.mkdir()
+    (folder / 'murata_type1sc.py').write_text(MODEL_SUBCLASS)
+    module = SimpleNamespace(__path__=[str(folder)])
+    cache = ModelCache(tmp_path / 'models.json')
+    with ModemEmulator() as emulator:
+        emulator.manufacturer = 'Murata'
+        emulator.model = 'Type1SC'
+        def mutate():
+            modem = NbntnModem(port=emulator.port)
+            modem.connect()
+            emulator.commands.clear()
+            modem = mutate_modem(modem, module=module, model_cache=cache)
+            modem.disconnect()
+            return modem
+        modem = mutate()
+        assert type(modem).__name__ == 'MurataType1sc'
+        assert 'ATI' in emulator.commands
+        entry = ModelCache(cache.path).get(emulator.port)
+        assert entry.imei == emulator.imei and entry.model == 'TYPE1SC'
+        assert entry.firmware == emulator.revision
+        modem = mutate()
+        assert type(modem).__name__ == 'MurataType1sc'
+        assert emulator.commands == ['AT+CGSN;+CGMR']
+        emulator.revision = '1.0.1'
+        modem = mutate()
+        assert 'ATI' in emulator.commands
+        assert cache.get(emulator.port).firmware == '1.0.1'
@@ -0,0 +1,89 @@
+import os
+import random
+import time
+
+import pytest
+
+from pynbntnmodem import MoMessage, MtMessage, PdnType
+from pynbntnmodem.fragmentation import Fragmenter, Reassembler, fragment
+
+
+def test_fragment_roundtrip():
+    sent: list[bytes] = []
+    fragmenter = Fragmenter(lambda b: sent.append(b) or MoMessage(b, PdnType.NON_IP),
+                            max_size=100)
+    assert len(fragmenter.send(b'small')) == 1 and sent[0] == b'\x00small'
+    payload = os.urandom(1000)
+    assert len(fragmenter.send(payload)) == 11
+    assert all(len(m) <= 100 for m in sent)
+    reassembler = Reassembler()
+    assert reassembler.add(sent[0]) == b'small'
+    fragments = sent[1:]
+    random.shuffle(fragments)
+    results = [reassembler.add(MtMessage(f, PdnType.NON_IP)) for f in fragments]
+    assert results[-1] == payload and not any(results[:-1])
+    assert reassembler.add(fragments[0]) is None   # new partial
+    assert reassembler.pending == 1
+    with pytest.raises(ValueError):
+        fragmenter.send(bytes(fragmenter.max_payload + 1))
+
+
+def test_reassembly_bounds():
+    reassembler = Reassembler(timeout=0.1, max_messages=2)
+    for msg_id in (1, 2, 3):
+        reassembler.add(fragment(bytes(300), 100, msg_id)[0], source='a')
+    assert reassembler.pending == 2
+    assert reassembler.stats()['evicted'] == 1
+    assert reassembler.add(b'\x05\x03\x02') is None   # index >= count
+    time.sleep(0.2)
+    assert reassembler.expire() == 2 and reassembler.size == 0
+    stats = reassembler.stats()
+    assert stats['expired'] == 2 and stats['invalid'] == 1
+
+
+def test_fragment_send_failure():
+    calls = []
+    def send(data: bytes):
+        calls.append(data)
+        return None if len(calls) == 2 else MoMessage(data, PdnType.NON_IP)
+    assert Fragmenter(send, max_size=50).send(bytes(200)) is None
+    assert len(calls) == 2
+
+
+def test_modem_fragmentation():
+    from pynbntnmodem import NbntnModem
+    from pynbntnmodem.emulator import ModemEmulator
+
+    class Custom(NbntnModem):
+        def send_message_nidd(self, payload: bytes, **kwargs):
+            return super().send_message_nidd(payload, **kwargs)
+
+    with ModemEmulator(registration_delay=0.05) as emulator:
+        modem = Custom(port=emulator.port, fragmentation=True)
+        modem.connect()
+        try:
+            time.sleep(0.1)
+            payload = os.urandom(2500)
+            mo = modem.send_message_nidd(payload)
+            assert mo is not None and mo.payload == payload
+            assert len(emulator.uplinks) == 3
+            assert all(len(m) <= 1200 for m in emulator.uplinks)
+            reassembler = Reassembler()
+            results = [reassembler.add(m) for m in emulator.uplinks]
+            assert results[-1] == payload
+            assert modem.metrics.snapshot()['calls']['send_message_nidd']['count'] == 1
+            assert modem.enable_nidd_urc()
+            received = []
+            for message in fragment(payload, 1200, 7):
+                emulator.send_downlink(message)
+                urc = modem.await_urc('+CRTDCP', timeout=2)
+                received.append(modem.receive_message_nidd(urc))
+            assert received[:2] == [None, None]
+            assert isinstance(received[2], MtMessage)
+            assert received[2].payload == payload
+            modem.fragmentation = False
+            emulator.uplinks.clear()
+            assert modem.send_message_nidd(b'raw') is not None
+            assert emulator.uplinks == [b'raw']
+        finally:
+            modem.disconnect()
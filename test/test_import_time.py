@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pynbntnmodem
+
+IMPORT_BUDGET_MS = 50
+DEFERRED_MODULES = ('pyatcommand', 'serial', 'asyncio', 'socket', 'subprocess',
+                    'tempfile', 'inspect', 'pynbntnmodem.loader')
+MODEM_IMPORT_BUDGET_MS = 400   # mostly pyatcommand and pyserial
+MODEM_DEFERRED_MODULES = ('asyncio', 'serial_asyncio', 'pynbntnmodem.loader',
+                          'pynbntnmodem.recorder', 'pynbntnmodem.signalhistory')
+
+SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = (time.perf_counter() - start) * 1000
+loaded = [m for m in {deferred!r} if m in sys.modules]
+print(elapsed, ','.join(loaded))
+'''
+
+
+def _cold_import(statement: str = 'import pynbntnmodem',
+                 deferred: tuple[str, ...] = DEFERRED_MODULES,
+                 ) -> tuple[float, str]:
+    root = Path(__file__).resolve().parent.parent
+    env = dict(os.environ, PYTHONPATH=str(root))
+    script = SCRIPT.format(statement=statement, deferred=deferred)
+    out = subprocess.run([sys.executable, '-c', script], env=env, cwd=root,
+                         capture_output=True, text=True, check=True).stdout
+    elapsed, _, loaded = out.strip().partition(' ')
+    return float(elapsed), loaded
+
+
+def test_import_time():
+    samples = [_cold_import() for _ in range(5)]
+    assert not samples[0][1], f'Eagerly imported: {samples[0][1]}'
+    best = min(elapsed for elapsed, _ in samples)
+    assert best < IMPORT_BUDGET_MS, f'import took {best:.1f} ms'
+
+
+def test_modem_import_time():
+    samples = [_cold_import('from pynbntnmodem import NbntnModem',
+                            MODEM_DEFERRED_MODULES) for _ in range(5)]
+    assert not samples[0][1], f'Eagerly imported: {samples[0][1]}'
+    best = min(elapsed for elapsed, _ in samples)
+    assert best < MODEM_IMPORT_BUDGET_MS, f'import took {best:.1f} ms'
+
+
+def test_lazy_public_api():
+    assert set(pynbntnmodem.__all__) == set(pynbntnmodem._LAZY)
+    for name in pynbntnmodem.__all__:
+        assert getattr(pynbntnmodem, name) is not None
+    assert 'NbntnModem' in dir(pynbntnmodem)
@@ -0,0 +1,68 @@
+
+import pytest
+
+from pynbntnmodem import AtTimeout, MetricsRegistry, NbntnModem, UrcType
+from pynbntnmodem.emulator import ModemEmulator
+from pynbntnmodem.metrics import command_verb
+
+
+def test_command_verb():
+    assert command_verb('AT+CFUN=0') == '+CFUN'
+    assert command_verb('AT+CEREG?;+CESQ') == '+CEREG;+CESQ'
+    assert command_verb('at%setcfg="x"') == '%SETCFG'
+    assert command_verb('ATE0') == 'E'
+    assert command_verb('ATI') == 'I'
+    assert command_verb('AT') == 'AT'
+
+
+def test_registry_export():
+    metrics = MetricsRegistry(buckets=(0.1, 1, 15))
+    metrics.observe_command('AT+CFUN=1', 0.05)
+    metrics.observe_command('AT+CFUN=0', 2, error=True)
+    metrics.observe_command('AT+CFUN?', 20, timeout=True)
+    metrics.observe_urc('+CEREG: 5', UrcType.REGISTRATION)
+    snapshot = metrics.snapshot()
+    cfun = snapshot['commands']['+CFUN']
+    assert (cfun['count'], cfun['errors'], cfun['timeouts']) == (3, 1, 1)
+    assert cfun['buckets'] == {'0.1': 1, '1': 1, '15': 2, '+Inf': 3}
+    assert cfun['max'] == 20
+    assert snapshot['urcs']['REGISTRATION']['count'] == 1
+    text = metrics.to_prometheus(labels={'port': '/dev/ttyUSB0'})
+    assert ('pynbntnmodem_command_duration_seconds_bucket{port="/dev/ttyUSB0",'
+            'command="+CFUN",le="15"} 2') in text
+    assert 'pynbntnmodem_command_timeouts_total{port="/dev/ttyUSB0",command="+CFUN"} 1' in text
+    assert 'pynbntnmodem_urc_total{port="/dev/ttyUSB0",urc_type="REGISTRATION"} 1' in text
+    metrics.reset()
+    assert not metrics.snapshot()['commands']
+    metrics.enabled = False
+    metrics.observe_command('AT', 0)
+    assert not metrics.snapshot()['commands']
+
+
+def test_modem_metrics():
+    class Subclass(NbntnModem):
+        def enable_radio(self, enable: bool = True, **kwargs) -> bool:
+            return super().enable_radio(enable, **kwargs)
+
+    with ModemEmulator(registration_delay=0.05) as emulator:
+        modem = Subclass(port=emulator.port)
+        modem.connect()
+        try:
+            assert modem.send_command('AT+CEREG=2').ok
+            emulator.script_error('AT+CESQ')
+            assert not modem.send_command('AT+CESQ').ok
+            emulator.script_timeout('AT+CGSN')
+            with pytest.raises(AtTimeout):
+                modem.send_command('AT+CGSN', timeout=0.5)
+            assert modem.enable_radio(True)
+            assert modem.await_urc('+CEREG:', timeout=5)
+            modem.send_command('AT')
+        finally:
+            modem.disconnect()
+    snapshot = modem.metrics.snapshot()
+    assert snapshot['commands']['+CESQ']['errors'] == 1
+    assert snapshot['commands']['+CGSN']['timeouts'] == 1
+    assert snapshot['commands']['+CGSN']['sum'] >= 0.5
+    assert snapshot['calls']['enable_radio']['count'] == 1
+    assert snapshot['urcs']['REGISTRATION']['count'] >= 1
+    assert NbntnModem(metrics=False).metrics.enabled is False
@@ -3,18 +3,21 @@ import random
 import time
 import threading
 from typing import Any, Optional, Union, Callable
-from unittest.mock import create_autospec
+from unittest.mock import create_autospec, patch
 
 import pytest
-from pyatcommand import AtErrorCode, AtResponse
+from pyatcommand import AtClient, AtErrorCode, AtResponse, AtTimeout
 
 from pynbntnmodem import (
     ModuleModel,
     NbntnModem,
     RegInfo,
+    RegistrationState,
     SigInfo,
     RadioAccessTechnology,
     PdnType,
+    RrcState,
+    UrcType,
 )
 from pynbntnmodem.ntninit import default_init
 
@@ -221,6 +224,188 @@ def test_urc_trigger(mock_modem, modem: NbntnModem|None):    # type: ignore
     assert urc == 'RDY'
 
 
+def test_await_urc_wakes_on_arrival(mock_modem):
+    urc_delay = 0.5
+    modem: NbntnModem = mock_modem(
+        response_map = { 'AT+CFUN=1': res_ok() },
+        urc_map = { 'AT+CFUN=1': ('\r\n+CEREG: 1\r\n', urc_delay) },
+    )
+    modem.inject_urc('\r\nRDY\r\n')
+    waiter = modem.urc_dispatcher.add_waiter('+CEREG:')
+    assert modem.send_command('AT+CFUN=1').ok
+    start = time.time()
+    urc = modem.await_urc('+CEREG:', waiter=waiter, timeout=5)
+    assert urc == '+CEREG: 1'
+    assert time.time() - start < urc_delay + 0.1
+    assert modem.get_urc() == 'RDY'   # non-matching URC not discarded
+    modem.inject_urc('\r\n+CSCON: 1\r\n')
+    assert modem.await_urc('+CSCON:', timeout=1) == '+CSCON: 1'   # backlog
+    assert modem.await_urc('+CRTDCP:', timeout=0.2) == ''
+
+
+def test_urc_subscription(mock_modem):
+    modem: NbntnModem = mock_modem({})
+    received: list = []
+    sub_cb = modem.urc_dispatcher.subscribe(
+        lambda urc, urc_type: received.append((urc, urc_type)),
+        urc_type=UrcType.REGISTRATION,
+    )
+    sub_q = modem.urc_dispatcher.subscribe(prefix='+CSCON:', queue=True,
+                                           consume=True)
+    modem.inject_urc('\r\n+CEREG: 1\r\n')
+    modem.inject_urc('\r\n+CSCON: 0\r\n')
+    assert received == [('+CEREG: 1', UrcType.REGISTRATION)]
+    assert sub_q.get(timeout=0.1) == '+CSCON: 0'
+    assert modem.get_urc() == '+CEREG: 1'
+    assert modem.get_urc() is None   # consumed by queue subscriber
+    assert modem.urc_dispatcher.unsubscribe(sub_cb)
+    assert modem.urc_dispatcher.unsubscribe(sub_q)
+    modem.inject_urc('\r\n+CEREG: 2\r\n')
+    assert len(received) == 1
+
+
+def test_state_cache(mock_modem):
+    modem: NbntnModem = mock_modem(
+        response_map = {
+            'AT+CGMR': res_ok('1.2.3'),
+            'AT+CEREG?': res_ok('5,1,"0001","01a2d001",9'),
+            'AT+CGDCONT?': res_ok('1,"Non-IP","viasat.poc",,0,0'),
+            'AT+CGACT?': res_ok('1,1'),
+            'AT+CGDCONT=1,"NON-IP","viasat.poc"': res_ok(),
+        },
+    )
+    for _ in range(3):
+        assert modem.firmware_version == '1.2.3'
+        assert modem.get_reginfo().is_registered()
+    assert modem.send_command.call_count == 2
+    stats = modem.state_cache.stats()
+    assert stats['firmware_version'] == {'hits': 2, 'misses': 1}
+    assert stats['total'] == {'hits': 4, 'misses': 2}
+    modem.inject_urc('\r\n+CEREG: 5\r\n')   # replaces registration
+    assert modem.get_reginfo().state == RegistrationState.ROAMING
+    assert modem.send_command.call_count == 2
+    assert len(modem.get_contexts()) == 1   # failed batch + CGDCONT + CGACT
+    modem.get_contexts()
+    assert modem.send_command.call_count == 5
+    assert modem.set_context('viasat.poc', PdnType.NON_IP)
+    modem.get_contexts()
+    assert modem.send_command.call_count == 9   # batch retried
+    modem.refresh()
+    assert modem.firmware_version == '1.2.3'
+    assert modem.send_command.call_count == 9   # retained by modem attribute
+    modem.state_cache.enabled = False
+    modem.get_reginfo()
+    modem.get_reginfo()
+    assert modem.send_command.call_count == 11
+
+
+def test_send_batch(mock_modem):
+    modem: NbntnModem = mock_modem(
+        response_map = {
+            'AT+CEREG?;+CGSN': res_ok(
+                '+CEREG: 5,1,"0001","01a2d001",9\n123456789012345'),
+            'AT+CIMI;+CSCON?;+CESQ': res_ok(
+                '901000000000001\n+CSCON: 0,1\n+CESQ: 99,99,255,255,20,50'),
+            'AT+CGDCONT?;+CGACT?': res_ok(
+                '+CGDCONT: 1,"IP","viasat.ip",,0,0\n'
+                '+CGDCONT: 2,"Non-IP","viasat.poc",,0,0\n'
+                '+CGACT: 1,0\n+CGACT: 2,1'),
+            'ATI': res_ok('ACME'),
+        },
+    )
+    responses = modem.send_batch(['AT+CEREG?', 'AT+CGSN', 'ATI', 'AT+CIMI',
+                                  'AT+CSCON?', 'AT+CESQ'])
+    assert all(res.ok for res in responses)
+    assert [res.info for res in responses] == [
+        '+CEREG: 5,1,"0001","01a2d001",9', '123456789012345', 'ACME',
+        '901000000000001', '+CSCON: 0,1', '+CESQ: 99,99,255,255,20,50',
+    ]
+    assert modem.send_command.call_count == 3   # one unprefixed per line
+    contexts = modem.get_contexts()
+    assert [c.active for c in contexts] == [False, True]
+    assert modem.send_command.call_count == 4
+    modem._batch_max = 1
+    assert not any(res.ok for res in modem.send_batch(['AT+CEREG?', 'AT+CESQ']))
+    assert modem.send_command.call_count == 6
+
+
+def test_send_batch_fallback(mock_modem):
+    def timeout(cmd, kwargs):
+        raise AtTimeout(cmd)
+
+    modem: NbntnModem = mock_modem(
+        response_map = {
+            'AT+CEREG?;+CESQ': timeout,
+            'AT+CEREG?': res_ok('+CEREG: 5,1,"0001","01a2d001",9'),
+            'AT+CESQ': res_ok('+CESQ: 99,99,255,255,20,50'),
+        },
+    )
+    for attempt in range(NbntnModem._batch_failures_max):
+        assert modem._batch_max > 1
+        responses = modem.send_batch(['AT+CEREG?', 'AT+CESQ'])
+        assert all(res.ok for res in responses)
+        assert modem.send_command.call_count == 3 * (attempt + 1)
+    assert modem._batch_max == 1
+    modem.send_batch(['AT+CEREG?', 'AT+CESQ'])
+    assert modem.send_command.call_count == 3 * attempt + 5
+
+
+def test_send_batch_urc(mock_modem):
+    modem: NbntnModem = mock_modem(
+        response_map = {
+            'AT+CESQ;+CSCON?': res_ok(
+                '+CESQ: 99,99,255,255,20,50\n+CEREG: 5\n+CSCON: 0,1'),
+        },
+    )
+    received = []
+    modem.urc_dispatcher.subscribe(lambda urc, _: received.append(urc),
+                                   prefix='+CEREG:')
+    responses = modem.send_batch(['AT+CESQ', 'AT+CSCON?'])
+    assert [res.info for res in responses] == [
+        '+CESQ: 99,99,255,255,20,50', '+CSCON: 0,1',
+    ]
+    assert received == ['+CEREG: 5'] and modem.get_urc() == '+CEREG: 5'
+
+
+def test_get_snapshot():
+    responses = {
+        'AT+CEREG?;+CESQ;+CSCON?;+CEDRXRDP;+CPSMS?;+CGPADDR;+CGDCONT?': res_ok(
+            '+CEREG: 5,1,"0001","01a2d001",9\n+CESQ: 99,99,255,255,20,50\n'
+            '+CSCON: 0,0\n+CEDRXRDP: 5,"0010","0101","0011"\n'
+            '+CPSMS: 1,,,"00101100","00001010"\n+CGPADDR: 1,"10.1.2.3"\n'
+            '+CGDCONT: 1,"IP","viasat.ip","10.1.2.3",0,0'),
+        'AT+CESQ;+CEDRXRDP;+CGPADDR;+CGDCONT?': res_ok(
+            '+CESQ: 99,99,255,255,22,52\n+CEDRXRDP: 5,"0010","0101","0011"\n'
+            '+CGPADDR: 1\n'
+            '+CGDCONT: 1,"IP","viasat.ip","10.1.2.3",0,0'),
+    }
+    def send(command, timeout=None, prefix='', **kwargs):
+        return responses.get(command, res_ok(ok=False))
+    with patch.object(AtClient, 'send_command', side_effect=send):
+        modem = NbntnModem()
+        snapshot = modem.get_snapshot()
+        assert snapshot.commands == 1 and snapshot.reused == ()
+        assert snapshot.reginfo.is_registered()
+        assert snapshot.siginfo.rsrp == -90
+        assert snapshot.rrc_state == RrcState.IDLE
+        assert snapshot.edrx_dynamic.ptw_bitmask == '0011'
+        assert snapshot.psm_config.mode == 1
+        assert snapshot.ip_address == '10.1.2.3'
+        with pytest.raises(AttributeError):
+            snapshot.ip_address = ''   # type: ignore
+        assert modem.get_snapshot().commands == 0   # all cached
+        modem.inject_urc('\r\n+CEREG: 1,"0001","01a2d002",9\r\n')
+        modem.inject_urc('\r\n+CSCON: 1\r\n')
+        snapshot = modem.get_snapshot(max_age=60)
+        assert snapshot.commands == 1
+        assert set(snapshot.reused) == {'reginfo', 'rrc_state', 'psm_config'}
+        assert snapshot.reginfo.ci == '01a2d002'
+        assert snapshot.rrc_state == RrcState.CONNECTED
+        assert snapshot.siginfo.rsrp == -88
+        assert snapshot.ip_address == '10.1.2.3'   # from context
+        assert modem.command_count == 2
+
+
 @pytest.mark.parametrize(
     'apn,pdn_type,expected_pdn_type',
     [
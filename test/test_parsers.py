@@ -0,0 +1,62 @@
+from pynbntnmodem import (
+    EdrxConfig,
+    NbntnModem,
+    PdnContext,
+    PdnType,
+    PsmConfig,
+    RegInfo,
+    RegistrationState,
+    RrcState,
+    SigInfo,
+)
+from pynbntnmodem.parsers import (
+    ParamField,
+    ParserRegistry,
+    ResponseParser,
+    default_parsers,
+)
+
+
+def test_default_parsers():
+    info = default_parsers.parse('+CEREG: 5,1,"0001","01a2d001",9,,,"00000101","00101100"',
+                                 query=True)
+    assert isinstance(info, RegInfo) and info.state == RegistrationState.HOME
+    assert info.tac == '0001' and info.ci == '01a2d001'
+    assert info.cause_type is None
+    assert info.act_t3324_bitmask == '00000101'
+    assert info.tau_t3412_bitmask == '00101100'
+    assert default_parsers.parse('+CEREG: 2').state == RegistrationState.SEARCHING
+    sig = default_parsers.parse('99,99,255,255,20,50', '+CESQ')
+    assert sig == SigInfo(rsrp=-90, rsrq=-9, sinr=255, rssi=255)
+    contexts = default_parsers.parse_lines(
+        '1,"IP","viasat.ip",,0,0\n+CGDCONT: 2,"Non-IP","viasat.poc",,0,0',
+        '+CGDCONT')
+    assert contexts == [PdnContext(1, PdnType.IP, 'viasat.ip'),
+                        PdnContext(2, PdnType.NON_IP, 'viasat.poc')]
+    assert default_parsers.parse('+CGACT: 2,1').active
+    psm = default_parsers.parse('+CPSMS: 1,,,"00101100","00001010"')
+    assert psm == PsmConfig(1, '00101100', '00001010')
+    edrx = default_parsers.parse('+CEDRXRDP: 5,"0010","0101","0011"')
+    assert edrx == EdrxConfig('0101', '0011')
+    assert default_parsers.parse('+CRTDCP: 1,2,"a1b2"').payload == b'\xa1\xb2'
+    assert default_parsers.parse('+CSCON: 1')['rrc_state'] == RrcState.CONNECTED
+    assert default_parsers.parse('0,0', '+CSCON', query=True)['rrc_state'] == RrcState.IDLE
+    assert default_parsers.parse('+XYZ: 1') is None
+
+
+def test_parse_stream():
+    lines = ['+CEREG: 1', 'RDY', '+CSCON: 0', '+CEREG: 2']
+    parsed = list(default_parsers.parse_stream(lines))
+    assert [p for p, _ in parsed] == ['+CEREG', '+CSCON', '+CEREG']
+
+
+def test_vendor_parser():
+    modem = NbntnModem()
+    modem.register_parser(ResponseParser('%MEAS', dict, [
+        ParamField(1, 'rsrp', int),
+        ParamField(2, 'sinr', int),
+    ]))
+    assert modem.parsers.parse('%MEAS: "SIGNAL",-101,5') == {'rsrp': -101, 'sinr': 5}
+    assert '%MEAS' not in default_parsers
+    registry = ParserRegistry()
+    assert len(registry) == 0 and registry.parse('+CEREG: 1') is None
@@ -0,0 +1,84 @@
+import time
+
+from pyatcommand import AtErrorCode, AtResponse
+
+from pynbntnmodem import MoMessage, NbntnModem, PdnType
+from pynbntnmodem.pool import ModemPool, PoolUrc
+
+
+class FakeModem(NbntnModem):
+    """A connected modem answering snapshot queries with a given signal."""
+    def __init__(self, rsrp_index: int, registered: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        self.rsrp_index = rsrp_index
+        self.registered = registered
+        self.payloads: list[bytes] = []
+
+    def is_connected(self) -> bool:
+        return True
+
+    def disconnect(self) -> None:
+        pass
+
+    def send_command(self, command: str, timeout=None, prefix='', **kwargs):
+        self._command_count += 1
+        if command.startswith('AT+CEREG?'):
+            stat = 1 if self.registered else 2
+            return AtResponse(AtErrorCode.OK,
+                              f'+CEREG: 5,{stat}\n+CESQ: 99,99,255,255,20,'
+                              f'{self.rsrp_index}\n+CSCON: 0,0')
+        return AtResponse(AtErrorCode.ERROR)
+
+    def send_message_nidd(self, payload: bytes, **kwargs):
+        time.sleep(0.01)
+        self.payloads.append(payload)
+        return MoMessage(payload, PdnType.NON_IP)
+
+
+def test_pool_balancing():
+    signals = {'/dev/fake0': (30, True), '/dev/fake1': (60, True),
+               '/dev/fake2': (90, False)}
+    pool = ModemPool(list(signals),
+                     modem_factory=lambda port: FakeModem(*signals[port]),
+                     refresh_interval=0.1)
+    results = pool.start(mutate=False, initialize=False)
+    assert all(results.values())
+    assert pool.select() == '/dev/fake1'   # best registered signal
+    futures = [pool.send(f'msg {i}'.encode()) for i in range(20)]
+    assert all(f.result(timeout=5) is not None for f in futures)
+    modems = pool.modems
+    assert len(modems['/dev/fake1'].payloads) > len(modems['/dev/fake0'].payloads) > 0
+    assert not modems['/dev/fake2'].payloads   # not registered
+    modems['/dev/fake1'].registered = False
+    modems['/dev/fake1'].inject_urc('\r\n+CEREG: 2\r\n')
+    time.sleep(0.2)
+    assert pool.select() == '/dev/fake0'   # status refreshed by the URC
+    modems['/dev/fake1'].registered = True
+    time.sleep(0.3)
+    assert pool.select() == '/dev/fake1'   # status refreshed when idle
+    stats = pool.stats()
+    assert stats['sent'] == 20 and stats['msgs_per_s'] > 0
+    assert 0 < stats['modems']['/dev/fake1']['utilization'] <= 1
+    pool.close(timeout=2)
+
+
+def test_pool_urcs():
+    pool = ModemPool(['a', 'b'], modem_factory=lambda port: FakeModem(50))
+    received: list[PoolUrc] = []
+    pool.subscribe(received.append)
+    pool.modems['b'].inject_urc('\r\n+CSCON: 1\r\n')
+    pool.modems['a'].inject_urc('\r\n+CEREG: 1\r\n')
+    urc = pool.get_urc(timeout=1)
+    assert urc is not None and urc.port == 'b' and urc.urc == '+CSCON: 1'
+    assert pool.get_urc(timeout=1).port == 'a'
+    assert len(received) == 2
+    assert pool.modems['a'].get_urc() == '+CEREG: 1'   # not consumed
+    future = pool.submit('a', lambda modem: modem.get_rrc_state())
+    assert future.result(timeout=1) is not None   # worker started on demand
+    pool.close(timeout=1)
+    pool = ModemPool(['a'], modem_factory=lambda port: FakeModem(50),
+                     consume_urcs=True)
+    pool.modems['a'].inject_urc('\r\n+CSCON: 1\r\n')
+    assert pool.get_urc(timeout=1).urc == '+CSCON: 1'
+    assert pool.modems['a'].get_urc() is None   # consumed by the pool
+    pool.close(timeout=1)
@@ -0,0 +1,45 @@
+import pytest
+
+from pynbntnmodem import (
+    EdrxConfig,
+    EnergyModel,
+    PsmConfig,
+    TimerPlan,
+    plan_timers,
+)
+from pynbntnmodem.psmplanner import encodable_timers
+
+
+def test_encodable_timers():
+    timers = encodable_timers()
+    assert len(timers['cycle']) == len(timers['ptw']) == 16
+    for seconds, bitmask in timers['tau']:
+        assert PsmConfig.tau_seconds(bitmask) == seconds
+    for seconds, bitmask in timers['act']:
+        assert PsmConfig.act_seconds(bitmask) == seconds
+    assert [s for s, _ in timers['act']] == sorted({s for s, _ in timers['act']})
+    assert timers['tau'][-1][0] == 31 * 320 * 3600
+
+
+def test_pareto_plans():
+    model = EnergyModel(connected_s=2, connected_mw=100)
+    plans = plan_timers(3600, 3600, model)
+    assert plans and all(isinstance(p, TimerPlan) for p in plans)
+    assert all(p.latency_s <= 3600 for p in plans)
+    for better, worse in zip(plans, plans[1:]):
+        assert better.power_mw <= worse.power_mw
+        assert better.latency_s > worse.latency_s
+    cheapest = plans[0]
+    assert cheapest.psm.mode == 1 and cheapest.tau_s == 3600
+    assert cheapest.act_s == 0 and cheapest.edrx is None
+    assert any(isinstance(p.edrx, EdrxConfig) and p.tau_s == 0 for p in plans)
+    assert all(p.psm.mode == 0 for p in plan_timers(60, 3600, model, psm=False))
+    assert all(p.edrx is None for p in plan_timers(60, 3600, model, edrx=False))
+    assert plan_timers(1, 3600, model) == []
+    assert {p.edrx.ptw_bitmask for p in plans if p.edrx} == {'0000'}
+    optimized = plan_timers(3600, 3600, model, ptw=None)
+    assert len({p.edrx.ptw_bitmask for p in optimized if p.edrx}) > 1
+    with pytest.raises(ValueError):
+        plan_timers(3600, 3600, model, ptw='2')
+    with pytest.raises(ValueError):
+        plan_timers(0, 3600)
@@ -0,0 +1,65 @@
+from pynbntnmodem import (
+    EdrxConfig,
+    EnergyModel,
+    PsmAutotuner,
+    PsmConfig,
+    TimerPlan,
+)
+
+T0 = 1_700_000_000.0
+MODEL = EnergyModel(connected_s=5, connected_mw=150)
+
+
+def _traffic(tuner: PsmAutotuner, start: float, count: int, mt_offset: float):
+    for i in range(count):
+        uplink = start + i * 3600
+        tuner.observe_uplink(uplink)
+        tuner.observe_mt(uplink + mt_offset)
+
+
+def test_autotune_with_hysteresis():
+    applied: list[TimerPlan] = []
+
+    def apply(plan: TimerPlan) -> bool:
+        applied.append(plan)
+        return True
+
+    tuner = PsmAutotuner(60, apply, model=MODEL, holdoff=3600)
+    assert tuner.recommend() is None and tuner.tune(T0) is None
+    _traffic(tuner, T0, 6, mt_offset=30)   # MT replies soon after uplinks
+    assert tuner.interval == 3600
+    plan = tuner.tune(T0 + 6 * 3600)
+    assert plan is not None and applied == [plan]
+    assert plan.psm.mode == 1 and 25 <= plan.act_s < 600
+    assert tuner.expected_latency(plan) <= 60 < plan.latency_s
+    worst_case = PsmAutotuner(60, apply, model=MODEL)   # no MT observed
+    for i in range(6):
+        worst_case.observe_uplink(T0 + i * 3600)
+    assert worst_case.recommend().power_mw > plan.power_mw
+    assert tuner.tune(T0 + 6 * 3600 + 60) is None   # holdoff
+    assert tuner.tune(T0 + 8 * 3600) is None   # unchanged
+    _traffic(tuner, T0 + 7 * 3600, 50, mt_offset=1800)   # traffic changes
+    retuned = tuner.tune(T0 + 60 * 3600)
+    assert retuned is not None and tuner.changes == 2
+    assert tuner.expected_latency(retuned) <= 60
+    assert tuner.tune(T0 + 70 * 3600) is None
+
+
+def test_autotune_granted_ptw():
+    applied: list[TimerPlan] = []
+    granted_edrx = EdrxConfig('0101', '0011')   # PTW 10.24 s
+
+    def apply(plan: TimerPlan) -> bool:
+        applied.append(plan)
+        return True
+
+    def granted():
+        return PsmConfig(), granted_edrx
+
+    tuner = PsmAutotuner(60, apply, granted, model=MODEL)
+    for i in range(6):
+        tuner.observe_uplink(T0 + i * 3600)
+    plan = tuner.tune(T0 + 6 * 3600)
+    assert plan is not None and applied == [plan]
+    assert plan.edrx.ptw_bitmask == granted_edrx.ptw_bitmask
+    assert plan.latency_s == plan.edrx.cycle_s - granted_edrx.ptw_s
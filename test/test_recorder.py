@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from pynbntnmodem import (
+    AtTimeout,
+    NbntnModem,
+    TrafficRecorder,
+    TrafficReplayer,
+    UrcType,
+)
+from pynbntnmodem.emulator import ModemEmulator
+from pynbntnmodem.recorder import (
+    EXCEPTION_CODE,
+    ReplayMismatch,
+    TrafficKind,
+    TrafficRecord,
+    read_records,
+)
+
+
+def _session(modem: NbntnModem) -> list:
+    results = [modem.imei, modem.get_siginfo().rsrp]
+    assert modem.set_regconfig(2)
+    assert modem.enable_radio(True)
+    results.append(modem.await_urc('+CEREG:', timeout=2))
+    return results
+
+
+def test_record_and_replay(tmp_path):
+    path = tmp_path / 'session.ntnrec'
+    with ModemEmulator(registration_delay=0.05) as emulator:
+        modem = NbntnModem(port=emulator.port, cache=False)
+        modem.connect()
+        with TrafficRecorder(path, capacity=100) as recorder:
+            recorder.attach(modem)
+            try:
+                recorded = _session(modem)
+                emulator.script_timeout('AT+CIMI')
+                with pytest.raises(AtTimeout):
+                    modem.send_command('AT+CIMI', timeout=0.3)
+            finally:
+                recorder.detach(modem)
+                modem.disconnect()
+            assert len(recorder.records()) > 8
+    records = list(read_records(path))
+    assert records[0].kind == TrafficKind.SESSION
+    assert any(r.kind == TrafficKind.URC for r in records)
+    replayed = NbntnModem(cache=False)
+    registrations = []
+    replayed.urc_dispatcher.subscribe(lambda u, t: registrations.append(u),
+                                      urc_type=UrcType.REGISTRATION)
+    replayer = TrafficReplayer(path)
+    replayer.attach(replayed)
+    start = time.monotonic()
+    assert _session(replayed) == recorded
+    with pytest.raises(AtTimeout):
+        replayed.send_command('AT+CIMI')
+    assert time.monotonic() - start < 0.5
+    cereg = [r.data for r in records if r.data.startswith('+CEREG:')]
+    assert registrations and registrations == cereg[:len(registrations)]
+    replayer.feed_urcs(replayed, to_end=True)
+    assert replayer.finished
+
+
+def test_replay_mismatch_and_truncation(tmp_path):
+    records = [
+        TrafficRecord(TrafficKind.SESSION, 0),
+        TrafficRecord(TrafficKind.COMMAND, 0.0, 'AT+CGMR'),
+        TrafficRecord(TrafficKind.RESPONSE, 0.05, '1.0.0', 0),
+        TrafficRecord(TrafficKind.COMMAND, 0.1, 'AT+CESQ'),
+        TrafficRecord(TrafficKind.RESPONSE, 0.15, '+CESQ: 99,99,255,255,20,50', 0),
+    ]
+    modem = NbntnModem(cache=False)
+    TrafficReplayer(records, speed=1).attach(modem)
+    start = time.monotonic()
+    assert modem.send_command('AT+CGMR').info == '1.0.0'
+    assert modem.send_command('AT+CESQ').ok
+    assert time.monotonic() - start >= 0.14
+    TrafficReplayer(records).attach(modem)
+    with pytest.raises(ReplayMismatch):
+        modem.send_command('AT+CESQ')
+    TrafficReplayer(records, strict=False).attach(modem)
+    assert modem.send_command('AT+CESQ').ok
+    path = tmp_path / 'truncated.ntnrec'
+    recorder = TrafficRecorder(capacity=2)
+    recorder.record_command('AT')
+    recorder.record_urc('+CEREG: 1')
+    assert [r.kind for r in recorder.records()] == [TrafficKind.COMMAND,
+                                                    TrafficKind.URC]
+    recorder.dump(path)
+    path.write_bytes(path.read_bytes()[:-3])
+    assert [r.data for r in read_records(path)] == ['AT']
+    (tmp_path / 'invalid').write_bytes(b'not a recording')
+    with pytest.raises(ValueError):
+        list(read_records(tmp_path / 'invalid'))
+
+
+def test_record_and_replay_exception():
+    modem = NbntnModem(cache=False)   # not connected
+    recorder = TrafficRecorder()
+    recorder.attach(modem)
+    with pytest.raises(ConnectionError):
+        modem.send_command('AT+CGMR')
+    response = recorder.records()[-1]
+    assert response.kind == TrafficKind.RESPONSE
+    assert response.code == EXCEPTION_CODE
+    assert modem.metrics.snapshot()['commands']['+CGMR']['errors'] == 1
+    replayed = NbntnModem(cache=False, metrics=False)
+    TrafficReplayer(recorder.records()).attach(replayed)
+    with pytest.raises(ConnectionError):
+        replayed.send_command('AT+CGMR')
@@ -0,0 +1,46 @@
+import sys
+from importlib.metadata import EntryPoint
+
+from pynbntnmodem import ModemRegistry, ModuleModel, NbntnModem
+from pynbntnmodem import registry as registry_module
+
+SUBCLASS = '''
+from pynbntnmodem import ModuleModel, NbntnModem
+
+
+class {name}(NbntnModem):
+    _model = ModuleModel.{model}
+'''
+
+
+def test_registry_sources(tmp_path, monkeypatch):
+    folder = tmp_path / 'modems'
+    folder.mkdir()
+    (folder / 'quectel_cc660d.py').write_text(
+        SUBCLASS.format(name='FolderCc660d', model='CC660D'))
+    (folder / 'murata_type1sc.py').write_text(
+        SUBCLASS.format(name='FolderType1sc', model='TYPE1SC'))
+    (tmp_path / 'vendor_type1sc.py').write_text(
+        SUBCLASS.format(name='VendorType1sc', model='TYPE1SC'))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    def fake_entry_points(group):
+        return [EntryPoint('TYPE1SC', 'vendor_type1sc:VendorType1sc', group),
+                EntryPoint('NOPE', 'vendor_nope:Nope', group)]
+    monkeypatch.setattr(registry_module, 'entry_points', fake_entry_points)
+    registry = ModemRegistry(folders=[folder], bundled=False)
+    assert set(registry.models()) == {ModuleModel.CC660D, ModuleModel.TYPE1SC}
+    assert registry.get(ModuleModel.TYPE1SC) == 'vendor_type1sc:VendorType1sc'
+    assert 'vendor_type1sc' not in sys.modules   # resolved lazily
+    cls = registry.resolve(ModuleModel.TYPE1SC)
+    assert cls.__name__ == 'VendorType1sc' and issubclass(cls, NbntnModem)
+    assert registry.resolve(ModuleModel.TYPE1SC) is cls
+    assert registry.resolve(ModuleModel.CC660D).__name__ == 'FolderCc660d'
+    assert registry.resolve(ModuleModel.BG95S5) is None
+
+    class Custom(NbntnModem):
+        _model = ModuleModel.TYPE1SC
+
+    registry.register(ModuleModel.TYPE1SC, Custom)
+    assert registry.resolve(ModuleModel.TYPE1SC) is Custom
+    registry.unregister(ModuleModel.TYPE1SC)
+    assert registry.resolve(ModuleModel.TYPE1SC).__name__ == 'VendorType1sc'
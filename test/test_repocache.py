@@ -0,0 +1,113 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from pynbntnmodem import NbntnModem, clone_and_load_modem_classes
+from pynbntnmodem.repocache import RepoCache, sanitize_url
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(
+        ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com',
+         '-C', str(repo), *args],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+
+
+def _commit(repo: Path, files: dict[str, str], message: str = 'update'):
+    for name, content in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    _git(repo, 'add', '-A')
+    _git(repo, 'commit', '-q', '-m', message)
+    return _git(repo, 'rev-parse', 'HEAD')
+
+
+@pytest.fixture
+def origin(tmp_path: Path):
+    repo = tmp_path / 'pynbntnmodem-acme-x1'
+    repo.mkdir()
+    _git(repo, 'init', '-q', '-b', 'main')
+    _commit(repo, {
+        'acme_x1.py': 'class AcmeX1:\n    pass\n',
+        'tests/test_x1.py': 'def test():\n    pass\n',
+    })
+    return repo
+
+
+def test_sanitize_url():
+    assert (sanitize_url('https://token@github.com/org/repo') ==
+            'https://github.com/org/repo')
+    assert (sanitize_url('https://user:pw@host/repo.git') ==
+            'https://host/repo.git')
+    assert sanitize_url('file:///tmp/repo') == 'file:///tmp/repo'
+
+
+def test_fetch_resolve_verify(origin: Path, tmp_path: Path):
+    cache = RepoCache(tmp_path / 'cache')
+    url = origin.as_uri()
+    assert cache.resolve(url) is None
+    snapshot = cache.fetch(url)
+    assert snapshot is not None
+    assert snapshot.commit == _git(origin, 'rev-parse', 'HEAD')
+    assert [p.name for p in snapshot.files()] == ['acme_x1.py']
+    offline = RepoCache(tmp_path / 'cache').resolve(url)
+    assert offline == snapshot
+    assert cache.verify(snapshot)
+    git = cache._git
+    commands = []
+    cache._git = lambda *args: commands.append(args[0]) or git(*args)
+    assert cache.fetch(url) == snapshot
+    assert commands == ['ls-remote']   # unchanged so not cloned
+    (snapshot.path / 'acme_x1.py').write_text('tampered = True\n')
+    assert not cache.verify(snapshot)
+    assert cache.resolve(url) is None
+    assert cache.fetch(url).commit == snapshot.commit
+    assert cache.resolve(url) is not None
+
+
+def test_fetch_all_and_refresh(origin: Path, tmp_path: Path):
+    other = tmp_path / 'pynbntnmodem-acme-y2'
+    other.mkdir()
+    _git(other, 'init', '-q', '-b', 'main')
+    _commit(other, {'acme_y2.py': 'class AcmeY2:\n    pass\n'})
+    cache = RepoCache(tmp_path / 'cache')
+    urls = [origin.as_uri(), other.as_uri(), (tmp_path / 'missing').as_uri()]
+    snapshots = cache.fetch_all(urls)
+    assert snapshots[urls[0]] is not None and snapshots[urls[1]] is not None
+    assert snapshots[urls[2]] is None
+    updated = _commit(origin, {'acme_x1.py': 'class AcmeX1:\n    v = 2\n'})
+    changed = []
+    def on_update(url, snapshot):
+        changed.append((url, snapshot.commit))
+    thread = cache.refresh(urls[:2], on_update=on_update)
+    thread.join(30)
+    assert changed == [(urls[0], updated)]
+    assert cache.resolve(urls[0]).commit == updated
+    assert cache.prune(urls[0], keep=1) == 1
+
+
+def test_clone_and_load_offline(tmp_path: Path):
+    repo = tmp_path / 'pynbntnmodem-acme-z3'
+    repo.mkdir()
+    _git(repo, 'init', '-q', '-b', 'main')
+    _commit(repo, {'acme_z3.py': (
+        'from pynbntnmodem import NbntnModem\n\n'
+        'class AcmeZ3(NbntnModem):\n    pass\n'
+    )})
+    cache = RepoCache(tmp_path / 'cache')
+    url = repo.as_uri()
+    assert clone_and_load_modem_classes([url], repo_cache=cache,
+                                        offline=True) == {}
+    classes = clone_and_load_modem_classes([url], repo_cache=cache)
+    assert issubclass(classes['AcmeZ3'], NbntnModem)
+    shutil.rmtree(repo)
+    download = tmp_path / 'download'
+    classes = clone_and_load_modem_classes([url], repo_cache=cache,
+                                           offline=True,
+                                           download_path=str(download))
+    assert 'AcmeZ3' in classes
+    assert (download / 'acme_z3.py').exists()
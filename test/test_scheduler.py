@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from pynbntnmodem import (
+    MoMessage,
+    SignalQuality,
+    TransportType,
+    UplinkScheduler,
+)
+
+
+class FakeLink:
+    def __init__(self, quality=SignalQuality.NONE, registered=True):
+        self.quality = quality
+        self.registered = registered
+        self.sent: list[tuple[bytes, SignalQuality]] = []
+        self.fail = 0
+
+    def link(self):
+        return self.quality, self.registered
+
+    def send(self, payload: bytes, **kwargs):
+        self.sent.append((payload, self.quality))
+        if self.fail:
+            self.fail -= 1
+            return None
+        return MoMessage(payload, TransportType.NIDD)
+
+
+def test_release_on_threshold():
+    fake = FakeLink(SignalQuality.WEAK)
+    scheduler = UplinkScheduler(fake.send, fake.link,
+                                threshold=SignalQuality.MID, poll_interval=0.05)
+    try:
+        first = scheduler.submit(b'first', deadline=10)
+        second = scheduler.submit(b'second', deadline=5)
+        time.sleep(0.15)
+        assert not fake.sent and scheduler.pending == 2
+        fake.registered = False
+        fake.quality = SignalQuality.GOOD
+        time.sleep(0.15)
+        assert not fake.sent
+        fake.registered = True
+        scheduler.wake()
+        assert isinstance(first.result(2), MoMessage)
+        assert second.result(2).payload == b'second'
+        assert [p for p, _ in fake.sent] == [b'second', b'first']
+        stats = scheduler.stats()
+        assert stats['sent'] == 2 and stats['forced'] == 0
+        assert stats['actual_success_rate'] == 1
+        assert stats['expected_success_rate'] == pytest.approx(0.93)
+        assert stats['immediate_success_rate'] == pytest.approx(0.4)
+        assert stats['by_quality'] == {'GOOD': {'attempts': 2, 'successes': 2}}
+    finally:
+        scheduler.close()
+
+
+def test_deadline_retry_and_drop():
+    fake = FakeLink(SignalQuality.NONE)
+    scheduler = UplinkScheduler(fake.send, fake.link, poll_interval=0.05,
+                                max_attempts=2)
+    try:
+        start = time.monotonic()
+        forced = scheduler.submit(b'forced', deadline=0.1)
+        assert forced.result(2) is not None
+        assert time.monotonic() - start >= 0.1
+        fake.fail = 2
+        dropped = scheduler.submit(b'dropped', deadline=0)
+        assert dropped.result(2) is None
+        assert [p for p, _ in fake.sent] == [b'forced', b'dropped', b'dropped']
+        stats = scheduler.stats()
+        assert stats['forced'] == 2 and stats['dropped'] == 1
+        assert stats['actual_success_rate'] == 0.5
+        assert stats['expected_success_rate'] == pytest.approx(0.1)
+    finally:
+        scheduler.close()
+    scheduler = UplinkScheduler(fake.send, fake.link, poll_interval=10)
+    future = scheduler.submit(b'flushed', deadline=60)
+    scheduler.close(flush=True, timeout=2)
+    assert future.result(0).payload == b'flushed'
+    with pytest.raises(ConnectionError):
+        scheduler.submit(b'closed')
+    with pytest.raises(ValueError):
+        UplinkScheduler(fake.send, fake.link, threshold=SignalQuality.WARNING)
+
+
+def test_retry_backoff_on_good_link():
+    fake = FakeLink(SignalQuality.GOOD)
+    fake.fail = 1
+    scheduler = UplinkScheduler(fake.send, fake.link, poll_interval=0.2)
+    try:
+        start = time.monotonic()
+        future = scheduler.submit(b'retried', deadline=60)
+        time.sleep(0.1)
+        assert len(fake.sent) == 1 and scheduler.pending == 1
+        assert future.result(2).payload == b'retried'
+        assert time.monotonic() - start >= 0.2
+        assert len(fake.sent) == 2 and scheduler.stats()['dropped'] == 0
+    finally:
+        scheduler.close()
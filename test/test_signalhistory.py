@@ -0,0 +1,73 @@
+import statistics
+
+import pytest
+
+from pynbntnmodem import NbntnModem, SigInfo, SignalHistory, SignalQuality
+from pynbntnmodem.signalhistory import signal_quality
+
+
+def _history(count: int, capacity: int = 100) -> SignalHistory:
+    history = SignalHistory(capacity)
+    history.extend((1_700_000_000 + 60 * i,
+                    SigInfo(rsrp=-110 + i % 10, rsrq=-10, sinr=i % 12 - 6,
+                            rssi=99, ber=0.25 * (i % 4)))
+                   for i in range(count))
+    return history
+
+
+def test_ring_buffer():
+    history = _history(150)
+    assert len(history) == 100
+    assert history.nbytes == 14 * 100
+    times = history.timestamps()
+    assert times[0] == 1_700_000_000 + 60 * 50 and list(times) == sorted(times)
+    assert history.latest() == SigInfo(-110 + 149 % 10, -10, 149 % 12 - 6,
+                                       99, 0.25)
+    assert len(history.values('rssi')) == 0
+    assert len(history.values('rssi', valid=False)) == 100
+    assert len(history.timestamps(window=600)) == 11
+    exported = history.export()
+    assert len(exported['timestamp']) == len(exported['ber']) == 100
+    history.append(SigInfo(rsrp=-101.6, sinr=3.5, ber=None))
+    latest = history.latest()
+    assert (latest.rsrp, latest.sinr, latest.ber) == (-102, 3.5, 99.0)
+    history.clear()
+    assert len(history) == 0 and history.latest() is None
+    with pytest.raises(ValueError):
+        history.values('snr')
+
+
+def test_statistics():
+    history = _history(100)
+    rsrp = [-110 + i % 10 for i in range(100)]
+    assert history.mean('rsrp') == statistics.mean(rsrp)
+    assert history.mean('rssi') is None
+    assert history.percentile('rsrp', 50) == statistics.median(rsrp)
+    assert history.percentile('rsrp', 0) == min(rsrp)
+    assert history.percentile('rsrp', 100) == max(rsrp)
+    assert history.mean('ber') == pytest.approx(0.375)
+    window = [-110 + i % 10 for i in range(90, 100)]
+    assert history.mean('rsrp', window=540) == statistics.mean(window)
+    rolling = history.rolling_mean('rsrp', 10)
+    assert len(rolling) == 91 and all(r == statistics.mean(rsrp[:10])
+                                      for r in rolling)
+    ewma = None
+    for value in rsrp:
+        ewma = value if ewma is None else 0.8 * ewma + 0.2 * value
+    assert history.ewma('rsrp', alpha=0.2) == pytest.approx(ewma)
+
+
+def test_quality():
+    history = SignalHistory(10)
+    for sinr in (-12, -7, -4, 0, 3.5, 4, 7, 14, 255):
+        history.append(SigInfo(sinr=sinr))
+    modem = NbntnModem()
+    expected = [modem.get_signal_quality(s)
+                for s in (-12, -7, -4, 0, 3.5, 4, 7, 14, 255)]
+    assert history.quality() == expected
+    assert expected == [SignalQuality.NONE, SignalQuality.WEAK,
+                        SignalQuality.LOW, SignalQuality.MID, SignalQuality.MID,
+                        SignalQuality.GOOD, SignalQuality.STRONG,
+                        SignalQuality.STRONG, SignalQuality.WARNING]
+    assert history.quality_counts()[SignalQuality.STRONG] == 2
+    assert signal_quality(15) == SignalQuality.WARNING
@@ -0,0 +1,114 @@
+import socket
+import threading
+import time
+from queue import Queue
+
+from pynbntnmodem import MoMessage, PdnType, UdpSocketBridge
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class FakeModemSocket:
+    def __init__(self):
+        self.sent: list[bytes] = []
+        self.downlink: Queue = Queue()
+        self.closed = threading.Event()
+        self.recv_calls = 0
+
+    def open(self, **kwargs) -> bool:
+        return True
+
+    def send(self, data: bytes) -> MoMessage:
+        self.sent.append(data)
+        return MoMessage(data, PdnType.IP)
+
+    def recv(self, **kwargs) -> 'bytes|None':
+        self.recv_calls += 1
+        return None if self.downlink.empty() else self.downlink.get()
+
+    def close(self) -> bool:
+        self.closed.set()
+        return True
+
+
+def make_bridge(fake: FakeModemSocket, port: int, **kwargs) -> UdpSocketBridge:
+    return UdpSocketBridge('127.0.0.1', port, open=fake.open, send=fake.send,
+                           recv=fake.recv, close=fake.close, **kwargs)
+
+
+def test_bridge_uplink_throughput():
+    fake = FakeModemSocket()
+    port = free_port()
+    bridge = make_bridge(fake, port, event_trigger=True)
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    count = 50
+    start = time.time()
+    for i in range(count):
+        client.sendto(f'datagram {i}'.encode(), ('127.0.0.1', port))
+    while len(fake.sent) < count and time.time() - start < 2:
+        time.sleep(0.01)
+    assert len(fake.sent) == count
+    assert time.time() - start < 1
+    client.sendto(b'x' * 2000, ('127.0.0.1', port))   # too large
+    bridge.close(timeout=2)
+    assert fake.closed.is_set()
+    assert len(fake.sent) == count
+    client.close()
+
+
+def test_bridge_downlink_drain():
+    fake = FakeModemSocket()
+    port = free_port()
+    bridge = make_bridge(fake, port, event_trigger=True)
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(1)
+    client.sendto(b'hello', ('127.0.0.1', port))
+    for i in range(3):
+        fake.downlink.put(f'reply {i}'.encode())
+    time.sleep(0.1)
+    bridge.receive_event()
+    replies = [client.recvfrom(1024)[0] for _ in range(3)]
+    assert replies == [b'reply 0', b'reply 1', b'reply 2']
+    time.sleep(0.1)
+    assert fake.recv_calls == 4   # one pass until empty
+    bridge.close(timeout=2)
+    client.close()
+
+
+def test_bridge_poll_backoff():
+    fake = FakeModemSocket()
+    port = free_port()
+    bridge = make_bridge(fake, port, poll_interval=0.05, max_poll_interval=0.4)
+    time.sleep(1)
+    assert fake.recv_calls < 8   # backed off from 20 polls
+    bridge.close(timeout=2)
+    assert fake.closed.is_set()
+    fake = FakeModemSocket()
+    bridge = make_bridge(fake, free_port(), poll_interval=0.05)
+    time.sleep(0.5)
+    assert fake.recv_calls >= 7   # no backoff by default
+    bridge.close(timeout=2)
+
+
+def test_bridge_fragmentation():
+    fake = FakeModemSocket()
+    port = free_port()
+    bridge = make_bridge(fake, port, event_trigger=True, fragmentation=True)
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(1)
+    large = bytes(range(256)) * 12
+    client.sendto(large, ('127.0.0.1', port))
+    start = time.time()
+    while len(fake.sent) < 3 and time.time() - start < 2:
+        time.sleep(0.01)
+    assert len(fake.sent) == 3
+    for fragment in reversed(fake.sent):
+        fake.downlink.put(fragment)
+    bridge.receive_event()
+    assert client.recvfrom(4096)[0] == large
+    bridge.close(timeout=2)
+    client.close()
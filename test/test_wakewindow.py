@@ -0,0 +1,82 @@
+import math
+import time
+
+import pytest
+
+from pynbntnmodem import (
+    EdrxConfig,
+    NbntnModem,
+    PsmConfig,
+    WakeWindowPredictor,
+)
+from pynbntnmodem.emulator import ModemEmulator
+from pynbntnmodem.wakewindow import WindowKind, psm_timers
+
+T0 = 1_700_000_000.0
+
+
+def _psm(tau: int, act: int) -> PsmConfig:
+    return PsmConfig(1, PsmConfig.seconds_to_tau(tau),
+                     PsmConfig.seconds_to_act(act))
+
+
+def test_psm_timeline():
+    assert psm_timers(_psm(3600, 60)) == (3600, 60)
+    assert psm_timers(PsmConfig()) is None
+    predictor = WakeWindowPredictor(_psm(3600, 60), connected_s=10)
+    assert predictor.next_reachable_window(T0) is None   # phase unknown
+    predictor.connected(T0)
+    predictor.idle(T0 + 30)
+    assert predictor.connected_s == pytest.approx(10 + 0.3 * 20)
+    window = predictor.next_reachable_window(T0 + 40)
+    assert (window.start, window.end) == (T0 + 40, T0 + 90)
+    assert window.kind == WindowKind.IDLE
+    assert predictor.time_until_sleep(T0 + 40) == 50
+    assert predictor.time_until_sleep(T0 + 100) == 0
+    tau = predictor.next_reachable_window(T0 + 100)
+    assert tau.start == T0 + 30 + 3600 and tau.kind == WindowKind.CONNECTED
+    assert tau.end == tau.start + predictor.connected_s + 60   # merged active
+    later = predictor.next_reachable_window(T0 + 30 + 10 * 3600)
+    assert later.kind == WindowKind.CONNECTED and later.start > T0 + 10 * 3600
+    predictor.psm_entered(T0 + 200)
+    assert predictor.next_reachable_window(T0 + 200).start == T0 + 3630
+    predictor.psm_exited(T0 + 300)
+    assert predictor.time_until_sleep(T0 + 300) > 60
+    assert len(predictor.windows(3 * 3600, now=T0 + 300)) == 6
+
+
+def test_edrx_windows():
+    edrx = EdrxConfig(EdrxConfig.seconds_to_edrx_cycle(40),
+                      EdrxConfig.seconds_to_edrx_ptw(5))
+    predictor = WakeWindowPredictor(edrx=edrx)
+    predictor.idle(T0)
+    windows = predictor.windows(200, now=T0 + 50)
+    assert [(w.start - T0, w.end - T0) for w in windows] == [
+        (80, 85), (120, 125), (160, 165), (200, 205), (240, 245),
+    ]
+    assert all(w.kind == WindowKind.PAGING for w in windows)
+    assert predictor.next_reachable_window(T0 + 50, min_duration=10) is None
+    predictor = WakeWindowPredictor(_psm(3600, 120), edrx)
+    predictor.idle(T0)
+    windows = predictor.windows(3700, now=T0)
+    assert [w.start - T0 for w in windows[:3]] == [0, 40, 80]
+    assert windows[3].kind == WindowKind.CONNECTED
+    assert [w.start - T0 for w in windows[3:]] == [3600, 3620, 3660]
+    assert WakeWindowPredictor().time_until_sleep() == math.inf
+
+
+def test_modem_tracking():
+    with ModemEmulator(rrc_inactivity=0.2) as emulator:
+        modem = NbntnModem(port=emulator.port)
+        modem.connect()
+        try:
+            assert modem.enable_rrc_urc()
+            predictor = WakeWindowPredictor.for_modem(modem, connected_s=5)
+            assert modem.send_message_nidd(b'hello') is not None
+            modem.await_urc('+CSCON: 0', timeout=2)
+            time.sleep(0.05)
+            assert predictor.connected_s < 5
+            assert predictor.time_until_sleep() == math.inf
+            predictor.detach()
+        finally:
+            modem.disconnect()